@@ -9,6 +9,13 @@
 # --- VERSION 7.42.2 (Patched): Added explicit prompt-ready dominant/least elements ---
 # --- VERSION 7.42.3: Ensure ephemeris_path_used is set at the start of calculate_chart ---
 # --- VERSION 7.42.4 (PATCH): Corrected indentation for return statement in calculate_chart
+# --- VERSION 7.48.1: Asc/MC declinations from the true obliquity (calculate_angle_declinations, shared with relocation) ---
+# --- VERSION 7.48.0: Heliacal rising/setting dates (heliacal.py) on fixed_star_links ---
+# --- VERSION 7.47.0: Birth-time-unknown mode (calculate_chart(time_unknown=True)): solar / solar whole-sign houses, no angles ---
+# --- VERSION 7.46.0: Ephemeris accuracy tiers (ephemeris_tier.py); calculate_chart(ephemeris_tier='moshier') runs file-free ---
+# --- VERSION 7.45.0: Optional extended asteroid catalog (asteroid_catalog.py), aspected via calculate_aspects extra_points ---
+# --- VERSION 7.44.0: Arabic parts via formula-compiled engine (arabic_parts.py) ---
+# --- VERSION 7.43.0: Store jd_ut/zodiac in calculation_info; balances & house rulers as reusable helpers (sidereal views) ---
 
 import swisseph as swe
 import os
@@ -48,7 +55,7 @@ except Exception as e:
 
 
 # --- Version ---
-__version__ = "7.42.4" # Incremented for the fix
+__version__ = "7.48.1"
 
 # --- Fixed Star Data and Configuration ---
 try:
@@ -102,6 +109,13 @@ except Exception as e:
 DEFAULT_FIXED_STAR_NAMES = tuple(FIXED_STAR_INFO.keys()) if FIXED_STAR_INFO else ()
 FIXED_STAR_ORB = 2.0
 
+from arabic_parts import calculate_arabic_parts, PARTS_IN_POSITIONS
+from asteroid_catalog import calculate_asteroid_positions
+from heliacal import add_heliacal_dates
+from ephemeris_tier import (
+    MOSHIER_UNSUPPORTED_BODIES, get_ephemeris_flag, get_ephemeris_tier, is_file_free_tier, use_ephemeris_tier,
+)
+
 
 # Optional Imports
 def fallback_calculate_ley_lines(lat, lng, loc_str):
@@ -234,6 +248,13 @@ MIDPOINTS_TO_CALCULATE = [
     ('Saturn', 'North Node'),
     ('Ascendant', 'Midheaven')
 ]
+# Birth time unknown: without a time there is no Ascendant/MC, so houses are counted from the Sun instead
+TIME_UNKNOWN_HOUSE_MODES = {"solar": "Solar (Sun on Ascendant)", "whole_sign": "Solar Whole Sign"}
+TIME_UNKNOWN_DEFAULT_HOUR, TIME_UNKNOWN_DEFAULT_MINUTE = 12, 0 # Noon chart: the Moon is then at most ~7 degrees off
+ANGLE_POINTS = ('Ascendant', 'Midheaven', 'IC', 'DC')
+TIME_DEPENDENT_FEATURES = ('Ascendant', 'Midheaven', 'IC', 'DC', 'Chart Ruler', 'Arabic Parts', 'Angle Midpoints', 'Quadrant House Cusps')
+# Prompt placeholders that only mean something with a known birth time (angles, chart ruler, house cusp signs, lots)
+TIME_DEPENDENT_PROMPT_KEYS = re.compile(r"\{(asc_|mc_|ic_|dc_|chart_ruler|house_\d+_|part_of_)")
 DECLINATION_POINTS = [
     'Sun', 'Moon', 'Mercury', 'Venus', 'Mars', 'Jupiter', 'Saturn',
     'Uranus', 'Neptune', 'Pluto', 'Chiron', 'North Node', 'True Node',
@@ -366,7 +387,7 @@ def get_moon_phase_details(jd_ut, sun_deg, moon_deg):
             angle += 360.0
 
         # Get illumination fraction from Swisseph
-        flags = swe.FLG_SWIEPH # Use standard ephemeris flags
+        flags = get_ephemeris_flag() # Active accuracy tier (Swiss files or Moshier)
         pheno_result = swe.pheno_ut(jd_ut, swe.MOON, flags)
         
         if isinstance(pheno_result, tuple) and len(pheno_result) >= 2:
@@ -542,7 +563,8 @@ def get_aspect_orb(p1_name, p2_name, aspect_name, aspect_type):
     else:
         return aspect_specific_orbs.get("default", 1.0) # Fallback if default not specified (shouldn't happen with good ORB_SETTINGS)
 
-def calculate_aspects(positions):
+def calculate_aspects(positions, extra_points=None):
+    """Longitude aspects from ASPECT_POINTS_FROM to ASPECT_POINTS_TO plus any extra_points (e.g. catalog asteroids)."""
     logger.info("   Calculating Longitude Aspects...")
     aspects_found = defaultdict(list)
     processed_pairs = set() # To avoid duplicate aspects (e.g. Sun-Moon and Moon-Sun)
@@ -553,7 +575,8 @@ def calculate_aspects(positions):
 
     # Prepare a dictionary of valid points and their degrees for quick lookup
     point_degrees = {}
-    all_aspect_points_set = set(ASPECT_POINTS_FROM) | set(ASPECT_POINTS_TO) # Combine all points considered for aspects
+    aspect_points_to = list(ASPECT_POINTS_TO) + [p for p in (extra_points or []) if p not in ASPECT_POINTS_TO]
+    all_aspect_points_set = set(ASPECT_POINTS_FROM) | set(aspect_points_to) # Combine all points considered for aspects
     for point_name in all_aspect_points_set:
         pos_data = positions.get(point_name)
         if isinstance(pos_data, dict) and pos_data.get('degree') is not None and pos_data.get('sign') != 'Error':
@@ -571,7 +594,7 @@ def calculate_aspects(positions):
             continue
         p1_deg = point_degrees[p1_name]
 
-        for p2_name in ASPECT_POINTS_TO:
+        for p2_name in aspect_points_to:
             if p2_name not in valid_points_for_aspects or p1_name == p2_name: # No aspects to self
                 continue
             
@@ -943,9 +966,24 @@ def calculate_midpoint(deg1, deg2):
 
     return midpoint
 
+def get_true_obliquity(jd_ut):
+    """True obliquity of the ecliptic (degrees, incl. nutation) for a Julian day (UT)."""
+    return swe.calc_ut(jd_ut, swe.ECL_NUT, get_ephemeris_flag())[0][0] # Tier flag keeps moshier charts file-free
+
+
+def calculate_angle_declinations(angle_degrees, obliquity):
+    """{name: declination} for ecliptic points such as {'Ascendant': lon, 'Midheaven': lon}: sin(Dec) = sin(Eps) * sin(Lon).
+
+    Shared by calculate_chart and relocated charts so both give the angles the same declinations.
+    """
+    sin_eps = math.sin(math.radians(obliquity))
+    return {name: math.degrees(math.asin(sin_eps * math.sin(math.radians(degree))))
+            for name, degree in angle_degrees.items()}
+
+
 def calculate_declinations(jd_ut, bodies, positions): # bodies is name -> swe_id map
     logger.info("   Calculating Declinations...")
-    flags = swe.FLG_SWIEPH | swe.FLG_SPEED # FLG_SPEED not strictly needed for declination only, but often calc_ut is used for general pos
+    flags = get_ephemeris_flag() | swe.FLG_SPEED # FLG_SPEED not strictly needed for declination only, but often calc_ut is used for general pos
     
     for name, body_id in bodies.items():
         if name not in positions: # Skip if point not in main positions dict (e.g. if it's an angle handled separately)
@@ -955,7 +993,7 @@ def calculate_declinations(jd_ut, bodies, positions): # bodies is name -> swe_id
         try:
             # For declination, we need equatorial coordinates.
             # swe.calc_ut with FLG_EQUATORIAL returns RA, Dec, Dist, SpeedRA, SpeedDec, SpeedDist
-            calc_result_eq, ret_flag_eq = swe.calc_ut(jd_ut, body_id, swe.FLG_EQUATORIAL | swe.FLG_SWIEPH)
+            calc_result_eq, ret_flag_eq = swe.calc_ut(jd_ut, body_id, swe.FLG_EQUATORIAL | get_ephemeris_flag())
             
             if ret_flag_eq >= 0 and isinstance(calc_result_eq, (list, tuple)) and len(calc_result_eq) >= 2:
                 # result[0] is Right Ascension, result[1] is Declination
@@ -974,49 +1012,17 @@ def calculate_declinations(jd_ut, bodies, positions): # bodies is name -> swe_id
             logger.warning(f"Position entry for {name} is not a dict, cannot add declination.")
 
     # Calculate Declinations for Ascendant and Midheaven
-    try:
-        # ascmc_raw contains [asc, mc, armc, Gearth, vertex, equat_asc, coasc1, coasc2, polasc]
-        # We need the ecliptic longitude of Asc and MC from ascmc_raw
-        if 'ascmc_raw' in positions and isinstance(positions['ascmc_raw'], (list, tuple)) and len(positions['ascmc_raw']) >= 2:
-            asc_lon_ecl = positions['ascmc_raw'][0] 
-            mc_lon_ecl = positions['ascmc_raw'][1]
-            
-            # Get obliquity of ecliptic
-            # swe.get_tid_acc returns [NutObl, TrueObl, MeanObl, NutLong, NutLat]
-            eps_tuple = swe.get_tid_acc(jd_ut, swe.FLG_SWIEPH) # Use current JD
-            true_obliquity = eps_tuple[1] # True obliquity of the ecliptic
-
-            # Ascendant Declination: sin(Dec) = sin(Eps) * sin(Lambda_Asc)
-            try:
-                asc_lon_rad = math.radians(asc_lon_ecl)
-                eps_rad = math.radians(true_obliquity)
-                asc_dec_rad = math.asin(math.sin(eps_rad) * math.sin(asc_lon_rad))
-                asc_declination = math.degrees(asc_dec_rad)
-                if 'Ascendant' in positions and isinstance(positions['Ascendant'], dict):
-                    positions['Ascendant']['declination'] = asc_declination
-                logger.debug(f"                    Ascendant: EclLon={asc_lon_ecl:.4f}, TrueObl={true_obliquity:.4f} -> Dec={asc_declination:.4f}")
-            except Exception as asc_dec_err:
-                logger.error(f"Error calculating Ascendant declination: {asc_dec_err}")
-                if 'Ascendant' in positions and isinstance(positions['Ascendant'], dict): positions['Ascendant']['declination'] = None
-            
-            # Midheaven Declination: sin(Dec) = sin(Eps) * sin(Lambda_MC)
-            try:
-                mc_lon_rad = math.radians(mc_lon_ecl)
-                # eps_rad is already calculated
-                mc_dec_rad = math.asin(math.sin(eps_rad) * math.sin(mc_lon_rad))
-                mc_declination = math.degrees(mc_dec_rad)
-                if 'Midheaven' in positions and isinstance(positions['Midheaven'], dict):
-                    positions['Midheaven']['declination'] = mc_declination
-                logger.debug(f"                    Midheaven: EclLon={mc_lon_ecl:.4f}, TrueObl={true_obliquity:.4f} -> Dec={mc_declination:.4f}")
-            except Exception as mc_dec_err:
-                logger.error(f"Error calculating Midheaven declination: {mc_dec_err}")
-                if 'Midheaven' in positions and isinstance(positions['Midheaven'], dict): positions['Midheaven']['declination'] = None
-        else:
-            logger.warning("Cannot calculate AC/MC declinations: 'ascmc_raw' data missing or invalid in positions dict.")
-    except Exception as e_acmc_dec:
-        logger.error(f"General error calculating AC/MC declinations: {e_acmc_dec}", exc_info=True)
-        if 'Ascendant' in positions and isinstance(positions['Ascendant'], dict): positions['Ascendant']['declination'] = None
-        if 'Midheaven' in positions and isinstance(positions['Midheaven'], dict): positions['Midheaven']['declination'] = None
+    angle_degrees = {name: positions[name]['degree'] for name in ('Ascendant', 'Midheaven')
+                     if isinstance(positions.get(name), dict) and positions[name].get('degree') is not None}
+    if angle_degrees:
+        try:
+            for name, declination in calculate_angle_declinations(angle_degrees, get_true_obliquity(jd_ut)).items():
+                positions[name]['declination'] = declination
+                logger.debug(f"                    {name}: EclLon={angle_degrees[name]:.4f} -> Dec={declination:.4f}")
+        except Exception as e_acmc_dec:
+            logger.error(f"Error calculating AC/MC declinations: {e_acmc_dec}", exc_info=True)
+            for name in angle_degrees:
+                positions[name]['declination'] = None
 
     logger.info("   Declination calculation finished.")
     return positions # Return the modified positions dictionary
@@ -1109,7 +1115,7 @@ def calculate_future_transits( natal_positions, jd_ut_natal, start_date, duratio
     events = []
     active_aspects_tracker = {} # To track start, peak, min_orb, and potential end of an aspect
     previous_transit_signs = {} # To track planet ingresses
-    flags = swe.FLG_SPEED | swe.FLG_SWIEPH # Calculate speed for retrograde checks if needed, though not strictly used for ingresses here
+    flags = swe.FLG_SPEED | get_ephemeris_flag() # Calculate speed for retrograde checks if needed, though not strictly used for ingresses here
     
     date_iter = start_date
     logger.debug(f"Iterating for transits from {start_date} to {end_date}")
@@ -1272,7 +1278,7 @@ def get_current_transit_phase(age, natal_positions, orb=2.0): # Orb for checking
     try:
         today = datetime.now(timezone.utc).date() # Use current UTC date
         jd_today = swe.julday(today.year, today.month, today.day, 0.0, swe.GREG_CAL)
-        flags = swe.FLG_SWIEPH # Basic flags for position
+        flags = get_ephemeris_flag() # Basic flags for position
         
         active_transit_strings = []
         
@@ -1334,7 +1340,7 @@ def calculate_fixed_star_conjunctions_v2( planet_positions_abs_deg, house_cusps,
         logger.warning("No fixed star names provided or loaded for check (V2).")
         return []
 
-    flags = swe.FLG_SWIEPH # Standard flags
+    flags = get_ephemeris_flag() # Standard flags
 
     calculated_star_details = {} # Cache calculated star positions for this JD
     for star_name in star_names:
@@ -1431,17 +1437,227 @@ def calculate_fixed_star_conjunctions_v2( planet_positions_abs_deg, house_cusps,
     return matches
 
 
+def calculate_balances(chart):
+    """Fill elemental/modality balances and element/modality chart signatures from chart['positions'].
+
+    Shared by calculate_chart and derived charts (e.g. sidereal views) so both report the same signatures.
+    """
+    logger.info("   Calculating Elemental and Modality Balances...")
+    element_counts = Counter(); modality_counts = Counter(); valid_points_for_balance = 0
+    dominant_element_str = "None"; weakest_element_str = "None"; dominant_modality_str = "None"; weakest_modality_str = "None" # Initialize
+    try:
+        for point_name_bal in POINTS_FOR_BALANCE: # Use predefined list of points for balance
+            pos_data_bal = chart['positions'].get(point_name_bal)
+            if isinstance(pos_data_bal, dict) and pos_data_bal.get('sign') not in [None, 'Error']:
+                sign_bal = pos_data_bal['sign']
+                element_bal = ELEMENT_MAP.get(sign_bal)
+                modality_bal = MODALITY_MAP.get(sign_bal)
+                if element_bal: element_counts[element_bal] += 1
+                if modality_bal: modality_counts[modality_bal] += 1
+                valid_points_for_balance += 1
+        
+        if valid_points_for_balance > 0:
+            # Calculate percentages
+            chart['elemental_balance'] = {el: round((count / valid_points_for_balance) * 100, 1) for el, count in element_counts.items()}
+            chart['modality_balance'] = {mod: round((count / valid_points_for_balance) * 100, 1) for mod, count in modality_counts.items()}
+
+            # Determine dominant and weakest elements
+            if element_counts:
+                max_elem_count = max(element_counts.values())
+                dominant_element_list_val = sorted([k for k, v_el in element_counts.items() if v_el == max_elem_count])
+                dominant_element_str = "/".join(dominant_element_list_val)
+                
+                all_elements_set = set(ELEMENT_MAP.values()) # {"Fire", "Earth", "Air", "Water"}
+                min_elem_count = min(element_counts.values()) if element_counts else 0
+                # Weakest are those with min count AND not dominant, PLUS any missing elements
+                weakest_elements_with_count = sorted([k for k, v_el in element_counts.items() if v_el == min_elem_count and k not in dominant_element_list_val])
+                missing_elements_list = sorted(list(all_elements_set - set(element_counts.keys())))
+                full_weakest_list_val = sorted(list(set(missing_elements_list + weakest_elements_with_count)))
+                
+                if set(dominant_element_list_val) == set(full_weakest_list_val) and len(element_counts) == 1: # e.g. only Fire planets
+                     weakest_element_str = "N/A (Only Dominant Present)"
+                elif not full_weakest_list_val and len(set(element_counts.values())) == 1 and len(element_counts) == len(all_elements_set): # All elements equally represented
+                    weakest_element_str = "Balanced"
+                else:
+                     weakest_element_str = "/".join(full_weakest_list_val) if full_weakest_list_val else "None" # if somehow list is empty but not balanced
+
+            # Determine dominant and weakest modalities
+            if modality_counts:
+                max_mod_count = max(modality_counts.values())
+                dominant_modality_list_val = sorted([k_mod for k_mod, v_mod in modality_counts.items() if v_mod == max_mod_count])
+                dominant_modality_str = "/".join(dominant_modality_list_val)
+
+                all_modalities_set = set(MODALITY_MAP.values()) # {"Cardinal", "Fixed", "Mutable"}
+                min_mod_count = min(modality_counts.values()) if modality_counts else 0
+                weakest_modality_list_val = sorted([k_mod for k_mod, v_mod in modality_counts.items() if v_mod == min_mod_count and k_mod not in dominant_modality_list_val])
+                missing_modalities_list = sorted(list(all_modalities_set - set(modality_counts.keys())))
+                full_weakest_mod_list_val = sorted(list(set(missing_modalities_list + weakest_modality_list_val)))
+
+                if set(dominant_modality_list_val) == set(full_weakest_mod_list_val) and len(modality_counts) == 1:
+                    weakest_modality_str = "N/A (Only Dominant Present)"
+                elif not full_weakest_mod_list_val and len(set(modality_counts.values())) == 1 and len(modality_counts) == len(all_modalities_set):
+                    weakest_modality_str = "Balanced"
+                else:
+                    weakest_modality_str = "/".join(full_weakest_mod_list_val) if full_weakest_mod_list_val else "None"
+            
+            chart['chart_signatures']['dominant_element'] = dominant_element_str
+            chart['chart_signatures']['weakest_element'] = weakest_element_str
+            chart['chart_signatures']['dominant_modality'] = dominant_modality_str
+            chart['chart_signatures']['weakest_modality'] = weakest_modality_str # Storing weakest modality too
+
+            # --- PATCH 7.42.2: Prompt-ready elements ---
+            prompt_dom_elem_1_val = "None"
+            prompt_dom_elem_2_val = "None" # Secondary dominant if exists
+            prompt_least_rep_elem_val = "None"
+
+            if dominant_element_str not in ["None", "Error"]:
+                dom_list_parsed_val = dominant_element_str.split('/')
+                prompt_dom_elem_1_val = dom_list_parsed_val[0]
+                if len(dom_list_parsed_val) > 1: # Co-dominant
+                    prompt_dom_elem_2_val = dom_list_parsed_val[1]
+                else: # Single dominant, find next highest for prompt_dom_elem_2
+                    current_element_balance_data_val = chart.get('elemental_balance', {})
+                    if current_element_balance_data_val:
+                        sorted_elems_val = sorted(
+                            [(el_s, pct_s) for el_s, pct_s in current_element_balance_data_val.items() if el_s != prompt_dom_elem_1_val],
+                            key=lambda item_s: item_s[1], # Sort by percentage
+                            reverse=True
+                        )
+                        if sorted_elems_val: # If there are other elements
+                            prompt_dom_elem_2_val = sorted_elems_val[0][0]
+            
+            if weakest_element_str not in ["None", "Error", "N/A (Only Dominant Present)", "Balanced"]:
+                weak_list_parsed_val = weakest_element_str.split('/')
+                prompt_least_rep_elem_val = weak_list_parsed_val[0] # Take the first if multiple weakest/missing
+            elif weakest_element_str == "Balanced":
+                 prompt_least_rep_elem_val = "perfectly balanced"
+            elif weakest_element_str == "N/A (Only Dominant Present)":
+                 prompt_least_rep_elem_val = "other elements less emphasized"
+
+
+            chart['chart_signatures']['prompt_dominant_element_1'] = prompt_dom_elem_1_val
+            # Ensure prompt_dom_elem_2 is not same as 1, and not "None" if it was derived
+            chart['chart_signatures']['prompt_dominant_element_2'] = prompt_dom_elem_2_val if prompt_dom_elem_2_val != prompt_dom_elem_1_val and prompt_dom_elem_2_val != "None" else "None"
+            chart['chart_signatures']['prompt_least_represented_element'] = prompt_least_rep_elem_val
+            logger.info(f"         Prompt Elements: Dom1='{chart['chart_signatures']['prompt_dominant_element_1']}', Dom2='{chart['chart_signatures']['prompt_dominant_element_2']}', Least='{chart['chart_signatures']['prompt_least_represented_element']}'")
+            # --- END PATCH ---
+            logger.info(f"         Balances Calculated (based on {valid_points_for_balance} points): Elements={chart['elemental_balance']}, Modalities={chart['modality_balance']}")
+            logger.info(f"         Dominant Element(s): {dominant_element_str}, Weakest: {weakest_element_str}")
+            logger.info(f"         Dominant Modality(ies): {dominant_modality_str}, Weakest: {weakest_modality_str}")
+        else: # No valid points for balance
+            logger.warning("Balance calculation skipped: No valid points found.")
+            for key_sig_bal_err in ['dominant_element', 'weakest_element', 'dominant_modality', 'weakest_modality', 'prompt_dominant_element_1', 'prompt_dominant_element_2', 'prompt_least_represented_element']:
+                chart['chart_signatures'][key_sig_bal_err] = "Error (No Points)"
+    except Exception as e_bal_main:
+        logger.error(f"Error calculating balances: {e_bal_main}", exc_info=True)
+        for key_sig_err_main in ['dominant_element', 'weakest_element', 'dominant_modality', 'weakest_modality', 'prompt_dominant_element_1', 'prompt_dominant_element_2', 'prompt_least_represented_element']:
+            chart['chart_signatures'][key_sig_err_main] = "Error (Calc Exception)"
+
+
+def calculate_house_rulers(house_cusps):
+    """Return the traditional ruler and sign for each of the 12 house cusps."""
+    logger.info("   Calculating House Rulers (Traditional)...")
+    house_rulers = {}
+    try:
+        for i in range(12):
+            house_num = i + 1
+            cusp_deg = house_cusps[i]
+            if cusp_deg is None: # Should have been caught earlier by house calc validation
+                logger.warning(f"Skipping House {house_num} ruler: Cusp degree is None.")
+                house_rulers[f'House {house_num}'] = {"ruler": "Error", "sign": "Error"}
+                continue
+            
+            cusp_sign, _ = get_zodiac_sign(cusp_deg)
+            ruler = "Error" # Default
+            if cusp_sign != "Error":
+                ruler = TRADITIONAL_RULER_MAP.get(cusp_sign, "Error") # Find ruler from map
+            else:
+                logger.warning(f"Cannot determine ruler for House {house_num}: Cusp sign calculation error.")
+            house_rulers[f'House {house_num}'] = {"ruler": ruler, "sign": cusp_sign}
+            logger.debug(f"         House {house_num}: Cusp={cusp_sign}, Ruler={ruler}")
+        logger.info("         House ruler calculation complete.")
+    except Exception as e:
+        logger.error(f"Error calculating house rulers: {e}", exc_info=True)
+        house_rulers = {f'House {i+1}': {"ruler": "Error", "sign": "Error"} for i in range(12)}
+    return house_rulers
+
+
+def get_chart_jd_ut(chart):
+    """Julian day (UT) of a chart: stored value first, otherwise rebuilt from birth_details."""
+    jd_ut = chart.get('calculation_info', {}).get('jd_ut')
+    if jd_ut is not None:
+        return jd_ut
+    details = chart.get('birth_details', {})
+    try:
+        local_dt = datetime(details['year'], details['month'], details['day'], details['hour'], details['minute'],
+                            tzinfo=ZoneInfo(details['tz_str']))
+        utc_dt = local_dt.astimezone(timezone.utc)
+        return swe.julday(utc_dt.year, utc_dt.month, utc_dt.day,
+                          utc_dt.hour + utc_dt.minute / 60.0 + utc_dt.second / 3600.0, swe.GREG_CAL)
+    except Exception as e:
+        logger.error(f"Cannot determine Julian day from chart: {e}")
+        return None
+
+
+def calculate_solar_house_cusps(sun_deg, mode="solar"):
+    """12 cusps for a chart without birth time: the Sun's degree ('solar') or its sign's 0° ('whole_sign') on the 1st."""
+    if mode not in TIME_UNKNOWN_HOUSE_MODES:
+        raise ValueError(f"Unknown time-unknown house mode '{mode}'. Choose from: {', '.join(TIME_UNKNOWN_HOUSE_MODES)}")
+    first_cusp = sun_deg if mode == "solar" else math.floor(sun_deg / 30.0) * 30.0
+    return [(first_cusp + 30.0 * i) % 360.0 for i in range(12)]
+
+
+def find_time_dependent_sections(prompts):
+    """Section keys whose ai_prompt uses angle / house-cusp placeholders (TIME_DEPENDENT_PROMPT_KEYS).
+
+    Accepts a dict keyed by section or a list of prompt dicts with 'section_id'.
+    """
+    items = prompts.items() if isinstance(prompts, dict) else ((p.get("section_id"), p) for p in prompts if isinstance(p, dict))
+    return [key for key, prompt in items if key and TIME_DEPENDENT_PROMPT_KEYS.search(str(prompt.get("ai_prompt", "")))]
+
+
+def _moon_sign_range(year, month, day, tz_str):
+    """Moon signs at the start and end of the local birth day (one entry when it stays in one sign)."""
+    signs = []
+    for hour, minute in ((0, 0), (23, 59)):
+        utc_dt = datetime(year, month, day, hour, minute, tzinfo=ZoneInfo(tz_str)).astimezone(timezone.utc)
+        jd = swe.julday(utc_dt.year, utc_dt.month, utc_dt.day, utc_dt.hour + utc_dt.minute / 60.0, swe.GREG_CAL)
+        sign = get_zodiac_sign(swe.calc_ut(jd, swe.MOON, get_ephemeris_flag())[0][0])[0]
+        if sign not in signs:
+            signs.append(sign)
+    return signs
+
+
 # === Main Calculation Function ===
 def calculate_chart(
     year, month, day, hour, minute, lat, lng, city, country, tz_str, gender,
     ephemeris_path_used, # This path should be validated and used
     skip_fixed_stars=False,
     full_name=None, # For numerology
-    house_system=b"P" # Default to Placidus (byte string)
+    house_system=b"P", # Default to Placidus (byte string)
+    include_asteroid_catalog=False, # True for the whole Data jsons catalog, or an iterable of asteroid names
+    ephemeris_tier=None, # "swiss" / "moshier"; None keeps the current context's tier (ephemeris_tier.py)
+    time_unknown=False, # Birth time unknown: noon positions (unless hour/minute given), Sun-based houses, no angles
+    time_unknown_houses="solar" # "solar" (Sun degree on the 1st cusp) or "whole_sign" (Sun's sign = 1st house)
 ):
     """Calculate complete birth chart including new calculations."""
+    if ephemeris_tier is not None:
+        with use_ephemeris_tier(ephemeris_tier):
+            return calculate_chart(
+                year, month, day, hour, minute, lat, lng, city, country, tz_str, gender, ephemeris_path_used,
+                skip_fixed_stars=skip_fixed_stars, full_name=full_name, house_system=house_system,
+                include_asteroid_catalog=include_asteroid_catalog,
+                time_unknown=time_unknown, time_unknown_houses=time_unknown_houses,
+            )
+
+    # Moshier tier: no ephemeris files are read, so skip the file-only bodies, fixed stars and asteroid catalog
+    file_free = is_file_free_tier()
     # --- PATCH: Ensure ephemeris path is set at the beginning ---
-    if ephemeris_path_used and os.path.isdir(ephemeris_path_used):
+    if file_free: # Ephemeris path is irrelevant without file I/O
+        logger.info("Ephemeris tier 'moshier': file-free calculation (no asteroids, fixed stars or asteroid catalog).")
+        skip_fixed_stars = True
+        include_asteroid_catalog = False
+    elif ephemeris_path_used and os.path.isdir(ephemeris_path_used):
         swe.set_ephe_path(ephemeris_path_used)
         logger.info(f"Swiss Ephemeris path explicitly set to: {ephemeris_path_used} within calculate_chart.")
     elif not ephemeris_path_used : # If path is None or empty string
@@ -1450,6 +1666,12 @@ def calculate_chart(
         logger.error(f"CRITICAL: Provided Swiss Ephemeris path is invalid or does not exist: {ephemeris_path_used}. Calculation may fail or use defaults.")
     # --- END OF PATCH ---
 
+    if time_unknown:
+        if time_unknown_houses not in TIME_UNKNOWN_HOUSE_MODES:
+            raise ValueError(f"Unknown time-unknown house mode '{time_unknown_houses}'. Choose from: {', '.join(TIME_UNKNOWN_HOUSE_MODES)}")
+        hour = TIME_UNKNOWN_DEFAULT_HOUR if hour is None else hour
+        minute = TIME_UNKNOWN_DEFAULT_MINUTE if minute is None else minute
+
     chart_version = __version__
     logger.info(f"--- Starting Chart Calculation (V{chart_version}) ---")
     logger.info(f"   Input: {day}-{month}-{year} {hour:02d}:{minute:02d}, Loc: '{city}', TZ: {tz_str}, Name: {full_name}")
@@ -1497,26 +1719,35 @@ def calculate_chart(
 
     # Calculate House Cusps and Angles (Ascendant, MC)
     house_cusps = []; ascendant_deg = None; mc_deg = None; ascmc_data = []
-    try:
-        # swe.houses returns (cusps_array, ascmc_array)
-        houses_data, ascmc_data = swe.houses(jd_ut, lat, lng, house_system)
-        house_cusps = list(houses_data[:12]) # First 12 are house cusps 1-12
-        ascendant_deg = ascmc_data[0]    # Ascendant
-        mc_deg = ascmc_data[1]           # Midheaven (MC)
+    if time_unknown: # No quadrant houses or angles without a birth time; count houses from the Sun
+        try:
+            sun_for_houses = swe.calc_ut(jd_ut, swe.SUN, get_ephemeris_flag())[0][0]
+            house_cusps = calculate_solar_house_cusps(sun_for_houses, time_unknown_houses)
+            logger.info(f"   Birth time unknown: {TIME_UNKNOWN_HOUSE_MODES[time_unknown_houses]} houses, angles skipped.")
+        except Exception as e:
+            logger.error(f"Solar house calculation failed: {e}", exc_info=True)
+            return {"error": f"Solar house calculation failed: {e}"}
+    else:
+        try:
+            # swe.houses returns (cusps_array, ascmc_array)
+            houses_data, ascmc_data = swe.houses(jd_ut, lat, lng, house_system)
+            house_cusps = list(houses_data[:12]) # First 12 are house cusps 1-12
+            ascendant_deg = ascmc_data[0]    # Ascendant
+            mc_deg = ascmc_data[1]           # Midheaven (MC)
         
-        # Validate house calculation results
-        if len(house_cusps) != 12 or any(c is None for c in house_cusps) or ascendant_deg is None or mc_deg is None:
-            logger.error("House calculation returned invalid cusp or angle data.")
-            # This is where the original return statement was misplaced.
-            # It should be part of this try-except block or the main function's error handling.
-            return {"error": "House calculation invalid cusp/angle data."} # Correctly indented now
+            # Validate house calculation results
+            if len(house_cusps) != 12 or any(c is None for c in house_cusps) or ascendant_deg is None or mc_deg is None:
+                logger.error("House calculation returned invalid cusp or angle data.")
+                # This is where the original return statement was misplaced.
+                # It should be part of this try-except block or the main function's error handling.
+                return {"error": "House calculation invalid cusp/angle data."} # Correctly indented now
             
-        logger.info("   House Cusps Calculated.")
-        logger.debug(f"         Raw Cusps: {house_cusps}")
-        logger.debug(f"         Raw Asc/MC: Asc={ascmc_data[0]}, MC={ascmc_data[1]}")
-    except Exception as e:
-        logger.error(f"House calculation failed: {e}", exc_info=True)
-        return {"error": f"House calculation failed: {e}"}
+            logger.info("   House Cusps Calculated.")
+            logger.debug(f"         Raw Cusps: {house_cusps}")
+            logger.debug(f"         Raw Asc/MC: Asc={ascmc_data[0]}, MC={ascmc_data[1]}")
+        except Exception as e:
+            logger.error(f"House calculation failed: {e}", exc_info=True)
+            return {"error": f"House calculation failed: {e}"}
 
 
     # Initialize chart dictionary structure
@@ -1526,13 +1757,18 @@ def calculate_chart(
             "calculation_timestamp_utc": calculation_start_utc.isoformat(),
             "swisseph_version": swe.version,
             "ephemeris_path": ephemeris_path_used,
+            "zodiac": "Tropical",
+            "ephemeris_tier": get_ephemeris_tier(),
+            "jd_ut": jd_ut, # Kept so derived charts (sidereal, relocated) need not recompute it
+            "skipped_features": list(TIME_DEPENDENT_FEATURES) if time_unknown else [],
         },
         "birth_details": {
             "year": year, "month": month, "day": day, "hour": hour, "minute": minute,
             "latitude": lat, "longitude": lng,
             "city": city, "country": country, "tz_str": tz_str,
             "geo_validated_city": geo_city, "geo_validated_country": geo_country,
-            "house_system": house_system.decode('utf-8', 'ignore'), # Decode bytes to string
+            "house_system": TIME_UNKNOWN_HOUSE_MODES[time_unknown_houses] if time_unknown else house_system.decode('utf-8', 'ignore'),
+            "time_unknown": time_unknown,
             "gender": gender,
             "age": "Error", "day_of_week": "Error", "chart_ruler": "Error",
             "hemisphere": "Unknown" 
@@ -1609,43 +1845,47 @@ def calculate_chart(
 
     # Populate Angles (Asc, MC, IC, DC) and determine Chart Ruler
     logger.info("   Populating Angles & Chart Ruler...")
-    try:
-        asc_sign, asc_exact = get_zodiac_sign(ascendant_deg); asc_house = 1 # Ascendant is always cusp of 1st house
-        chart['angles']['Ascendant'] = {'degree': ascendant_deg, 'sign': asc_sign, 'exact_degree': asc_exact, 'house': asc_house}
-        chart['positions']['Ascendant'] = chart['angles']['Ascendant'] # Also add to positions for aspecting
-        logger.debug(f"         Ascendant: {asc_sign} {asc_exact:.4f}°")
-
-        mc_sign, mc_exact = get_zodiac_sign(mc_deg); mc_house = 10 # MC is always cusp of 10th house in many systems (like Placidus)
-        chart['angles']['Midheaven'] = {'degree': mc_deg, 'sign': mc_sign, 'exact_degree': mc_exact, 'house': mc_house}
-        chart['positions']['Midheaven'] = chart['angles']['Midheaven']
-        logger.debug(f"         Midheaven: {mc_sign} {mc_exact:.4f}°")
-
-        ic_deg = (mc_deg + 180.0) % 360.0 # IC is opposite MC
-        ic_sign, ic_exact = get_zodiac_sign(ic_deg); ic_house = 4 # IC is cusp of 4th house
-        chart['angles']['IC'] = {'degree': ic_deg, 'sign': ic_sign, 'exact_degree': ic_exact, 'house': ic_house}
-        chart['positions']['IC'] = chart['angles']['IC']
-        logger.debug(f"         IC: {ic_sign} {ic_exact:.4f}°")
-
-        dc_deg = (ascendant_deg + 180.0) % 360.0 # Descendant is opposite Ascendant
-        dc_sign, dc_exact = get_zodiac_sign(dc_deg); dc_house = 7 # DC is cusp of 7th house
-        chart['angles']['DC'] = {'degree': dc_deg, 'sign': dc_sign, 'exact_degree': dc_exact, 'house': dc_house}
-        chart['positions']['DC'] = chart['angles']['DC']
-        logger.debug(f"         Descendant: {dc_sign} {dc_exact:.4f}°")
-
-        if asc_sign != "Error":
-            chart_ruler_result = TRADITIONAL_RULER_MAP.get(asc_sign, "Error")
-            chart['birth_details']['chart_ruler'] = chart_ruler_result
-            logger.info(f"         Chart Ruler (Traditional): {chart_ruler_result}")
-        else:
-            chart['birth_details']['chart_ruler'] = "Error (Asc Sign Error)"
-            logger.warning("Cannot determine chart ruler due to Ascendant sign error.")
-    except Exception as e:
-        logger.error(f"Error populating angles or chart ruler: {e}", exc_info=True)
-        # Ensure defaults if error
-        for angle_key in ['Ascendant', 'Midheaven', 'IC', 'DC']:
-            if angle_key not in chart['angles']: chart['angles'][angle_key] = {'degree': None, 'sign': 'Error', 'exact_degree': 0.0, 'house': 0}
-            if angle_key not in chart['positions']: chart['positions'][angle_key] = chart['angles'][angle_key]
-        if 'chart_ruler' not in chart['birth_details']: chart['birth_details']['chart_ruler'] = "Error (Calc Exception)"
+    if time_unknown:
+        chart['birth_details']['chart_ruler'] = "Unknown (Time Unknown)"
+        logger.info("         Angles and chart ruler skipped (birth time unknown).")
+    else:
+        try:
+            asc_sign, asc_exact = get_zodiac_sign(ascendant_deg); asc_house = 1 # Ascendant is always cusp of 1st house
+            chart['angles']['Ascendant'] = {'degree': ascendant_deg, 'sign': asc_sign, 'exact_degree': asc_exact, 'house': asc_house}
+            chart['positions']['Ascendant'] = chart['angles']['Ascendant'] # Also add to positions for aspecting
+            logger.debug(f"         Ascendant: {asc_sign} {asc_exact:.4f}°")
+
+            mc_sign, mc_exact = get_zodiac_sign(mc_deg); mc_house = 10 # MC is always cusp of 10th house in many systems (like Placidus)
+            chart['angles']['Midheaven'] = {'degree': mc_deg, 'sign': mc_sign, 'exact_degree': mc_exact, 'house': mc_house}
+            chart['positions']['Midheaven'] = chart['angles']['Midheaven']
+            logger.debug(f"         Midheaven: {mc_sign} {mc_exact:.4f}°")
+
+            ic_deg = (mc_deg + 180.0) % 360.0 # IC is opposite MC
+            ic_sign, ic_exact = get_zodiac_sign(ic_deg); ic_house = 4 # IC is cusp of 4th house
+            chart['angles']['IC'] = {'degree': ic_deg, 'sign': ic_sign, 'exact_degree': ic_exact, 'house': ic_house}
+            chart['positions']['IC'] = chart['angles']['IC']
+            logger.debug(f"         IC: {ic_sign} {ic_exact:.4f}°")
+
+            dc_deg = (ascendant_deg + 180.0) % 360.0 # Descendant is opposite Ascendant
+            dc_sign, dc_exact = get_zodiac_sign(dc_deg); dc_house = 7 # DC is cusp of 7th house
+            chart['angles']['DC'] = {'degree': dc_deg, 'sign': dc_sign, 'exact_degree': dc_exact, 'house': dc_house}
+            chart['positions']['DC'] = chart['angles']['DC']
+            logger.debug(f"         Descendant: {dc_sign} {dc_exact:.4f}°")
+
+            if asc_sign != "Error":
+                chart_ruler_result = TRADITIONAL_RULER_MAP.get(asc_sign, "Error")
+                chart['birth_details']['chart_ruler'] = chart_ruler_result
+                logger.info(f"         Chart Ruler (Traditional): {chart_ruler_result}")
+            else:
+                chart['birth_details']['chart_ruler'] = "Error (Asc Sign Error)"
+                logger.warning("Cannot determine chart ruler due to Ascendant sign error.")
+        except Exception as e:
+            logger.error(f"Error populating angles or chart ruler: {e}", exc_info=True)
+            # Ensure defaults if error
+            for angle_key in ['Ascendant', 'Midheaven', 'IC', 'DC']:
+                if angle_key not in chart['angles']: chart['angles'][angle_key] = {'degree': None, 'sign': 'Error', 'exact_degree': 0.0, 'house': 0}
+                if angle_key not in chart['positions']: chart['positions'][angle_key] = chart['angles'][angle_key]
+            if 'chart_ruler' not in chart['birth_details']: chart['birth_details']['chart_ruler'] = "Error (Calc Exception)"
 
 
     # Calculate Natal Planet/Point Positions
@@ -1664,7 +1904,7 @@ def calculate_chart(
         'Ceres': swe.CERES, 'Pallas': swe.PALLAS, 'Juno': swe.JUNO, 'Vesta': swe.VESTA,
         'Black Moon Lilith': swe.MEAN_APOG # Mean Apogee (Lilith)
     }
-    flags = swe.FLG_SPEED | swe.FLG_SWIEPH # Request speed for retrograde detection
+    flags = swe.FLG_SPEED | get_ephemeris_flag() # Request speed for retrograde detection
     sun_pos_deg = None # To store Sun's degree for Moon Phase calculation
     moon_pos_deg = None # To store Moon's degree for Moon Phase
     
@@ -1673,6 +1913,12 @@ def calculate_chart(
     for name, body_id in bodies_for_calc.items():
         sign, exact_degree, house, speed, is_retrograde, degree = 'Error', 0.0, 0, 0.0, False, None
         dignity = "None"
+        if file_free and name in MOSHIER_UNSUPPORTED_BODIES:
+            chart['positions'][name] = {
+                'degree': None, 'sign': "Error (Moshier Tier)", 'exact_degree': 0.0, 'house': 0,
+                'speed': 0.0, 'is_retrograde': False, 'dignity': dignity, 'declination': None,
+            }
+            continue
         try:
             calc_result, ret_flag = swe.calc_ut(jd_ut, body_id, flags)
             if ret_flag < 0: # Error or warning from Swisseph
@@ -1719,6 +1965,13 @@ def calculate_chart(
              temp_positions_for_decl_calc[name] = body_id
 
 
+    if time_unknown: # Flag whether the noon Moon sign is certain for this birth day
+        try:
+            chart['birth_details']['moon_sign_range'] = _moon_sign_range(year, month, day, tz_str)
+            logger.info(f"         Moon sign over the birth day: {' -> '.join(chart['birth_details']['moon_sign_range'])}")
+        except Exception as e:
+            logger.warning(f"Moon sign range calculation failed: {e}")
+
     # Calculate Declinations (after all main body positions are set)
     if jd_ut is None:
         logger.error("Cannot calculate declinations because Julian Day (jd_ut) is not valid.")
@@ -1775,121 +2028,25 @@ def calculate_chart(
         logger.warning("South Node calculation skipped: North Node data missing or invalid.")
         chart['positions']['South Node'] = {'degree': None, 'sign': 'Error', 'exact_degree': 0.0, 'house': 0, 'speed': 0.0, 'is_retrograde': False, 'dignity':'None', 'declination': None}
 
-    # Calculate Elemental and Modality Balances
-    logger.info("   Calculating Elemental and Modality Balances...")
-    element_counts = Counter(); modality_counts = Counter(); valid_points_for_balance = 0
-    dominant_element_str = "None"; weakest_element_str = "None"; dominant_modality_str = "None"; weakest_modality_str = "None" # Initialize
-    try:
-        for point_name_bal in POINTS_FOR_BALANCE: # Use predefined list of points for balance
-            pos_data_bal = chart['positions'].get(point_name_bal)
-            if isinstance(pos_data_bal, dict) and pos_data_bal.get('sign') not in [None, 'Error']:
-                sign_bal = pos_data_bal['sign']
-                element_bal = ELEMENT_MAP.get(sign_bal)
-                modality_bal = MODALITY_MAP.get(sign_bal)
-                if element_bal: element_counts[element_bal] += 1
-                if modality_bal: modality_counts[modality_bal] += 1
-                valid_points_for_balance += 1
-        
-        if valid_points_for_balance > 0:
-            # Calculate percentages
-            chart['elemental_balance'] = {el: round((count / valid_points_for_balance) * 100, 1) for el, count in element_counts.items()}
-            chart['modality_balance'] = {mod: round((count / valid_points_for_balance) * 100, 1) for mod, count in modality_counts.items()}
-
-            # Determine dominant and weakest elements
-            if element_counts:
-                max_elem_count = max(element_counts.values())
-                dominant_element_list_val = sorted([k for k, v_el in element_counts.items() if v_el == max_elem_count])
-                dominant_element_str = "/".join(dominant_element_list_val)
-                
-                all_elements_set = set(ELEMENT_MAP.values()) # {"Fire", "Earth", "Air", "Water"}
-                min_elem_count = min(element_counts.values()) if element_counts else 0
-                # Weakest are those with min count AND not dominant, PLUS any missing elements
-                weakest_elements_with_count = sorted([k for k, v_el in element_counts.items() if v_el == min_elem_count and k not in dominant_element_list_val])
-                missing_elements_list = sorted(list(all_elements_set - set(element_counts.keys())))
-                full_weakest_list_val = sorted(list(set(missing_elements_list + weakest_elements_with_count)))
-                
-                if set(dominant_element_list_val) == set(full_weakest_list_val) and len(element_counts) == 1: # e.g. only Fire planets
-                     weakest_element_str = "N/A (Only Dominant Present)"
-                elif not full_weakest_list_val and len(set(element_counts.values())) == 1 and len(element_counts) == len(all_elements_set): # All elements equally represented
-                    weakest_element_str = "Balanced"
-                else:
-                     weakest_element_str = "/".join(full_weakest_list_val) if full_weakest_list_val else "None" # if somehow list is empty but not balanced
-
-            # Determine dominant and weakest modalities
-            if modality_counts:
-                max_mod_count = max(modality_counts.values())
-                dominant_modality_list_val = sorted([k_mod for k_mod, v_mod in modality_counts.items() if v_mod == max_mod_count])
-                dominant_modality_str = "/".join(dominant_modality_list_val)
-
-                all_modalities_set = set(MODALITY_MAP.values()) # {"Cardinal", "Fixed", "Mutable"}
-                min_mod_count = min(modality_counts.values()) if modality_counts else 0
-                weakest_modality_list_val = sorted([k_mod for k_mod, v_mod in modality_counts.items() if v_mod == min_mod_count and k_mod not in dominant_modality_list_val])
-                missing_modalities_list = sorted(list(all_modalities_set - set(modality_counts.keys())))
-                full_weakest_mod_list_val = sorted(list(set(missing_modalities_list + weakest_modality_list_val)))
-
-                if set(dominant_modality_list_val) == set(full_weakest_mod_list_val) and len(modality_counts) == 1:
-                    weakest_modality_str = "N/A (Only Dominant Present)"
-                elif not full_weakest_mod_list_val and len(set(modality_counts.values())) == 1 and len(modality_counts) == len(all_modalities_set):
-                    weakest_modality_str = "Balanced"
-                else:
-                    weakest_modality_str = "/".join(full_weakest_mod_list_val) if full_weakest_mod_list_val else "None"
-            
-            chart['chart_signatures']['dominant_element'] = dominant_element_str
-            chart['chart_signatures']['weakest_element'] = weakest_element_str
-            chart['chart_signatures']['dominant_modality'] = dominant_modality_str
-            chart['chart_signatures']['weakest_modality'] = weakest_modality_str # Storing weakest modality too
-
-            # --- PATCH 7.42.2: Prompt-ready elements ---
-            prompt_dom_elem_1_val = "None"
-            prompt_dom_elem_2_val = "None" # Secondary dominant if exists
-            prompt_least_rep_elem_val = "None"
-
-            if dominant_element_str not in ["None", "Error"]:
-                dom_list_parsed_val = dominant_element_str.split('/')
-                prompt_dom_elem_1_val = dom_list_parsed_val[0]
-                if len(dom_list_parsed_val) > 1: # Co-dominant
-                    prompt_dom_elem_2_val = dom_list_parsed_val[1]
-                else: # Single dominant, find next highest for prompt_dom_elem_2
-                    current_element_balance_data_val = chart.get('elemental_balance', {})
-                    if current_element_balance_data_val:
-                        sorted_elems_val = sorted(
-                            [(el_s, pct_s) for el_s, pct_s in current_element_balance_data_val.items() if el_s != prompt_dom_elem_1_val],
-                            key=lambda item_s: item_s[1], # Sort by percentage
-                            reverse=True
-                        )
-                        if sorted_elems_val: # If there are other elements
-                            prompt_dom_elem_2_val = sorted_elems_val[0][0]
-            
-            if weakest_element_str not in ["None", "Error", "N/A (Only Dominant Present)", "Balanced"]:
-                weak_list_parsed_val = weakest_element_str.split('/')
-                prompt_least_rep_elem_val = weak_list_parsed_val[0] # Take the first if multiple weakest/missing
-            elif weakest_element_str == "Balanced":
-                 prompt_least_rep_elem_val = "perfectly balanced"
-            elif weakest_element_str == "N/A (Only Dominant Present)":
-                 prompt_least_rep_elem_val = "other elements less emphasized"
-
+    # Extended Asteroid Catalog (premium reports)
+    catalog_asteroid_names = []
+    if include_asteroid_catalog:
+        logger.info("   Calculating Extended Asteroid Catalog...")
+        try:
+            catalog_positions = calculate_asteroid_positions(jd_ut, house_cusps, selection=include_asteroid_catalog)
+            catalog_positions = {k: v for k, v in catalog_positions.items() if k not in chart['positions']}
+            chart['positions'].update(catalog_positions)
+            catalog_asteroid_names = list(catalog_positions)
+        except Exception as e:
+            logger.error(f"Error calculating asteroid catalog: {e}", exc_info=True)
+    chart['asteroid_catalog'] = catalog_asteroid_names
 
-            chart['chart_signatures']['prompt_dominant_element_1'] = prompt_dom_elem_1_val
-            # Ensure prompt_dom_elem_2 is not same as 1, and not "None" if it was derived
-            chart['chart_signatures']['prompt_dominant_element_2'] = prompt_dom_elem_2_val if prompt_dom_elem_2_val != prompt_dom_elem_1_val and prompt_dom_elem_2_val != "None" else "None"
-            chart['chart_signatures']['prompt_least_represented_element'] = prompt_least_rep_elem_val
-            logger.info(f"         Prompt Elements: Dom1='{chart['chart_signatures']['prompt_dominant_element_1']}', Dom2='{chart['chart_signatures']['prompt_dominant_element_2']}', Least='{chart['chart_signatures']['prompt_least_represented_element']}'")
-            # --- END PATCH ---
-            logger.info(f"         Balances Calculated (based on {valid_points_for_balance} points): Elements={chart['elemental_balance']}, Modalities={chart['modality_balance']}")
-            logger.info(f"         Dominant Element(s): {dominant_element_str}, Weakest: {weakest_element_str}")
-            logger.info(f"         Dominant Modality(ies): {dominant_modality_str}, Weakest: {weakest_modality_str}")
-        else: # No valid points for balance
-            logger.warning("Balance calculation skipped: No valid points found.")
-            for key_sig_bal_err in ['dominant_element', 'weakest_element', 'dominant_modality', 'weakest_modality', 'prompt_dominant_element_1', 'prompt_dominant_element_2', 'prompt_least_represented_element']:
-                chart['chart_signatures'][key_sig_bal_err] = "Error (No Points)"
-    except Exception as e_bal_main:
-        logger.error(f"Error calculating balances: {e_bal_main}", exc_info=True)
-        for key_sig_err_main in ['dominant_element', 'weakest_element', 'dominant_modality', 'weakest_modality', 'prompt_dominant_element_1', 'prompt_dominant_element_2', 'prompt_least_represented_element']:
-            chart['chart_signatures'][key_sig_err_main] = "Error (Calc Exception)"
+    # Calculate Elemental and Modality Balances
+    calculate_balances(chart)
 
 
     # Calculate Aspects (Longitude)
-    chart['aspects'] = calculate_aspects(chart['positions'])
+    chart['aspects'] = calculate_aspects(chart['positions'], extra_points=catalog_asteroid_names)
     # Calculate Declination Aspects
     chart['declination_aspects'] = calculate_declination_aspects(chart['positions'], orb=DECLINATION_ORB)
 
@@ -1953,30 +2110,7 @@ def calculate_chart(
 
 
     # Calculate House Rulers
-    logger.info("   Calculating House Rulers (Traditional)...")
-    house_rulers = {}
-    try:
-        for i in range(12):
-            house_num = i + 1
-            cusp_deg = chart['house_info']['cusps'][i]
-            if cusp_deg is None: # Should have been caught earlier by house calc validation
-                logger.warning(f"Skipping House {house_num} ruler: Cusp degree is None.")
-                house_rulers[f'House {house_num}'] = {"ruler": "Error", "sign": "Error"}
-                continue
-            
-            cusp_sign, _ = get_zodiac_sign(cusp_deg)
-            ruler = "Error" # Default
-            if cusp_sign != "Error":
-                ruler = TRADITIONAL_RULER_MAP.get(cusp_sign, "Error") # Find ruler from map
-            else:
-                logger.warning(f"Cannot determine ruler for House {house_num}: Cusp sign calculation error.")
-            house_rulers[f'House {house_num}'] = {"ruler": ruler, "sign": cusp_sign}
-            logger.debug(f"         House {house_num}: Cusp={cusp_sign}, Ruler={ruler}")
-        chart['house_rulers'] = house_rulers
-        logger.info("         House ruler calculation complete.")
-    except Exception as e:
-        logger.error(f"Error calculating house rulers: {e}", exc_info=True)
-        chart['house_rulers'] = {f'House {i+1}': {"ruler": "Error", "sign": "Error"} for i in range(12)}
+    chart['house_rulers'] = calculate_house_rulers(chart['house_info']['cusps'])
 
 
     # Numerology Calculations
@@ -2033,74 +2167,24 @@ def calculate_chart(
         logger.error(f"Error getting Schumann resonance: {e}", exc_info=True)
         chart['earth_energies']['schumann'] = {"frequency": None, "source": "error"}
 
-    # Parts of Fortune and Spirit
-    logger.info("   Calculating Parts of Fortune and Spirit...")
-    try:
-        asc_deg = chart['angles'].get('Ascendant', {}).get('degree')
-        sun_deg = chart['positions'].get('Sun', {}).get('degree')
-        moon_deg = chart['positions'].get('Moon', {}).get('degree')
-        
-        pof_sign, pof_exact, pof_house, pof_degree = "Error", 0.0, 0, None
-        pos_sign, pos_exact, pos_house, pos_degree = "Error", 0.0, 0, None
-
-        if asc_deg is not None and sun_deg is not None and moon_deg is not None:
-            # Determine if chart is Diurnal (Sun above horizon) or Nocturnal (Sun below horizon)
-            # Horizon is Ascendant-Descendant axis. Houses 7-12 are above horizon.
-            sun_house = chart['positions'].get('Sun', {}).get('house', 0) # Get Sun's house
-            desc_deg = chart['angles'].get('DC',{}).get('degree') # For more precise check if needed
-
-            is_diurnal = False
-            if asc_deg is not None and desc_deg is not None: # Use direct angle comparison if possible
-                # Check if Sun's longitude is between Asc and Desc (longitudinally, above horizon)
-                # This is complex due to circular math. Simpler way is house position.
-                if sun_house != 0 and 7 <= sun_house <= 12: # Sun in houses 7-12 is above horizon
-                    is_diurnal = True
-                elif sun_house != 0 and 1 <= sun_house <= 6: # Sun in houses 1-6 is below horizon
-                    is_diurnal = False
-                else: # Fallback if house is 0 or Error
-                    logger.warning("Cannot reliably determine Diurnal/Nocturnal status for Parts calculation using Sun house. Using approximate check.")
-                    # Approximate: if Sun is between Asc and Desc going counter-clockwise from Asc
-                    if asc_deg < desc_deg: # Normal order
-                        is_diurnal = (sun_deg > asc_deg and sun_deg < desc_deg)
-                    else: # Wraps around 0 Aries (e.g. Asc 330, Desc 150)
-                        is_diurnal = (sun_deg > asc_deg or sun_deg < desc_deg)
-            elif sun_house != 0: # Fallback to just house check if angles are problematic
-                is_diurnal = (7 <= sun_house <= 12)
-            else:
-                logger.warning("Cannot determine Diurnal/Nocturnal status for Parts calculation.")
-            
-            if is_diurnal: # Day chart
-                pof_degree = (asc_deg + moon_deg - sun_deg) % 360.0
-                pos_degree = (asc_deg + sun_deg - moon_deg) % 360.0
-            else: # Night chart
-                pof_degree = (asc_deg + sun_deg - moon_deg) % 360.0
-                pos_degree = (asc_deg + moon_deg - sun_deg) % 360.0
-            
-            if pof_degree < 0: pof_degree += 360.0
-            if pos_degree < 0: pos_degree += 360.0
-
-            pof_sign, pof_exact = get_zodiac_sign(pof_degree)
-            pos_sign, pos_exact = get_zodiac_sign(pos_degree)
-            if pof_sign != 'Error': pof_house = calculate_house(pof_degree, chart['house_info']['cusps'])
-            if pos_sign != 'Error': pos_house = calculate_house(pos_degree, chart['house_info']['cusps'])
-
-            logger.debug(f"         Part of Fortune: {pof_sign} {pof_exact:.4f}°, House {pof_house} (Diurnal: {is_diurnal})")
-            logger.debug(f"         Part of Spirit: {pos_sign} {pos_exact:.4f}°, House {pos_house} (Diurnal: {is_diurnal})")
-        else:
-            logger.warning("Part of Fortune/Spirit calculation skipped: Asc/Sun/Moon degree missing.")
-            # Ensure error values are set
-            pof_degree, pos_degree = None, None 
-
-        chart['other_points']['Part of Fortune'] = {'degree': pof_degree, 'sign': pof_sign, 'exact_degree': pof_exact, 'house': pof_house}
-        chart['other_points']['Part of Spirit'] = {'degree': pos_degree, 'sign': pos_sign, 'exact_degree': pos_exact, 'house': pos_house}
-        # Also add to main positions dict for aspecting
-        chart['positions']['Part of Fortune'] = chart['other_points']['Part of Fortune']
-        chart['positions']['Part of Spirit'] = chart['other_points']['Part of Spirit']
-        logger.info("         Parts of Fortune/Spirit calculation complete.")
-    except Exception as e:
-        logger.error(f"Error calculating Parts of Fortune/Spirit: {e}", exc_info=True)
-        chart['other_points']['Part of Fortune'] = {'degree': None, 'sign': 'Error', 'exact_degree': 0.0, 'house': 0}
-        chart['other_points']['Part of Spirit'] = {'degree': None, 'sign': 'Error', 'exact_degree': 0.0, 'house': 0}
+    # Arabic Parts (Fortune, Spirit and the rest of the compiled lots table)
+    logger.info("   Calculating Arabic Parts...")
+    if time_unknown: # Every lot is measured from the Ascendant
+        for part_name in PARTS_IN_POSITIONS:
+            chart['other_points'][part_name] = {'degree': None, 'sign': 'Unknown (Time Unknown)', 'exact_degree': 0.0, 'house': 0}
+        logger.info("         Arabic Parts skipped (birth time unknown).")
+    else:
+        try:
+            arabic_parts_result = calculate_arabic_parts(chart['positions'], chart['angles'], chart['house_info']['cusps'])
+            chart['other_points'].update(arabic_parts_result)
+            # Fortune/Spirit are also added to main positions dict for aspecting
+            for part_name in PARTS_IN_POSITIONS:
+                chart['positions'][part_name] = chart['other_points'][part_name]
+            logger.info(f"         Arabic Parts calculation complete ({len(arabic_parts_result)} parts).")
+        except Exception as e:
+            logger.error(f"Error calculating Arabic Parts: {e}", exc_info=True)
+            chart['other_points']['Part of Fortune'] = {'degree': None, 'sign': 'Error', 'exact_degree': 0.0, 'house': 0}
+            chart['other_points']['Part of Spirit'] = {'degree': None, 'sign': 'Error', 'exact_degree': 0.0, 'house': 0}
 
 
     # Calculate Midpoints
@@ -2114,7 +2198,8 @@ def calculate_chart(
             if isinstance(data, dict) and data.get('degree') is not None and data.get('sign') != 'Error'
         }
 
-        for p1_name, p2_name in MIDPOINTS_TO_CALCULATE: # Use predefined list of pairs
+        midpoint_pairs = [pair for pair in MIDPOINTS_TO_CALCULATE if not (time_unknown and set(pair) & set(ANGLE_POINTS))]
+        for p1_name, p2_name in midpoint_pairs: # Use predefined list of pairs
             mp_key = f"{p1_name}/{p2_name}"
             deg1 = valid_positions_for_midpoints.get(p1_name)
             deg2 = valid_positions_for_midpoints.get(p2_name)
@@ -2187,6 +2272,7 @@ def calculate_chart(
                     name: data['degree']
                     for name, data in chart['positions'].items()
                     if isinstance(data, dict) and data.get('degree') is not None and data.get('sign') not in [None, 'Error']
+                    and name not in catalog_asteroid_names # Catalog asteroids are not checked against stars
                 } # Include angles if they are in chart['positions'] and you want to check stars to them
                 
                 if planet_positions_abs_deg_for_fs:
@@ -2199,6 +2285,10 @@ def calculate_chart(
                         orb=FIXED_STAR_ORB # Use defined orb
                     )
                     logger.info(f"         Fixed Star calculation complete. Found {len(fixed_star_matches)} conjunctions.")
+                    try: # Star phase in the birth year (table lookup per star / latitude band)
+                        add_heliacal_dates(fixed_star_matches, year, lat, lng)
+                    except Exception as e_hel:
+                        logger.warning(f"   Heliacal dates unavailable: {e_hel}")
                 else:
                     logger.warning("   No valid planet positions found to calculate fixed star conjunctions.")
                     fixed_star_matches = []
@@ -2238,8 +2328,18 @@ def calculate_pet_chart(**kwargs):
     kwargs['skip_fixed_stars'] = True # Pets usually don't need fixed stars
     kwargs['gender'] = kwargs.get('gender', 'U') # Default gender to Unknown for pets if not specified
 
+    # No birth_time for the pet: noon positions with Sun-based houses (time-unknown mode)
+    if 'birth_date' in kwargs and not kwargs.get('birth_time'):
+        kwargs['time_unknown'] = True
+        try:
+            dt_obj = datetime.strptime(kwargs['birth_date'], "%Y-%m-%d")
+            kwargs['year'], kwargs['month'], kwargs['day'] = dt_obj.year, dt_obj.month, dt_obj.day
+            kwargs.setdefault('hour', None); kwargs.setdefault('minute', None)
+        except Exception as e:
+            logger.warning(f"Could not parse birth_date for pet in calculate_pet_chart: {e}")
+
     # Convert birth_date and birth_time to year, month, day, hour, minute if provided
-    if 'birth_date' in kwargs and 'birth_time' in kwargs:
+    if 'birth_date' in kwargs and kwargs.get('birth_time'):
         try:
             dt_obj = datetime.strptime(f"{kwargs['birth_date']} {kwargs['birth_time']}", "%Y-%m-%d %H:%M")
             kwargs['year'] = dt_obj.year
@@ -2264,7 +2364,8 @@ def calculate_pet_chart(**kwargs):
         'year','month','day','hour','minute',
         'lat','lng','city','country','tz_str',
         'gender','ephemeris_path_used','skip_fixed_stars',
-        'full_name','house_system'
+        'full_name','house_system','include_asteroid_catalog','ephemeris_tier',
+        'time_unknown','time_unknown_houses'
     }
     filtered_kwargs = {k: v for k, v in kwargs.items() if k in accepted_params}
     
@@ -0,0 +1,190 @@
+# ai_batch.py
+# --- VERSION 1.0.0: Offline batch submission of AI sections (JSONL batch file, pluggable backend, polling) ---
+# Overnight bulk orders do not need interactive latency. Every section prompt of every order is written as
+# one line of a JSONL batch file in the chat-completions batch format
+#   {"custom_id": "<order_id>::<section>", "method": "POST", "url": "/v1/chat/completions", "body": {...}}
+# which a backend submits and runs; poll_batch() waits for completion and parse_batch_output() maps the
+# output lines back to {custom_id: text} (failed lines map to None and are reported).
+# Backends (BATCH_BACKENDS, chosen by name or AI_BATCH_BACKEND):
+# - "openai": the provider's Batch API (file upload + 24h completion window, billed at the batch rate).
+# - "local": runs the lines in-process through a completion callable; stand-in for tests and offline runs.
+
+import json
+import logging
+import os
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - AI_BATCH - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+try:
+    script_dir = os.path.dirname(os.path.realpath(__file__))
+except NameError:
+    script_dir = os.getcwd()
+
+DEFAULT_BATCH_DIR = os.path.join(script_dir, "output", "batches")
+BATCH_ENDPOINT = "/v1/chat/completions"
+COMPLETION_WINDOW = "24h"
+CUSTOM_ID_SEPARATOR = "::"
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+DEFAULT_POLL_SECONDS = 60.0
+DEFAULT_TIMEOUT_SECONDS = 26 * 3600 # Completion window plus slack
+
+
+def make_custom_id(order_id, section):
+    return f"{order_id}{CUSTOM_ID_SEPARATOR}{section}"
+
+
+def split_custom_id(custom_id):
+    """(order_id, section) from a custom_id written by make_custom_id."""
+    order_id, _, section = custom_id.rpartition(CUSTOM_ID_SEPARATOR)
+    return order_id, section
+
+
+def batch_line(custom_id, model, prompt, system_prompt=None, temperature=None):
+    """One chat-completions request line of a batch file."""
+    messages = ([{"role": "system", "content": system_prompt}] if system_prompt else []) + [{"role": "user", "content": prompt}]
+    body = {"model": model, "messages": messages}
+    if temperature is not None:
+        body["temperature"] = temperature
+    return {"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": body}
+
+
+def write_batch_file(lines, path):
+    """Writes request lines as JSONL (custom_ids must be unique) and returns the path."""
+    seen = set()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for line in lines:
+            if line["custom_id"] in seen:
+                raise ValueError(f"Duplicate custom_id in batch: {line['custom_id']}")
+            seen.add(line["custom_id"])
+            f.write(json.dumps(line, ensure_ascii=False) + "\n")
+    logger.info(f"Batch file written: {path} ({len(seen)} requests).")
+    return path
+
+
+def parse_batch_output(text):
+    """{custom_id: completion text or None} from batch output JSONL; failed lines are logged and map to None."""
+    results = {}
+    for raw in text.splitlines():
+        if not raw.strip():
+            continue
+        line = json.loads(raw)
+        custom_id = line.get("custom_id")
+        response = line.get("response") or {}
+        try:
+            if line.get("error") or response.get("status_code", 200) != 200:
+                raise ValueError(line.get("error") or response.get("body"))
+            results[custom_id] = response["body"]["choices"][0]["message"]["content"].strip()
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            logger.warning(f"Batch item '{custom_id}' failed: {e}")
+            results[custom_id] = None
+    return results
+
+
+class LocalBatchBackend:
+    """In-process stand-in for a batch provider: complete(body) -> text runs each line when the batch is first polled."""
+
+    def __init__(self, complete, batch_dir=None):
+        self.complete = complete
+        self.batch_dir = batch_dir or DEFAULT_BATCH_DIR
+        self._batches = {}
+
+    def submit(self, input_path):
+        batch_id = f"local_batch_{uuid.uuid4().hex[:12]}"
+        self._batches[batch_id] = {"input_path": input_path, "status": "validating", "output_path": None}
+        return batch_id
+
+    def _run(self, batch):
+        output_path = os.path.join(self.batch_dir, f"{os.path.splitext(os.path.basename(batch['input_path']))[0]}_output.jsonl")
+        os.makedirs(self.batch_dir, exist_ok=True)
+        with open(batch["input_path"], "r", encoding="utf-8") as f_in, open(output_path, "w", encoding="utf-8") as f_out:
+            for raw in f_in:
+                request = json.loads(raw)
+                try:
+                    content = self.complete(request["body"])
+                    out = {"custom_id": request["custom_id"], "error": None, "response": {
+                        "status_code": 200, "body": {"choices": [{"message": {"role": "assistant", "content": content}}]}}}
+                except Exception as e:
+                    out = {"custom_id": request["custom_id"], "response": None,
+                           "error": {"code": type(e).__name__, "message": str(e)}}
+                f_out.write(json.dumps(out, ensure_ascii=False) + "\n")
+        batch.update(status="completed", output_path=output_path)
+
+    def status(self, batch_id):
+        batch = self._batches[batch_id]
+        if batch["status"] not in TERMINAL_STATUSES:
+            self._run(batch)
+        return batch["status"]
+
+    def output(self, batch_id):
+        with open(self._batches[batch_id]["output_path"], "r", encoding="utf-8") as f:
+            return f.read()
+
+
+class OpenAIBatchBackend:
+    """The provider's Batch API through an OpenAI client (created from the environment when not given)."""
+
+    def __init__(self, client=None):
+        if client is None:
+            from openai import OpenAI
+            client = OpenAI()
+        self.client = client
+
+    def submit(self, input_path):
+        with open(input_path, "rb") as f:
+            uploaded = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(input_file_id=uploaded.id, endpoint=BATCH_ENDPOINT, completion_window=COMPLETION_WINDOW)
+        return batch.id
+
+    def status(self, batch_id):
+        return self.client.batches.retrieve(batch_id).status
+
+    def output(self, batch_id):
+        batch = self.client.batches.retrieve(batch_id)
+        parts = [self.client.files.content(file_id).text for file_id in (batch.output_file_id, batch.error_file_id) if file_id]
+        return "\n".join(parts)
+
+
+BATCH_BACKENDS = {"local": LocalBatchBackend, "openai": OpenAIBatchBackend}
+
+
+def poll_batch(backend, batch_id, poll_seconds=DEFAULT_POLL_SECONDS, timeout_seconds=DEFAULT_TIMEOUT_SECONDS, sleep=time.sleep):
+    """Waits until the batch reaches a terminal status and returns that status (TimeoutError after timeout_seconds)."""
+    waited = 0.0
+    while True:
+        status = backend.status(batch_id)
+        if status in TERMINAL_STATUSES:
+            logger.info(f"Batch {batch_id} finished with status '{status}' after {waited:.0f}s of polling.")
+            return status
+        if waited >= timeout_seconds:
+            raise TimeoutError(f"Batch {batch_id} still '{status}' after {timeout_seconds:.0f}s.")
+        logger.info(f"Batch {batch_id} is '{status}', next poll in {poll_seconds:.0f}s.")
+        sleep(poll_seconds)
+        waited += poll_seconds
+
+
+def run_batch(lines, backend, batch_path, poll_seconds=DEFAULT_POLL_SECONDS, timeout_seconds=DEFAULT_TIMEOUT_SECONDS, sleep=time.sleep):
+    """Writes, submits and polls one batch; returns {custom_id: text or None} (all None if the batch did not complete)."""
+    lines = list(lines)
+    if not lines:
+        return {}
+    write_batch_file(lines, batch_path)
+    batch_id = backend.submit(batch_path)
+    logger.info(f"Submitted batch {batch_id} ({len(lines)} requests) via {type(backend).__name__}.")
+    status = poll_batch(backend, batch_id, poll_seconds, timeout_seconds, sleep)
+    results = {line["custom_id"]: None for line in lines}
+    if status == "completed":
+        results.update(parse_batch_output(backend.output(batch_id)))
+    else:
+        logger.error(f"Batch {batch_id} ended '{status}'; no results collected.")
+    failed = sum(1 for text in results.values() if text is None)
+    logger.info(f"Batch {batch_id}: {len(results) - failed}/{len(results)} sections returned.")
+    return results
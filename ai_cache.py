@@ -0,0 +1,163 @@
+# ai_cache.py
+# --- VERSION 1.0.0: Disk-backed AI response cache keyed by prompt fingerprint (SQLite, TTL, LRU by size) ---
+# Re-running an order after a layout fix or a failed PDF re-pays for every section although the formatted
+# prompts are byte-identical. Responses are stored in one SQLite file under the SHA-256 of (model, temperature,
+# system prompt, formatted prompt), so any change to the chart data, voice or template is a different key.
+# Entries expire after ttl_seconds; when the stored text exceeds max_bytes the least recently used entries
+# are evicted. Failed calls and empty responses are never stored. bypass=True (CLI --regenerate) skips the
+# lookup and overwrites the entry with the fresh response. The file is only created on the first store.
+# Path / limits: AI_CACHE_PATH, AI_CACHE_TTL_DAYS, AI_CACHE_MAX_MB; AI_CACHE_DISABLED=1 turns caching off.
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - AI_CACHE - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+try:
+    script_dir = os.path.dirname(os.path.realpath(__file__))
+except NameError:
+    script_dir = os.getcwd()
+
+DEFAULT_CACHE_PATH = os.path.join(script_dir, "output", "ai_response_cache.sqlite3")
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_MB = 200
+
+
+def prompt_fingerprint(model, temperature, system_prompt, prompt):
+    """SHA-256 hex key of everything that determines a completion."""
+    temperature = None if temperature is None else round(float(temperature), 4)
+    payload = json.dumps([model, temperature, system_prompt or "", prompt], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _env_float(name, default):
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        logger.warning(f"Invalid {name} '{os.getenv(name)}', using {default}.")
+        return default
+
+
+class AIResponseCache:
+    """SQLite-backed {fingerprint: response} store with TTL expiry and size-bounded LRU eviction (thread-safe)."""
+
+    def __init__(self, path=None, ttl_seconds=None, max_bytes=None, enabled=True, clock=time.time):
+        self.path = path or os.getenv("AI_CACHE_PATH") or DEFAULT_CACHE_PATH
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else _env_float("AI_CACHE_TTL_DAYS", DEFAULT_TTL_DAYS) * 86400
+        self.max_bytes = max_bytes if max_bytes is not None else int(_env_float("AI_CACHE_MAX_MB", DEFAULT_MAX_MB) * 1024 * 1024)
+        self.enabled = enabled
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._connection = None
+        self._counters = {"hits": 0, "misses": 0, "bypassed": 0, "stores": 0, "evictions": 0}
+
+    def _connect(self, create):
+        if self._connection is None:
+            if not create and not os.path.exists(self.path):
+                return None
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL, size INTEGER NOT NULL, "
+                "created REAL NOT NULL, last_access REAL NOT NULL)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        return self._connection
+
+    def get(self, key):
+        """Cached response for key, or None (missing or expired)."""
+        with self._lock:
+            connection = self._connect(create=False)
+            row = connection.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone() if connection else None
+            now = self.clock()
+            if row is not None and now - row[1] > self.ttl_seconds:
+                connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                connection.commit()
+                row = None
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+            connection.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            connection.commit()
+            self._counters["hits"] += 1
+            return row[0]
+
+    def put(self, key, response):
+        """Store a response (empty responses are ignored) and evict least recently used entries above max_bytes."""
+        if not response:
+            return
+        with self._lock:
+            connection = self._connect(create=True)
+            now = self.clock()
+            size = len(response.encode("utf-8"))
+            connection.execute("INSERT OR REPLACE INTO responses (key, response, size, created, last_access) VALUES (?, ?, ?, ?, ?)",
+                               (key, response, size, now, now))
+            self._counters["stores"] += 1
+            total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                evicted = 0
+                for old_key, old_size in connection.execute("SELECT key, size FROM responses ORDER BY last_access ASC").fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    connection.execute("DELETE FROM responses WHERE key = ?", (old_key,))
+                    total -= old_size
+                    evicted += 1
+                self._counters["evictions"] += evicted
+                logger.info(f"AI cache over {self.max_bytes} bytes: evicted {evicted} least recently used entries.")
+            connection.commit()
+
+    def get_or_generate(self, model, temperature, system_prompt, prompt, generate, bypass=False):
+        """Cached response for this exact call, else generate() (stored if non-empty). bypass skips the lookup."""
+        if not self.enabled:
+            return generate()
+        key = prompt_fingerprint(model, temperature, system_prompt, prompt)
+        if bypass:
+            with self._lock:
+                self._counters["bypassed"] += 1
+        else:
+            cached = self.get(key)
+            if cached is not None:
+                logger.info(f"AI cache hit {key[:12]} ({len(cached)} chars).")
+                return cached
+        response = generate()
+        self.put(key, response)
+        return response
+
+    def stats(self):
+        """Counters plus hit_rate (hits / lookups) and the number of stored entries."""
+        with self._lock:
+            connection = self._connect(create=False)
+            entries = connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0] if connection else 0
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {**self._counters, "entries": entries, "hit_rate": round(self._counters["hits"] / lookups, 3) if lookups else 0.0}
+
+    def clear(self):
+        with self._lock:
+            connection = self._connect(create=False)
+            if connection:
+                connection.execute("DELETE FROM responses")
+                connection.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_ai_cache():
+    """The process-wide AIResponseCache (AI_CACHE_DISABLED=1 makes it a pass-through)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AIResponseCache(enabled=os.getenv("AI_CACHE_DISABLED", "0") != "1")
+            logger.info(f"AI response cache: {_cache.path} (enabled: {_cache.enabled}).")
+        return _cache
@@ -0,0 +1,84 @@
+# ai_concurrency.py
+# --- VERSION 1.1.0: on_result callback fires as each section lands (feeds the PDF layout pipeline) ---
+# --- VERSION 1.0.0: Bounded concurrent generation of report sections with ordered results ---
+# AI sections are independent network calls, so running them one after another makes a report take the sum
+# of all section latencies. run_sections_concurrently() runs them in a bounded thread pool (the OpenAI client
+# is synchronous and thread-safe), so wall time approaches the slowest section. Results are returned in
+# input order whatever the completion order, and a failing section becomes its own error result instead of
+# aborting the report. The limit comes from the caller, AI_MAX_CONCURRENCY, or DEFAULT_AI_CONCURRENCY;
+# a limit of 1 runs sequentially in the calling thread. on_result(key, result) is called from the worker
+# thread as soon as a section (or its on_error replacement) is ready, in completion order.
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - AI_POOL - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+DEFAULT_AI_CONCURRENCY = 6
+
+
+def get_ai_concurrency(max_concurrency=None):
+    """Concurrency limit: explicit value, else AI_MAX_CONCURRENCY env var, else DEFAULT_AI_CONCURRENCY (minimum 1)."""
+    if max_concurrency is None:
+        try:
+            max_concurrency = int(os.getenv("AI_MAX_CONCURRENCY", DEFAULT_AI_CONCURRENCY))
+        except ValueError:
+            logger.warning(f"Invalid AI_MAX_CONCURRENCY '{os.getenv('AI_MAX_CONCURRENCY')}', using {DEFAULT_AI_CONCURRENCY}.")
+            max_concurrency = DEFAULT_AI_CONCURRENCY
+    return max(1, int(max_concurrency))
+
+
+def run_sections_concurrently(items, worker, max_concurrency=None, on_error=None, on_result=None):
+    """Run worker(payload) for each (key, payload) in items with at most max_concurrency calls in flight.
+
+    Returns {key: result} in the order of items. If worker raises, the result is on_error(key, exc), or the
+    exception is re-raised after the other sections finish when on_error is None. on_result(key, result)
+    is called as each section's result is ready.
+    """
+    items = list(items)
+    limit = min(get_ai_concurrency(max_concurrency), max(1, len(items)))
+    durations = {}
+
+    def run(key, payload):
+        start = time.perf_counter()
+        try:
+            outcome = (worker(payload), None)
+        except Exception as e:
+            logger.error(f"Section '{key}' failed: {type(e).__name__}: {e}")
+            outcome = (None, e) if on_error is None else (on_error(key, e), None)
+        durations[key] = time.perf_counter() - start
+        if on_result is not None and outcome[1] is None:
+            on_result(key, outcome[0])
+        return outcome
+
+    start = time.perf_counter()
+    outcomes = {}
+    if limit == 1:
+        for key, payload in items:
+            outcomes[key] = run(key, payload)
+    else:
+        with ThreadPoolExecutor(max_workers=limit, thread_name_prefix="ai-section") as pool:
+            futures = [(key, pool.submit(run, key, payload)) for key, payload in items]
+            for key, future in futures:
+                outcomes[key] = future.result()
+
+    results = {}
+    for key, _ in items:
+        result, error = outcomes[key]
+        if error is not None:
+            raise error
+        results[key] = result
+
+    wall = time.perf_counter() - start
+    if durations:
+        logger.info(f"{len(items)} sections in {wall:.2f}s with concurrency {limit} "
+                    f"(sum of sections {sum(durations.values()):.2f}s, slowest {max(durations.values()):.2f}s).")
+    return results
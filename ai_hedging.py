@@ -0,0 +1,263 @@
+# ai_hedging.py
+# --- VERSION 1.0.0: Hedged AI requests and per-section latency histograms ---
+# --- VERSION 1.1.0: Hedged inside the scheduler (after the rate-limit wait); the duplicate acquires its own capacity ---
+# A few sections per report take several times the median latency and set the finish time of the whole report.
+# HedgedCaller.call() times every AI call per label (section) into a LatencyRecorder. When hedging is on and a
+# call has not answered by the chosen latency percentile (the label's own samples once it has MIN_SAMPLES,
+# otherwise all labels pooled), one duplicate request is sent; whichever succeeds first is returned and the
+# other is told to stop (cancellable calls get should_stop=, which stream_completion checks between chunks and
+# then closes its stream). If one attempt fails the other is still awaited; if both fail the error is raised.
+# Run it as the scheduler's wrap= hook so the clock starts after AIScheduler.acquire() and queue waits and retry
+# backoff never reach the samples; before_hedge= (e.g. the scheduler's acquire) gates the duplicate request.
+# Samples persist across runs (AI_LATENCY_PATH, default output/ai_latency.json) so deadlines are tuned from
+# real traffic; format_histograms() (and `python ai_hedging.py`) shows them. Hedging is off unless a
+# percentile is given (AI_HEDGE_PERCENTILE or per call); latencies are recorded either way.
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, wait
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - AI_HEDGE - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+try:
+    script_dir = os.path.dirname(os.path.realpath(__file__))
+except NameError:
+    script_dir = os.getcwd()
+
+DEFAULT_LATENCY_PATH = os.path.join(script_dir, "output", "ai_latency.json")
+MIN_SAMPLES = 20 # Samples needed before a percentile is trusted as a deadline
+MIN_DEADLINE_SECONDS = 2.0 # Never hedge earlier than this
+MAX_SAMPLES_PER_LABEL = 500 # Most recent samples kept per label
+HISTOGRAM_BUCKETS = (1, 2, 4, 8, 15, 30, 60, 120) # Upper bucket edges in seconds; the last bucket is open-ended
+BAR_WIDTH = 30
+
+
+def latency_percentile(samples, percentile):
+    """Nearest-rank percentile of samples (None when there are none)."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(float(percentile) / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class LatencyRecorder:
+    """Thread-safe per-label latency samples (bounded, most recent kept), optionally persisted as JSON."""
+
+    def __init__(self, path=None, max_samples=MAX_SAMPLES_PER_LABEL):
+        self.path = path or os.getenv("AI_LATENCY_PATH") or DEFAULT_LATENCY_PATH
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            for label, values in stored.items():
+                self._samples[label] = deque((float(v) for v in values), maxlen=self.max_samples)
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable latency file {self.path}: {e}")
+            self._samples = {}
+
+    def record(self, label, seconds):
+        with self._lock:
+            self._samples.setdefault(label, deque(maxlen=self.max_samples)).append(round(float(seconds), 3))
+
+    def labels(self):
+        with self._lock:
+            return list(self._samples)
+
+    def samples(self, label=None):
+        """Samples of one label, or of all labels pooled when label is None."""
+        with self._lock:
+            if label is not None:
+                return list(self._samples.get(label, ()))
+            return [v for values in self._samples.values() for v in values]
+
+    def percentile(self, percentile, label=None):
+        return latency_percentile(self.samples(label), percentile)
+
+    def histogram(self, label=None):
+        """[(bucket name, count)] over HISTOGRAM_BUCKETS."""
+        counts = [0] * (len(HISTOGRAM_BUCKETS) + 1)
+        for value in self.samples(label):
+            index = next((i for i, edge in enumerate(HISTOGRAM_BUCKETS) if value <= edge), len(HISTOGRAM_BUCKETS))
+            counts[index] += 1
+        names = [f"<={edge}s" for edge in HISTOGRAM_BUCKETS] + [f">{HISTOGRAM_BUCKETS[-1]}s"]
+        return list(zip(names, counts))
+
+    def format_histograms(self, labels=None):
+        """Per-label text histograms with n, p50, p90, p95 and p99 (labels without samples are skipped)."""
+        blocks = []
+        for label in (labels if labels is not None else sorted(self.labels())):
+            samples = self.samples(label)
+            if not samples:
+                continue
+            stats = "  ".join(f"p{p} {latency_percentile(samples, p):.1f}s" for p in (50, 90, 95, 99))
+            lines = [f"{label}  n={len(samples)}  {stats}"]
+            histogram = self.histogram(label)
+            peak = max(count for _, count in histogram)
+            for name, count in histogram:
+                lines.append(f"  {name:>6} |{'#' * math.ceil(BAR_WIDTH * count / peak) if count else ''} {count or ''}".rstrip())
+            blocks.append("\n".join(lines))
+        return "\n\n".join(blocks) if blocks else "No latency samples recorded."
+
+    def save(self):
+        """Writes the samples to self.path (atomically)."""
+        with self._lock:
+            data = {label: list(values) for label, values in self._samples.items()}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+
+class _Attempt:
+    """One request of a hedged call, run on its own daemon thread."""
+
+    def __init__(self, fn, args, kwargs, cancellable, before=None):
+        self.future = Future()
+        self.stop = threading.Event()
+        if cancellable:
+            kwargs = dict(kwargs, should_stop=self.stop.is_set)
+        self.future.set_running_or_notify_cancel()
+        threading.Thread(target=self._run, args=(fn, args, kwargs, before), daemon=True, name="ai-hedge").start()
+
+    def _run(self, fn, args, kwargs, before):
+        try:
+            if before is not None:
+                before()
+                if self.stop.is_set(): # The other attempt answered while this one waited
+                    raise CancelledError()
+            self.future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            self.future.set_exception(e)
+
+
+def _env_percentile():
+    value = os.getenv("AI_HEDGE_PERCENTILE")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning(f"Invalid AI_HEDGE_PERCENTILE '{value}', hedging disabled.")
+        return None
+
+
+class HedgedCaller:
+    """Runs AI calls with latency recording and, when a percentile is set, one hedged duplicate per slow call."""
+
+    def __init__(self, recorder=None, percentile=None, min_samples=MIN_SAMPLES, min_deadline=MIN_DEADLINE_SECONDS):
+        self.recorder = recorder if recorder is not None else LatencyRecorder()
+        self.percentile = percentile if percentile is not None else _env_percentile()
+        self.min_samples = min_samples
+        self.min_deadline = min_deadline
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "hedged": 0, "hedge_wins": 0, "cancelled": 0}
+
+    def deadline(self, label, percentile=None):
+        """Seconds to wait before hedging a call for label, or None (hedging off or too few samples)."""
+        percentile = percentile if percentile is not None else self.percentile
+        if not percentile:
+            return None
+        samples = self.recorder.samples(label)
+        if len(samples) < self.min_samples:
+            samples = self.recorder.samples()
+        if len(samples) < self.min_samples:
+            return None
+        return max(self.min_deadline, latency_percentile(samples, percentile))
+
+    def _count(self, **increments):
+        with self._lock:
+            for name, amount in increments.items():
+                self._stats[name] += amount
+
+    def call(self, label, fn, /, *args, hedge_percentile=None, cancellable=False, before_hedge=None, **kwargs):
+        """fn(*args, **kwargs), duplicated once if it outlives the label's latency deadline; returns the first success.
+
+        cancellable=True passes should_stop= to fn so the losing request can stop early. before_hedge() runs on
+        the duplicate's thread before it is sent (e.g. a rate-limit acquire). label and fn are positional-only,
+        so a label= keyword is passed through to fn.
+        """
+        self._count(calls=1)
+        start = time.perf_counter()
+        deadline = self.deadline(label, hedge_percentile)
+        if deadline is None:
+            result = fn(*args, **kwargs)
+            self.recorder.record(label, time.perf_counter() - start)
+            return result
+
+        attempts = [_Attempt(fn, args, kwargs, cancellable)]
+        if not wait([attempts[0].future], timeout=deadline).done:
+            logger.info(f"{label}: no answer after {deadline:.1f}s (p{self.percentile if hedge_percentile is None else hedge_percentile:g}), sending a hedged duplicate.")
+            self._count(hedged=1)
+            attempts.append(_Attempt(fn, args, kwargs, cancellable, before=before_hedge))
+
+        winner, error = None, None
+        pending = {attempt.future for attempt in attempts}
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for attempt in attempts:
+                if attempt.future in done:
+                    if attempt.future.exception() is None:
+                        winner = winner or attempt
+                    else:
+                        error = error or attempt.future.exception()
+        for attempt in attempts:
+            if attempt is not winner and not attempt.future.done():
+                attempt.stop.set()
+                self._count(cancelled=1)
+        if winner is None:
+            raise error
+        if winner is not attempts[0]:
+            self._count(hedge_wins=1)
+            logger.info(f"{label}: hedged duplicate won after {time.perf_counter() - start:.1f}s.")
+        self.recorder.record(label, time.perf_counter() - start)
+        return winner.future.result()
+
+    def metrics(self):
+        """Snapshot: calls, hedged, hedge_wins, cancelled and the configured percentile."""
+        with self._lock:
+            return {**self._stats, "percentile": self.percentile}
+
+
+_hedger = None
+_hedger_lock = threading.Lock()
+
+
+def get_ai_hedger():
+    """The process-wide HedgedCaller (latency samples loaded from AI_LATENCY_PATH on first use)."""
+    global _hedger
+    with _hedger_lock:
+        if _hedger is None:
+            _hedger = HedgedCaller()
+            state = f"hedging at p{_hedger.percentile:g}" if _hedger.percentile else "hedging off"
+            logger.info(f"AI latency recorder: {len(_hedger.recorder.samples())} samples from {_hedger.recorder.path} ({state}).")
+        return _hedger
+
+
+if __name__ == "__main__":
+    recorder = LatencyRecorder()
+    print(f"Latency samples from {recorder.path}:\n")
+    print(recorder.format_histograms())
+    pooled = recorder.samples()
+    if pooled:
+        print("\nHedge deadline by percentile (all sections pooled): " +
+              ", ".join(f"p{p} {latency_percentile(pooled, p):.1f}s" for p in (80, 90, 95, 99)))
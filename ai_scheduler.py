@@ -0,0 +1,199 @@
+# ai_scheduler.py
+# --- VERSION 1.0.0: Process-wide rate-limit-aware scheduler for AI calls (token buckets, priorities, retries) ---
+# --- VERSION 1.1.0: call(wrap=...) hook runs each attempt through a wrapper once its rate-limit wait is over ---
+# Every AI call of every report type goes through one AIScheduler, so reports running in parallel share the
+# provider's requests-per-minute and tokens-per-minute limits instead of each discovering them as 429s.
+# - Two token buckets (requests, estimated tokens) refill continuously; a call waits until both can pay.
+# - Waiting calls are served by priority class (PRIORITY_CLASSES: express orders before standard before bulk)
+#   and first-come within a class.
+# - 429 / 408 / 5xx and connection errors are retried with full-jitter exponential backoff (Retry-After is
+#   honoured when the provider sends it); other errors and the last failed attempt are re-raised to the caller.
+# - call(wrap=...) hands each attempt to wrap(fn, *args, **kwargs) after acquire(), so a wrapper (e.g. the latency
+#   hedger) times only the provider request, not the queue wait or the retry backoff.
+# - metrics() reports queue depth (now, peak, per class), throttled time, retries and failures.
+# Limits come from AI_REQUESTS_PER_MINUTE / AI_TOKENS_PER_MINUTE or the defaults below.
+
+import heapq
+import itertools
+import logging
+import os
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - AI_SCHED - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+PRIORITY_CLASSES = {"express": 0, "standard": 1, "bulk": 2}
+DEFAULT_PRIORITY = "standard"
+DEFAULT_REQUESTS_PER_MINUTE = 500
+DEFAULT_TOKENS_PER_MINUTE = 150000
+DEFAULT_OUTPUT_TOKENS = 1500 # Expected completion size when estimating a call's token cost
+CHARS_PER_TOKEN = 4.0
+MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {"RateLimitError", "APIConnectionError", "APITimeoutError", "InternalServerError", "ServiceUnavailableError"}
+
+
+def estimate_tokens(*texts, output_tokens=DEFAULT_OUTPUT_TOKENS):
+    """Rough token cost of a call: prompt characters / CHARS_PER_TOKEN plus the expected completion."""
+    return int(sum(len(text or "") for text in texts) / CHARS_PER_TOKEN) + output_tokens
+
+
+def _env_int(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        logger.warning(f"Invalid {name} '{os.getenv(name)}', using {default}.")
+        return default
+
+
+class TokenBucket:
+    """Continuously refilling bucket of `capacity` units, refilled at capacity per `period` seconds."""
+
+    def __init__(self, capacity, period=60.0, clock=time.monotonic):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.clock = clock
+        self.level = self.capacity
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """Seconds until `amount` units are available (0.0 if now); amounts above capacity wait for a full bucket."""
+        self._refill()
+        missing = min(float(amount), self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def consume(self, amount):
+        self._refill()
+        self.level -= min(float(amount), self.capacity)
+
+
+def _status_code(error):
+    code = getattr(error, "status_code", None)
+    if code is None:
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code
+
+
+def is_retryable(error):
+    """True for rate limits, timeouts, server errors and connection failures."""
+    code = _status_code(error)
+    if code is not None:
+        return code in RETRYABLE_STATUS_CODES
+    return type(error).__name__ in RETRYABLE_ERROR_NAMES
+
+
+def _retry_after(error):
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class AIScheduler:
+    """Shared gate for AI calls: call(fn, ...) waits for rate-limit capacity in priority order, then runs fn with retries."""
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, max_retries=MAX_RETRIES,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.requests = TokenBucket(requests_per_minute or _env_int("AI_REQUESTS_PER_MINUTE", DEFAULT_REQUESTS_PER_MINUTE), clock=clock)
+        self.tokens = TokenBucket(tokens_per_minute or _env_int("AI_TOKENS_PER_MINUTE", DEFAULT_TOKENS_PER_MINUTE), clock=clock)
+        self.max_retries = max_retries
+        self.sleep = sleep
+        self._condition = threading.Condition()
+        self._waiting = [] # Heap of (priority rank, arrival number)
+        self._arrivals = itertools.count()
+        self._stats = {"requests": 0, "retries": 0, "failures": 0, "throttled_seconds": 0.0, "max_queue_depth": 0}
+        self._depth_by_priority = {name: 0 for name in PRIORITY_CLASSES}
+
+    def acquire(self, estimated_tokens, priority=DEFAULT_PRIORITY):
+        """Block until this call is first in priority order and both buckets can pay for it."""
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority '{priority}'. Use one of: {', '.join(PRIORITY_CLASSES)}")
+        ticket = (PRIORITY_CLASSES[priority], next(self._arrivals))
+        start = time.monotonic()
+        with self._condition:
+            heapq.heappush(self._waiting, ticket)
+            self._depth_by_priority[priority] += 1
+            self._stats["max_queue_depth"] = max(self._stats["max_queue_depth"], len(self._waiting))
+            try:
+                while True:
+                    if self._waiting[0] == ticket:
+                        wait = max(self.requests.wait_time(1), self.tokens.wait_time(estimated_tokens))
+                        if wait <= 0:
+                            break
+                        self._condition.wait(timeout=wait)
+                    else:
+                        self._condition.wait()
+                heapq.heappop(self._waiting)
+                self.requests.consume(1)
+                self.tokens.consume(estimated_tokens)
+                self._stats["requests"] += 1
+            except BaseException:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                raise
+            finally:
+                self._depth_by_priority[priority] -= 1
+                self._stats["throttled_seconds"] += time.monotonic() - start
+                self._condition.notify_all()
+
+    def call(self, fn, *args, priority=DEFAULT_PRIORITY, estimated_tokens=DEFAULT_OUTPUT_TOKENS, label=None, wrap=None, **kwargs):
+        """fn(*args, **kwargs) under the rate limits; retryable errors are retried, the last error is re-raised.
+
+        wrap, if given, runs each attempt as wrap(fn, *args, **kwargs) once its rate-limit wait is over.
+        """
+        label = label or getattr(fn, "__name__", "AI call")
+        for attempt in range(self.max_retries + 1):
+            self.acquire(estimated_tokens, priority)
+            try:
+                if wrap is not None:
+                    return wrap(fn, *args, **kwargs)
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    with self._condition:
+                        self._stats["failures"] += 1
+                    raise
+                delay = _retry_after(e)
+                if delay is None:
+                    delay = random.uniform(0.0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+                with self._condition:
+                    self._stats["retries"] += 1
+                logger.warning(f"{label}: {type(e).__name__} (status {_status_code(e)}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s.")
+                self.sleep(delay)
+
+    def metrics(self):
+        """Snapshot: queue_depth, queue_depth_by_priority, max_queue_depth, requests, retries, failures, throttled_seconds."""
+        with self._condition:
+            return {**self._stats, "queue_depth": len(self._waiting),
+                    "queue_depth_by_priority": dict(self._depth_by_priority),
+                    "throttled_seconds": round(self._stats["throttled_seconds"], 3)}
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_ai_scheduler():
+    """The process-wide AIScheduler (created on first use from the environment limits)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = AIScheduler()
+            logger.info(f"AI scheduler: {_scheduler.requests.capacity:.0f} requests/min, {_scheduler.tokens.capacity:.0f} tokens/min.")
+        return _scheduler
@@ -0,0 +1,180 @@
+# arabic_parts.py
+# --- VERSION 1.0.0: Formula-compiled Arabic parts (lots) engine ---
+# Parts are declared as "A + B - C" strings. The table is parsed once at import into index arrays,
+# so evaluating every part for a chart is a handful of NumPy operations plus one house-index lookup.
+
+import logging
+import re
+
+import numpy as np
+
+from vectorized_astro import build_house_index, houses_for_degrees, sign_names, signs_for_degrees
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - PARTS - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+# Day-chart formulas. reverse_at_night swaps B and C for nocturnal charts.
+# Operands may be chart points (positions/angles), house cusps ("Cusp 8") or other parts.
+ARABIC_PARTS_FORMULAS = {
+    "Part of Fortune":   {"formula": "Ascendant + Moon - Sun", "reverse_at_night": True},
+    "Part of Spirit":    {"formula": "Ascendant + Sun - Moon", "reverse_at_night": True},
+    "Part of Eros":      {"formula": "Ascendant + Venus - Part of Spirit", "reverse_at_night": True},
+    "Part of Necessity": {"formula": "Ascendant + Part of Fortune - Mercury", "reverse_at_night": True},
+    "Part of Courage":   {"formula": "Ascendant + Part of Fortune - Mars", "reverse_at_night": True},
+    "Part of Victory":   {"formula": "Ascendant + Jupiter - Part of Spirit", "reverse_at_night": True},
+    "Part of Nemesis":   {"formula": "Ascendant + Part of Fortune - Saturn", "reverse_at_night": True},
+    "Part of Marriage":  {"formula": "Ascendant + Venus - Saturn", "reverse_at_night": False},
+    "Part of Father":    {"formula": "Ascendant + Saturn - Sun", "reverse_at_night": True},
+    "Part of Mother":    {"formula": "Ascendant + Moon - Venus", "reverse_at_night": True},
+    "Part of Children":  {"formula": "Ascendant + Saturn - Jupiter", "reverse_at_night": True},
+    "Part of Siblings":  {"formula": "Ascendant + Jupiter - Saturn", "reverse_at_night": False},
+    "Part of Commerce":  {"formula": "Ascendant + Mercury - Sun", "reverse_at_night": True},
+    "Part of Death":     {"formula": "Ascendant + Cusp 8 - Moon", "reverse_at_night": False},
+    "Part of Illness":   {"formula": "Ascendant + Mars - Saturn", "reverse_at_night": True},
+}
+PARTS_IN_POSITIONS = ("Part of Fortune", "Part of Spirit") # Also exposed in chart['positions'] for aspecting
+# Only these lots have entries in Data jsons/arabic_parts.json (pof_fortune / pof_spirit). The other lots are
+# data-only: they are in chart['other_points'] for the chart JSON and calculations, but the report has no
+# interpretation text for them and does not put them in prompts.
+INTERPRETED_PARTS = ("Part of Fortune", "Part of Spirit")
+
+_FORMULA_PATTERN = re.compile(r"^\s*(.+?)\s*\+\s*(.+?)\s*-\s*(.+?)\s*$")
+_CUSP_PATTERN = re.compile(r"^Cusp\s+(\d{1,2})$")
+
+
+def _parse_formula(part_name, formula):
+    """Split 'A + B - C' into its three operand names. Raises ValueError on malformed formulas."""
+    match = _FORMULA_PATTERN.match(formula)
+    if not match:
+        raise ValueError(f"Arabic part '{part_name}' has malformed formula '{formula}' (expected 'A + B - C').")
+    operands = match.groups()
+    for operand in operands:
+        cusp_match = _CUSP_PATTERN.match(operand)
+        if cusp_match and not 1 <= int(cusp_match.group(1)) <= 12:
+            raise ValueError(f"Arabic part '{part_name}' references invalid cusp '{operand}'.")
+    return operands
+
+
+def compile_parts_table(formulas):
+    """Compile a formula table into evaluation stages.
+
+    Returns a dict with:
+      - 'part_names': part names in table order
+      - 'base_operands': chart point / cusp names read from the chart, in slot order
+      - 'stages': list of (part_slots, a_slots, day_b_slots, day_c_slots, night_b_slots, night_c_slots) arrays
+    Slots index one value vector laid out as [base operands..., parts...]. Parts that reference other parts
+    land in later stages, so each stage only reads values that are already filled in.
+    """
+    part_names = list(formulas)
+    parsed = {name: _parse_formula(name, spec["formula"]) for name, spec in formulas.items()}
+
+    base_operands = []
+    for operands in parsed.values():
+        for operand in operands:
+            if operand not in formulas and operand not in base_operands:
+                base_operands.append(operand)
+    slot_of = {name: i for i, name in enumerate(base_operands)}
+    slot_of.update({name: len(base_operands) + i for i, name in enumerate(part_names)})
+
+    stages = []
+    resolved = set()
+    remaining = list(part_names)
+    while remaining:
+        ready = [name for name in remaining if all(op not in formulas or op in resolved for op in parsed[name])]
+        if not ready:
+            raise ValueError(f"Arabic parts have circular references: {', '.join(remaining)}")
+        a_slots, b_slots, c_slots, night_b, night_c = [], [], [], [], []
+        for name in ready:
+            a_op, b_op, c_op = parsed[name]
+            a_slots.append(slot_of[a_op]); b_slots.append(slot_of[b_op]); c_slots.append(slot_of[c_op])
+            if formulas[name].get("reverse_at_night", True):
+                night_b.append(slot_of[c_op]); night_c.append(slot_of[b_op])
+            else:
+                night_b.append(slot_of[b_op]); night_c.append(slot_of[c_op])
+        stages.append(tuple(np.array(x, dtype=int) for x in (
+            [slot_of[n] for n in ready], a_slots, b_slots, c_slots, night_b, night_c)))
+        resolved.update(ready)
+        remaining = [name for name in remaining if name not in resolved]
+
+    return {"part_names": part_names, "base_operands": base_operands, "stages": stages}
+
+
+# Parsed once at import; a malformed table fails loudly at startup instead of mid-report.
+COMPILED_PARTS = compile_parts_table(ARABIC_PARTS_FORMULAS)
+logger.debug(f"Compiled {len(COMPILED_PARTS['part_names'])} Arabic parts in {len(COMPILED_PARTS['stages'])} stages.")
+
+
+def is_diurnal_chart(positions, angles):
+    """Sect of the chart: True when the Sun is above the horizon (houses 7-12)."""
+    sun_data = positions.get('Sun', {}) if isinstance(positions, dict) else {}
+    sun_house = sun_data.get('house', 0)
+    if sun_house and 1 <= sun_house <= 12:
+        return 7 <= sun_house <= 12
+
+    # Fallback if house is 0 or Error: Sun between Asc and Desc going counter-clockwise from Asc
+    logger.warning("Cannot reliably determine Diurnal/Nocturnal status using Sun house. Using approximate check.")
+    sun_deg = sun_data.get('degree')
+    asc_deg = angles.get('Ascendant', {}).get('degree')
+    desc_deg = angles.get('DC', {}).get('degree')
+    if sun_deg is None or asc_deg is None or desc_deg is None:
+        logger.warning("Cannot determine Diurnal/Nocturnal status; treating chart as nocturnal.")
+        return False
+    if asc_deg < desc_deg: # Normal order
+        return asc_deg < sun_deg < desc_deg
+    return sun_deg > asc_deg or sun_deg < desc_deg # Wraps around 0 Aries
+
+
+def _operand_degree(operand, positions, angles, house_cusps):
+    cusp_match = _CUSP_PATTERN.match(operand)
+    if cusp_match:
+        index = int(cusp_match.group(1)) - 1
+        return house_cusps[index] if house_cusps and len(house_cusps) > index else None
+    point = positions.get(operand) or angles.get(operand) or {}
+    if point.get('sign') == 'Error':
+        return None
+    return point.get('degree')
+
+
+def calculate_arabic_parts(positions, angles, house_cusps, is_diurnal=None, house_index=None, compiled=COMPILED_PARTS):
+    """Evaluate every compiled part for one chart.
+
+    Returns {part_name: {'degree', 'sign', 'exact_degree', 'house'}}; parts whose operands are missing
+    get degree None / sign 'Error' / house 0. Pass a prebuilt house_index to skip rebuilding it.
+    """
+    if is_diurnal is None:
+        is_diurnal = is_diurnal_chart(positions, angles)
+
+    n_base = len(compiled["base_operands"])
+    values = np.full(n_base + len(compiled["part_names"]), np.nan)
+    for slot, operand in enumerate(compiled["base_operands"]):
+        degree = _operand_degree(operand, positions, angles, house_cusps)
+        if degree is not None:
+            values[slot] = float(degree)
+
+    for part_slots, a_slots, day_b, day_c, night_b, night_c in compiled["stages"]:
+        b_slots, c_slots = (day_b, day_c) if is_diurnal else (night_b, night_c)
+        values[part_slots] = np.mod(values[a_slots] + values[b_slots] - values[c_slots], 360.0) # NaN propagates
+
+    part_degrees = values[n_base:]
+    sign_idx, exact_degrees = signs_for_degrees(part_degrees)
+    signs = sign_names(sign_idx)
+    if house_index is None and house_cusps:
+        house_index = build_house_index(house_cusps)
+    houses = houses_for_degrees(part_degrees, house_index)
+
+    parts = {}
+    for i, part_name in enumerate(compiled["part_names"]):
+        valid = bool(np.isfinite(part_degrees[i]))
+        parts[part_name] = {
+            'degree': float(part_degrees[i]) if valid else None,
+            'sign': signs[i] if valid else 'Error',
+            'exact_degree': float(exact_degrees[i]) if valid else 0.0,
+            'house': int(houses[i]) if valid else 0,
+        }
+        logger.debug(f"         {part_name}: {parts[part_name]['sign']} {parts[part_name]['exact_degree']:.4f}°, House {parts[part_name]['house']} (Diurnal: {is_diurnal})")
+    return parts
@@ -0,0 +1,116 @@
+# asteroid_catalog.py
+# --- VERSION 1.0.0: Extended named-asteroid catalog (Eros, Psyche, Sappho, ...) loaded from Data jsons ---
+# Positions are computed in one tight loop of swe.calc_ut calls; sign/house placement and the result
+# dicts are built afterwards in a vectorized pass. Bodies whose ephemeris files (astNNN/seNNNNN.se1)
+# are not installed are skipped and remembered, so later charts do not retry them.
+
+import json
+import logging
+import os
+from functools import lru_cache
+
+import numpy as np
+import swisseph as swe
+
+from vectorized_astro import build_house_index, houses_for_degrees, sign_names, signs_for_degrees
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - ASTEROIDS - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+try:
+    script_dir = os.path.dirname(os.path.realpath(__file__))
+except NameError:
+    script_dir = os.getcwd()
+
+ASTEROID_CATALOG_PATH = os.path.join(script_dir, "Data jsons", "asteroid_catalog.json")
+ASTEROID_CALC_FLAGS = swe.FLG_SPEED | swe.FLG_SWIEPH
+
+_missing_asteroids = set() # MPC numbers whose ephemeris files were not found
+
+
+def load_asteroid_catalog(path=ASTEROID_CATALOG_PATH):
+    """Return {name: {'mpc_number': int, ...}} from the catalog JSON, or {} if it cannot be loaded."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            catalog = json.load(f).get("asteroid_catalog", {})
+        logger.info(f"Loaded {len(catalog)} asteroids from '{os.path.basename(path)}'.")
+        return catalog
+    except FileNotFoundError:
+        logger.error(f"Asteroid catalog not found at: {path}")
+    except json.JSONDecodeError:
+        logger.error(f"Could not decode JSON from '{path}'. Check the file for syntax errors.")
+    return {}
+
+
+ASTEROID_CATALOG = load_asteroid_catalog()
+
+
+def reset_missing_asteroids():
+    """Forget skipped bodies, e.g. after installing ephemeris files or changing the ephemeris path."""
+    _missing_asteroids.clear()
+    _calc_asteroid_rows.cache_clear()
+
+
+def resolve_asteroid_names(selection=True):
+    """Turn a selection (True = whole catalog, or an iterable of names) into a tuple of known catalog names."""
+    if selection is True:
+        return tuple(ASTEROID_CATALOG)
+    if not selection:
+        return ()
+    names = tuple(name for name in selection if name in ASTEROID_CATALOG)
+    unknown = set(selection) - set(names)
+    if unknown:
+        logger.warning(f"Ignoring asteroids not in catalog: {', '.join(sorted(unknown))}")
+    return names
+
+
+@lru_cache(maxsize=128)
+def _calc_asteroid_rows(jd_ut, names):
+    """Raw (name, longitude, speed) rows for one Julian day; cached so repeated calls for a chart are free."""
+    rows = []
+    skipped = []
+    for name in names:
+        mpc_number = ASTEROID_CATALOG[name]["mpc_number"]
+        if mpc_number in _missing_asteroids:
+            continue
+        try:
+            calc_result, _ret_flag = swe.calc_ut(jd_ut, swe.AST_OFFSET + mpc_number, ASTEROID_CALC_FLAGS)
+            rows.append((name, calc_result[0], calc_result[3]))
+        except swe.Error:
+            _missing_asteroids.add(mpc_number)
+            skipped.append(name)
+    if skipped:
+        logger.warning(f"Skipped {len(skipped)} asteroids with missing ephemeris files: {', '.join(skipped)}")
+    return tuple(rows)
+
+
+def calculate_asteroid_positions(jd_ut, house_cusps=None, selection=True):
+    """Return {name: position dict} for the selected catalog asteroids, shaped like chart['positions'] entries."""
+    names = resolve_asteroid_names(selection)
+    if not names or jd_ut is None:
+        return {}
+    rows = _calc_asteroid_rows(jd_ut, names)
+    if not rows:
+        return {}
+
+    degrees = np.array([row[1] for row in rows], dtype=float)
+    speeds = np.array([row[2] for row in rows], dtype=float)
+    sign_idx, exact_degrees = signs_for_degrees(degrees)
+    signs = sign_names(sign_idx)
+    house_index = build_house_index(house_cusps) if house_cusps else None
+    houses = houses_for_degrees(degrees, house_index)
+
+    positions = {}
+    for i, (name, _, _) in enumerate(rows):
+        positions[name] = {
+            'degree': float(degrees[i]), 'sign': signs[i], 'exact_degree': float(exact_degrees[i]),
+            'house': int(houses[i]), 'speed': round(float(speeds[i]), 6), 'is_retrograde': bool(speeds[i] < 0),
+            'dignity': 'None', 'declination': None,
+        }
+    logger.info(f"Calculated {len(positions)} catalog asteroid positions ({len(names) - len(positions)} unavailable).")
+    return positions
@@ -0,0 +1,157 @@
+# astrocartography_engine.py
+# --- VERSION 1.0.0: Vectorized astrocartography (AC/DC/MC/IC) planetary lines ---
+# --- VERSION 1.1.0: fill_astrocartography_fields puts the lines for an order's birth data into its prompt data ---
+# From the natal Julian day, each planet's right ascension/declination and Greenwich sidereal time give:
+#   MC/IC lines: the meridian where local sidereal time equals the planet's RA (constant longitude),
+#   AC/DC lines: where the planet's hour angle equals -/+ its semi-arc, i.e. cos H0 = -tan(lat) * tan(dec).
+# All planets x all grid latitudes are evaluated as one NumPy matrix; lines are returned as polylines of
+# [latitude, longitude] points, split where a line leaves the valid latitude band or crosses the dateline.
+
+import logging
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+import swisseph as swe
+
+from ephemeris_tier import get_ephemeris_flag
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - ACG - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+ACG_PLANETS = {
+    'Sun': swe.SUN, 'Moon': swe.MOON, 'Mercury': swe.MERCURY, 'Venus': swe.VENUS, 'Mars': swe.MARS,
+    'Jupiter': swe.JUPITER, 'Saturn': swe.SATURN, 'Uranus': swe.URANUS, 'Neptune': swe.NEPTUNE, 'Pluto': swe.PLUTO,
+}
+ACG_ANGLES = ("AC", "DC", "MC", "IC")
+DEFAULT_LAT_STEP = 0.5 # degrees between polyline points
+DEFAULT_MAX_LAT = 85.0 # Mapping projections rarely go beyond this
+BIRTH_DATA_FIELDS = ("date_of_birth", "birth_time", "tz_str") # Order fields the lines are computed from
+
+
+def _wrap_longitude(lon):
+    """Wrap longitudes to [-180, 180)."""
+    return (np.asarray(lon) + 180.0) % 360.0 - 180.0
+
+
+def calculate_planet_equatorial(jd_ut, planets=None):
+    """Return (names, ra_deg, dec_deg) arrays for the planets that could be calculated."""
+    planets = planets or ACG_PLANETS
+    names, ras, decs = [], [], []
+    for name, body_id in planets.items():
+        try:
+            calc_result, _ret_flag = swe.calc_ut(jd_ut, body_id, swe.FLG_EQUATORIAL | get_ephemeris_flag())
+            names.append(name); ras.append(calc_result[0]); decs.append(calc_result[1])
+        except Exception as e:
+            logger.warning(f"Skipping {name} for astrocartography: {e}")
+    return names, np.array(ras, dtype=float), np.array(decs, dtype=float)
+
+
+def _polylines(latitudes, longitudes):
+    """Split one line (NaN = no crossing at that latitude) into [[lat, lon], ...] runs, breaking at the dateline."""
+    valid = np.isfinite(longitudes)
+    breaks = np.zeros(latitudes.shape[0], dtype=bool)
+    breaks[1:] = (valid[1:] != valid[:-1]) | (np.abs(np.diff(longitudes)) > 180.0)
+    polylines = []
+    for lat_run, lon_run, valid_run in zip(np.split(latitudes, np.flatnonzero(breaks)),
+                                           np.split(longitudes, np.flatnonzero(breaks)),
+                                           np.split(valid, np.flatnonzero(breaks))):
+        if valid_run.size > 1 and valid_run[0]:
+            polylines.append(np.column_stack((lat_run, lon_run)).round(4).tolist())
+    return polylines
+
+
+def compute_astrocartography_lines(jd_ut, planets=None, lat_step=DEFAULT_LAT_STEP, max_lat=DEFAULT_MAX_LAT):
+    """Compute AC/DC/MC/IC lines for every planet.
+
+    Returns {'jd_ut', 'gst_deg', 'lat_step', 'latitudes': [...], 'planets': {name: {'ra', 'dec', 'mc_longitude',
+    'ic_longitude', 'longitudes': {angle: ndarray, NaN where no crossing}, 'lines': {angle: [polyline, ...]}}}}.
+    'lines' is plain lists (JSON/map ready); 'longitudes' keeps the per-latitude arrays for ranking.
+    Longitudes are east-positive in [-180, 180).
+    """
+    names, ra, dec = calculate_planet_equatorial(jd_ut, planets)
+    gst_deg = swe.sidtime(jd_ut) * 15.0
+    latitudes = np.arange(-max_lat, max_lat + lat_step / 2.0, lat_step)
+
+    # Meridian lines: one longitude per planet
+    mc_lon = _wrap_longitude(ra - gst_deg)
+    ic_lon = _wrap_longitude(mc_lon + 180.0)
+
+    # Horizon lines: planets x latitudes matrix of semi-arcs (NaN where the planet is circumpolar/never rises)
+    cos_h0 = -np.tan(np.radians(latitudes))[None, :] * np.tan(np.radians(dec))[:, None]
+    semi_arc = np.degrees(np.arccos(np.where(np.abs(cos_h0) <= 1.0, cos_h0, np.nan)))
+    ac_lon = _wrap_longitude(mc_lon[:, None] - semi_arc)
+    dc_lon = _wrap_longitude(mc_lon[:, None] + semi_arc)
+
+    result = {"jd_ut": jd_ut, "gst_deg": gst_deg, "lat_step": lat_step, "latitudes": latitudes.tolist(), "planets": {}}
+    for i, name in enumerate(names):
+        longitudes = {
+            "AC": ac_lon[i], "DC": dc_lon[i],
+            "MC": np.full(latitudes.shape, mc_lon[i]), "IC": np.full(latitudes.shape, ic_lon[i]),
+        }
+        result["planets"][name] = {
+            "ra": float(ra[i]), "dec": float(dec[i]),
+            "mc_longitude": float(mc_lon[i]), "ic_longitude": float(ic_lon[i]),
+            "longitudes": longitudes,
+            "lines": {angle: _polylines(latitudes, lons) for angle, lons in longitudes.items()},
+        }
+    logger.info(f"Astrocartography lines computed for {len(names)} planets over {latitudes.size} latitudes.")
+    return result
+
+
+def _format_lon(lon):
+    return f"{abs(lon):.1f}°{'E' if lon >= 0 else 'W'}"
+
+
+def format_lines_for_prompt(acg_result, reference_latitudes=(0.0, 40.0, -35.0)):
+    """Short text summary of the lines (meridian longitudes and horizon crossings at a few latitudes)."""
+    latitudes = np.asarray(acg_result.get("latitudes", []))
+    lines_text = []
+    for name, planet in acg_result.get("planets", {}).items():
+        parts = [f"MC {_format_lon(planet['mc_longitude'])}", f"IC {_format_lon(planet['ic_longitude'])}"]
+        for angle in ("AC", "DC"):
+            crossings = []
+            for ref_lat in reference_latitudes:
+                if latitudes.size == 0:
+                    break
+                lon = planet["longitudes"][angle][int(np.argmin(np.abs(latitudes - ref_lat)))]
+                if np.isfinite(lon):
+                    crossings.append(f"{_format_lon(lon)} at {abs(ref_lat):.0f}°{'N' if ref_lat >= 0 else 'S'}")
+            if crossings:
+                parts.append(f"{angle} " + ", ".join(crossings))
+        lines_text.append(f"{name}: " + "; ".join(parts))
+    return "\n".join(lines_text)
+
+
+def birth_jd_ut(date_of_birth, birth_time, tz_str):
+    """Julian day (UT) for a local birth date 'YYYY-MM-DD', time 'HH:MM' and IANA time zone. Raises ValueError."""
+    try:
+        local_dt = datetime.strptime(f"{str(date_of_birth).strip()} {str(birth_time).strip()}", "%Y-%m-%d %H:%M")
+        utc_dt = local_dt.replace(tzinfo=ZoneInfo(str(tz_str))).astimezone(timezone.utc)
+    except (ValueError, ZoneInfoNotFoundError) as e:
+        raise ValueError(f"Invalid birth data '{date_of_birth} {birth_time} {tz_str}': {e}")
+    return swe.julday(utc_dt.year, utc_dt.month, utc_dt.day, utc_dt.hour + utc_dt.minute / 60.0 + utc_dt.second / 3600.0)
+
+
+def fill_astrocartography_fields(data, rank_locations=None):
+    """Copy of an astrocartography order with its lines computed from date_of_birth, birth_time and tz_str.
+
+    Adds 'planetary_lines' (format_lines_for_prompt text) for the prompt. When 'locations' is missing and
+    rank_locations is given, it is filled with rank_locations(lines). Values supplied by the caller are kept;
+    without full birth data the order is returned unchanged.
+    """
+    missing = [field for field in BIRTH_DATA_FIELDS if not data.get(field)]
+    if missing:
+        logger.info(f"Astrocartography lines not computed: order has no {', '.join(missing)}.")
+        return data
+    acg = compute_astrocartography_lines(birth_jd_ut(data["date_of_birth"], data["birth_time"], data["tz_str"]))
+    filled = dict(data)
+    filled.setdefault("planetary_lines", format_lines_for_prompt(acg))
+    if "locations" not in filled and rank_locations is not None:
+        filled["locations"] = rank_locations(acg)
+    return filled
@@ -0,0 +1,226 @@
+# city_ranking.py
+# --- VERSION 1.0.0: Rank gazetteer cities by proximity to astrocartography lines ---
+# --- VERSION 1.0.1: report_engine fills a missing `locations` from rank_cities (theme from the order's 'theme') ---
+# Line segments from astrocartography_engine are binned once into a lat/lon grid; each segment is registered
+# in every cell its bounding box (grown by the orb radius) touches. A city then only measures distances to
+# the segments listed in its own cell, instead of to every segment of every line.
+# Scores are the sum of (planet weight x angle weight x linear falloff) over lines within the orb, and the
+# top-N results are shaped like the astrocartography prompt's `locations` entries.
+
+import json
+import logging
+import os
+
+import numpy as np
+
+from astrocartography_engine import ACG_ANGLES
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - CITYRANK - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+try:
+    script_dir = os.path.dirname(os.path.realpath(__file__))
+except NameError:
+    script_dir = os.getcwd()
+
+WORLD_CITIES_PATH = os.path.join(script_dir, "Data jsons", "world_cities.json")
+KM_PER_DEGREE = 111.195 # Mean Earth radius 6371 km
+DEFAULT_ORB_KM = 700.0 # Lines are usually read as strong within a few hundred km
+DEFAULT_CELL_DEG = 10.0
+DEFAULT_TOP_N = 10
+
+# Positive = benefic, negative = malefic. Angle weights scale every planet's line on that angle.
+LINE_WEIGHT_PRESETS = {
+    "general": {
+        "planets": {'Sun': 0.7, 'Moon': 0.5, 'Mercury': 0.4, 'Venus': 1.0, 'Mars': -0.6, 'Jupiter': 1.0,
+                    'Saturn': -0.8, 'Uranus': -0.2, 'Neptune': -0.3, 'Pluto': -0.5},
+        "angles": {'AC': 1.0, 'DC': 0.8, 'MC': 1.0, 'IC': 0.8},
+    },
+    "love": {
+        "planets": {'Sun': 0.4, 'Moon': 0.8, 'Mercury': 0.2, 'Venus': 1.0, 'Mars': 0.3, 'Jupiter': 0.7,
+                    'Saturn': -0.9, 'Uranus': -0.4, 'Neptune': 0.1, 'Pluto': -0.6},
+        "angles": {'AC': 0.8, 'DC': 1.2, 'MC': 0.5, 'IC': 1.0},
+    },
+    "career": {
+        "planets": {'Sun': 1.0, 'Moon': 0.3, 'Mercury': 0.7, 'Venus': 0.5, 'Mars': 0.4, 'Jupiter': 1.0,
+                    'Saturn': 0.2, 'Uranus': 0.1, 'Neptune': -0.4, 'Pluto': -0.2},
+        "angles": {'AC': 0.8, 'DC': 0.6, 'MC': 1.3, 'IC': 0.4},
+    },
+}
+
+
+def load_world_cities(path=WORLD_CITIES_PATH):
+    """Return the bundled city list ([{'place_name', 'country', 'latitude', 'longitude'}, ...]), or [] on error."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cities = json.load(f).get("cities", [])
+        logger.info(f"Loaded {len(cities)} cities from '{os.path.basename(path)}'.")
+        return cities
+    except FileNotFoundError:
+        logger.error(f"City list not found at: {path}")
+    except json.JSONDecodeError:
+        logger.error(f"Could not decode JSON from '{path}'. Check the file for syntax errors.")
+    return []
+
+
+WORLD_CITIES = load_world_cities()
+
+
+def _wrap_longitude(lon):
+    return (np.asarray(lon) + 180.0) % 360.0 - 180.0
+
+
+def _collect_segments(acg_result):
+    """Flatten every polyline into segment endpoint arrays plus a (planet, angle) key per segment."""
+    line_keys, seg_points, seg_line = [], [], []
+    for planet_name, planet in acg_result.get("planets", {}).items():
+        for angle in ACG_ANGLES:
+            polylines = planet.get("lines", {}).get(angle, [])
+            if not polylines:
+                continue
+            line_id = len(line_keys)
+            line_keys.append((planet_name, angle))
+            for polyline in polylines:
+                points = np.asarray(polyline, dtype=float)
+                if points.shape[0] < 2:
+                    continue
+                seg_points.append(np.hstack((points[:-1], points[1:]))) # lat0, lon0, lat1, lon1
+                seg_line.append(np.full(points.shape[0] - 1, line_id))
+    if not seg_points:
+        return line_keys, np.empty((0, 4)), np.empty(0, dtype=int)
+    return line_keys, np.vstack(seg_points), np.concatenate(seg_line)
+
+
+def build_segment_index(acg_result, radius_km=DEFAULT_ORB_KM, cell_deg=DEFAULT_CELL_DEG):
+    """Grid index over all line segments of an astrocartography result.
+
+    Returns {'line_keys': [(planet, angle), ...], 'segments': (S, 4) [lat0, lon0, lat1, lon1],
+    'segment_line': (S,), 'cell_offsets', 'cell_segments', 'cell_deg', 'n_lon_cells', 'n_lat_cells', 'radius_km'}.
+    Segments of cell c are cell_segments[cell_offsets[c]:cell_offsets[c + 1]].
+    """
+    line_keys, segments, segment_line = _collect_segments(acg_result)
+    n_lat_cells = int(np.ceil(180.0 / cell_deg))
+    n_lon_cells = int(np.ceil(360.0 / cell_deg))
+    n_cells = n_lat_cells * n_lon_cells
+
+    buffer_lat = radius_km / KM_PER_DEGREE
+    lat_lo = np.minimum(segments[:, 0], segments[:, 2]) - buffer_lat
+    lat_hi = np.maximum(segments[:, 0], segments[:, 2]) + buffer_lat
+    # A degree of longitude shrinks towards the poles, so the longitude buffer uses the most poleward latitude
+    widest_lat = np.minimum(np.maximum(np.abs(lat_lo), np.abs(lat_hi)), 89.0)
+    buffer_lon = np.minimum(buffer_lat / np.cos(np.radians(widest_lat)), 180.0)
+    lon_lo = np.minimum(segments[:, 1], segments[:, 3]) - buffer_lon
+    lon_hi = np.maximum(segments[:, 1], segments[:, 3]) + buffer_lon
+
+    row_lo = np.clip(np.floor((lat_lo + 90.0) / cell_deg), 0, n_lat_cells - 1).astype(int)
+    row_hi = np.clip(np.floor((lat_hi + 90.0) / cell_deg), 0, n_lat_cells - 1).astype(int)
+    col_lo = np.floor((lon_lo + 180.0) / cell_deg).astype(int)
+    n_cols = np.minimum(np.floor((lon_hi + 180.0) / cell_deg).astype(int) - col_lo + 1, n_lon_cells)
+    n_rows = row_hi - row_lo + 1
+
+    # Expand every segment into the (row, col) cells of its buffered bounding box in one pass
+    counts = n_rows * n_cols
+    seg_ids = np.repeat(np.arange(segments.shape[0]), counts)
+    within = np.arange(seg_ids.size) - np.repeat(np.cumsum(counts) - counts, counts)
+    rows = row_lo[seg_ids] + within // n_cols[seg_ids]
+    cols = (col_lo[seg_ids] + within % n_cols[seg_ids]) % n_lon_cells
+    cells = rows * n_lon_cells + cols
+
+    order = np.argsort(cells, kind='stable')
+    cell_offsets = np.zeros(n_cells + 1, dtype=int)
+    cell_offsets[1:] = np.cumsum(np.bincount(cells, minlength=n_cells))
+    logger.info(f"Indexed {segments.shape[0]} segments of {len(line_keys)} lines into {np.count_nonzero(np.diff(cell_offsets))} grid cells.")
+    return {
+        "line_keys": line_keys, "segments": segments, "segment_line": segment_line,
+        "cell_offsets": cell_offsets, "cell_segments": seg_ids[order],
+        "cell_deg": cell_deg, "n_lat_cells": n_lat_cells, "n_lon_cells": n_lon_cells, "radius_km": radius_km,
+    }
+
+
+def nearest_line_distances(index, latitudes, longitudes):
+    """(N cities, L lines) matrix of distances in km to each line; inf where the line is beyond the orb radius."""
+    lats = np.atleast_1d(np.asarray(latitudes, dtype=float))
+    lons = np.atleast_1d(np.asarray(longitudes, dtype=float))
+    distances = np.full((lats.size, len(index["line_keys"])), np.inf)
+    if lats.size == 0 or not index["line_keys"]:
+        return distances
+
+    rows = np.clip(np.floor((lats + 90.0) / index["cell_deg"]), 0, index["n_lat_cells"] - 1).astype(int)
+    cols = np.floor((_wrap_longitude(lons) + 180.0) / index["cell_deg"]).astype(int) % index["n_lon_cells"]
+    cells = rows * index["n_lon_cells"] + cols
+    starts = index["cell_offsets"][cells]
+    counts = index["cell_offsets"][cells + 1] - starts
+
+    # (city, candidate segment) pairs for every city at once
+    city_ids = np.repeat(np.arange(lats.size), counts)
+    seg_ids = index["cell_segments"][np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(city_ids.size)]
+    if seg_ids.size == 0:
+        return distances
+
+    # Local equirectangular projection around each city (km); segments are short enough for this to hold
+    city_lat, city_lon = lats[city_ids], lons[city_ids]
+    lon_scale = np.cos(np.radians(city_lat))
+    seg = index["segments"][seg_ids]
+    ax = _wrap_longitude(seg[:, 1] - city_lon) * lon_scale
+    ay = seg[:, 0] - city_lat
+    dx = _wrap_longitude(seg[:, 3] - seg[:, 1]) * lon_scale # Along the segment, not via the city's antimeridian
+    dy = seg[:, 2] - seg[:, 0]
+    length_sq = dx * dx + dy * dy
+    t = np.clip(np.where(length_sq > 0, -(ax * dx + ay * dy) / np.where(length_sq > 0, length_sq, 1.0), 0.0), 0.0, 1.0)
+    pair_km = np.hypot(ax + t * dx, ay + t * dy) * KM_PER_DEGREE
+
+    np.minimum.at(distances, (city_ids, index["segment_line"][seg_ids]), pair_km)
+    distances[distances > index["radius_km"]] = np.inf
+    return distances
+
+
+def resolve_line_weights(theme="general", planet_weights=None, angle_weights=None):
+    """Theme preset merged with any caller overrides; returns (planet_weights, angle_weights)."""
+    preset = LINE_WEIGHT_PRESETS.get(theme)
+    if preset is None:
+        logger.warning(f"Unknown ranking theme '{theme}', using 'general'.")
+        preset = LINE_WEIGHT_PRESETS["general"]
+    return {**preset["planets"], **(planet_weights or {})}, {**preset["angles"], **(angle_weights or {})}
+
+
+def rank_cities(acg_result, cities=None, top_n=DEFAULT_TOP_N, theme="general", planet_weights=None,
+                angle_weights=None, radius_km=DEFAULT_ORB_KM, index=None):
+    """Score cities against the lines of one astrocartography result and return the best top_n.
+
+    Each result is {'place_name', 'country', 'latitude', 'longitude', 'score', 'lines': [{'planet', 'angle',
+    'distance_km', 'influence'}, ...]} (lines nearest first), i.e. ready for data['locations'].
+    Pass a prebuilt index to rank several city lists or themes against the same lines.
+    """
+    cities = WORLD_CITIES if cities is None else cities
+    if not cities:
+        return []
+    index = index or build_segment_index(acg_result, radius_km=radius_km)
+    planet_w, angle_w = resolve_line_weights(theme, planet_weights, angle_weights)
+    line_weights = np.array([planet_w.get(planet, 0.0) * angle_w.get(angle, 1.0)
+                             for planet, angle in index["line_keys"]], dtype=float)
+
+    distances = nearest_line_distances(index, [c["latitude"] for c in cities], [c["longitude"] for c in cities])
+    falloff = np.clip(1.0 - distances / index["radius_km"], 0.0, 1.0) # inf -> 0
+    influence = falloff * line_weights[None, :]
+    scores = influence.sum(axis=1)
+
+    ranked = []
+    for city_idx in np.argsort(-scores, kind='stable')[:top_n]:
+        near = np.flatnonzero(np.isfinite(distances[city_idx]))
+        near = near[np.argsort(distances[city_idx, near])]
+        city = cities[city_idx]
+        ranked.append({
+            "place_name": city["place_name"], "country": city.get("country"),
+            "latitude": city["latitude"], "longitude": city["longitude"],
+            "score": round(float(scores[city_idx]), 4),
+            "lines": [{"planet": index["line_keys"][i][0], "angle": index["line_keys"][i][1],
+                       "distance_km": round(float(distances[city_idx, i]), 1),
+                       "influence": round(float(influence[city_idx, i]), 4)} for i in near],
+        })
+    logger.info(f"Ranked {len(cities)} cities for theme '{theme}'; top: {', '.join(r['place_name'] for r in ranked[:3])}")
+    return ranked
@@ -0,0 +1,216 @@
+# destiny_matrix.py
+# --- VERSION 1.0.0: Destiny Matrix (22-arcana) calculator with a precomputed date table ---
+# Every matrix position is a sum of earlier positions reduced to an arcana number 1-22 (digits are summed
+# while the value exceeds 22). The matrix depends on the birth date only, so the whole DESTINY_TABLE_START ..
+# DESTINY_TABLE_END range is computed once at import as one uint8 array (one row per day, ~2 MB);
+# single lookups are a row index and batch validation of many orders is a fancy-indexing pass.
+
+import logging
+from datetime import date, datetime
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - DESTINY - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+ARCANA_NAMES = {
+    1: "The Magician", 2: "The High Priestess", 3: "The Empress", 4: "The Emperor", 5: "The Hierophant",
+    6: "The Lovers", 7: "The Chariot", 8: "Justice", 9: "The Hermit", 10: "Wheel of Fortune",
+    11: "Strength", 12: "The Hanged Man", 13: "Death", 14: "Temperance", 15: "The Devil",
+    16: "The Tower", 17: "The Star", 18: "The Moon", 19: "The Sun", 20: "Judgement",
+    21: "The World", 22: "The Fool",
+}
+
+# Position -> operands summed (then reduced). "day", "month" and "year" are the birth-date inputs;
+# operands must be defined earlier in the table.
+DESTINY_MATRIX_POSITIONS = {
+    # Personal square
+    "personality": ("day",),
+    "talents_from_above": ("month",),
+    "material_karma": ("year",),
+    "karmic_tail": ("personality", "talents_from_above", "material_karma"),
+    "comfort_zone": ("personality", "talents_from_above", "material_karma", "karmic_tail"),
+    # Ancestral square
+    "ancestral_spiritual_male": ("personality", "talents_from_above"),
+    "ancestral_spiritual_female": ("talents_from_above", "material_karma"),
+    "ancestral_material_male": ("material_karma", "karmic_tail"),
+    "ancestral_material_female": ("karmic_tail", "personality"),
+    # Inner points between each corner and the centre
+    "personality_inner": ("personality", "comfort_zone"),
+    "personality_core": ("personality", "personality_inner"),
+    "talents_inner": ("talents_from_above", "comfort_zone"),
+    "talents_core": ("talents_from_above", "talents_inner"),
+    "material_inner": ("material_karma", "comfort_zone"),
+    "material_core": ("material_karma", "material_inner"),
+    "karmic_tail_inner": ("karmic_tail", "comfort_zone"),
+    "karmic_tail_core": ("karmic_tail", "karmic_tail_inner"),
+    # Love / money channel
+    "love_money_point": ("material_inner", "karmic_tail_inner"),
+    "love_channel": ("love_money_point", "karmic_tail_inner"),
+    "money_channel": ("love_money_point", "material_inner"),
+    # Purposes
+    "sky_line": ("talents_from_above", "karmic_tail"),
+    "earth_line": ("personality", "material_karma"),
+    "personal_purpose": ("sky_line", "earth_line"),
+    "male_line": ("ancestral_spiritual_male", "ancestral_material_male"),
+    "female_line": ("ancestral_spiritual_female", "ancestral_material_female"),
+    "social_purpose": ("male_line", "female_line"),
+    "spiritual_purpose": ("personal_purpose", "social_purpose"),
+    "planetary_purpose": ("social_purpose", "spiritual_purpose"),
+}
+DESTINY_POSITION_NAMES = tuple(DESTINY_MATRIX_POSITIONS)
+
+# Report fields (destiny_matrix schema) and the matrix positions they come from
+DESTINY_SUMMARY_FIELDS = {
+    "life_path_number": "spiritual_purpose",
+    "innate_talent_number": "talents_from_above",
+    "balance_number": "comfort_zone",
+}
+CHALLENGE_POSITIONS = ("karmic_tail", "karmic_tail_inner", "karmic_tail_core")
+CYCLE_POSITIONS = {"primary": "personal_purpose", "secondary": ("social_purpose", "spiritual_purpose", "planetary_purpose")}
+
+DESTINY_TABLE_START = np.datetime64('1900-01-01')
+DESTINY_TABLE_END = np.datetime64('2100-12-31')
+
+
+def _digit_sum(values):
+    values = np.array(values, dtype=np.int64) # Copy: the loop below consumes it
+    total = np.zeros_like(values)
+    while np.any(values):
+        total += values % 10
+        values //= 10
+    return total
+
+
+def reduce_to_arcana(values):
+    """Reduce integers to 1-22 by summing digits while above 22 (works on scalars and arrays)."""
+    values = np.asarray(values, dtype=np.int64)
+    while np.any(values > 22):
+        values = np.where(values > 22, _digit_sum(values), values)
+    return values
+
+
+def compute_destiny_matrix_rows(dates):
+    """(N, P) uint8 arcana matrix (columns in DESTINY_POSITION_NAMES order) for a datetime64[D] array."""
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    months_since_epoch = dates.astype('datetime64[M]')
+    inputs = {
+        "day": (dates - months_since_epoch).astype(np.int64) + 1,
+        "month": months_since_epoch.astype(np.int64) % 12 + 1,
+        "year": _digit_sum(dates.astype('datetime64[Y]').astype(np.int64) + 1970),
+    }
+    columns = {}
+    for name, operands in DESTINY_MATRIX_POSITIONS.items():
+        total = sum(inputs[op] if op in inputs else columns[op] for op in operands)
+        columns[name] = reduce_to_arcana(total)
+    return np.stack([columns[name] for name in DESTINY_POSITION_NAMES], axis=-1).astype(np.uint8)
+
+
+DESTINY_TABLE = compute_destiny_matrix_rows(np.arange(DESTINY_TABLE_START, DESTINY_TABLE_END + 1))
+logger.debug(f"Precomputed Destiny Matrix table: {DESTINY_TABLE.shape[0]} dates x {DESTINY_TABLE.shape[1]} positions.")
+
+
+def _to_datetime64(date_of_birth):
+    """Accept 'YYYY-MM-DD' strings, date/datetime objects or datetime64. Raises ValueError otherwise."""
+    if isinstance(date_of_birth, datetime):
+        date_of_birth = date_of_birth.date()
+    if isinstance(date_of_birth, (date, np.datetime64)):
+        return np.datetime64(date_of_birth, 'D')
+    try:
+        return np.datetime64(datetime.strptime(str(date_of_birth).strip(), "%Y-%m-%d").date(), 'D')
+    except ValueError:
+        raise ValueError(f"Invalid date_of_birth '{date_of_birth}' (expected YYYY-MM-DD).")
+
+
+def destiny_matrix_rows(dates):
+    """Table rows for many dates at once; dates outside the table range are computed directly."""
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    offsets = (dates - DESTINY_TABLE_START).astype(np.int64)
+    in_table = (offsets >= 0) & (offsets < DESTINY_TABLE.shape[0])
+    if np.all(in_table):
+        return DESTINY_TABLE[offsets]
+    rows = np.empty((dates.size, DESTINY_TABLE.shape[1]), dtype=np.uint8)
+    rows[in_table] = DESTINY_TABLE[offsets[in_table]]
+    rows[~in_table] = compute_destiny_matrix_rows(dates[~in_table])
+    return rows
+
+
+def _summary_from_row(row):
+    value = {name: int(row[i]) for i, name in enumerate(DESTINY_POSITION_NAMES)}
+    summary = {field: value[position] for field, position in DESTINY_SUMMARY_FIELDS.items()}
+    summary["challenge_numbers"] = [value[position] for position in CHALLENGE_POSITIONS]
+    summary["cycles"] = {
+        "primary": value[CYCLE_POSITIONS["primary"]],
+        "secondary": [value[position] for position in CYCLE_POSITIONS["secondary"]],
+    }
+    return value, summary
+
+
+def calculate_destiny_matrix(date_of_birth):
+    """Full matrix for one birth date.
+
+    Returns {'date_of_birth', 'positions': {position: {'arcana', 'name'}}, 'life_path_number',
+    'challenge_numbers', 'innate_talent_number', 'balance_number', 'cycles'}.
+    Raises ValueError for unparseable dates.
+    """
+    dob = _to_datetime64(date_of_birth)
+    value, summary = _summary_from_row(destiny_matrix_rows(dob[None])[0])
+    return {
+        "date_of_birth": str(dob),
+        "positions": {name: {"arcana": arcana, "name": ARCANA_NAMES[arcana]} for name, arcana in value.items()},
+        **summary,
+    }
+
+
+def fill_destiny_matrix_fields(data):
+    """Fill missing destiny_matrix report fields from data['date_of_birth']; supplied values are kept."""
+    if not data.get("date_of_birth"):
+        return data
+    matrix = calculate_destiny_matrix(data["date_of_birth"])
+    filled = dict(data)
+    for field in list(DESTINY_SUMMARY_FIELDS) + ["challenge_numbers", "cycles"]:
+        if field not in filled:
+            filled[field] = matrix[field]
+    filled.setdefault("matrix_positions", matrix["positions"])
+    return filled
+
+
+def validate_destiny_matrix_orders(orders):
+    """Check supplied numbers on many orders against the table in one pass.
+
+    orders: iterable of dicts with 'date_of_birth' and any of the summary fields. Returns a list of
+    {'index', 'field', 'expected', 'given'} mismatches (field 'date_of_birth' for unparseable dates).
+    """
+    orders = list(orders)
+    problems, valid_index, valid_dates = [], [], []
+    for i, order in enumerate(orders):
+        try:
+            valid_dates.append(_to_datetime64(order.get("date_of_birth")))
+            valid_index.append(i)
+        except ValueError:
+            problems.append({"index": i, "field": "date_of_birth", "expected": "YYYY-MM-DD", "given": order.get("date_of_birth")})
+    if not valid_index:
+        return problems
+
+    rows = destiny_matrix_rows(np.array(valid_dates, dtype='datetime64[D]'))
+    column = {name: i for i, name in enumerate(DESTINY_POSITION_NAMES)}
+    expected_fields = {field: rows[:, column[position]] for field, position in DESTINY_SUMMARY_FIELDS.items()}
+    expected_challenges = rows[:, [column[position] for position in CHALLENGE_POSITIONS]]
+
+    for row_idx, order_idx in enumerate(valid_index):
+        order = orders[order_idx]
+        for field, expected in expected_fields.items():
+            if field in order and order[field] != int(expected[row_idx]):
+                problems.append({"index": order_idx, "field": field, "expected": int(expected[row_idx]), "given": order[field]})
+        if "challenge_numbers" in order:
+            expected = expected_challenges[row_idx].tolist()
+            if list(order["challenge_numbers"]) != expected:
+                problems.append({"index": order_idx, "field": "challenge_numbers", "expected": expected, "given": order["challenge_numbers"]})
+    problems.sort(key=lambda p: p["index"])
+    logger.info(f"Validated {len(orders)} Destiny Matrix orders: {len(problems)} problems.")
+    return problems
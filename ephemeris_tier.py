@@ -0,0 +1,151 @@
+# ephemeris_tier.py
+# --- VERSION 1.0.0: Accuracy tier switch (Swiss Ephemeris files vs built-in Moshier) plus benchmark ---
+# --- VERSION 1.1.0: Tier held in a ContextVar, so concurrent reports (threads, async tasks) cannot switch each other's tier ---
+# "swiss"   - FLG_SWIEPH: reads the se*.se1 files (sub-milliarcsecond; needed for asteroids and fixed stars).
+#             Swiss Ephemeris silently falls back to Moshier for the main planets when the files are missing.
+# "moshier" - FLG_MOSEPH: analytical theory compiled into the library, no file I/O at all. Planets, nodes and
+#             Lilith agree with the file ephemeris to about an arcsecond (Moon a few arcseconds) for 3000 BC-3000 AD,
+#             which is ample for previews, pet charts and containers shipped without ephemeris files.
+# The tier is read at call time through get_ephemeris_flag() from a ContextVar: use_ephemeris_tier() scopes it to
+# the current thread / async task, and every other context keeps the default (EPHEMERIS_TIER env var or "swiss").
+# Run `python ephemeris_tier.py` for a speed / deviation report on this machine.
+
+import contextvars
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import swisseph as swe
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - EPHE - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+EPHEMERIS_TIERS = {"swiss": swe.FLG_SWIEPH, "moshier": swe.FLG_MOSEPH}
+DEFAULT_EPHEMERIS_TIER = "swiss"
+# Bodies Moshier cannot compute (they always need seas_*.se1 / ast*.se1 files)
+MOSHIER_UNSUPPORTED_BODIES = ('Chiron', 'Ceres', 'Pallas', 'Juno', 'Vesta')
+
+BENCHMARK_BODIES = {
+    'Sun': swe.SUN, 'Moon': swe.MOON, 'Mercury': swe.MERCURY, 'Venus': swe.VENUS, 'Mars': swe.MARS,
+    'Jupiter': swe.JUPITER, 'Saturn': swe.SATURN, 'Uranus': swe.URANUS, 'Neptune': swe.NEPTUNE, 'Pluto': swe.PLUTO,
+    'True Node': swe.TRUE_NODE, 'Black Moon Lilith': swe.MEAN_APOG,
+}
+
+
+def _validated_tier(tier):
+    tier = str(tier).strip().lower()
+    if tier not in EPHEMERIS_TIERS:
+        raise ValueError(f"Unknown ephemeris tier '{tier}'. Choose from: {', '.join(EPHEMERIS_TIERS)}")
+    return tier
+
+
+_default_tier = DEFAULT_EPHEMERIS_TIER
+if os.getenv('EPHEMERIS_TIER'):
+    try:
+        _default_tier = _validated_tier(os.getenv('EPHEMERIS_TIER'))
+        logger.info(f"Ephemeris tier '{_default_tier}' selected via EPHEMERIS_TIER environment variable.")
+    except ValueError as e:
+        logger.error(f"{e}; using '{DEFAULT_EPHEMERIS_TIER}'.")
+
+_tier_var = contextvars.ContextVar("ephemeris_tier", default=_default_tier)
+
+
+def get_ephemeris_tier():
+    return _tier_var.get()
+
+
+def get_ephemeris_flag():
+    """Swisseph ephemeris flag (FLG_SWIEPH or FLG_MOSEPH) for the active tier; OR it with FLG_SPEED etc."""
+    return EPHEMERIS_TIERS[_tier_var.get()]
+
+
+def is_file_free_tier():
+    """True when the active tier must not touch ephemeris files (skip asteroids, fixed stars)."""
+    return _tier_var.get() == "moshier"
+
+
+def set_ephemeris_tier(tier):
+    """Switch the tier of the current context (thread / async task); returns the previous one.
+
+    Other threads and tasks keep their own tier. Raises ValueError for unknown tiers.
+    """
+    previous = _tier_var.get()
+    _tier_var.set(_validated_tier(tier))
+    if previous != _tier_var.get():
+        logger.info(f"Ephemeris tier switched from '{previous}' to '{_tier_var.get()}' for this context.")
+    return previous
+
+
+@contextmanager
+def use_ephemeris_tier(tier):
+    """Run a block on the given tier in the current context only, restoring the previous tier afterwards."""
+    token = _tier_var.set(_validated_tier(tier))
+    try:
+        yield _tier_var.get()
+    finally:
+        _tier_var.reset(token)
+
+
+def benchmark_ephemeris_tiers(jds=None, bodies=None, flags=swe.FLG_SPEED):
+    """Time both tiers on a sample of Julian days and report the largest longitude/latitude deviations.
+
+    Default sample: 250 dates spread over 1900-2100. Returns {'samples', 'swiss_files_used', 'timing':
+    {tier: {'seconds', 'calls_per_second'}}, 'speedup', 'max_deviation_arcsec': {body: arcsec}, 'worst_body'}.
+    When no ephemeris files are installed, "swiss" falls back to Moshier and the deviations are 0.
+    """
+    if jds is None:
+        jds = np.linspace(swe.julday(1900, 1, 1, 0.0), swe.julday(2100, 1, 1, 0.0), 250)
+    jds = np.asarray(jds, dtype=float)
+    bodies = bodies or BENCHMARK_BODIES
+
+    results, timing = {}, {}
+    swiss_files_used = False
+    for tier, tier_flag in EPHEMERIS_TIERS.items():
+        values = np.full((len(bodies), jds.size, 2), np.nan)
+        start = time.perf_counter()
+        for b, body_id in enumerate(bodies.values()):
+            for j, jd in enumerate(jds):
+                calc_result, ret_flag = swe.calc_ut(float(jd), body_id, flags | tier_flag)
+                values[b, j] = calc_result[:2]
+                # Mean node/apogee echo the requested flag; only planets show which ephemeris really answered
+                if tier == "swiss" and body_id <= swe.PLUTO and ret_flag & swe.FLG_SWIEPH:
+                    swiss_files_used = True
+        seconds = time.perf_counter() - start
+        calls = len(bodies) * jds.size
+        timing[tier] = {"seconds": round(seconds, 4), "calls_per_second": round(calls / seconds) if seconds else None}
+        results[tier] = values
+
+    delta = results["moshier"] - results["swiss"]
+    delta[..., 0] = (delta[..., 0] + 180.0) % 360.0 - 180.0
+    max_dev = np.nanmax(np.abs(delta), axis=(1, 2)) * 3600.0
+    max_deviation = {name: round(float(max_dev[b]), 3) for b, name in enumerate(bodies)}
+    report = {
+        "samples": int(jds.size),
+        "swiss_files_used": swiss_files_used,
+        "timing": timing,
+        "speedup": round(timing["swiss"]["seconds"] / timing["moshier"]["seconds"], 2) if timing["moshier"]["seconds"] else None,
+        "max_deviation_arcsec": max_deviation,
+        "worst_body": max(max_deviation, key=max_deviation.get),
+    }
+    if not swiss_files_used:
+        logger.warning("No Swiss Ephemeris files were used; 'swiss' timings and deviations reflect the Moshier fallback.")
+    return report
+
+
+if __name__ == "__main__":
+    report = benchmark_ephemeris_tiers()
+    print(f"Samples: {report['samples']} dates x {len(report['max_deviation_arcsec'])} bodies "
+          f"(Swiss Ephemeris files used: {report['swiss_files_used']})")
+    for tier, stats in report["timing"].items():
+        print(f"  {tier:8s} {stats['seconds']:.4f}s  ({stats['calls_per_second']} calls/s)")
+    print(f"  Moshier speedup: x{report['speedup']}")
+    print("Max deviation Moshier vs Swiss (arcsec):")
+    for name, arcsec in report["max_deviation_arcsec"].items():
+        print(f"  {name:18s} {arcsec:8.3f}")
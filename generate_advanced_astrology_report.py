@@ -1,4 +1,17 @@
 # generate_advanced_astrology_report.py
+# --- VERSION 22.66.2 — Hedging and section latency timed from after the rate-limit wait (scheduler wrap= hook) ---
+# --- VERSION 22.66.1 — Arabic part lookups limited to lots with interpretation data (INTERPRETED_PARTS) ---
+# --- VERSION 22.66.0 — Slow AI sections hedged with a duplicate request after a latency-percentile deadline (--hedge_percentile) ---
+# --- VERSION 22.65.0 — Per-section checkpoints: --resume regenerates only missing/failed sections, --rebuild_pdf lays out from the checkpoint ---
+# --- VERSION 22.64.0 — Prompts fitted to a per-section token budget by compacting interpretation context (--no_compact_prompts) ---
+# --- VERSION 22.63.0 — Streamed AI sections laid out into the PDF as they land (--no_stream_pdf for the old order) ---
+# --- VERSION 22.62.0 — Interpretation lookups served from a flattened index built once at load time ---
+# --- VERSION 22.61.0 — Chart-wide prompt context built once per report and shared; --benchmark_context ---
+# --- VERSION 22.60.0 — Persistent AI response cache keyed by prompt fingerprint (--regenerate bypasses it) ---
+# --- VERSION 22.59.0 — AI calls go through the shared rate-limit scheduler (--priority express/standard/bulk) ---
+# --- VERSION 22.58.0 — AI sections generated concurrently (--ai_concurrency), output kept in PROMPTS order ---
+# --- VERSION 22.57.0 — Added --time_unknown (solar houses, time-dependent sections carry a caveat) ---
+# --- VERSION 22.56.9 — Added --ephemeris_tier option (file-free Moshier previews) ---
 # --- VERSION 22.56.8 — Removed pdf_generator_version_marker import ---
 # --- VERSION 22.56.7 — Apply import and path fixes for package structure ---
 # --- VERSION 22.56.5 — Fix TypeError with species/breed in calculate_chart call ---
@@ -15,16 +28,19 @@ from io import BytesIO # Keep if used elsewhere or for future additions (e.g., i
 import tempfile
 # import pytz # <<< REMOVED
 import logging # Ensure logging is imported for validator
-from collections import defaultdict, Counter # Added Counter
+from collections import defaultdict, Counter, ChainMap # Added Counter
+from collections.abc import Mapping
+from types import MappingProxyType
 import copy
 import argparse
 import math # Ensure math is imported
+import time
 from itertools import combinations # Needed for pattern detection
 from dateutil.relativedelta import relativedelta # Needed for future transits
 
 # --- Define Version ---
 # <<< VERSION UPDATED >>>
-__version__ = "22.56.8" # Version reflects marker removal
+__version__ = "22.66.2" # Version reflects hedging after the rate-limit wait
 
 # --- OpenAI Client Setup ---
 # Attempt to import specific errors for better handling
@@ -45,7 +61,7 @@ try:
         TEST_MODE = True # Force Test Mode if no API key
         print("WARNING: OPENAI_API_KEY environment variable not set. Forcing TEST MODE. AI calls will be mocked.")
     else:
-        client = OpenAI(api_key=openai_api_key)
+        client = OpenAI(api_key=openai_api_key, max_retries=0) # Retries and backoff are done by common.ai_scheduler
         # Optional: Add a simple check here if needed, e.g., listing models (can consume tokens)
         # try:
         #     client.models.list()
@@ -137,6 +153,17 @@ else:
     OCCASION_STYLES_FROM_ORCHESTRATOR = {}
 
 
+# --- Build Interpretation Index ---
+# Every interpretation file is flattened once here; safe_get_interp() is a single dict lookup and keys the
+# context builder can never resolve are reported now instead of as placeholders in the prompts.
+try:
+    from common.interpretation_index import build_interpretation_index
+    logger.info("build_interpretation_index imported from common.interpretation_index.")
+except ImportError as e:
+    logger.critical(f"FATAL ERROR importing build_interpretation_index from 'common.interpretation_index': {e}"); raise
+INTERPRETATION_INDEX = build_interpretation_index(COMMON_DATA_JSON_DIR) if JSON_LOADER_AVAILABLE else None
+
+
 # Continue importing other modules (many are now common)
 try:
     # Adjusted for package structure (assuming prompt_definitions_pet.py is in pet_report/)
@@ -164,9 +191,57 @@ try:
 except ImportError as e:
     logger.critical(f"FATAL ERROR importing apply_voice_to_prompt from 'common.voice_engine': {e}"); raise
 
+try:
+    from common.ai_concurrency import run_sections_concurrently
+    logger.info("run_sections_concurrently imported from common.ai_concurrency.")
+except ImportError as e:
+    logger.critical(f"FATAL ERROR importing run_sections_concurrently from 'common.ai_concurrency': {e}"); raise
+
+try:
+    from common.report_pipeline import SectionLayoutPipeline, stream_completion
+    logger.info("Streaming/layout pipeline imported from common.report_pipeline.")
+except ImportError as e:
+    logger.critical(f"FATAL ERROR importing from 'common.report_pipeline': {e}"); raise
+
+try:
+    from common.ai_hedging import get_ai_hedger
+    logger.info("Hedged AI calls imported from common.ai_hedging.")
+except ImportError as e:
+    logger.critical(f"FATAL ERROR importing from 'common.ai_hedging': {e}"); raise
+
+try:
+    from common.report_checkpoint import SectionCheckpoint, order_checkpoint_id
+    logger.info("Section checkpoints imported from common.report_checkpoint.")
+except ImportError as e:
+    logger.critical(f"FATAL ERROR importing from 'common.report_checkpoint': {e}"); raise
+
+try:
+    from common.prompt_budget import fit_prompt_to_budget, format_budget_report, section_token_budget
+    logger.info("Prompt budgeting imported from common.prompt_budget.")
+except ImportError as e:
+    logger.critical(f"FATAL ERROR importing from 'common.prompt_budget': {e}"); raise
+
+try:
+    from common.ai_scheduler import DEFAULT_PRIORITY, PRIORITY_CLASSES, estimate_tokens, get_ai_scheduler
+    logger.info("AI scheduler imported from common.ai_scheduler.")
+except ImportError as e:
+    logger.critical(f"FATAL ERROR importing from 'common.ai_scheduler': {e}"); raise
+
+try:
+    from common.ai_cache import get_ai_cache, prompt_fingerprint
+    logger.info("AI response cache imported from common.ai_cache.")
+except ImportError as e:
+    logger.critical(f"FATAL ERROR importing get_ai_cache from 'common.ai_cache': {e}"); raise
+
+try:
+    from common.arabic_parts import INTERPRETED_PARTS
+    logger.info("Interpreted Arabic parts imported from common.arabic_parts.")
+except ImportError as e:
+    logger.critical(f"FATAL ERROR importing INTERPRETED_PARTS from 'common.arabic_parts': {e}"); raise
+
 try:
     # Adjusted for package structure (assuming advanced_calculate_astrology.py is in common/)
-    from common.advanced_calculate_astrology import calculate_chart, get_zodiac_sign, swe, __version__ as calc_version
+    from common.advanced_calculate_astrology import calculate_chart, find_time_dependent_sections, get_zodiac_sign, swe, __version__ as calc_version
     logger.info(f"Calculation engine imported (V{calc_version}). Swisseph object potentially imported.")
 except ImportError as e:
     logger.critical(f"FATAL ERROR importing from common.advanced_calculate_astrology: {e}"); raise
@@ -188,13 +263,14 @@ except ImportError as e:
 try:
     # Import the HUMAN PDF generator function from human_report.py within the same package
     # <<< FIXED IMPORT LINE >>>
-    from .human_report import generate_human_pdf
+    from .human_report import generate_human_pdf, prepare_human_pdf, build_section_flowables, assemble_human_pdf
     # Assuming generate_human_pdf doesn't expose a version marker, or we don't need it here.
     logger.info(f"Human PDF generator imported from .human_report.")
 except ImportError as e:
     logger.critical(f"FATAL ERROR importing generate_human_pdf from .human_report: {e}")
     # Define dummy if critical for script to run further for testing other parts
     def generate_human_pdf(**kwargs): logger.error("Dummy generate_human_pdf called due to import error."); return False
+    prepare_human_pdf = build_section_flowables = assemble_human_pdf = None # Streaming PDF pipeline unavailable
     # pdf_generator_version_marker = "N/A" # Variable removed
 
 
@@ -243,7 +319,7 @@ for p in possible_paths:
         break
 
 if not ephe_path:
-    logger.critical("Ephemeris path not found in SWEPHE_PATH, default path, or relative 'ephe'/'swisseph' directory at project root. Calculation requires ephemeris files.")
+    logger.critical("Ephemeris path not found in SWEPHE_PATH, default path, or relative 'ephe'/'swisseph' directory at project root. Calculation requires ephemeris files (or --ephemeris_tier moshier / EPHEMERIS_TIER=moshier for file-free previews).")
 elif swe: # Only set path if swe object exists
     try:
         swe.set_ephe_path(ephe_path)
@@ -268,6 +344,13 @@ AI_MODEL = os.getenv("AI_MODEL", "gpt-4-turbo") # Or your preferred model
 try: AI_TEMPERATURE = float(os.getenv("AI_TEMPERATURE", "0.3"))
 except ValueError: AI_TEMPERATURE = 0.3; logger.warning("Invalid AI_TEMPERATURE env var, using 0.3")
 
+# Prepended to prompts of sections that use angles / house cusps when the birth time is unknown
+TIME_UNKNOWN_PROMPT_NOTE = (
+    "IMPORTANT: The birth time is unknown. There is no Rising sign, Midheaven or chart ruler, and houses are solar houses "
+    "counted from the Sun. Do not interpret an Ascendant, Midheaven or house cusp signs; say gently that these need a birth "
+    "time and draw on sign placements and aspects instead.\n\n"
+)
+
 
 # --- Helper Functions ---
 # ... (Helper functions like replace_css_variables, _find_tightest_aspect, etc. - assumed identical) ...
@@ -583,8 +666,8 @@ def _validate_context_keys(section_key, prompt_template, context, logger_instanc
     if not isinstance(prompt_template, str):
         logger_instance.error(f"[{section_key}] Cannot validate keys: prompt_template is not a string.")
         return False, 0 # Return count 0
-    if not isinstance(context, dict):
-        logger_instance.error(f"[{section_key}] Cannot validate keys: context is not a dictionary.")
+    if not isinstance(context, Mapping):
+        logger_instance.error(f"[{section_key}] Cannot validate keys: context is not a mapping.")
         return False, 0 # Return count 0
 
     required_keys = set(re.findall(r'\{([a-zA-Z0-9_]+)\}', prompt_template))
@@ -611,12 +694,13 @@ def _validate_context_keys(section_key, prompt_template, context, logger_instanc
 
 
 # === Context Preparation Logic ==
-def _prepare_prompt_context(section_key, chart_data, client_name, gender, occasion_mode, is_pet_report, birth_date=None, birth_time=None, pet_breed=None, pet_species=None, **kwargs):
+def _build_chart_context(chart_data, client_name, gender, occasion_mode, is_pet_report, birth_date=None, birth_time=None, pet_breed=None, pet_species=None, **kwargs):
     """
-    Prepares the context dictionary for formatting a specific section's AI prompt.
+    Builds the chart-wide context dictionary shared by every section's AI prompt
+    (interpretation lookups, aspect/transit formatting, sign/house keys). Nothing here depends on the section,
+    so build_report_context calls it once per report.
 
     Args:
-        section_key (str): string identifier for this section
         chart_data (dict): The main chart data dictionary.
         client_name (str): The client or pet name.
         gender (str): Client gender ('M', 'F', or other).
@@ -628,11 +712,11 @@ def _prepare_prompt_context(section_key, chart_data, client_name, gender, occasi
         pet_species (str, optional): Pet species. Defaults to None.
         **kwargs: Catch-all for any future or unused fields.
     """
-    logger.info(f"--> Preparing context for section: {section_key}")
+    logger.info(f"--> Building chart-wide prompt context for: {client_name}")
     # ... function body ...
     context = {}
     if not isinstance(chart_data, dict):
-        logger.error(f"Invalid chart_data provided to _prepare_prompt_context for section {section_key}.")
+        logger.error("Invalid chart_data provided to _build_chart_context.")
         return {"error": "Invalid chart data"}
 
     # json_loader is now imported at the top (common.json_loader)
@@ -640,100 +724,15 @@ def _prepare_prompt_context(section_key, chart_data, client_name, gender, occasi
 
     default_interp = "[Interpretation data unavailable]"
 
-    # *** UPDATED safe_get_interp with Nested Lookup Logic ***
     def safe_get_interp(group, key, default=default_interp):
         """
-        Looks up interpretation, handling normalization, group mapping, and potential nested JSON structures.
-        Attempts flat lookup first, then tries nested lookup based on key patterns.
+        Looks up an interpretation in the pre-built INTERPRETATION_INDEX (normalized keys, group mapping and
+        nested JSON paths resolved at load time). Unresolvable keys were reported when the index was built.
         """
-        if not key or not isinstance(key, str) or not group or not isinstance(group, str):
-            logger.warning(f"Invalid group ('{group}') or key ('{key}') provided for lookup.")
-            return default
-        if not JSON_LOADER_AVAILABLE: # Added check
-            logger.warning(f"JSON loader not available, cannot lookup {group}/{key}")
-            return default # Cannot perform lookup without loader
-
-        # --- Normalization Step ---
-        group_norm = group.lower().replace(' ', '_').replace('-', '_')
-        key_norm = key.lower().replace(' ', '_').replace('-', '_')
-
-        if key_norm != key or group_norm != group:
-            logger.debug(f"Normalized lookup: '{group}/{key}' -> '{group_norm}/{key_norm}'")
-
-        # --- Group to Filename Mapping ---
-        file_group = group_norm
-        if group_norm in ("major", "minor", "declination"): # Combined aspect groups
-            file_group = "aspects"
-            logger.debug(f"Mapping group '{group_norm}' to file group '{file_group}')")
-        # Add other mappings here if needed (e.g., rising_sign -> rising)
-        elif group_norm == "rising_sign":
-            file_group = "rising_sign" # Keep mapping explicit if needed, or remove if filename matches
-        elif group_norm == "dignity":
-            file_group = "dignity" # Adjust if filename is dignities.json -> "dignities"
-
-        # --- Data Loading and Lookup Logic ---
-        try:
-            # Load the entire data dictionary for the group using the imported function
-            full_data = load_json_data(file_group) # Ensure this function works!
-
-            if not isinstance(full_data, dict):
-                logger.warning(f"Could not load or parse data for group '{file_group}'. Returning default for key '{key_norm}'.")
-                return default
-
-            # 1. Try direct/flat lookup first using the fully combined key
-            flat_result = full_data.get(key_norm)
-            # Check if result is valid (not None, not empty string, not the default placeholder itself)
-            if flat_result is not None and flat_result != "" and flat_result != default_interp:
-                logger.debug(f"Flat lookup successful for: {file_group}/{key_norm}")
-                return flat_result
-            elif flat_result is not None: # It exists but is empty or default
-                logger.debug(f"Flat lookup for {file_group}/{key_norm} found but value is empty/default. Will attempt nested.")
-            else: # Flat key doesn't exist at all
-                logger.debug(f"Flat lookup failed for: {file_group}/{key_norm}. Attempting nested.")
-
-
-            # 2. Attempt Nested Lookup if flat failed or was empty/default
-            parts = key_norm.split('_')
-            nested_result = None
-
-            # Try Pattern 1: group_id_subkey (e.g., house_1_corethemes -> data['house_1']['corethemes'])
-            if len(parts) >= 3:
-                base_key = f"{parts[0]}_{parts[1]}" # e.g., house_1, sun_sign
-                sub_key = "_".join(parts[2:])       # e.g., corethemes, aries
-                nested_base_obj = full_data.get(base_key)
-                if isinstance(nested_base_obj, dict):
-                    nested_result = nested_base_obj.get(sub_key)
-                    if nested_result is not None and nested_result != "" and nested_result != default_interp:
-                        logger.debug(f"Nested lookup successful (Pat1): {file_group}/{base_key}/{sub_key}")
-                        return nested_result
-                    #else: logger.debug(f"Nested lookup (Pat1) failed for subkey '{sub_key}' within base '{base_key}' in {file_group}") # Can be noisy
-
-            # Try Pattern 2: primary_secondary (e.g., dominant_fire -> data['dominant']['fire'])
-            if nested_result is None and len(parts) >= 2:
-                base_key = parts[0] # e.g., dominant, lifepath, unaspected, pattern
-                sub_key = "_".join(parts[1:]) # e.g., fire, 11, sun, grand_trine
-                nested_base_obj = full_data.get(base_key)
-                if isinstance(nested_base_obj, dict):
-                    nested_result = nested_base_obj.get(sub_key)
-                    if nested_result is not None and nested_result != "" and nested_result != default_interp:
-                        logger.debug(f"Nested lookup successful (Pat2): {file_group}/{base_key}/{sub_key}")
-                        return nested_result
-                    #else: logger.debug(f"Nested lookup (Pat2) failed for subkey '{sub_key}' within base '{base_key}' in {file_group}") # Can be noisy
-
-            # 3. If all lookups fail, return the default
-            logger.warning(f"Lookup failed for {file_group}/{key_norm} (flat and nested attempts).")
-            return default
-
-        # Catch FileNotFoundError specifically if load_json_data raises it (it shouldn't, should return None)
-        except FileNotFoundError: # Keep just in case load_json_data changes
-            logger.warning(f"Interpretation file not found for group '{file_group}'. Cannot lookup key '{key_norm}'.")
+        if INTERPRETATION_INDEX is None:
+            logger.warning(f"Interpretation index not available, cannot lookup {group}/{key}")
             return default
-        # Catch other potential errors during lookup
-        except Exception as e:
-            logger.error(f"Unexpected error during lookup for {file_group}/{key_norm}: {e}", exc_info=True)
-            # Return a more specific error message if possible, otherwise fallback
-            return f"[Error Loading: {file_group}/{key_norm}]"
-    # *** END of updated safe_get_interp Definition ***
+        return INTERPRETATION_INDEX.get(group, key, default)
 
 
     # --- Extract data safely using .get() with defaults ---
@@ -855,8 +854,12 @@ def _prepare_prompt_context(section_key, chart_data, client_name, gender, occasi
     if not asc_data: asc_data = angles.get("Ascendant", {})
     asc_sign = asc_data.get('sign')
     context['asc_sign'] = asc_sign if asc_sign and asc_sign != "Error" else "?"
-    rising_data = load_json_data("rising_sign")
-    if isinstance(rising_data, dict):
+    time_unknown = birth_details.get('time_unknown', False) # No Ascendant without a birth time: skip the rising-sign lookup
+    rising_data = None if time_unknown else load_json_data("rising_sign")
+    if time_unknown:
+        context['asc_sign'] = "Unknown (birth time not given)"
+        context["asc_sign_interp_json"] = default_interp
+    elif isinstance(rising_data, dict):
         context["asc_sign_interp_json"] = rising_data.get(asc_sign, default_interp)
         if context["asc_sign_interp_json"] == default_interp and asc_sign != '?':
              logger.warning(f"Interpretation for Ascendant sign '{asc_sign}' not found in rising_sign.json.")
@@ -1005,8 +1008,9 @@ def _prepare_prompt_context(section_key, chart_data, client_name, gender, occasi
 
     # Arabic Parts List
     arabic_part_interps = []
-    ARABIC_PARTS_NAMES = ["Part of Fortune", "Part of Spirit"]
     if isinstance(other_points, dict):
+        # Only lots with interpretation data are looked up; the other computed lots are data-only
+        ARABIC_PARTS_NAMES = [name for name in INTERPRETED_PARTS if name in other_points]
         for part_name in ARABIC_PARTS_NAMES:
             part_data = other_points.get(part_name, {})
             if isinstance(part_data, dict) and part_data.get('degree') is not None:
@@ -1124,6 +1128,26 @@ def _prepare_prompt_context(section_key, chart_data, client_name, gender, occasi
     context['mc_aspects_str'] = _format_aspect_list(aspects_dict.get("Midheaven", []), max_aspects=2, aspect_type_filter='major')
     context['moon_aspects_str'] = _format_aspect_list(aspects_dict.get("Moon", []), max_aspects=3)
 
+    return context
+
+
+def build_report_context(chart_data, client_name, gender, occasion_mode, is_pet_report, **kwargs):
+    """Chart-wide prompt context for one report, built once and frozen (read-only) so all sections can share it."""
+    return MappingProxyType(_build_chart_context(chart_data, client_name, gender, occasion_mode, is_pet_report, **kwargs))
+
+
+def _prepare_prompt_context(section_key, chart_data, client_name, gender, occasion_mode, is_pet_report, birth_date=None, birth_time=None, pet_breed=None, pet_species=None, report_context=None, **kwargs):
+    """
+    Context for one section's AI prompt: a cheap overlay of section keys (and the validation flag) on the shared
+    report context from build_report_context, which is built here only when the caller has none.
+    """
+    if report_context is None:
+        report_context = build_report_context(chart_data, client_name, gender, occasion_mode, is_pet_report, birth_date=birth_date,
+                                              birth_time=birth_time, pet_breed=pet_breed, pet_species=pet_species, **kwargs)
+    context = ChainMap({'section_id': section_key}, report_context)
+    if "error" in report_context:
+        return context
+
     # Validator Call
     PROMPTS_TO_USE = PET_PROMPTS if is_pet_report else HUMAN_PROMPTS
     base_prompt_template_for_validation = "" # Initialize
@@ -1163,6 +1187,31 @@ def _prepare_prompt_context(section_key, chart_data, client_name, gender, occasi
     return context
 
 
+def benchmark_prompt_context(chart_data, client_name, gender, occasion_mode="default", is_pet_report=False, prompts_list=None):
+    """Times context building for all sections: rebuilt per section (old path) vs one shared build plus overlays."""
+    prompts_list = prompts_list if prompts_list is not None else (PET_PROMPTS if is_pet_report else HUMAN_PROMPTS)
+    section_keys = [p.get("section_id") for p in prompts_list if isinstance(p, dict) and p.get("section_id")]
+
+    start = time.perf_counter()
+    for section_key in section_keys:
+        _prepare_prompt_context(section_key, chart_data, client_name, gender, occasion_mode, is_pet_report)
+    per_section_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report_context = build_report_context(chart_data, client_name, gender, occasion_mode, is_pet_report)
+    for section_key in section_keys:
+        _prepare_prompt_context(section_key, chart_data, client_name, gender, occasion_mode, is_pet_report, report_context=report_context)
+    shared_seconds = time.perf_counter() - start
+
+    result = {
+        "sections": len(section_keys), "per_section_build_seconds": round(per_section_seconds, 4),
+        "shared_build_seconds": round(shared_seconds, 4), "saved_seconds": round(per_section_seconds - shared_seconds, 4),
+        "speedup": round(per_section_seconds / shared_seconds, 1) if shared_seconds > 0 else None,
+    }
+    logger.info(f"Prompt context benchmark: {result}")
+    return result
+
+
 # --- Content Generation Function ---
 # ... (Full function definition from previous version) ...
 def generate_report_content_via_ai(
@@ -1173,15 +1222,22 @@ def generate_report_content_via_ai(
     occasion_mode="default",
     is_pet_report=False,
     pet_breed=None,
-    pet_species=None
+    pet_species=None,
+    max_concurrency=None, # Sections generated in parallel; None = AI_MAX_CONCURRENCY env var or ai_concurrency default
+    ai_priority=DEFAULT_PRIORITY, # Scheduler class: "express" orders are served before "standard" and "bulk"
+    bypass_cache=False, # True = ignore cached responses and regenerate every section (the fresh ones replace them)
+    on_section_ready=None, # Called with (section_key, section_data) as each section finishes, e.g. to start its PDF layout
+    compact_prompts=True, # Compact interpretation context so each prompt fits its word_count-driven token budget
+    checkpoint=None, # SectionCheckpoint: every finished section (content, error flag, prompt hash) is persisted as it lands
+    resume=False, # Reuse checkpointed sections whose prompt is unchanged; only missing/failed/stale ones call the AI
+    hedge_percentile=None # Send a duplicate request when a section outlives this latency percentile (None = AI_HEDGE_PERCENTILE env var or off)
 ):
-    """Loops through PROMPTS (list), prepares context, formats, calls AI or stubs, returns full results dict."""
+    """Prepares context, formats and calls AI (or stubs) for every PROMPTS section concurrently; returns results dict in PROMPTS order."""
     if not isinstance(prompts_list, list) or not prompts_list:
         logger.critical("PROMPTS list is not available or invalid.")
         return {"error": "PROMPTS list not loaded or invalid format"}
 
-    report_sections_final = {}
-    logger.info(f"Starting content generation loop for {len(prompts_list)} sections...")
+    logger.info(f"Starting content generation for {len(prompts_list)} sections...")
 
     system_prompt_elowen = """You are Elowen, a wise, empathetic, and insightful astrologer with deep knowledge of esoteric traditions, mythology, and psychological archetypes. Your writing style is poetic, evocative, and empowering, using a direct second-person voice (addressing the client as 'you'). You seamlessly blend technical astrological details and provided interpretations with rich, symbolic narrative. Avoid generic statements; ensure every insight expands upon the specific chart data and interpretations provided in the prompt. Do not use markdown formatting like ### or * in your response; use plain text headers where requested."""
     system_prompt_mika = """You are Mika, a whimsical, heartful guide who speaks to and about animals with warmth, curiosity, and respect. Your voice is affectionate, playful, and sometimes soul-deep, always addressing the animal's human guardian. You use clear metaphors and simple language to explain astrology. If appropriate, weave in animal instincts, loyalty, curiosity, or spiritual symbolism. Avoid overly complex or abstract language. Ensure the tone is consistently lighthearted and humorous for a pet report."""
@@ -1190,22 +1246,35 @@ def generate_report_content_via_ai(
     current_system_prompt = system_prompt_mika if is_pet_report else system_prompt_elowen
     logger.info(f"Using persona: {current_persona}")
 
-    prompt_context = {} # Initialize context dictionary outside the loop for potential reuse/access in blessing
+    # Chart-wide context is built once per report and shared read-only; sections only add an overlay
+    report_context = build_report_context(chart_data, client_name, gender, occasion_mode, is_pet_report,
+                                          pet_breed=pet_breed, pet_species=pet_species)
+
+    time_dependent_sections = set()
+    if chart_data.get('birth_details', {}).get('time_unknown'):
+        time_dependent_sections = set(find_time_dependent_sections(prompts_list))
+        logger.info(f"Birth time unknown: {len(time_dependent_sections)} sections get the time-unknown caveat: {sorted(time_dependent_sections)}")
 
+    sections_to_generate = []
     for prompt_struct in prompts_list:
+        if not isinstance(prompt_struct, dict):
+            logger.warning(f"Skipping invalid prompt structure: {prompt_struct!r:.80}")
+            continue
         section_key = prompt_struct.get("section_id")
         if not section_key:
              logger.warning("Skipping prompt structure with missing 'section_id'.")
              continue
+        sections_to_generate.append((section_key, prompt_struct))
 
-        if not isinstance(prompt_struct, dict):
-            logger.warning(f"Skipping invalid prompt structure for key: {section_key}")
-            continue
-
+    def generate_section(prompt_struct):
+        """Context, voice, formatting and AI call for one section; returns the section dict with content and error_flag."""
+        section_key = prompt_struct["section_id"]
+        prompt_context = {} # Also read by the pet blessing below
         logger.info(f"Processing section: {section_key} - {prompt_struct.get('header', 'No Header')}")
         final_section_data = copy.deepcopy(prompt_struct)
         ai_generated_content = f"[AI Placeholder - {section_key}]"
         error_flag = False
+        prompt_hash = None
         section_meta = final_section_data.get("meta", {})
 
         sections_to_skip_ai = ["cover", "toc", "chart_wheel"]
@@ -1224,7 +1293,8 @@ def generate_report_content_via_ai(
                 error_flag = True
                 logger.error(f"Invalid or missing prompt template for {section_key}")
             else:
-                prompt_context = _prepare_prompt_context(section_key, chart_data, client_name, gender, occasion_mode, is_pet_report, pet_breed, pet_species)
+                prompt_context = _prepare_prompt_context(section_key, chart_data, client_name, gender, occasion_mode, is_pet_report,
+                                                         pet_breed=pet_breed, pet_species=pet_species, report_context=report_context)
 
                 if prompt_context.get('validation_error'):
                     ai_generated_content = f"[SYSTEM ERROR: Context Validation Failed for {section_key} - Check Logs]"
@@ -1252,7 +1322,13 @@ def generate_report_content_via_ai(
 
                     if not error_flag:
                         try:
-                            formatted_ai_prompt = voiced_prompt_template.format(**prompt_context)
+                            token_budget = section_token_budget(prompt_struct.get("word_count"), section_meta.get("prompt_token_budget"))
+                            formatted_ai_prompt, budget_report = fit_prompt_to_budget(
+                                voiced_prompt_template, prompt_context, token_budget, section=section_key, compact=compact_prompts)
+                            final_section_data.setdefault("meta", {})["prompt_tokens"] = budget_report
+                            if section_key in time_dependent_sections:
+                                formatted_ai_prompt = TIME_UNKNOWN_PROMPT_NOTE + formatted_ai_prompt
+                                final_section_data.setdefault("meta", {})["time_unknown"] = True
                             logger.debug(f"Formatted Prompt (start) {section_key}: {formatted_ai_prompt[:300]}...")
                             # Placeholder check (adjust filter as needed)
                             unresolved = re.findall(r'(\{.*?\})', formatted_ai_prompt)
@@ -1269,15 +1345,30 @@ def generate_report_content_via_ai(
                             logger.error(f"Format error {section_key}: {fmt_err}", exc_info=True)
 
                         if not error_flag:
-                            if test_mode_flag or client_instance is None: # Use renamed vars
+                            mocked = test_mode_flag or client_instance is None # Use renamed vars
+                            prompt_hash = prompt_fingerprint("test_mode" if mocked else AI_MODEL, AI_TEMPERATURE, current_system_prompt, formatted_ai_prompt)
+                            checkpointed_section = checkpoint.reusable(section_key, prompt_hash) if (checkpoint is not None and resume) else None
+                            if checkpointed_section:
+                                logger.info(f"             -> Resumed {section_key} from checkpoint (no AI call)")
+                                return checkpointed_section
+                            if mocked:
                                 ai_generated_content = (f"**[TEST MODE ACTIVE - AI Call Mocked]**\n\n_(Prompt for '{section_key}'):_\n{formatted_ai_prompt[:800]}...")
                                 logger.info(f"             -> MOCK Generated for {section_key}")
                             else:
                                 logger.info(f"                         ▶️ Calling AI ({AI_MODEL}) for {section_key}...")
                                 try:
                                     messages=[{"role": "system", "content": current_system_prompt},{"role": "user", "content": formatted_ai_prompt}]
-                                    response = client_instance.chat.completions.create(model=AI_MODEL, messages=messages, temperature=AI_TEMPERATURE) # Use client_instance
-                                    ai_response_text = response.choices[0].message.content.strip()
+                                    scheduler = get_ai_scheduler()
+                                    estimated_tokens = estimate_tokens(current_system_prompt, formatted_ai_prompt)
+                                    def hedged_attempt(fn, *args, **kwargs): # Runs after the rate-limit wait, so only the request itself is timed
+                                        return get_ai_hedger().call(section_key, fn, *args, hedge_percentile=hedge_percentile, cancellable=True,
+                                                                    before_hedge=lambda: scheduler.acquire(estimated_tokens, ai_priority), **kwargs)
+                                    def request_completion(): # Streamed: tokens arrive as they are generated; a slow section may be hedged
+                                        return scheduler.call(
+                                            stream_completion, client_instance.chat.completions.create, model=AI_MODEL, messages=messages, temperature=AI_TEMPERATURE,
+                                            priority=ai_priority, estimated_tokens=estimated_tokens, label=section_key, wrap=hedged_attempt)
+                                    ai_response_text = get_ai_cache().get_or_generate(
+                                        AI_MODEL, AI_TEMPERATURE, current_system_prompt, formatted_ai_prompt, request_completion, bypass=bypass_cache)
                                     ai_generated_content = ai_response_text if ai_response_text else "[AI Response Empty]";
                                     if not ai_response_text: logger.warning(f"Empty AI response for {section_key}.")
                                     logger.info(f"             -> AI Response received for {section_key} ({len(ai_generated_content)} chars)")
@@ -1304,7 +1395,7 @@ def generate_report_content_via_ai(
                  if blessing_text_template:
                      try:
                          # Use pet_name from prompt_context if available, otherwise default name
-                         pet_name_for_blessing = prompt_context.get("pet_name", client_name) if isinstance(prompt_context, dict) else client_name
+                         pet_name_for_blessing = prompt_context.get("pet_name", client_name) if isinstance(prompt_context, Mapping) else client_name
                          final_blessing_text = blessing_text_template.replace("{pet_name}", pet_name_for_blessing)
                          if isinstance(ai_generated_content, str):
                              if ai_generated_content.strip() != f"[AI Placeholder - {section_key}]":
@@ -1320,10 +1411,33 @@ def generate_report_content_via_ai(
 
         final_section_data['ai_generated_content'] = ai_generated_content
         final_section_data['error_flag'] = error_flag
-        report_sections_final[section_key] = final_section_data
         logger.debug(f"Finished processing section {section_key}. Error: {error_flag}")
-
-    logger.info("AI content generation loop finished.")
+        if checkpoint is not None:
+            checkpoint.save_section(section_key, final_section_data, prompt_hash)
+        return final_section_data
+
+    def section_failed(section_key, error):
+        failed_section = copy.deepcopy(dict(sections_to_generate)[section_key])
+        failed_section['ai_generated_content'] = "[ERROR: Unexpected Section Generation Error]"
+        failed_section['error_flag'] = True
+        if checkpoint is not None:
+            checkpoint.save_section(section_key, failed_section)
+        return failed_section
+
+    report_sections_final = run_sections_concurrently(sections_to_generate, generate_section,
+                                                      max_concurrency=max_concurrency, on_error=section_failed,
+                                                      on_result=on_section_ready)
+    budget_reports = [s.get("meta", {}).get("prompt_tokens") for s in report_sections_final.values() if isinstance(s, dict)]
+    if any(budget_reports):
+        logger.info(f"Prompt tokens per section (compaction {'on' if compact_prompts else 'off'}):\n{format_budget_report(budget_reports)}")
+    hedger = get_ai_hedger()
+    if hedger.metrics()["calls"]:
+        logger.info(f"AI latency per section:\n{hedger.recorder.format_histograms([key for key, _ in sections_to_generate])}")
+        try:
+            hedger.recorder.save()
+        except OSError as save_err:
+            logger.warning(f"Could not save AI latency samples to {hedger.recorder.path}: {save_err}")
+    logger.info(f"AI content generation finished. Hedging: {hedger.metrics()}. Scheduler: {get_ai_scheduler().metrics()}, cache: {get_ai_cache().stats()}")
     return report_sections_final
 
 
@@ -1393,10 +1507,107 @@ def validate_generated_content(report_content):
     # Only consider validation truly "passed" if no issues were found
     return issues_found == 0, issues_found
 
+# --- Human PDF Helpers ---
+def _human_pdf_paths():
+    """assets/fonts/data directories passed to the human PDF generator."""
+    current_script_dir_for_paths = os.path.dirname(os.path.abspath(__file__)) # human_report/
+    return {
+        'assets_base_dir': os.path.join(current_script_dir_for_paths, 'assets'), # Assumes human_report/assets
+        'fonts_base_dir': os.path.join(current_script_dir_for_paths, 'fonts'), # Assumes human_report/fonts
+        'data_jsons_dir': COMMON_DATA_JSON_DIR, # Data JSON dir should be the common one (common.json_loader)
+    }
+
+
+def _human_pdf_section_data(section_content, prompt_def):
+    """generate_human_pdf section dict ({'header', 'ai_content', 'quote'}) for one generated section."""
+    section_id = prompt_def.get("section_id")
+    return {
+        'header': section_content.get('header', prompt_def.get('header', section_id)),
+        'ai_content': section_content.get('ai_generated_content', ''),
+        'quote': section_content.get('quote', prompt_def.get('quote'))
+    }
+
+
+def _build_human_pdf(final_report_content, prompts_list, client_name, occasion_mode, output_path):
+    """Lays out the human PDF from generated sections in PROMPTS order; returns True if the PDF was written."""
+    # --- Prepare context/data specifically for generate_human_pdf ---
+    # Convert final_report_content dict to list ordered by prompts_list
+    sections_list_for_human_pdf = []
+    if isinstance(prompts_list, list) and isinstance(final_report_content, dict):
+        for prompt_def in prompts_list:
+            section_id = prompt_def.get("section_id")
+            if section_id and section_id in final_report_content:
+                sections_list_for_human_pdf.append(_human_pdf_section_data(final_report_content[section_id], prompt_def))
+            elif section_id:
+                logger.warning(f"Section {section_id} defined in PROMPTS but not found in final_report_content for PDF.")
+
+    # Define paths needed by generate_human_pdf
+    pdf_paths = _human_pdf_paths()
+
+    if not pdf_paths['data_jsons_dir']:
+         logger.error("COMMON_DATA_JSON_DIR is not set, cannot provide data path to human PDF generator.")
+         return False # Stop if common data path is missing
+
+    # Call the imported human PDF generator function
+    logger.info(f"Calling generate_human_pdf for client: {client_name}")
+    main_pdf_created = generate_human_pdf(
+         output_path=output_path, # Use the path passed into the orchestrator
+         client_name=client_name,
+         sections_data=sections_list_for_human_pdf, # Pass the formatted list
+         occasion_style_key=occasion_mode,
+         **pdf_paths # assets, fonts and the common data dir
+    )
+    if main_pdf_created:
+        logger.info(f"       -> Main Human Report PDF generated successfully: {output_path}")
+    else:
+        logger.error("       -> Main Human Report PDF generation FAILED.")
+    return bool(main_pdf_created)
+
+
+def rebuild_pdf_from_checkpoint(checkpoint, client_name, occasion_mode, output_path, prompts_list=None):
+    """Lays out the human PDF again from checkpointed sections only (no chart calculation, no AI calls)."""
+    prompts_list = prompts_list if prompts_list is not None else HUMAN_PROMPTS
+    if not checkpoint.exists():
+        logger.critical(f"No checkpoint found for order '{checkpoint.order_id}' ({checkpoint.path}); nothing to rebuild.")
+        return False
+    section_ids = [p.get("section_id") for p in prompts_list if isinstance(p, dict) and p.get("section_id")]
+    pending = checkpoint.pending(section_ids)
+    if pending:
+        logger.warning(f"Rebuilding PDF with {len(pending)} missing or failed sections (run --resume to regenerate them): {pending}")
+    logger.info(f"Rebuilding PDF for order '{checkpoint.order_id}' from {len(section_ids) - len(pending)} checkpointed sections...")
+    main_pdf_created = _build_human_pdf(checkpoint.sections(section_ids), prompts_list, client_name, occasion_mode, output_path)
+    if main_pdf_created:
+        checkpoint.update_meta(status="pdf_built", output_path=output_path)
+    return main_pdf_created
+
+
+def _start_human_pdf_pipeline(prompts_list, client_name, occasion_mode, output_path):
+    """Prepares the human PDF and a SectionLayoutPipeline that lays out each section as soon as it is generated.
+
+    Returns (pipeline, layout), or (None, None) when the PDF cannot be prepared (the sequential path then reports why).
+    """
+    pdf_paths = _human_pdf_paths()
+    if prepare_human_pdf is None or not pdf_paths['data_jsons_dir']:
+        return None, None
+    prompt_defs = {p.get("section_id"): p for p in prompts_list if isinstance(p, dict) and p.get("section_id")}
+    section_order = list(prompt_defs)
+    layout = prepare_human_pdf(output_path=output_path, client_name=client_name, occasion_style_key=occasion_mode, **pdf_paths)
+
+    def layout_section(section_id, section_content):
+        pdf_section_data = _human_pdf_section_data(section_content, prompt_defs[section_id])
+        return build_section_flowables(layout, pdf_section_data, section_order.index(section_id), len(section_order))
+
+    return SectionLayoutPipeline(layout_section, section_order), layout
+
+
 # --- Main Workflow Function ---
 # ... (Full function definition from previous version, including call to corrected generate_human_pdf) ...
-def main(birth_info_for_calc, client_name, gender, occasion_mode="default", full_name=None, is_pet_report=False, pet_breed=None, pet_species=None, output_path=None):
-    """Orchestrates the entire report generation process."""
+def main(birth_info_for_calc, client_name, gender, occasion_mode="default", full_name=None, is_pet_report=False, pet_breed=None, pet_species=None, output_path=None, ai_concurrency=None, ai_priority=DEFAULT_PRIORITY, regenerate=False, stream_pdf=True, compact_prompts=True, checkpoint_id=None, resume=False, hedge_percentile=None):
+    """Orchestrates the entire report generation process.
+
+    Finished sections are checkpointed per order (checkpoint_id, derived from the order details when None);
+    resume=True regenerates only the sections that are missing, failed or whose prompt changed.
+    """
     global KerykeionClass, ChartMakerClass, client, __version__, OCCASION_STYLES_FROM_ORCHESTRATOR
     report_script_version = __version__
     logger.info(f"🚀 Starting Report Generation (V{report_script_version}) for: {client_name}...")
@@ -1489,17 +1700,35 @@ def main(birth_info_for_calc, client_name, gender, occasion_mode="default", full
         # Step 4: Generate AI Content
         logger.info("[Step 4/6] Generating report content via AI...")
         if not TEST_MODE and not client: raise RuntimeError("OpenAI client not available for live AI call.")
+        checkpoint = SectionCheckpoint(checkpoint_id or order_checkpoint_id(client_name, birth_info_for_calc, occasion_mode, is_pet_report, pet_species, pet_breed))
+        if resume and checkpoint.exists():
+            pending_sections = checkpoint.pending([p.get("section_id") for p in PROMPTS_TO_USE if isinstance(p, dict)])
+            logger.info(f"       -> Resuming order '{checkpoint.order_id}': {len(pending_sections)} of {len(PROMPTS_TO_USE)} sections missing or failed: {pending_sections}")
+            checkpoint.update_meta(status="generating", output_path=output_path, version=report_script_version)
+        else:
+            if resume: logger.warning(f"       -> No checkpoint for order '{checkpoint.order_id}'; generating every section.")
+            checkpoint.reset(client_name=client_name, occasion_mode=occasion_mode, is_pet_report=is_pet_report,
+                             output_path=output_path, version=report_script_version, status="generating")
+        logger.info(f"       -> Checkpointing sections to {checkpoint.path}")
+        pdf_pipeline, pdf_layout = (None, None)
+        if stream_pdf and not is_pet_report: # Human PDF sections are laid out while the remaining sections generate
+            pdf_pipeline, pdf_layout = _start_human_pdf_pipeline(PROMPTS_TO_USE, client_name, occasion_mode, output_path)
+            if pdf_pipeline: logger.info("       -> Streaming PDF pipeline started: sections are laid out as they land.")
         final_report_content = generate_report_content_via_ai( # Calls the corrected function
             chart_data=chart_data, client_name=client_name, gender=gender,
             client_instance=client, test_mode_flag=TEST_MODE, prompts_list=PROMPTS_TO_USE,
             occasion_mode=occasion_mode, is_pet_report=is_pet_report,
-            pet_breed=pet_breed, pet_species=pet_species
+            pet_breed=pet_breed, pet_species=pet_species,
+            max_concurrency=ai_concurrency, ai_priority=ai_priority, bypass_cache=regenerate,
+            on_section_ready=pdf_pipeline.submit if pdf_pipeline else None,
+            compact_prompts=compact_prompts, checkpoint=checkpoint, resume=resume, hedge_percentile=hedge_percentile
         )
         # ... (error checking for final_report_content)
         if not isinstance(final_report_content, dict) or "error" in final_report_content:
              logger.critical(f"Content generation failed: {final_report_content.get('error', 'Unknown')}")
              return
         sections_with_errors = {k: v for k, v in final_report_content.items() if v.get('error_flag')}
+        checkpoint.update_meta(status="sections_with_errors" if sections_with_errors else "sections_complete")
         if sections_with_errors:
             logger.warning(f"       -> AI content generation completed with errors in {len(sections_with_errors)} sections.")
             for skey in sections_with_errors.keys(): logger.warning(f"         - Section {skey} flagged with error.")
@@ -1516,55 +1745,22 @@ def main(birth_info_for_calc, client_name, gender, occasion_mode="default", full
         # Step 6: Generate PDF
         logger.info("[Step 6/6] Generating Main Report PDF...")
         # This 'main' function is assumed to be for HUMAN reports based on its filename/context
-        if not is_pet_report:
-            # --- Prepare context/data specifically for generate_human_pdf ---
-            # Convert final_report_content dict to list ordered by PROMPTS_TO_USE
-            sections_list_for_human_pdf = []
-            if isinstance(PROMPTS_TO_USE, list) and isinstance(final_report_content, dict):
-                for prompt_def in PROMPTS_TO_USE:
-                    section_id = prompt_def.get("section_id")
-                    if section_id and section_id in final_report_content:
-                        pdf_section_data = {
-                            'header': final_report_content[section_id].get('header', prompt_def.get('header', section_id)),
-                            'ai_content': final_report_content[section_id].get('ai_generated_content', ''),
-                            'quote': final_report_content[section_id].get('quote', prompt_def.get('quote'))
-                        }
-                        sections_list_for_human_pdf.append(pdf_section_data)
-                    elif section_id:
-                        logger.warning(f"Section {section_id} defined in PROMPTS but not found in final_report_content for PDF.")
-
-            # Define paths needed by generate_human_pdf
-            current_script_dir_for_paths = os.path.dirname(os.path.abspath(__file__)) # human_report/
-            assets_dir_for_human_pdf = os.path.join(current_script_dir_for_paths, 'assets') # Assumes human_report/assets
-            fonts_dir_for_human_pdf = os.path.join(current_script_dir_for_paths, 'fonts') # Assumes human_report/fonts
-            # Data JSON dir should be the common one
-            data_jsons_dir_for_human_pdf = COMMON_DATA_JSON_DIR # Imported from common.json_loader
-
-            if not data_jsons_dir_for_human_pdf:
-                 logger.error("COMMON_DATA_JSON_DIR is not set, cannot provide data path to human PDF generator.")
-                 return # Stop if common data path is missing
-
-            # Call the imported human PDF generator function
-            logger.info(f"Calling generate_human_pdf for client: {client_name}")
-            main_pdf_created = generate_human_pdf(
-                 output_path=output_path, # Use the path passed into this main orchestrator function
-                 client_name=client_name,
-                 sections_data=sections_list_for_human_pdf, # Pass the formatted list
-                 occasion_style_key=occasion_mode,
-                 assets_base_dir=assets_dir_for_human_pdf,
-                 fonts_base_dir=fonts_dir_for_human_pdf,
-                 data_jsons_dir=data_jsons_dir_for_human_pdf # Pass the common data dir path
-            )
-            if main_pdf_created:
-                overall_success = True
-                logger.info(f"       -> Main Human Report PDF generated successfully: {output_path}")
-            else:
-                overall_success = False
-                logger.error("       -> Main Human Report PDF generation FAILED.")
+        if not is_pet_report and pdf_pipeline:
+            # Sections were laid out as they landed; only the remaining layout and the document build are left
+            logger.info(f"Assembling streamed human PDF for client: {client_name}")
+            main_pdf_created = assemble_human_pdf(pdf_layout, pdf_pipeline.results())
+            overall_success = bool(main_pdf_created)
+            if main_pdf_created: logger.info(f"       -> Main Human Report PDF generated successfully: {output_path}")
+            else: logger.error("       -> Main Human Report PDF generation FAILED.")
+        elif not is_pet_report:
+            main_pdf_created = _build_human_pdf(final_report_content, PROMPTS_TO_USE, client_name, occasion_mode, output_path)
+            overall_success = bool(main_pdf_created)
         else:
              # If this orchestrator is accidentally called for a pet report, log it.
              logger.warning("This orchestrator (generate_advanced_astrology_report.py) is intended for HUMAN reports. Skipping PDF generation for pet report.")
              overall_success = True # Consider it "successful" in terms of this script's scope (it calculated data)
+        if main_pdf_created:
+            checkpoint.update_meta(status="pdf_built", output_path=output_path)
 
     # --- Error Handling ---
     except (FileNotFoundError, ImportError, AuthenticationError, OpenAIError, RuntimeError, ValueError, TypeError) as critical_err:
@@ -1658,6 +1854,19 @@ if __name__ == "__main__":
     parser.add_argument("--breed", type=str, default=None, help="Pet breed (e.g., Golden Retriever, Siamese). Optional if --pet is used.") # Added breed
     # Optional arguments
     parser.add_argument("--house_system", type=str, default="P", choices=["P", "K", "R", "C", "E", "V"], help="House system code (Default: P - Placidus)")
+    parser.add_argument("--time_unknown", action='store_true', help="Birth time unknown: noon positions (unless --hour/--minute given), Sun-based houses, no Ascendant/MC.")
+    parser.add_argument("--time_unknown_houses", type=str, default="solar", choices=["solar", "whole_sign"], help="Houses for --time_unknown: 'solar' (Sun degree on the 1st cusp) or 'whole_sign' (Sun's sign = 1st house)")
+    parser.add_argument("--ephemeris_tier", type=str, default=None, choices=["swiss", "moshier"], help="Ephemeris accuracy tier: 'swiss' (ephemeris files) or 'moshier' (built-in, no files; for previews). Default: EPHEMERIS_TIER env var or 'swiss'")
+    parser.add_argument("--ai_concurrency", type=int, default=None, help="Max AI sections generated in parallel (1 = sequential). Default: AI_MAX_CONCURRENCY env var or 6")
+    parser.add_argument("--priority", type=str, default=DEFAULT_PRIORITY, choices=list(PRIORITY_CLASSES), help="AI scheduling class; 'express' orders are served first when rate limits bite")
+    parser.add_argument("--regenerate", action='store_true', help="Ignore cached AI responses and regenerate every section")
+    parser.add_argument("--no_stream_pdf", action='store_true', help="Lay out the PDF only after every section is generated (disables the streaming pipeline)")
+    parser.add_argument("--no_compact_prompts", action='store_true', help="Send full interpretation context even when a prompt exceeds its token budget (the per-section token report is still logged)")
+    parser.add_argument("--hedge_percentile", type=float, default=None, help="Send a duplicate AI request when a section is slower than this latency percentile of past calls (e.g. 95). Default: AI_HEDGE_PERCENTILE env var or off")
+    parser.add_argument("--resume", action='store_true', help="Reuse this order's checkpointed sections; only missing, failed or changed sections are regenerated")
+    parser.add_argument("--rebuild_pdf", action='store_true', help="Lay out the PDF again from this order's checkpoint only (no chart calculation, no AI calls) and exit")
+    parser.add_argument("--order_id", type=str, default=None, help="Checkpoint id for this order. Default: derived from name, birth data, occasion and pet details")
+    parser.add_argument("--benchmark_context", action='store_true', help="Time prompt-context building (per section vs once per report) for this chart and exit")
     parser.add_argument("--log", type=str, default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], help="Set console logging level")
     # Added output_path argument
     parser.add_argument("--output_path", type=str, default=None, help="Specify the output path for the PDF. Overrides default naming/location.")
@@ -1668,7 +1877,7 @@ if __name__ == "__main__":
     # Check required arguments based on --pet flag
     if not args.pet:
         # If not a pet report, the standard birth chart arguments are required
-        required_human_args = ['year', 'month', 'day', 'hour', 'minute', 'lat', 'lng']
+        required_human_args = ['year', 'month', 'day', 'lat', 'lng'] if args.time_unknown else ['year', 'month', 'day', 'hour', 'minute', 'lat', 'lng']
         missing_human_args = [arg for arg in required_human_args if getattr(args, arg) is None]
         if missing_human_args:
             print(f"Error: The following arguments are required for human reports but were not provided: {', '.join(['--' + arg for arg in missing_human_args])}")
@@ -1703,6 +1912,11 @@ if __name__ == "__main__":
         'city': args.city, 'country': args.country, 'tz_str': args.tz_str,
         'house_system': args.house_system.encode('utf-8'),
     }
+    if args.ephemeris_tier:
+        birth_info_for_calc['ephemeris_tier'] = args.ephemeris_tier
+    if args.time_unknown:
+        birth_info_for_calc['time_unknown'] = True
+        birth_info_for_calc['time_unknown_houses'] = args.time_unknown_houses
 
     # Log a warning if --pet is used but --species is default or "Animal"
     if args.pet and args.species == "Animal":
@@ -1761,6 +1975,21 @@ if __name__ == "__main__":
         # final_occasion_mode is already set to the valid occasion_mode here from args.occasion
         logger.info(f"Using validated occasion mode: '{final_occasion_mode}'")
 
+    if args.benchmark_context:
+        benchmark_chart = calculate_chart(**birth_info_for_calc, gender=args.gender, full_name=args.full_name or args.name, ephemeris_path_used=ephe_path)
+        print(json.dumps(benchmark_prompt_context(benchmark_chart, args.name, args.gender, final_occasion_mode, args.pet), indent=2))
+        exit(0)
+
+    checkpoint_id = args.order_id or order_checkpoint_id(args.name, birth_info_for_calc, final_occasion_mode, args.pet, args.species, args.breed)
+    if args.rebuild_pdf:
+        if args.pet:
+            logger.critical("--rebuild_pdf only rebuilds human reports (pet PDFs are built by pet_report/run_pet_report.py).")
+            exit(1)
+        rebuild_checkpoint = SectionCheckpoint(checkpoint_id)
+        # Without --output_path the rebuilt PDF replaces the one the checkpointed run was writing
+        rebuild_output_path = args.output_path or rebuild_checkpoint.meta.get("output_path") or final_pdf_path_to_use
+        exit(0 if rebuild_pdf_from_checkpoint(rebuild_checkpoint, args.name, final_occasion_mode, rebuild_output_path) else 1)
+
     # Log Startup Info
     logger.info("-" * 60)
     # Corrected logger call to use args.name
@@ -1788,7 +2017,15 @@ if __name__ == "__main__":
             is_pet_report=args.pet, # Pass args.pet directly here
             pet_breed=args.breed, # Pass the explicit pet_breed argument
             pet_species=args.species, # Pass the explicit pet_species argument
-            output_path=final_pdf_path_to_use # Pass the determined final output path
+            output_path=final_pdf_path_to_use, # Pass the determined final output path
+            ai_concurrency=args.ai_concurrency,
+            ai_priority=args.priority,
+            regenerate=args.regenerate,
+            stream_pdf=not args.no_stream_pdf,
+            compact_prompts=not args.no_compact_prompts,
+            checkpoint_id=checkpoint_id,
+            resume=args.resume,
+            hedge_percentile=args.hedge_percentile
         )
     except Exception as main_err:
         logger.critical(f"Error during main workflow execution: {main_err}", exc_info=True)
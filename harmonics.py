@@ -0,0 +1,136 @@
+# harmonics.py
+# --- VERSION 1.0.0: Harmonic charts 1..N in one NumPy matrix with harmonic conjunction signatures ---
+# The Hth harmonic chart multiplies every longitude by H (mod 360), so a natal aspect of 360k/H degrees
+# becomes a conjunction. All harmonics are built as one (H, P) matrix and the pairwise separations as one
+# (H, P, P) array; pairs within the conjunction orb of ORB_SETTINGS (luminary/default via get_aspect_orb)
+# are harmonic conjunctions. A pair is only credited to the harmonics where its aspect is primary
+# (gcd(k, H) == 1): a natal opposition is conjunct in every even harmonic but only signifies the 2nd.
+# Signatures rank harmonics by the summed closeness of their primary conjunctions.
+
+import logging
+
+import numpy as np
+
+from advanced_calculate_astrology import get_aspect_orb
+from vectorized_astro import normalize_degrees, sign_names, signs_for_degrees
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - HARMONIC - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+HARMONIC_POINTS = (
+    'Sun', 'Moon', 'Mercury', 'Venus', 'Mars', 'Jupiter', 'Saturn', 'Uranus', 'Neptune', 'Pluto',
+    'Chiron', 'North Node', 'Ascendant', 'Midheaven',
+)
+DEFAULT_MAX_HARMONIC = 12
+HARMONIC_MEANINGS = {
+    1: "identity", 2: "polarity and effort", 3: "ease and enjoyment", 4: "challenge and manifestation",
+    5: "creativity and style", 6: "service and relationship patterns", 7: "inspiration and imagination",
+    8: "drive and accomplishment", 9: "joy, fulfilment and spiritual ideals", 10: "recognition of talents",
+    11: "visionary and unconventional gifts", 12: "sacrifice and transcendence",
+}
+
+
+def _point_degrees(positions, points=HARMONIC_POINTS):
+    """(names, degrees) for the points present in a chart's positions dict."""
+    names, degrees = [], []
+    for name in points:
+        data = positions.get(name)
+        if isinstance(data, dict) and data.get('degree') is not None and data.get('sign') != 'Error':
+            try:
+                degrees.append(float(data['degree']))
+                names.append(name)
+            except (TypeError, ValueError):
+                logger.debug(f"Skipping {name} for harmonics: invalid degree '{data.get('degree')}'.")
+    return names, np.array(degrees, dtype=float)
+
+
+def harmonic_matrix(degrees, max_harmonic=DEFAULT_MAX_HARMONIC):
+    """(max_harmonic, P) harmonic longitudes: row h-1 holds degrees * h mod 360."""
+    harmonics = np.arange(1, max_harmonic + 1, dtype=float)
+    return normalize_degrees(harmonics[:, None] * np.asarray(degrees, dtype=float)[None, :])
+
+
+def harmonic_chart(positions, harmonic):
+    """Harmonic positions {point: {'degree', 'sign', 'exact_degree'}} for one harmonic of a chart."""
+    names, degrees = _point_degrees(positions)
+    row = harmonic_matrix(degrees, harmonic)[-1]
+    sign_index, exact = signs_for_degrees(row)
+    return {name: {"degree": round(float(row[i]), 4), "sign": sign, "exact_degree": float(exact[i])}
+            for i, (name, sign) in enumerate(zip(names, sign_names(sign_index)))}
+
+
+def _conjunction_orbs(names):
+    """(P, P) conjunction orbs from ORB_SETTINGS (luminary orb when the Sun or Moon is involved)."""
+    return np.array([[get_aspect_orb(a, b, "Conjunction", "major") for b in names] for a in names], dtype=float)
+
+
+def find_harmonic_conjunctions(positions, max_harmonic=DEFAULT_MAX_HARMONIC, primary_only=True):
+    """Pairs conjunct within orb in each harmonic 1..max_harmonic.
+
+    Returns {harmonic: [{'point1', 'point2', 'orb', 'natal_angle', 'strength'}]} (tightest first); 'orb' is
+    in harmonic degrees, 'natal_angle' the underlying natal aspect (360k/H) and strength 1 - orb/limit.
+    """
+    names, degrees = _point_degrees(positions)
+    found = {h: [] for h in range(1, max_harmonic + 1)}
+    if len(names) < 2:
+        logger.warning("Harmonic conjunctions skipped: fewer than two points with valid degrees.")
+        return found
+
+    matrix = harmonic_matrix(degrees, max_harmonic)
+    separation = np.abs((matrix[:, :, None] - matrix[:, None, :] + 180.0) % 360.0 - 180.0) # (H, P, P)
+    orbs = _conjunction_orbs(names)
+    upper = np.triu(np.ones((len(names), len(names)), dtype=bool), k=1)
+    hits = (separation <= orbs[None, :, :]) & upper[None, :, :]
+
+    h_idx, i_idx, j_idx = np.nonzero(hits)
+    harmonics = h_idx + 1
+    natal_gap = (degrees[j_idx] - degrees[i_idx]) % 360.0
+    multiple = np.rint(natal_gap * harmonics / 360.0).astype(int) % harmonics # k in 360k/H
+    if primary_only:
+        primary = np.gcd(multiple, harmonics) == 1 # gcd(0, 1) == 1 keeps natal conjunctions in the 1st harmonic
+        h_idx, i_idx, j_idx, harmonics, multiple = (a[primary] for a in (h_idx, i_idx, j_idx, harmonics, multiple))
+
+    for h, i, j, k in zip(harmonics.tolist(), i_idx.tolist(), j_idx.tolist(), multiple.tolist()):
+        orb = float(separation[h - 1, i, j])
+        k = min(k, h - k) if h > 1 else 0 # Natal aspect measured the short way round
+        found[h].append({
+            "point1": names[i], "point2": names[j], "orb": round(orb, 2),
+            "natal_angle": round(360.0 * k / h, 2), "strength": round(1.0 - orb / orbs[i, j], 3),
+        })
+    for conjunctions in found.values():
+        conjunctions.sort(key=lambda c: c["orb"])
+    return found
+
+
+def strongest_harmonic_signatures(positions, max_harmonic=DEFAULT_MAX_HARMONIC, top=5):
+    """Harmonics ranked by the summed strength of their primary conjunctions.
+
+    Returns [{'harmonic', 'score', 'points', 'conjunctions', 'meaning'}], strongest first (harmonics with none omitted).
+    """
+    conjunctions = find_harmonic_conjunctions(positions, max_harmonic)
+    signatures = []
+    for h, pairs in conjunctions.items():
+        if not pairs:
+            continue
+        points = sorted({p["point1"] for p in pairs} | {p["point2"] for p in pairs})
+        signatures.append({
+            "harmonic": h, "score": round(sum(p["strength"] for p in pairs), 3), "points": points,
+            "conjunctions": pairs, "meaning": HARMONIC_MEANINGS.get(h, "Unknown"),
+        })
+    signatures.sort(key=lambda s: s["score"], reverse=True)
+    logger.info(f"Harmonic signatures 1-{max_harmonic}: {len(signatures)} harmonics with primary conjunctions.")
+    return signatures[:top]
+
+
+def format_harmonics_for_prompt(signatures):
+    """One line per signature: 'H5 (creativity and style), score 2.41: Sun-Venus 1.2, Mars-Moon 3.0'."""
+    lines = []
+    for signature in signatures:
+        pairs = ", ".join(f"{c['point1']}-{c['point2']} {c['orb']}" for c in signature["conjunctions"][:4])
+        lines.append(f"H{signature['harmonic']} ({signature['meaning']}), score {signature['score']}: {pairs}")
+    return "\n".join(lines) if lines else "None"
@@ -0,0 +1,147 @@
+# heliacal.py
+# --- VERSION 1.0.0: Heliacal rising / setting dates for fixed stars with a per-year latitude-band table ---
+# swe.heliacal_ut models atmosphere and eyesight but costs a visibility search per call. Star phases only
+# need the day, so the catalog stars (star_coordinates.py) are solved with the classical arcus visionis rule:
+# a star is seen rising (setting) when the Sun is at least arcus_visionis(magnitude) degrees below the horizon
+# at the moment the star crosses the horizon. For one year every star x latitude band x day is evaluated in
+# one NumPy pass and cached; heliacal rising is the first morning of visibility, heliacal setting the last
+# evening. Table dates are for the band centre and good to a day or two. Stars outside the catalog or
+# latitudes outside HELIACAL_LATITUDE_BANDS fall back to swe.heliacal_ut (needs sefstars.txt), cached per
+# star, year and band.
+
+import logging
+from datetime import date, timedelta
+
+import numpy as np
+import swisseph as swe
+
+from ephemeris_tier import get_ephemeris_flag
+from star_coordinates import FIXED_STAR_J2000, STAR_MAGNITUDES, STAR_NAMES, star_equatorial_of_date
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - HELIACAL - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+HELIACAL_BAND_WIDTH = 5.0
+HELIACAL_LATITUDE_BANDS = np.arange(-60.0, 60.0 + HELIACAL_BAND_WIDTH, HELIACAL_BAND_WIDTH) # Band centres
+# Live fallback (swe.heliacal_ut): standard atmosphere and a 36-year-old observer with normal eyes
+HELIACAL_ATMOSPHERE = (1013.25, 15.0, 40.0, 0.0)
+HELIACAL_OBSERVER = (36.0, 1.0, 0.0, 0.0, 0.0, 0.0)
+
+_heliacal_tables = {} # year -> {'rising': (S, B) day index, 'setting': (S, B) day index, 'status': (S, B)}
+_live_cache = {}      # (star, year, band) -> result dict
+
+
+def arcus_visionis(magnitude):
+    """Sun depression (degrees) needed to see a star of this magnitude on the horizon (~8 for Sirius, ~11 for 1st mag)."""
+    return np.clip(10.0 + 1.4 * np.asarray(magnitude, dtype=float), 7.5, 16.0)
+
+
+def latitude_band(lat):
+    """Centre of the HELIACAL_BAND_WIDTH band containing lat."""
+    return float(round(lat / HELIACAL_BAND_WIDTH) * HELIACAL_BAND_WIDTH)
+
+
+def compute_heliacal_table(year):
+    """Heliacal rising/setting day indices (0 = Jan 1, -1 = none) for every catalog star and latitude band.
+
+    Returns {'year', 'stars', 'bands', 'rising', 'setting', 'status'}; status is 'ok', 'circumpolar' or 'never_rises'.
+    """
+    first_day = date(year, 1, 1)
+    n_days = (date(year + 1, 1, 1) - first_day).days
+    # Day -1 (Dec 31 of the previous year) lets an event on Jan 1 show up as a transition
+    jds = swe.julday(year, 1, 1, 0.0) + np.arange(-1, n_days)
+    sun = np.array([swe.calc_ut(float(jd), swe.SUN, swe.FLG_EQUATORIAL | get_ephemeris_flag())[0][:2] for jd in jds])
+    sun_ra, sun_dec = np.radians(sun[:, 0]), np.radians(sun[:, 1])
+
+    _, star_ra, star_dec = star_equatorial_of_date(swe.julday(year, 7, 2, 0.0))
+    phi = np.radians(HELIACAL_LATITUDE_BANDS)
+    cos_h0 = -np.tan(phi)[None, :] * np.tan(np.radians(star_dec))[:, None] # (S, B)
+    status = np.where(cos_h0 <= -1.0, "circumpolar", np.where(cos_h0 >= 1.0, "never_rises", "ok"))
+    h0 = np.arccos(np.clip(cos_h0, -1.0, 1.0))
+    depression = np.radians(arcus_visionis(STAR_MAGNITUDES))[:, None, None]
+
+    def sun_hour_angle_and_altitude(star_lst):
+        hour_angle = (star_lst[..., None] - sun_ra + np.pi) % (2 * np.pi) - np.pi # (S, B, D)
+        sin_alt = (np.sin(phi)[None, :, None] * np.sin(sun_dec)
+                   + np.cos(phi)[None, :, None] * np.cos(sun_dec) * np.cos(hour_angle))
+        return hour_angle, np.arcsin(np.clip(sin_alt, -1.0, 1.0))
+
+    star_ra_rad = np.radians(star_ra)[:, None]
+    ha_rise, alt_rise = sun_hour_angle_and_altitude(star_ra_rad - h0)
+    ha_set, alt_set = sun_hour_angle_and_altitude(star_ra_rad + h0)
+    morning = (alt_rise <= -depression) & (ha_rise < 0) # Star on the eastern horizon before dawn
+    evening = (alt_set <= -depression) & (ha_set > 0)   # Star on the western horizon after dusk
+
+    first_morning = ~morning[..., :-1] & morning[..., 1:]
+    last_evening = evening[..., :-1] & ~evening[..., 1:]
+    rising = np.where(first_morning.any(axis=-1), first_morning.argmax(axis=-1), -1)
+    setting = np.where(last_evening.any(axis=-1), last_evening.argmax(axis=-1) - 1, -1) # Day before the first miss
+    valid = status == "ok"
+    return {
+        "year": year, "stars": STAR_NAMES, "bands": HELIACAL_LATITUDE_BANDS,
+        "rising": np.where(valid, rising, -1), "setting": np.where(valid, setting, -1), "status": status,
+    }
+
+
+def get_heliacal_table(year):
+    """Cached compute_heliacal_table(year)."""
+    if year not in _heliacal_tables:
+        _heliacal_tables[year] = compute_heliacal_table(year)
+        logger.info(f"Heliacal table {year}: {len(STAR_NAMES)} stars x {len(HELIACAL_LATITUDE_BANDS)} latitude bands.")
+    return _heliacal_tables[year]
+
+
+def _day_to_iso(year, day_index):
+    return (date(year, 1, 1) + timedelta(days=int(day_index))).isoformat() if day_index >= 0 else None
+
+
+def _live_heliacal(star, year, band, lng):
+    """swe.heliacal_ut for one star/year/band; both events searched from Jan 1."""
+    result = {"rising": None, "setting": None, "status": "ok"}
+    jd_start = swe.julday(year, 1, 1, 0.0)
+    events = {"rising": swe.HELIACAL_RISING, "setting": swe.HELIACAL_SETTING}
+    for key, event_type in events.items():
+        try:
+            event = swe.heliacal_ut(jd_start, (lng, band, 0.0), HELIACAL_ATMOSPHERE, HELIACAL_OBSERVER, star, event_type,
+                                    get_ephemeris_flag() | swe.HELFLAG_HIGH_PRECISION)
+            y, m, d, _ = swe.revjul(event[0], swe.GREG_CAL)
+            result[key] = date(y, m, d).isoformat() if y == year else None
+        except Exception as e:
+            logger.warning(f"Live heliacal {key} for '{star}' ({year}, lat {band}) unavailable: {e}")
+            result["status"] = "unavailable"
+    return result
+
+
+def heliacal_dates(star, year, lat, lng=0.0):
+    """Heliacal rising and setting dates ('YYYY-MM-DD' or None) of a star for a year and latitude.
+
+    Returns {'star', 'year', 'latitude_band', 'rising', 'setting', 'status', 'source'}; source is 'table'
+    for catalog stars inside HELIACAL_LATITUDE_BANDS and 'live' otherwise.
+    """
+    band = latitude_band(lat)
+    base = {"star": star, "year": year, "latitude_band": band}
+    if star in FIXED_STAR_J2000 and HELIACAL_LATITUDE_BANDS[0] <= band <= HELIACAL_LATITUDE_BANDS[-1]:
+        table = get_heliacal_table(year)
+        s, b = STAR_NAMES.index(star), int(np.argmin(np.abs(HELIACAL_LATITUDE_BANDS - band)))
+        return {**base, "rising": _day_to_iso(year, table["rising"][s, b]), "setting": _day_to_iso(year, table["setting"][s, b]),
+                "status": str(table["status"][s, b]), "source": "table"}
+    key = (star, year, band)
+    if key not in _live_cache:
+        _live_cache[key] = _live_heliacal(star, year, band, lng)
+    return {**base, **_live_cache[key], "source": "live"}
+
+
+def add_heliacal_dates(fixed_star_links, year, lat, lng=0.0):
+    """Add 'heliacal_rising' / 'heliacal_setting' to each fixed_star_links entry (in place) and return the list."""
+    for link in fixed_star_links:
+        star = link.get("star")
+        if not star:
+            continue
+        phases = heliacal_dates(star, year, lat, lng)
+        link["heliacal_rising"], link["heliacal_setting"] = phases["rising"], phases["setting"]
+    return fixed_star_links
@@ -0,0 +1,155 @@
+# house_grid.py
+# --- VERSION 1.0.0: Vectorized Ascendant/MC/house cusps for many locations at one instant ---
+# --- VERSION 1.1.0: compute_houses_from_armc for many instants at one place (birth-time scans) ---
+# swe.houses is one C call per location; scanning thousands of grid points or cities from Python makes the
+# per-call overhead the bottleneck. Here every location is a row of NumPy arrays, computed from the same
+# ARMC/obliquity formulas Swiss Ephemeris uses. Supported: Placidus (iterative), Porphyry, Equal, Whole Sign.
+
+import logging
+
+import numpy as np
+import swisseph as swe
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - HOUSEGRID - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+SUPPORTED_GRID_HOUSE_SYSTEMS = (b'P', b'O', b'E', b'W') # Placidus, Porphyry, Equal, Whole Sign
+PLACIDUS_MAX_ITERATIONS = 50
+PLACIDUS_TOLERANCE = 1e-10 # degrees
+
+
+def _obliquity_and_sidereal_time(jd_ut):
+    """True obliquity (deg) and apparent Greenwich sidereal time (deg) for a Julian day (UT)."""
+    true_obliquity = swe.calc_ut(jd_ut, swe.ECL_NUT)[0][0]
+    return true_obliquity, swe.sidtime(jd_ut) * 15.0
+
+
+def _ecliptic_longitude_from_ra(ra_rad, eps_rad):
+    """Longitude of the ecliptic point with the given right ascension."""
+    return np.degrees(np.arctan2(np.sin(ra_rad), np.cos(ra_rad) * np.cos(eps_rad))) % 360.0
+
+
+def _ascendant(armc_rad, lat_rad, eps_rad):
+    return np.degrees(np.arctan2(
+        np.cos(armc_rad),
+        -(np.sin(armc_rad) * np.cos(eps_rad) + np.tan(lat_rad) * np.sin(eps_rad))
+    )) % 360.0
+
+
+def _porphyry_cusps(asc, mc):
+    """Trisect each quadrant between the angles."""
+    cusps = np.empty(asc.shape + (12,))
+    upper_arc = (asc - mc) % 360.0 # MC -> Asc
+    lower_arc = (mc + 180.0 - asc) % 360.0 # Asc -> IC
+    cusps[:, 0] = asc
+    cusps[:, 1] = asc + lower_arc / 3.0
+    cusps[:, 2] = asc + 2.0 * lower_arc / 3.0
+    cusps[:, 9] = mc
+    cusps[:, 10] = mc + upper_arc / 3.0
+    cusps[:, 11] = mc + 2.0 * upper_arc / 3.0
+    cusps[:, 3:9] = cusps[:, [9, 10, 11, 0, 1, 2]] + 180.0 # Houses 4-9 oppose 10-12 and 1-3
+    return cusps % 360.0
+
+
+# Placidus intermediate cusps as (fraction of semi-arc, below horizon) for houses 11, 12, 2, 3
+PLACIDUS_CUSP_FRACTIONS = np.array([1.0 / 3.0, 2.0 / 3.0, 2.0 / 3.0, 1.0 / 3.0])
+PLACIDUS_CUSP_BELOW_HORIZON = np.array([False, False, True, True])
+
+
+def _placidus_cusps(armc_rad, lat_rad, eps_rad, initial_guess):
+    """Iterate the four Placidus intermediate cusps (11, 12, 2, 3) for every location at once.
+
+    Above the horizon a cusp's hour angle from the MC is fraction * diurnal semi-arc (11th: 1/3, 12th: 2/3);
+    below it the hour angle is 180 - fraction * nocturnal semi-arc (2nd: 2/3, 3rd: 1/3). The semi-arc depends on
+    the cusp's own declination, so each cusp is iterated to a fixed point starting from initial_guess (the
+    Porphyry cusps, shape (N, 4)). Only cusps that have not converged yet are recomputed on later iterations.
+    """
+    n_locations = armc_rad.shape[0]
+    armc_all = np.repeat(armc_rad, 4)
+    tan_lat_all = np.repeat(np.tan(lat_rad), 4)
+    fractions = np.tile(PLACIDUS_CUSP_FRACTIONS, n_locations)
+    below = np.tile(PLACIDUS_CUSP_BELOW_HORIZON, n_locations)
+    sin_eps = np.sin(eps_rad)
+
+    longitude = np.asarray(initial_guess, dtype=float).ravel().copy()
+    declination = np.arcsin(sin_eps * np.sin(np.radians(longitude)))
+    active = np.arange(n_locations * 4)
+    for _ in range(PLACIDUS_MAX_ITERATIONS):
+        diurnal_semi_arc = np.arccos(np.clip(-tan_lat_all[active] * np.tan(declination[active]), -1.0, 1.0))
+        hour_angle = np.where(below[active],
+                              np.pi - fractions[active] * (np.pi - diurnal_semi_arc),
+                              fractions[active] * diurnal_semi_arc)
+        new_longitude = _ecliptic_longitude_from_ra(armc_all[active] + hour_angle, eps_rad)
+        delta = np.abs((new_longitude - longitude[active] + 180.0) % 360.0 - 180.0)
+        longitude[active] = new_longitude
+        declination[active] = np.arcsin(sin_eps * np.sin(np.radians(new_longitude)))
+        active = active[delta >= PLACIDUS_TOLERANCE]
+        if active.size == 0:
+            break
+    return longitude.reshape(n_locations, 4)
+
+
+def compute_houses_from_armc(armc, latitudes, obliquity, house_system=b'P'):
+    """Ascendant, MC and 12 cusps from ARMC values (degrees) and latitudes, one row per pair.
+
+    Lets callers vary the instant instead of the place (ARMC = sidereal time + longitude), e.g. scanning a
+    birth-time window at one location. obliquity is the true obliquity in degrees.
+    Returns {'ascendant', 'mc', 'armc', 'cusps'} as compute_house_grid does. Raises ValueError for unsupported systems.
+    """
+    if isinstance(house_system, str):
+        house_system = house_system.encode('utf-8')
+    if house_system not in SUPPORTED_GRID_HOUSE_SYSTEMS:
+        raise ValueError(f"House system {house_system!r} not supported by grid computation; use swe.houses.")
+
+    armc, lats = np.broadcast_arrays(np.atleast_1d(np.asarray(armc, dtype=float)) % 360.0,
+                                     np.atleast_1d(np.asarray(latitudes, dtype=float)))
+    armc, lats = armc.ravel(), lats.ravel()
+    eps_rad = np.radians(obliquity)
+    armc_rad = np.radians(armc)
+    lat_rad = np.radians(lats)
+
+    mc = _ecliptic_longitude_from_ra(armc_rad, eps_rad)
+    asc = _ascendant(armc_rad, lat_rad, eps_rad)
+    # Inside the polar circles Swiss Ephemeris keeps the Ascendant east of the MC (flips it by 180 otherwise)
+    polar = np.abs(lats) >= 90.0 - obliquity
+    flip = polar & (((asc - mc + 180.0) % 360.0 - 180.0) < 0)
+    asc = np.where(flip, (asc + 180.0) % 360.0, asc)
+
+    if house_system == b'E':
+        cusps = (asc[:, None] + 30.0 * np.arange(12)) % 360.0
+    elif house_system == b'W':
+        cusps = (np.floor(asc / 30.0)[:, None] * 30.0 + 30.0 * np.arange(12)) % 360.0
+    else:
+        cusps = _porphyry_cusps(asc, mc)
+        if house_system == b'P':
+            non_polar = ~polar
+            if not np.all(non_polar):
+                logger.warning(f"Placidus undefined for {np.count_nonzero(~non_polar)} polar locations; using Porphyry there.")
+            if np.any(non_polar):
+                rows = cusps[non_polar]
+                placidus = _placidus_cusps(armc_rad[non_polar], lat_rad[non_polar], eps_rad, rows[:, [10, 11, 1, 2]])
+                rows[:, [10, 11, 1, 2]] = placidus
+                rows[:, [4, 5, 7, 8]] = (placidus + 180.0) % 360.0
+                cusps[non_polar] = rows
+
+    return {"ascendant": asc, "mc": mc, "armc": armc, "cusps": cusps}
+
+
+def compute_house_grid(jd_ut, latitudes, longitudes, house_system=b'P'):
+    """Ascendant, MC, ARMC and 12 cusps for every (latitude, longitude) pair at one Julian day (UT).
+
+    latitudes/longitudes: array-likes of equal length (degrees, east longitude positive).
+    Returns {'ascendant': (N,), 'mc': (N,), 'armc': (N,), 'cusps': (N, 12)}; cusps[:, 0] is house 1.
+    Placidus is undefined inside the polar circles (swe.houses raises there); those rows fall back to Porphyry.
+    Raises ValueError for unsupported house systems.
+    """
+    lats = np.atleast_1d(np.asarray(latitudes, dtype=float))
+    lngs = np.atleast_1d(np.asarray(longitudes, dtype=float))
+    lats, lngs = np.broadcast_arrays(lats, lngs)
+    obliquity, gst_deg = _obliquity_and_sidereal_time(jd_ut)
+    return compute_houses_from_armc(gst_deg + lngs.ravel(), lats.ravel(), obliquity, house_system)
@@ -1,11 +1,15 @@
 # human_report.py
 # Standalone PDF generator for Human Astrology Reports
+# Layout is split into prepare_human_pdf / build_section_flowables / assemble_human_pdf so sections can be
+# laid out as they arrive from the AI (report_pipeline.SectionLayoutPipeline); generate_human_pdf runs all three.
 
 import os
 import json
+import traceback
 from reportlab.lib.pagesizes import LETTER
 from reportlab.lib.styles import StyleSheet1, ParagraphStyle
 from reportlab.lib.units import inch
+from reportlab.lib import colors
 from reportlab.lib.colors import HexColor, black, white # Basic colors
 from reportlab.platypus import SimpleDocTemplate, Image, Paragraph, Spacer, PageBreak, Flowable
 from reportlab.pdfbase import pdfmetrics
@@ -67,13 +71,13 @@ def apply_markdown_to_reportlab(text_line):
     line = line.replace('\n', '<br/>') # Convert newlines to <br/>
     return line
 
-def generate_human_pdf(output_path, client_name, sections_data, occasion_style_key, 
-                       assets_base_dir, fonts_base_dir, data_jsons_dir):
+def prepare_human_pdf(output_path, client_name, occasion_style_key,
+                      assets_base_dir, fonts_base_dir, data_jsons_dir):
     """
-    Generates a standalone human astrology PDF.
-    sections_data: List of dicts, e.g., [{'header': 'Title', 'ai_content': 'Body text...', 'quote': 'Optional'}]
+    Sets up the document, fonts, occasion style and cover page for a human PDF.
+    Returns the layout dict used by build_section_flowables and assemble_human_pdf.
     """
-    print(f"HUMAN_REPORT: Generating PDF for {client_name} at {output_path}")
+    print(f"HUMAN_REPORT: Preparing PDF for {client_name} at {output_path}")
     print(f"HUMAN_REPORT: Using style key '{occasion_style_key}'")
 
     doc = SimpleDocTemplate(output_path, pagesize=LETTER,
@@ -129,40 +133,60 @@ def generate_human_pdf(output_path, client_name, sections_data, occasion_style_k
     story.append(Paragraph(f"Prepared for {client_name}", styles['CoverSubTitle']))
     story.append(PageBreak())
 
-    # Content Pages
-    for i, section in enumerate(sections_data): # sections_data is a list of dicts
-        header_text = section.get('header', f"Section {i+1}")
-        ai_content = section.get('ai_content', "No content for this section.")
-        quote_text = section.get('quote') # From prompt_definitions via orchestrator
-
-        if header_text:
-            story.append(Paragraph(apply_markdown_to_reportlab(header_text), styles['H1']))
-        
-        if quote_text: # Add quote if available for the section
-            story.append(Paragraph(apply_markdown_to_reportlab(f"<i>“{quote_text}”</i>"), styles['Quote']))
-
-        # Add a general divider before the main body, unless it's the first content section after cover.
-        # Or always add it if that's the style. For simplicity, adding after header/quote.
-        if i > 0 or quote_text : # Add space or divider
-             story.append(Spacer(1, 0.1*inch)) # Add a bit of space if there was a quote
-
-        if os.path.exists(divider_image_abs_path):
-            try: story.append(Image(divider_image_abs_path, width=doc.width - 1*inch, height=0.25*inch, kind='proportional', hAlign='CENTER')) # Centered, width adjusted
-            except Exception as e: print(f"ERROR adding divider image {divider_image_abs_path}: {e}")
-            story.append(Spacer(1, 0.2*inch))
-        else: print(f"WARNING: Divider image not found: {divider_image_abs_path}")
-        
-        if ai_content:
-            # Simple split by double newline for paragraphs
-            for para_text in ai_content.split('\n\n'):
-                if para_text.strip():
-                    story.append(Paragraph(apply_markdown_to_reportlab(para_text.strip()), styles['Body']))
-        
-        if i < len(sections_data) - 1: # Don't add page break after the very last section
-            story.append(PageBreak())
+    return {'doc': doc, 'styles': styles, 'cover_story': story, 'divider_image_abs_path': divider_image_abs_path,
+            'output_path': output_path}
+
+def build_section_flowables(layout, section, index, total_sections):
+    """
+    Flowables for one content section (header, quote, divider, body, page break).
+    section: {'header': 'Title', 'ai_content': 'Body text...', 'quote': 'Optional'}; index is its position
+    among total_sections. Depends only on this section, so sections can be laid out in any order.
+    """
+    styles = layout['styles']
+    doc = layout['doc']
+    divider_image_abs_path = layout['divider_image_abs_path']
+    story = []
+
+    header_text = section.get('header', f"Section {index+1}")
+    ai_content = section.get('ai_content', "No content for this section.")
+    quote_text = section.get('quote') # From prompt_definitions via orchestrator
+
+    if header_text:
+        story.append(Paragraph(apply_markdown_to_reportlab(header_text), styles['H1']))
+    
+    if quote_text: # Add quote if available for the section
+        story.append(Paragraph(apply_markdown_to_reportlab(f"<i>“{quote_text}”</i>"), styles['Quote']))
+
+    # Add a general divider before the main body, unless it's the first content section after cover.
+    # Or always add it if that's the style. For simplicity, adding after header/quote.
+    if index > 0 or quote_text : # Add space or divider
+         story.append(Spacer(1, 0.1*inch)) # Add a bit of space if there was a quote
 
+    if os.path.exists(divider_image_abs_path):
+        try: story.append(Image(divider_image_abs_path, width=doc.width - 1*inch, height=0.25*inch, kind='proportional', hAlign='CENTER')) # Centered, width adjusted
+        except Exception as e: print(f"ERROR adding divider image {divider_image_abs_path}: {e}")
+        story.append(Spacer(1, 0.2*inch))
+    else: print(f"WARNING: Divider image not found: {divider_image_abs_path}")
+    
+    if ai_content:
+        # Simple split by double newline for paragraphs
+        for para_text in ai_content.split('\n\n'):
+            if para_text.strip():
+                story.append(Paragraph(apply_markdown_to_reportlab(para_text.strip()), styles['Body']))
+    
+    if index < total_sections - 1: # Don't add page break after the very last section
+        story.append(PageBreak())
+    return story
+
+def assemble_human_pdf(layout, section_flowables):
+    """Builds the PDF from the cover and the per-section flowable lists (already in report order)."""
+    story = list(layout['cover_story'])
+    for flowables in section_flowables:
+        story.extend(flowables)
+
+    output_path = layout['output_path']
     try:
-        doc.build(story)
+        layout['doc'].build(story)
         print(f"HUMAN_REPORT: Successfully generated {output_path}")
         return True
     except Exception as e:
@@ -170,6 +194,19 @@ def generate_human_pdf(output_path, client_name, sections_data, occasion_style_k
         traceback.print_exc()
         return False
 
+def generate_human_pdf(output_path, client_name, sections_data, occasion_style_key, 
+                       assets_base_dir, fonts_base_dir, data_jsons_dir):
+    """
+    Generates a standalone human astrology PDF.
+    sections_data: List of dicts, e.g., [{'header': 'Title', 'ai_content': 'Body text...', 'quote': 'Optional'}]
+    """
+    print(f"HUMAN_REPORT: Generating PDF for {client_name} at {output_path}")
+    layout = prepare_human_pdf(output_path, client_name, occasion_style_key,
+                               assets_base_dir, fonts_base_dir, data_jsons_dir)
+    section_flowables = [build_section_flowables(layout, section, i, len(sections_data)) # sections_data is a list of dicts
+                         for i, section in enumerate(sections_data)]
+    return assemble_human_pdf(layout, section_flowables)
+
 if __name__ == '__main__':
     # Simple test for human_report.py
     print("Running test for human_report.py...")
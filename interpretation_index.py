@@ -0,0 +1,200 @@
+# interpretation_index.py
+# --- VERSION 1.0.0: Flattened, pre-normalized index over every "Data jsons" interpretation file ---
+# safe_get_interp() used to normalize the group and key, map the group to a file, try a flat lookup and then
+# split the key on underscores to guess nested paths, on every call. The index does that work once at load
+# time: every file is flattened into {(group, key): text} with file keys normalized the same way as lookups
+# (lower case, spaces/hyphens -> underscores) and every nested path joined with underscores, so a lookup is
+# one dict hit. Precedence follows the old lookup order: flat keys first, then nested paths by depth, and
+# between equal depths the old pattern order ("house_1/corethemes" before "dominant/fire").
+# Empty values and the unavailable placeholder are not indexed, so a deeper usable path can fill the key.
+# At build time the keys the report context asks for (expected_interpretation_keys) are checked and the
+# missing or placeholder-only ones are logged once, instead of surfacing as "[Interpretation data unavailable]"
+# in individual prompts.
+
+import json
+import logging
+import os
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - INTERP_IDX - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+try:
+    script_dir = os.path.dirname(os.path.realpath(__file__))
+except NameError:
+    script_dir = os.getcwd()
+
+DEFAULT_DATA_DIR = os.path.join(script_dir, "Data jsons")
+DEFAULT_INTERP = "[Interpretation data unavailable]"
+PLACEHOLDER_TEXTS = {"[AUTO-PLACEHOLDER]"}
+GROUP_ALIASES = {"major": "aspects", "minor": "aspects", "declination": "aspects"} # Lookup group -> file group
+EXCLUDED_FILES = {"world_cities"} # Geocoding data, not interpretations
+TOP_KEY_PRECEDENCE = {2: 0, 1: 1} # Underscore parts of a top-level key -> rank among equal-depth paths
+REPORT_EXAMPLES = 8 # Unresolved keys shown per group in the build-time warning
+
+SIGNS = ('aries', 'taurus', 'gemini', 'cancer', 'leo', 'virgo', 'libra', 'scorpio', 'sagittarius', 'capricorn', 'aquarius', 'pisces')
+INTERPRETED_PLANETS = ('sun', 'moon', 'mercury', 'venus', 'mars', 'jupiter', 'saturn', 'uranus', 'neptune', 'pluto', 'chiron')
+DIGNITY_PLANETS = ('sun', 'moon', 'mercury', 'venus', 'mars', 'jupiter', 'saturn')
+DIGNITY_TYPES = ('rulership', 'exaltation', 'detriment', 'fall')
+INTERPRETED_ASTEROIDS = ('ceres', 'pallas', 'juno', 'vesta')
+MAJOR_ASPECT_NAMES = ('conjunction', 'opposition', 'square', 'trine', 'sextile')
+NUMEROLOGY_NUMBERS = tuple(range(1, 10)) + (11, 22, 33)
+ELEMENTS = ('fire', 'earth', 'air', 'water')
+MODALITIES = ('cardinal', 'fixed', 'mutable')
+MOON_PHASE_NAMES = ('new_moon', 'waxing_crescent', 'first_quarter', 'waxing_gibbous', 'full_moon',
+                    'waning_gibbous', 'last_quarter', 'waning_crescent')
+
+
+@lru_cache(maxsize=8192)
+def normalize_key(text):
+    """Lookup form of a group or key: lower case, spaces and hyphens as underscores."""
+    return str(text).lower().replace(' ', '_').replace('-', '_')
+
+
+def _usable(value):
+    return value is not None and value != "" and value != DEFAULT_INTERP
+
+
+def _flatten(data, path=()):
+    """Yields (normalized path tuple, value) for every node below data, parents before children."""
+    for key, value in data.items():
+        node_path = path + (normalize_key(key),)
+        yield node_path, value
+        if isinstance(value, dict):
+            yield from _flatten(value, node_path)
+
+
+class InterpretationIndex:
+    """{(group, key): interpretation} with normalized keys and nested paths pre-expanded."""
+
+    def __init__(self, entries, placeholders=frozenset(), files=()):
+        self._entries = entries
+        self._placeholders = placeholders
+        self.files = tuple(files)
+        self.unresolved = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, group_key):
+        group, key = group_key
+        return self.get(group, key, default=None) is not None
+
+    def get(self, group, key, default=DEFAULT_INTERP):
+        """Interpretation for (group, key) in any spelling the old lookup accepted, else default."""
+        if not key or not isinstance(key, str) or not group or not isinstance(group, str):
+            return default
+        group_norm = normalize_key(group)
+        return self._entries.get((GROUP_ALIASES.get(group_norm, group_norm), normalize_key(key)), default)
+
+    def is_placeholder(self, group, key):
+        group_norm = normalize_key(group)
+        return (GROUP_ALIASES.get(group_norm, group_norm), normalize_key(key)) in self._placeholders
+
+    def find_unresolved(self, keys):
+        """{'missing': {group: [keys]}, 'placeholder': {group: [keys]}} for the (group, key) pairs not backed by real text."""
+        report = {"missing": {}, "placeholder": {}}
+        for group, key in keys:
+            if self.get(group, key, default=None) is None:
+                report["missing"].setdefault(group, []).append(key)
+            elif self.is_placeholder(group, key):
+                report["placeholder"].setdefault(group, []).append(key)
+        return report
+
+
+def expected_interpretation_keys():
+    """(group, key) pairs the report context looks up for any chart, in the key formats of _build_chart_context."""
+    keys = []
+    for planet in INTERPRETED_PLANETS:
+        keys += [("planets", f"{planet}_sign_{sign}") for sign in SIGNS]
+        keys += [("planets", f"{planet}_house_{house}") for house in range(1, 13)]
+        keys.append(("planets", f"{planet}_coretheme"))
+    keys += [("dignity", f"{planet}_{dignity}") for planet in DIGNITY_PLANETS for dignity in DIGNITY_TYPES]
+    for asteroid in INTERPRETED_ASTEROIDS:
+        keys += [("asteroids", f"{asteroid}_sign_{sign}") for sign in SIGNS]
+        keys += [("asteroids", f"{asteroid}_house_{house}") for house in range(1, 13)]
+        keys.append(("asteroids", f"{asteroid}_coretheme"))
+    for house in range(1, 13):
+        keys += [("house", f"house_{house}_sign_{sign}") for sign in SIGNS]
+        keys.append(("house", f"house_{house}_corethemes"))
+    for node in ("northnode", "southnode"):
+        keys += [("nodes", f"{node}_sign_{sign}") for sign in SIGNS]
+        keys += [("nodes", f"{node}_house_{house}") for house in range(1, 13)]
+    for prefix in ("lifepath", "soulurge", "expression"):
+        keys += [("numerology", f"{prefix}_{number}") for number in NUMEROLOGY_NUMBERS]
+    keys += [("numerology", f"personalyear_{number}") for number in range(1, 10)]
+    keys += [("element", f"{rank}_{element}") for rank in ("dominant", "weakest") for element in ELEMENTS]
+    keys += [("modality", f"{rank}_{modality}") for rank in ("dominant", "weakest") for modality in MODALITIES]
+    keys += [("dominant", f"{element}_{modality}") for element in ELEMENTS for modality in MODALITIES]
+    keys += [("unaspected", f"unaspected_{planet}") for planet in INTERPRETED_PLANETS]
+    for i, first in enumerate(sorted(INTERPRETED_PLANETS[:10])):
+        for second in sorted(INTERPRETED_PLANETS[:10])[i + 1:]:
+            keys += [("major", f"{first}_{second}_{aspect}") for aspect in MAJOR_ASPECT_NAMES]
+    keys += [("moon_phases", f"moonphase_{phase}") for phase in MOON_PHASE_NAMES]
+    return keys
+
+
+def _log_unresolved(report, total):
+    for kind, by_group in report.items():
+        count = sum(len(keys) for keys in by_group.values())
+        if not count:
+            continue
+        summary = "; ".join(f"{group} {len(keys)} (e.g. {', '.join(keys[:REPORT_EXAMPLES])})" for group, keys in by_group.items())
+        logger.warning(f"Interpretation index: {count} of {total} expected keys {kind}: {summary}")
+        for group, keys in by_group.items():
+            logger.debug(f"{kind.capitalize()} keys in '{group}': {keys}")
+
+
+def build_interpretation_index(data_dir=None, expected_keys=None):
+    """Loads every JSON file in data_dir into one InterpretationIndex and logs the expected keys it cannot resolve.
+
+    expected_keys defaults to expected_interpretation_keys(); the report is kept on index.unresolved.
+    """
+    data_dir = data_dir or DEFAULT_DATA_DIR
+    ranked = []
+    files = []
+    try:
+        filenames = sorted(name for name in os.listdir(data_dir) if name.endswith(".json"))
+    except OSError as e:
+        logger.error(f"Cannot list interpretation directory '{data_dir}': {e}")
+        filenames = []
+
+    for filename in filenames:
+        group = normalize_key(filename[:-len(".json")])
+        if group in EXCLUDED_FILES:
+            continue
+        try:
+            with open(os.path.join(data_dir, filename), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"Skipping interpretation file '{filename}': {e}")
+            continue
+        if not isinstance(data, dict):
+            logger.debug(f"Skipping '{filename}': top level is {type(data).__name__}, not an object.")
+            continue
+        files.append(filename)
+        for path, value in _flatten(data):
+            if _usable(value):
+                # Old lookup order: flat key, then nested by depth; at equal depth a two-part top-level key
+                # ("house_1/corethemes") before a one-part one ("dominant/fire") before any other
+                rank = (len(path), TOP_KEY_PRECEDENCE.get(len(path[0].split('_')), len(TOP_KEY_PRECEDENCE)))
+                ranked.append((rank, (group, "_".join(path)), value))
+
+    entries, placeholders = {}, set()
+    for _, group_key, value in sorted(ranked, key=lambda item: item[0]):
+        if group_key not in entries:
+            entries[group_key] = value
+            if isinstance(value, str) and value in PLACEHOLDER_TEXTS:
+                placeholders.add(group_key)
+
+    index = InterpretationIndex(entries, frozenset(placeholders), files)
+    keys = expected_interpretation_keys() if expected_keys is None else list(expected_keys)
+    index.unresolved = index.find_unresolved(keys)
+    logger.info(f"Interpretation index: {len(entries)} keys from {len(files)} files in '{data_dir}'.")
+    _log_unresolved(index.unresolved, len(keys))
+    return index
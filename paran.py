@@ -0,0 +1,115 @@
+# paran.py
+# --- VERSION 1.0.0: Parans (star and planet angular at the same moment) for a chart's date and latitude ---
+# A body crosses the four angles when local sidereal time (LST) equals RA - H0 (rising), RA (culminating),
+# RA + H0 (setting) and RA + 180 (anti-culminating), with cos H0 = -tan(lat) tan(dec). Every planet and
+# catalog star (star_coordinates.py) is turned into these four LSTs in one NumPy pass; the star events are
+# sorted once and each planet event finds its partners inside the orb with two searchsorted calls, so the
+# work is O((P + S) log S) instead of solving rise/set times pair by pair. Parans are a whole-day
+# phenomenon (Brady): birth time only moves the planets, mostly the Moon, by a few degrees.
+
+import logging
+
+import numpy as np
+
+from advanced_calculate_astrology import get_chart_jd_ut
+from astrocartography_engine import ACG_PLANETS, calculate_planet_equatorial
+from star_coordinates import star_equatorial_of_date
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - PARAN - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+PARAN_EVENTS = ("rising", "culminating", "setting", "anti-culminating")
+PARAN_EVENT_VERBS = {"rising": "rises", "culminating": "culminates", "setting": "sets", "anti-culminating": "anti-culminates"}
+PARAN_ORB_MINUTES = 4.0 # Sidereal minutes of time (1 degree of LST)
+DEGREES_PER_SIDEREAL_MINUTE = 0.25
+
+
+def angular_event_lst(ra, dec, lat):
+    """(N, 4) LST in degrees of each body's rising, culminating, setting, anti-culminating (NaN: never rises/sets)."""
+    ra, dec = np.asarray(ra, dtype=float), np.asarray(dec, dtype=float)
+    cos_h0 = -np.tan(np.radians(lat)) * np.tan(np.radians(dec))
+    h0 = np.degrees(np.arccos(np.where(np.abs(cos_h0) < 1.0, cos_h0, np.nan)))
+    return np.column_stack((ra - h0, ra, ra + h0, ra + 180.0)) % 360.0
+
+
+def compute_paran_events(jd_ut, lat, planets=None, stars=None):
+    """Angular crossing LSTs for planets and catalog stars at one latitude.
+
+    Returns {'planets': names, 'planet_lst': (P, 4), 'stars': names, 'star_lst': (S, 4)}; columns follow PARAN_EVENTS.
+    """
+    planet_names, planet_ra, planet_dec = calculate_planet_equatorial(jd_ut, planets or ACG_PLANETS)
+    star_names, star_ra, star_dec = star_equatorial_of_date(jd_ut, stars)
+    return {
+        "planets": list(planet_names), "planet_lst": angular_event_lst(planet_ra, planet_dec, lat),
+        "stars": list(star_names), "star_lst": angular_event_lst(star_ra, star_dec, lat),
+    }
+
+
+def _format_lst(lst_deg):
+    minutes = int(round(lst_deg / DEGREES_PER_SIDEREAL_MINUTE)) % 1440
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def find_parans(jd_ut, lat, orb_minutes=PARAN_ORB_MINUTES, planets=None, stars=None):
+    """All star/planet pairs angular within orb_minutes of sidereal time of each other at latitude lat.
+
+    Returns [{'star', 'star_event', 'planet', 'planet_event', 'orb_minutes', 'lst'}] sorted by orb ('lst' is the
+    planet event's local sidereal time, 'HH:MM').
+    """
+    events = compute_paran_events(jd_ut, lat, planets, stars)
+    orb_deg = orb_minutes * DEGREES_PER_SIDEREAL_MINUTE
+
+    star_lst = events["star_lst"].ravel()
+    star_ids = np.flatnonzero(np.isfinite(star_lst))
+    order = star_ids[np.argsort(star_lst[star_ids])]
+    sorted_lst = star_lst[order]
+    # Copies shifted by a full turn so windows crossing 0h find their partners
+    wrapped_lst = np.concatenate((sorted_lst - 360.0, sorted_lst, sorted_lst + 360.0))
+    wrapped_ids = np.tile(order, 3)
+
+    planet_lst = events["planet_lst"].ravel()
+    planet_ids = np.flatnonzero(np.isfinite(planet_lst))
+    lo = np.searchsorted(wrapped_lst, planet_lst[planet_ids] - orb_deg, side="left")
+    hi = np.searchsorted(wrapped_lst, planet_lst[planet_ids] + orb_deg, side="right")
+    counts = hi - lo
+    pair_planet = np.repeat(planet_ids, counts)
+    pair_slot = np.repeat(lo - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+    pair_star = wrapped_ids[pair_slot]
+    pair_orb = np.abs(wrapped_lst[pair_slot] - planet_lst[pair_planet]) / DEGREES_PER_SIDEREAL_MINUTE
+
+    n_events = len(PARAN_EVENTS)
+    # A star anti-culminating with a planet on the meridian repeats the culminating pair 12 sidereal hours earlier
+    meridian = (pair_planet % n_events) % 2 == 1
+    keep = ~(meridian & (pair_star % n_events == PARAN_EVENTS.index("anti-culminating")))
+    pair_star, pair_planet, pair_orb = pair_star[keep], pair_planet[keep], pair_orb[keep]
+    parans = [{
+        "star": events["stars"][s // n_events], "star_event": PARAN_EVENTS[s % n_events],
+        "planet": events["planets"][p // n_events], "planet_event": PARAN_EVENTS[p % n_events],
+        "orb_minutes": round(float(orb), 2), "lst": _format_lst(planet_lst[p]),
+    } for s, p, orb in zip(pair_star.tolist(), pair_planet.tolist(), pair_orb)]
+    parans.sort(key=lambda paran: paran["orb_minutes"])
+    logger.info(f"Parans at latitude {lat:.2f}: {len(parans)} within {orb_minutes} min "
+                f"({len(planet_ids)} planet and {len(star_ids)} star events).")
+    return parans
+
+
+def calculate_chart_parans(chart, orb_minutes=PARAN_ORB_MINUTES, stars=None):
+    """find_parans for a calculated chart (its Julian day and birth latitude); [] if either is missing."""
+    jd_ut = get_chart_jd_ut(chart)
+    lat = chart.get('birth_details', {}).get('latitude')
+    if jd_ut is None or lat is None:
+        logger.error("Cannot calculate parans: chart has no Julian day or birth latitude.")
+        return []
+    return find_parans(jd_ut, float(lat), orb_minutes=orb_minutes, stars=stars)
+
+
+def format_parans_for_prompt(parans, max_parans=8):
+    """One line per paran, tightest first: 'Sirius rising as Venus culminates (1.2 min)'."""
+    lines = [f"{p['star']} {p['star_event']} as {p['planet']} {PARAN_EVENT_VERBS[p['planet_event']]} ({p['orb_minutes']} min)"
+             for p in parans[:max_parans]]
+    return "\n".join(lines) if lines else "None"
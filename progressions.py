@@ -0,0 +1,268 @@
+# progressions.py
+# --- VERSION 1.0.0: Secondary progressions (a day for a year) from a cached daily ephemeris per chart ---
+# The progressed chart for age N years is the sky N days after birth. Instead of one calculate_chart per
+# target date, each natal Julian day gets a daily table (position + speed, PROGRESSION_TABLE_DAYS days, one
+# swe call per body per day) that is cached and cubic-Hermite interpolated to any progressed instant, so a
+# whole timeline sampled monthly is a few NumPy operations. Progressed angles use the solar arc: the Sun's
+# progressed motion is added to the natal ARMC and the MC/Ascendant come from house_grid at the birth latitude.
+# Progressed points are placed in the natal houses and aspected to the natal points.
+
+import logging
+from datetime import date, datetime
+from functools import lru_cache
+
+import numpy as np
+import swisseph as swe
+
+from advanced_calculate_astrology import ASPECT_DEFINITIONS, get_chart_jd_ut
+from ephemeris_tier import get_ephemeris_flag
+from house_grid import compute_houses_from_armc
+from vectorized_astro import build_house_index, houses_for_degrees, normalize_degrees, sign_names, signs_for_degrees
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - PROGRESS - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+PROGRESSED_BODIES = {
+    'Sun': swe.SUN, 'Moon': swe.MOON, 'Mercury': swe.MERCURY, 'Venus': swe.VENUS, 'Mars': swe.MARS,
+    'Jupiter': swe.JUPITER, 'Saturn': swe.SATURN, 'Uranus': swe.URANUS, 'Neptune': swe.NEPTUNE, 'Pluto': swe.PLUTO,
+    'North Node': swe.MEAN_NODE,
+}
+PROGRESSED_ANGLES = ('Ascendant', 'Midheaven')
+NATAL_POINTS = tuple(PROGRESSED_BODIES) + PROGRESSED_ANGLES
+PROGRESSION_ASPECTS = {name: d["angle"] for name, d in ASPECT_DEFINITIONS.items() if d["type"] == "major"}
+PROGRESSION_ORB = 1.0          # Degrees; progressed aspects are read within a degree (about a year for the Sun)
+PROGRESSION_TABLE_DAYS = 120   # Daily table length = oldest supported age in years
+PROGRESSION_SAMPLES_PER_YEAR = 12
+TROPICAL_YEAR_DAYS = 365.242199
+
+
+@lru_cache(maxsize=64)
+def _daily_ephemeris(natal_jd, days, flags):
+    """(longitudes, speeds), each (days + 1, B), for PROGRESSED_BODIES at natal_jd + 0..days (NaN if unavailable)."""
+    jds = natal_jd + np.arange(days + 1)
+    longitudes = np.full((jds.size, len(PROGRESSED_BODIES)), np.nan)
+    speeds = np.full_like(longitudes, np.nan)
+    for b, (name, body_id) in enumerate(PROGRESSED_BODIES.items()):
+        try:
+            rows = np.array([swe.calc_ut(float(jd), body_id, flags)[0] for jd in jds])
+        except Exception as e:
+            logger.warning(f"Cannot build progressed ephemeris for {name}: {e}")
+            continue
+        # Unwrapped across 0 Aries so neighbouring days can be interpolated directly
+        steps = (np.diff(rows[:, 0]) + 180.0) % 360.0 - 180.0
+        longitudes[:, b] = rows[0, 0] + np.concatenate(([0.0], np.cumsum(steps)))
+        speeds[:, b] = rows[:, 3]
+    longitudes.setflags(write=False)
+    speeds.setflags(write=False)
+    logger.info(f"Progressed daily ephemeris built for JD {natal_jd:.5f}: {days + 1} days x {len(PROGRESSED_BODIES)} bodies.")
+    return longitudes, speeds
+
+
+def daily_ephemeris(natal_jd, days=PROGRESSION_TABLE_DAYS):
+    """Cached daily table for a natal Julian day (keyed on the active ephemeris tier too)."""
+    return _daily_ephemeris(float(natal_jd), int(days), swe.FLG_SPEED | get_ephemeris_flag())
+
+
+def progressed_longitudes(natal_jd, ages):
+    """(N, B) unwrapped progressed longitudes of PROGRESSED_BODIES for ages in years (cubic Hermite between days).
+
+    Raises ValueError for ages outside 0..PROGRESSION_TABLE_DAYS.
+    """
+    offsets = np.atleast_1d(np.asarray(ages, dtype=float)) # Days after birth: one day per year of age
+    if np.any(offsets < 0) or np.any(offsets > PROGRESSION_TABLE_DAYS):
+        raise ValueError(f"Progressions supported for ages 0-{PROGRESSION_TABLE_DAYS} years, got {offsets.min():.2f}-{offsets.max():.2f}.")
+    longitudes, speeds = daily_ephemeris(natal_jd)
+    day = np.minimum(np.floor(offsets).astype(int), PROGRESSION_TABLE_DAYS - 1)
+    t = (offsets - day)[:, None]
+    h00, h10 = 2 * t**3 - 3 * t**2 + 1, t**3 - 2 * t**2 + t
+    h01, h11 = -2 * t**3 + 3 * t**2, t**3 - t**2
+    return h00 * longitudes[day] + h10 * speeds[day] + h01 * longitudes[day + 1] + h11 * speeds[day + 1]
+
+
+def _to_jd(target_date):
+    if isinstance(target_date, str):
+        target_date = date.fromisoformat(target_date)
+    if isinstance(target_date, datetime):
+        return swe.julday(target_date.year, target_date.month, target_date.day,
+                          target_date.hour + target_date.minute / 60.0, swe.GREG_CAL)
+    return swe.julday(target_date.year, target_date.month, target_date.day, 12.0, swe.GREG_CAL)
+
+
+def _jd_to_iso(jd):
+    y, m, d, _ = swe.revjul(float(jd), swe.GREG_CAL)
+    return date(y, m, d).isoformat()
+
+
+def _natal_context(chart):
+    """Natal Julian day, natal longitudes (NaN where missing), house index and ARMC (None when time is unknown)."""
+    natal_jd = get_chart_jd_ut(chart)
+    if natal_jd is None:
+        return None
+    positions = chart.get('positions', {})
+    natal = np.array([positions.get(name, {}).get('degree', np.nan) if isinstance(positions.get(name), dict) else np.nan
+                      for name in NATAL_POINTS], dtype=float)
+    house_info = chart.get('house_info', {})
+    time_unknown = chart.get('birth_details', {}).get('time_unknown', False)
+    ascmc = house_info.get('ascmc_raw') or []
+    armc = None if time_unknown or len(ascmc) < 3 else float(ascmc[2])
+    return {
+        "jd": float(natal_jd), "natal": natal, "house_index": build_house_index(house_info.get('cusps') or []),
+        "armc": armc, "latitude": chart.get('birth_details', {}).get('latitude'),
+    }
+
+
+def _progressed_points(context, ages):
+    """(N, len(NATAL_POINTS)) progressed longitudes in [0, 360); angles NaN when the birth time is unknown."""
+    ages = np.atleast_1d(np.asarray(ages, dtype=float))
+    bodies = progressed_longitudes(context["jd"], ages)
+    angles = np.full((ages.size, len(PROGRESSED_ANGLES)), np.nan)
+    if context["armc"] is not None and context["latitude"] is not None:
+        sun = list(PROGRESSED_BODIES).index('Sun')
+        solar_arc = bodies[:, sun] - progressed_longitudes(context["jd"], 0.0)[0, sun]
+        progressed_jds = context["jd"] + ages
+        obliquity = swe.calc_ut(float(progressed_jds.mean()), swe.ECL_NUT)[0][0]
+        grid = compute_houses_from_armc(context["armc"] + solar_arc, float(context["latitude"]), obliquity, b'E')
+        angles = np.column_stack((grid["ascendant"], grid["mc"]))
+    return normalize_degrees(np.column_stack((bodies, angles)))
+
+
+def _aspects_to_natal(progressed, natal, orb):
+    """Major aspects between one row of progressed points and the natal points, tightest first."""
+    separation = np.abs((progressed[:, None] - natal[None, :] + 180.0) % 360.0 - 180.0)
+    aspects = []
+    for aspect_name, angle in PROGRESSION_ASPECTS.items():
+        for i, j in zip(*np.nonzero(np.abs(separation - angle) <= orb)):
+            if i == j and angle == 0.0:
+                continue # Slow planets barely leave their natal place
+            aspects.append({"progressed": NATAL_POINTS[i], "aspect": aspect_name, "natal": NATAL_POINTS[j],
+                            "orb": round(float(abs(separation[i, j] - angle)), 2)})
+    aspects.sort(key=lambda aspect: aspect["orb"])
+    return aspects
+
+
+def progressed_chart(chart, target_date, orb=PROGRESSION_ORB):
+    """Secondary-progressed positions for target_date (date, datetime or 'YYYY-MM-DD').
+
+    Returns {'target_date', 'age_years', 'progressed_jd', 'positions', 'aspects_to_natal'}, positions holding
+    {'degree', 'sign', 'exact_degree', 'house'} per point (natal houses), or {'error': ...}.
+    """
+    context = _natal_context(chart)
+    if context is None:
+        return {"error": "Cannot progress chart: no Julian day."}
+    age = (_to_jd(target_date) - context["jd"]) / TROPICAL_YEAR_DAYS
+    try:
+        points = _progressed_points(context, age)[0]
+    except ValueError as e:
+        logger.error(f"Progressed chart failed: {e}")
+        return {"error": str(e)}
+    sign_index, exact = signs_for_degrees(points)
+    houses = houses_for_degrees(points, context["house_index"])
+    positions = {
+        name: {"degree": round(float(points[i]), 4), "sign": sign, "exact_degree": float(exact[i]), "house": int(houses[i])}
+        for i, (name, sign) in enumerate(zip(NATAL_POINTS, sign_names(sign_index))) if np.isfinite(points[i])
+    }
+    return {
+        "target_date": _jd_to_iso(_to_jd(target_date)), "age_years": round(float(age), 3),
+        "progressed_jd": context["jd"] + age, "positions": positions,
+        "aspects_to_natal": _aspects_to_natal(points, context["natal"], orb),
+    }
+
+
+def _crossing_dates(jds, values, threshold_mask):
+    """Linear-interpolated JDs where values (N, K) cross zero between samples, restricted to threshold_mask."""
+    v0, v1 = values[:-1], values[1:]
+    crossing = (np.sign(v0) != np.sign(v1)) & threshold_mask & np.isfinite(v0) & np.isfinite(v1)
+    rows, cols = np.nonzero(crossing)
+    fraction = v0[rows, cols] / (v0[rows, cols] - v1[rows, cols])
+    return rows, cols, jds[rows] + fraction * (jds[rows + 1] - jds[rows])
+
+
+def progressed_timeline(chart, start_year, end_year, samples_per_year=PROGRESSION_SAMPLES_PER_YEAR):
+    """Year-by-year progressed snapshots and dated events between Jan 1 start_year and Jan 1 end_year + 1.
+
+    Returns {'years': [{'year', 'age_years', 'positions': {point: 'Sign dd.dd'}}], 'events': [...]} with events
+    {'date', 'type': 'sign_change'|'house_change'|'aspect', 'point', ...} sorted by date, or {'error': ...}.
+    """
+    context = _natal_context(chart)
+    if context is None:
+        return {"error": "Cannot progress chart: no Julian day."}
+    start_jd, end_jd = swe.julday(start_year, 1, 1, 0.0), swe.julday(end_year + 1, 1, 1, 0.0)
+    n_samples = (end_year + 1 - start_year) * samples_per_year + 1
+    jds = np.linspace(start_jd, end_jd, n_samples)
+    ages = (jds - context["jd"]) / TROPICAL_YEAR_DAYS
+    try:
+        points = _progressed_points(context, np.clip(ages, 0.0, None))
+    except ValueError as e:
+        logger.error(f"Progressed timeline failed: {e}")
+        return {"error": str(e)}
+    points[ages < 0] = np.nan # Before birth
+
+    events = []
+    sign_index, _ = signs_for_degrees(points)
+    changed = (sign_index[1:] != sign_index[:-1]) & (sign_index[:-1] >= 0) & (sign_index[1:] >= 0)
+    for row, col in zip(*np.nonzero(changed)):
+        # Boundary crossed: start of the new sign when moving direct, start of the old one when retrograde
+        before, after = sign_index[row, col], sign_index[row + 1, col]
+        boundary = 30.0 * (after if (after - before) % 12 == 1 else before)
+        d0 = (points[row, col] - boundary + 180.0) % 360.0 - 180.0
+        d1 = (points[row + 1, col] - boundary + 180.0) % 360.0 - 180.0
+        jd = jds[row] + (d0 / (d0 - d1) if d0 != d1 else 0.0) * (jds[row + 1] - jds[row])
+        events.append({"jd": jd, "type": "sign_change", "point": NATAL_POINTS[col],
+                       "from": sign_names([sign_index[row, col]])[0], "to": sign_names([sign_index[row + 1, col]])[0]})
+
+    if context["house_index"] is not None:
+        houses = houses_for_degrees(points, context["house_index"])
+        for row, col in zip(*np.nonzero((houses[1:] != houses[:-1]) & (houses[:-1] > 0) & (houses[1:] > 0))):
+            events.append({"jd": jds[row + 1], "type": "house_change", "point": NATAL_POINTS[col],
+                           "from": int(houses[row, col]), "to": int(houses[row + 1, col])})
+
+    # Exact aspects: the signed distance from the aspect angle changes sign between samples
+    natal = context["natal"]
+    signed = (points[:, :, None] - natal[None, None, :] + 180.0) % 360.0 - 180.0 # (N, P, natal)
+    flat = signed.reshape(n_samples, -1)
+    for aspect_name, angle in PROGRESSION_ASPECTS.items():
+        for direction in ((1.0,) if angle in (0.0, 180.0) else (1.0, -1.0)):
+            offset = (flat - direction * angle + 180.0) % 360.0 - 180.0
+            near = (np.abs(offset[:-1]) < 5.0) & (np.abs(offset[1:]) < 5.0)
+            _, cols, crossing_jds = _crossing_dates(jds, offset, near)
+            for col, jd in zip(cols, crossing_jds):
+                p, n = divmod(int(col), len(NATAL_POINTS))
+                if p == n and angle == 0.0:
+                    continue # A point conjunct its own natal place only at birth
+                events.append({"jd": jd, "type": "aspect", "point": NATAL_POINTS[p], "aspect": aspect_name,
+                               "natal": NATAL_POINTS[n]})
+
+    events.sort(key=lambda event: event["jd"])
+    for event in events:
+        event["date"] = _jd_to_iso(event.pop("jd"))
+
+    yearly = []
+    for k in range(0, n_samples - 1, samples_per_year):
+        if ages[k] < 0:
+            continue
+        sign_row = sign_names(sign_index[k])
+        yearly.append({
+            "year": start_year + k // samples_per_year, "age_years": round(float(ages[k]), 2),
+            "positions": {name: f"{sign_row[i]} {points[k, i] % 30.0:.2f}"
+                          for i, name in enumerate(NATAL_POINTS) if np.isfinite(points[k, i])},
+        })
+    logger.info(f"Progressed timeline {start_year}-{end_year}: {len(yearly)} years, {len(events)} events.")
+    return {"years": yearly, "events": events}
+
+
+def format_progressions_for_prompt(timeline, max_events=12):
+    """One line per timeline event: '2031-04-02: Progressed Moon enters Leo'."""
+    lines = []
+    for event in timeline.get("events", [])[:max_events]:
+        if event["type"] == "sign_change":
+            lines.append(f"{event['date']}: Progressed {event['point']} enters {event['to']}")
+        elif event["type"] == "house_change":
+            lines.append(f"{event['date']}: Progressed {event['point']} moves into house {event['to']}")
+        else:
+            lines.append(f"{event['date']}: Progressed {event['point']} {event['aspect']} natal {event['natal']}")
+    return "\n".join(lines) if lines else "None"
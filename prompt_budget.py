@@ -0,0 +1,193 @@
+# prompt_budget.py
+# --- VERSION 1.0.0: Per-section prompt token budgets and context compaction ---
+# Sections inline interpretation blobs (aspect/midpoint/pattern lists, per-planet sign/house/dignity texts) into
+# their prompts; a 250-word section could carry a 3,500+ token prompt. fit_prompt_to_budget() formats a section
+# template and, when the prompt exceeds the section's budget (section_token_budget(word_count)), compacts the
+# interpretation values behind its placeholders, least important tier first (KEY_PRIORITIES), until it fits:
+#   1. dedupe   - text repeated across keys (or list entries) is kept once, later copies become DEDUPE_MARKER
+#   2. truncate - interpretation texts are cut to their first sentence(s) (TRUNCATE_CHARS)
+#   3. drop     - JSON lists keep their MAX_LIST_ITEMS tightest-orb entries, texts are cut to DROP_CHARS
+# Chart facts (names, signs, degrees, houses) are never touched. Each call returns a report with the prompt
+# tokens before and after; format_budget_report() renders them as a per-section table.
+
+import json
+import logging
+import re
+import string
+from collections import ChainMap
+
+from ai_scheduler import estimate_tokens
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - PROMPT_BUDGET - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+PROMPT_TOKENS_PER_OUTPUT_WORD = 4 # Prompt budget per requested output word
+MIN_PROMPT_TOKENS = 1000 # Floor so short sections keep their template and core chart facts
+DEFAULT_WORD_COUNT = 400
+DEDUPE_MIN_CHARS = 60 # Shorter strings are labels/facts, not interpretation text
+DEDUPE_MARKER = "(as above)"
+TRUNCATE_CHARS = 160
+DROP_CHARS = 80
+MAX_LIST_ITEMS = 3
+STRATEGIES = ("dedupe", "truncate", "drop")
+
+# Compaction order: lowest priority first. Keys matching no pattern are never compacted.
+KEY_PRIORITIES = (
+    (0, re.compile(r"^(midpoint|arabic_part|aspect_pattern|minor_aspect|declination_aspect|unaspected|all_aspect)\w*_json$")),
+    (1, re.compile(r"\w*(dignity|fixed_star|house)\w*_(interp|interps)(_json)?$")),
+    (2, re.compile(r"\w*_(interp|interps)(_json)?$")),
+)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_prompt_tokens(text):
+    """Approximate prompt tokens of a text (same estimator the AI scheduler uses, without completion tokens)."""
+    return estimate_tokens(text, output_tokens=0)
+
+
+def section_token_budget(word_count=None, override=None):
+    """Prompt token budget for a section asking for word_count words (an explicit override wins)."""
+    if override:
+        return int(override)
+    try:
+        words = int(word_count or DEFAULT_WORD_COUNT)
+    except (TypeError, ValueError):
+        words = DEFAULT_WORD_COUNT
+    return max(MIN_PROMPT_TOKENS, words * PROMPT_TOKENS_PER_OUTPUT_WORD)
+
+
+def key_priority(key):
+    """Compaction priority of a context key (0 = compacted first), or None if it must stay verbatim."""
+    for priority, pattern in KEY_PRIORITIES:
+        if pattern.match(key):
+            return priority
+    return None
+
+
+def template_keys(template):
+    """Context keys referenced by a format template, in order of first use."""
+    keys = []
+    for _, field, _, _ in string.Formatter().parse(template):
+        if field:
+            root = re.split(r"[.\[]", field, maxsplit=1)[0]
+            if root and root not in keys:
+                keys.append(root)
+    return keys
+
+
+def shorten_text(text, max_chars):
+    """Whole leading sentences up to max_chars; a single long sentence is cut at a word boundary."""
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+    kept = ""
+    for sentence in _SENTENCE_END.split(text):
+        if len(kept) + len(sentence) + 1 > max_chars:
+            break
+        kept = f"{kept} {sentence}".strip()
+    if kept:
+        return kept
+    return text[:max_chars].rsplit(" ", 1)[0].rstrip(",;:") + "…"
+
+
+def _orb(item):
+    try:
+        return abs(float(item.get("orb")))
+    except (AttributeError, TypeError, ValueError):
+        return float("inf")
+
+
+def _compact(value, strategy, seen):
+    """Applies one strategy to a parsed JSON value (or plain string) recursively."""
+    if isinstance(value, str):
+        if strategy == "dedupe":
+            if len(value) < DEDUPE_MIN_CHARS:
+                return value
+            fingerprint = " ".join(value.split()).lower()
+            if fingerprint in seen:
+                return DEDUPE_MARKER
+            seen.add(fingerprint)
+            return value
+        return shorten_text(value, TRUNCATE_CHARS if strategy == "truncate" else DROP_CHARS)
+    if isinstance(value, dict):
+        return {k: _compact(v, strategy, seen) for k, v in value.items()}
+    if isinstance(value, list):
+        if strategy == "drop" and len(value) > MAX_LIST_ITEMS:
+            value = sorted(value, key=_orb)[:MAX_LIST_ITEMS] # Stable: unsorted lists keep their leading entries
+        return [_compact(v, strategy, seen) for v in value]
+    return value
+
+
+def compact_value(text, strategy, seen=None):
+    """One compaction strategy applied to a context value (JSON text is compacted structurally)."""
+    seen = set() if seen is None else seen
+    try:
+        parsed = json.loads(text)
+    except (TypeError, ValueError):
+        return _compact(text, strategy, seen)
+    if not isinstance(parsed, (dict, list)):
+        return _compact(text, strategy, seen)
+    compacted = _compact(parsed, strategy, seen)
+    return text if compacted == parsed else json.dumps(compacted, ensure_ascii=False)
+
+
+def fit_prompt_to_budget(template, context, budget_tokens, section=None, compact=True):
+    """Formats template with context, compacting interpretation values until the prompt fits budget_tokens.
+
+    Returns (prompt, report); report holds section, budget, before, after, actions and within_budget.
+    KeyError from formatting propagates exactly as str.format would raise it.
+    """
+    prompt = template.format(**context)
+    before = estimate_prompt_tokens(prompt)
+    report = {"section": section, "budget": budget_tokens, "before": before, "after": before, "actions": []}
+    if compact and before > budget_tokens:
+        candidates = [k for k in template_keys(template)
+                      if key_priority(k) is not None and isinstance(context.get(k), str) and context.get(k)]
+        overlay = {}
+        view = ChainMap(overlay, context)
+
+        seen = set() # Dedupe walks keys in template order so the first occurrence is the one kept
+        for key in candidates:
+            deduped = compact_value(view[key], "dedupe", seen)
+            if deduped != view[key]:
+                overlay[key] = deduped
+                report["actions"].append(f"dedupe:{key}")
+        prompt = template.format(**view)
+
+        # Each priority tier is fully compacted (largest values first) before a more important tier is touched
+        for priority in sorted({key_priority(k) for k in candidates}):
+            tier = sorted((k for k in candidates if key_priority(k) == priority), key=lambda k: -len(view[k]))
+            for strategy in STRATEGIES[1:]:
+                for key in tier:
+                    if estimate_prompt_tokens(prompt) <= budget_tokens:
+                        break
+                    compacted = compact_value(view[key], strategy)
+                    if compacted != view[key]:
+                        overlay[key] = compacted
+                        report["actions"].append(f"{strategy}:{key}")
+                        prompt = template.format(**view)
+        report["after"] = estimate_prompt_tokens(prompt)
+    report["within_budget"] = report["after"] <= budget_tokens
+    if compact and not report["within_budget"]:
+        logger.warning(f"Section '{section}' prompt still {report['after']} tokens after compaction (budget {budget_tokens}).")
+    return prompt, report
+
+
+def format_budget_report(reports):
+    """Plain-text table of prompt tokens per section before and after compaction, with totals."""
+    reports = [r for r in reports if r]
+    width = max([len(str(r.get("section"))) for r in reports] + [len("Section")])
+    lines = [f"{'Section':<{width}}  {'Budget':>6}  {'Before':>6}  {'After':>6}  {'Saved':>6}"]
+    for r in reports:
+        flag = "" if r.get("within_budget", True) else "  OVER"
+        lines.append(f"{str(r.get('section')):<{width}}  {r['budget']:>6}  {r['before']:>6}  {r['after']:>6}  {r['before'] - r['after']:>6}{flag}")
+    before = sum(r["before"] for r in reports)
+    after = sum(r["after"] for r in reports)
+    saved_pct = (100.0 * (before - after) / before) if before else 0.0
+    lines.append(f"{'TOTAL':<{width}}  {'':>6}  {before:>6}  {after:>6}  {before - after:>6}  ({saved_pct:.0f}% saved)")
+    return "\n".join(lines)
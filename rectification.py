@@ -0,0 +1,157 @@
+# rectification.py
+# --- VERSION 1.0.0: Birth-time window scanner (how Ascendant, Moon and houses change across unknown times) ---
+# Over a day the planets other than the Moon move at most ~2 degrees, so they are computed once at each end
+# of the window (position + speed) and cubic-Hermite interpolated to every step. Only the Moon (one swe call
+# per step), the angles and the cusps are recomputed per step; cusps for Placidus/Porphyry/Equal/Whole Sign
+# come from one vectorized house_grid call over all steps. Consecutive steps with identical key features are
+# merged into segments, so a customer sees e.g. "Asc Leo 09:12-11:40, Moon in 5th until 10:05".
+
+import logging
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+import swisseph as swe
+
+from ephemeris_tier import get_ephemeris_flag
+from house_grid import SUPPORTED_GRID_HOUSE_SYSTEMS, compute_houses_from_armc
+from vectorized_astro import ZODIAC_SIGNS, houses_for_degree_rows, normalize_degrees
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - RECTIFY - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+# Bodies slow enough to interpolate across a day (the Moon moves ~13 degrees/day and is computed per step)
+INTERPOLATED_BODIES = {
+    'Sun': swe.SUN, 'Mercury': swe.MERCURY, 'Venus': swe.VENUS, 'Mars': swe.MARS, 'Jupiter': swe.JUPITER,
+    'Saturn': swe.SATURN, 'Uranus': swe.URANUS, 'Neptune': swe.NEPTUNE, 'Pluto': swe.PLUTO,
+    'North Node': swe.MEAN_NODE,
+}
+DEFAULT_STEP_MINUTES = 1
+
+
+def _parse_hhmm(value):
+    hour, minute = (int(part) for part in str(value).split(":"))
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        raise ValueError(f"Invalid time '{value}' (expected HH:MM).")
+    return hour * 60 + minute
+
+
+def _local_times_to_jd(local_times, tz_str):
+    """UT Julian days for naive local datetimes in tz_str (DST handled per step)."""
+    try:
+        tz = ZoneInfo(tz_str)
+    except ZoneInfoNotFoundError:
+        logger.error(f"Unknown or invalid Timezone String provided: '{tz_str}'")
+        raise ValueError(f"Unknown Timezone: {tz_str}")
+    jds = []
+    for local_dt in local_times:
+        utc_dt = local_dt.replace(tzinfo=tz).astimezone(timezone.utc)
+        jds.append(swe.julday(utc_dt.year, utc_dt.month, utc_dt.day,
+                              utc_dt.hour + utc_dt.minute / 60.0 + utc_dt.second / 3600.0, swe.GREG_CAL))
+    return np.array(jds, dtype=float)
+
+
+def interpolate_slow_bodies(jds, bodies=None):
+    """(N, B) longitudes for the given Julian days from two swe calls per body (cubic Hermite on position/speed).
+
+    Returns (names, longitudes); bodies that cannot be calculated get NaN columns.
+    """
+    bodies = bodies or INTERPOLATED_BODIES
+    jds = np.asarray(jds, dtype=float)
+    jd0, jd1 = float(jds.min()), float(jds.max())
+    span = jd1 - jd0
+    t = (jds - jd0) / span if span > 0 else np.zeros_like(jds)
+    h00, h10 = 2 * t**3 - 3 * t**2 + 1, t**3 - 2 * t**2 + t
+    h01, h11 = -2 * t**3 + 3 * t**2, t**3 - t**2
+
+    flags = swe.FLG_SPEED | get_ephemeris_flag()
+    longitudes = np.full((jds.size, len(bodies)), np.nan)
+    for b, (name, body_id) in enumerate(bodies.items()):
+        try:
+            start_pos, _ = swe.calc_ut(jd0, body_id, flags)
+            end_pos, _ = swe.calc_ut(jd1, body_id, flags)
+        except Exception as e:
+            logger.warning(f"Cannot interpolate {name}: {e}")
+            continue
+        p0, v0 = start_pos[0], start_pos[3]
+        p1 = p0 + (end_pos[0] - p0 + 180.0) % 360.0 - 180.0 # Unwrapped across 0 Aries
+        longitudes[:, b] = h00 * p0 + h10 * span * v0 + h01 * p1 + h11 * span * end_pos[3]
+    return list(bodies), normalize_degrees(longitudes)
+
+
+def _angles_and_cusps(jds, lat, lng, house_system):
+    """(asc, mc, cusps (N, 12)) for every step at one location."""
+    mid_jd = float(jds[jds.size // 2])
+    obliquity = swe.calc_ut(mid_jd, swe.ECL_NUT)[0][0] # Changes by milliarcseconds over a day
+    armc = np.array([swe.sidtime(jd) for jd in jds]) * 15.0 + lng
+    if house_system in SUPPORTED_GRID_HOUSE_SYSTEMS:
+        grid = compute_houses_from_armc(armc, lat, obliquity, house_system)
+        return grid["ascendant"], grid["mc"], grid["cusps"]
+    asc, mc, cusps = np.empty(jds.size), np.empty(jds.size), np.empty((jds.size, 12))
+    for i, jd in enumerate(jds):
+        cusps_raw, ascmc = swe.houses(float(jd), lat, lng, house_system)
+        cusps[i], asc[i], mc[i] = cusps_raw[:12], ascmc[0], ascmc[1]
+    return asc, mc, cusps
+
+
+def scan_birth_time_window(year, month, day, lat, lng, tz_str, start_time="00:00", end_time="23:59",
+                           step_minutes=DEFAULT_STEP_MINUTES, house_system=b'P'):
+    """Evaluate the chart at every step (local time) in [start_time, end_time] and group identical features.
+
+    Returns {'date', 'tz_str', 'step_minutes', 'samples', 'segments': [{'start', 'end', 'minutes',
+    'ascendant_sign', 'midheaven_sign', 'moon_sign', 'moon_house', 'houses': {body: house}}],
+    'changes': [{'time', 'feature', 'from', 'to'}]}. Times are local 'HH:MM'; 'end' is the last sampled time.
+    Raises ValueError for bad times, steps or timezones.
+    """
+    if step_minutes <= 0:
+        raise ValueError("step_minutes must be positive.")
+    if isinstance(house_system, str):
+        house_system = house_system.encode('utf-8')
+    start_minute, end_minute = _parse_hhmm(start_time), _parse_hhmm(end_time)
+    if end_minute < start_minute:
+        raise ValueError(f"end_time {end_time} is before start_time {start_time}.")
+
+    midnight = datetime(year, month, day)
+    local_times = [midnight + timedelta(minutes=m) for m in range(start_minute, end_minute + 1, step_minutes)]
+    jds = _local_times_to_jd(local_times, tz_str)
+
+    body_names, body_longitudes = interpolate_slow_bodies(jds)
+    moon = np.array([swe.calc_ut(float(jd), swe.MOON, get_ephemeris_flag())[0][0] for jd in jds])
+    asc, mc, cusps = _angles_and_cusps(jds, lat, lng, house_system)
+
+    houses = houses_for_degree_rows(np.column_stack((moon, body_longitudes)), cusps)
+    feature_names = ["Ascendant sign", "Midheaven sign", "Moon sign", "Moon house"] + [f"{name} house" for name in body_names]
+    features = np.column_stack((
+        (asc // 30).astype(int), (mc // 30).astype(int), (moon // 30).astype(int), houses,
+    ))
+
+    labels = [t.strftime("%H:%M") for t in local_times]
+    changed = np.any(features[1:] != features[:-1], axis=1)
+    boundaries = np.concatenate(([0], np.flatnonzero(changed) + 1, [features.shape[0]]))
+    segments = []
+    for seg_start, seg_end in zip(boundaries[:-1], boundaries[1:]):
+        row = features[seg_start]
+        segments.append({
+            "start": labels[seg_start], "end": labels[seg_end - 1], "minutes": int((seg_end - seg_start) * step_minutes),
+            "ascendant_sign": ZODIAC_SIGNS[row[0]], "midheaven_sign": ZODIAC_SIGNS[row[1]],
+            "moon_sign": ZODIAC_SIGNS[row[2]], "moon_house": int(row[3]),
+            "houses": {name: int(row[4 + b]) for b, name in enumerate(body_names)},
+        })
+
+    changes = []
+    for step, column in zip(*np.nonzero(features[1:] != features[:-1])):
+        before, after = features[step, column], features[step + 1, column]
+        if column < 3:
+            before, after = ZODIAC_SIGNS[before], ZODIAC_SIGNS[after]
+        changes.append({"time": labels[step + 1], "feature": feature_names[column], "from": before if column < 3 else int(before), "to": after if column < 3 else int(after)})
+
+    logger.info(f"Scanned {len(local_times)} birth times ({start_time}-{end_time}, every {step_minutes} min): {len(segments)} segments.")
+    return {
+        "date": midnight.date().isoformat(), "tz_str": tz_str, "step_minutes": step_minutes,
+        "samples": len(local_times), "segments": segments, "changes": changes,
+    }
@@ -0,0 +1,230 @@
+# relocation.py
+# --- VERSION 1.0.0: Relocated charts for many cities from one natal chart ---
+# --- VERSION 1.1.0: Cusps for Placidus/Porphyry/Equal/Whole Sign come from one vectorized house_grid call ---
+# --- VERSION 1.2.0: Declination aspects, aspect patterns and fixed-star links recomputed with the aspects ---
+# --- VERSION 1.2.1: Asc/MC declinations from calculate_chart's calculate_angle_declinations ---
+# Planetary longitudes, speeds and declinations do not depend on where the chart is cast, so a relocated
+# chart only needs new swe.houses output: angles, cusps, house placements, Arabic parts, midpoints that
+# involve the angles, house rulers and the balances, aspects, aspect patterns, declination aspects and fixed-star
+# links that include the angles. Everything else is shared (not copied) with the natal chart, so hundreds of
+# cities per customer stay cheap.
+
+import logging
+
+import numpy as np
+import swisseph as swe
+
+from advanced_calculate_astrology import (
+    DECLINATION_ORB,
+    MIDPOINTS_TO_CALCULATE,
+    TRADITIONAL_RULER_MAP,
+    calculate_angle_declinations,
+    calculate_aspects,
+    calculate_balances,
+    calculate_declination_aspects,
+    calculate_fixed_star_conjunctions_v2,
+    calculate_house_rulers,
+    calculate_midpoint,
+    detect_grand_cross,
+    detect_grand_trine,
+    detect_stellium,
+    detect_t_square,
+    detect_yod,
+    get_chart_jd_ut,
+    get_true_obliquity,
+)
+from arabic_parts import PARTS_IN_POSITIONS, calculate_arabic_parts
+from heliacal import add_heliacal_dates
+from house_grid import SUPPORTED_GRID_HOUSE_SYSTEMS, compute_house_grid
+from vectorized_astro import build_house_index, houses_for_degrees, sign_names, signs_for_degrees
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - RELOCATE - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+ANGLE_HOUSES = {"Ascendant": 1, "Midheaven": 10, "IC": 4, "DC": 7}
+SWE_ASCMC_LENGTH = 8 # swe.houses ascmc: Asc, MC, ARMC, Vertex, equatorial Asc, co-Asc (Koch), co-Asc (Munkasey), polar Asc
+
+
+def _location_fields(location):
+    """Accept {'lat','lng'} / {'latitude','longitude'} dicts or (lat, lng) tuples; return (lat, lng, city, country)."""
+    if isinstance(location, dict):
+        lat = location.get('lat', location.get('latitude'))
+        lng = location.get('lng', location.get('longitude'))
+        return float(lat), float(lng), location.get('city', location.get('place_name')), location.get('country')
+    lat, lng = location[:2]
+    return float(lat), float(lng), None, None
+
+
+def _angle_entries(asc_deg, mc_deg, obliquity):
+    """Angle dicts as built by calculate_chart, including Asc/MC declinations."""
+    angle_degrees = {
+        "Ascendant": asc_deg, "Midheaven": mc_deg,
+        "IC": (mc_deg + 180.0) % 360.0, "DC": (asc_deg + 180.0) % 360.0,
+    }
+    sign_idx, exact_degrees = signs_for_degrees(list(angle_degrees.values()))
+    signs = sign_names(sign_idx)
+    angles = {}
+    for i, (name, degree) in enumerate(angle_degrees.items()):
+        angles[name] = {'degree': degree, 'sign': signs[i], 'exact_degree': float(exact_degrees[i]), 'house': ANGLE_HOUSES[name]}
+    if obliquity is not None:
+        declinations = calculate_angle_declinations({name: angle_degrees[name] for name in ("Ascendant", "Midheaven")}, obliquity)
+        for name, declination in declinations.items():
+            angles[name]['declination'] = declination
+    return angles
+
+
+def _relocated_midpoints(positions, house_index):
+    midpoint_names, midpoint_degrees = [], []
+    for p1_name, p2_name in MIDPOINTS_TO_CALCULATE:
+        deg1 = positions.get(p1_name, {}).get('degree')
+        deg2 = positions.get(p2_name, {}).get('degree')
+        midpoint_names.append(f"{p1_name}/{p2_name}")
+        midpoint = calculate_midpoint(deg1, deg2) if deg1 is not None and deg2 is not None else None
+        midpoint_degrees.append(np.nan if midpoint is None else midpoint)
+    sign_idx, exact_degrees = signs_for_degrees(midpoint_degrees)
+    signs = sign_names(sign_idx)
+    houses = houses_for_degrees(midpoint_degrees, house_index)
+    midpoints = {}
+    for i, mp_key in enumerate(midpoint_names):
+        valid = bool(np.isfinite(midpoint_degrees[i]))
+        midpoints[mp_key] = {
+            'degree': float(midpoint_degrees[i]) if valid else None, 'sign': signs[i] if valid else 'Error',
+            'exact_degree': float(exact_degrees[i]) if valid else 0.0, 'house': int(houses[i]) if valid else 0,
+        }
+    return midpoints
+
+
+def _relocated_fixed_star_links(chart, positions, house_cusps, jd_ut, lat, lng):
+    """Fixed-star conjunctions for the relocated points, as calculate_chart builds them (heliacal dates included)."""
+    catalog_names = set(chart.get('asteroid_catalog') or ())
+    star_points = {name: data['degree'] for name, data in positions.items()
+                   if isinstance(data, dict) and data.get('degree') is not None and data.get('sign') not in (None, 'Error')
+                   and name not in catalog_names}
+    links = calculate_fixed_star_conjunctions_v2(star_points, house_cusps, jd_ut)
+    try:
+        add_heliacal_dates(links, chart.get('birth_details', {}).get('year'), lat, lng)
+    except Exception as e:
+        logger.warning(f"Heliacal dates unavailable for relocated chart: {e}")
+    return links
+
+
+def relocate_chart(chart, locations, house_system=None, recompute_aspects=True):
+    """Return one relocated chart per location (same order), or {"error": ...} entries for failures.
+
+    chart: tropical natal chart from calculate_chart. locations: dicts with lat/lng (plus optional city/country)
+    or (lat, lng) tuples. house_system defaults to the natal chart's. Set recompute_aspects=False when only
+    houses/angles are needed (e.g. ranking many cities); aspects, declination aspects, aspect patterns and
+    fixed-star links are then left as natal. Fixed-star links are only recomputed when the natal chart has
+    some (charts calculated with skip_fixed_stars have none).
+    """
+    if not isinstance(chart, dict) or 'error' in chart:
+        return [{"error": "Relocation needs a successfully calculated natal chart."} for _ in locations]
+    jd_ut = get_chart_jd_ut(chart)
+    if jd_ut is None:
+        return [{"error": "Relocation failed: chart Julian day unavailable."} for _ in locations]
+    if house_system is None:
+        house_system = str(chart.get('birth_details', {}).get('house_system', 'P')).encode('utf-8')
+    elif isinstance(house_system, str):
+        house_system = house_system.encode('utf-8')
+
+    try:
+        obliquity = get_true_obliquity(jd_ut) # For angle declinations
+    except Exception as e:
+        logger.warning(f"Could not get obliquity for relocated angle declinations: {e}")
+        obliquity = None
+
+    # Location-independent points, gathered once: their degrees never change, only their houses
+    natal_positions = chart.get('positions', {})
+    movable_names = [name for name, data in natal_positions.items()
+                     if isinstance(data, dict) and data.get('degree') is not None
+                     and name not in ANGLE_HOUSES and name not in PARTS_IN_POSITIONS]
+    movable_degrees = np.array([float(natal_positions[name]['degree']) for name in movable_names], dtype=float)
+
+    logger.info(f"Relocating chart to {len(locations)} locations (house system {house_system.decode('utf-8', 'ignore')})")
+    house_grid = None
+    if house_system in SUPPORTED_GRID_HOUSE_SYSTEMS and locations:
+        try:
+            grid_coords = np.array([_location_fields(location)[:2] for location in locations], dtype=float)
+            house_grid = compute_house_grid(jd_ut, grid_coords[:, 0], grid_coords[:, 1], house_system)
+        except Exception as e:
+            logger.warning(f"Vectorized house grid unavailable, falling back to swe.houses per location: {e}")
+
+    relocated_charts = []
+    for location_index, location in enumerate(locations):
+        try:
+            lat, lng, city, country = _location_fields(location)
+            if house_grid is not None:
+                house_cusps = house_grid['cusps'][location_index].tolist()
+                # Grid rows carry Asc, MC and ARMC only; the other swe.houses slots are None
+                ascmc = [float(house_grid['ascendant'][location_index]), float(house_grid['mc'][location_index]),
+                         float(house_grid['armc'][location_index])] + [None] * (SWE_ASCMC_LENGTH - 3)
+            else:
+                cusps_raw, ascmc = swe.houses(jd_ut, lat, lng, house_system)
+                house_cusps = list(cusps_raw[:12])
+            house_index = build_house_index(house_cusps)
+            houses = houses_for_degrees(movable_degrees, house_index)
+
+            positions = dict(natal_positions)
+            for i, name in enumerate(movable_names):
+                if natal_positions[name].get('house') != houses[i]:
+                    positions[name] = {**natal_positions[name], 'house': int(houses[i])}
+            angles = _angle_entries(ascmc[0], ascmc[1], obliquity)
+            for name, angle_data in angles.items():
+                positions[name] = {**natal_positions.get(name, {}), **angle_data}
+                angles[name] = positions[name]
+
+            other_points = dict(chart.get('other_points', {}))
+            other_points.update(calculate_arabic_parts(positions, angles, house_cusps, house_index=house_index))
+            for part_name in PARTS_IN_POSITIONS:
+                positions[part_name] = other_points[part_name]
+
+            asc_sign = angles['Ascendant']['sign']
+            birth_details = {
+                **chart.get('birth_details', {}),
+                "latitude": lat, "longitude": lng,
+                "city": city or chart.get('birth_details', {}).get('city'),
+                "country": country or chart.get('birth_details', {}).get('country'),
+                "house_system": house_system.decode('utf-8', 'ignore'),
+                "chart_ruler": TRADITIONAL_RULER_MAP.get(asc_sign, "Error (Asc Sign Error)"),
+                "hemisphere": "Northern Hemisphere" if lat >= 0 else "Southern Hemisphere",
+                "relocated_from": {"latitude": chart.get('birth_details', {}).get('latitude'),
+                                   "longitude": chart.get('birth_details', {}).get('longitude')},
+            }
+            relocated = {
+                **chart,
+                "birth_details": birth_details,
+                "house_info": {"cusps": house_cusps, "ascmc_raw": list(ascmc)},
+                "positions": positions,
+                "angles": angles,
+                "other_points": other_points,
+                "midpoints": _relocated_midpoints(positions, house_index),
+                "house_rulers": calculate_house_rulers(house_cusps),
+                "chart_signatures": dict(chart.get('chart_signatures', {})),
+            }
+            calculate_balances(relocated)
+            if recompute_aspects:
+                # Parts are left out, as in calculate_chart (they are computed after its aspect pass)
+                aspect_positions = {k: v for k, v in positions.items() if k not in PARTS_IN_POSITIONS}
+                relocated['aspects'] = calculate_aspects(aspect_positions, extra_points=chart.get('asteroid_catalog'))
+                relocated['declination_aspects'] = calculate_declination_aspects(aspect_positions, orb=DECLINATION_ORB)
+                try:
+                    aspects = relocated['aspects']
+                    relocated['aspect_patterns'] = (
+                        detect_grand_trine(aspects, aspect_positions) + detect_t_square(aspects) + detect_yod(aspects)
+                        + detect_grand_cross(aspects) + detect_stellium(aspect_positions)
+                    )
+                except Exception as e:
+                    logger.error(f"Error re-detecting aspect patterns for relocated chart: {e}", exc_info=True)
+                    relocated['aspect_patterns'] = []
+                if chart.get('fixed_star_links'):
+                    relocated['fixed_star_links'] = _relocated_fixed_star_links(chart, positions, house_cusps, jd_ut, lat, lng)
+            relocated_charts.append(relocated)
+        except Exception as e:
+            logger.error(f"Relocation failed for location {location}: {e}", exc_info=True)
+            relocated_charts.append({"error": f"Relocation failed: {e}"})
+    return relocated_charts
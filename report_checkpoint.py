@@ -0,0 +1,133 @@
+# report_checkpoint.py
+# --- VERSION 1.0.0: Per-order section checkpoints (resume after a crash, PDF-only rebuild) ---
+# A crash at section 18 or during the PDF build used to lose every finished section, and the rerun paid for all
+# AI calls again. SectionCheckpoint keeps one JSON file per order (output/checkpoints/<order_id>.json) and
+# rewrites it atomically each time a section finishes: the full section dict (content, error flag, header,
+# meta) plus the fingerprint of the prompt that produced it. A resumed run reuses a section only if it did not
+# fail and its prompt fingerprint is unchanged; anything missing, failed or stale is regenerated. The stored
+# sections are also enough to lay out the PDF again without a chart calculation or any AI call.
+# Directory: REPORT_CHECKPOINT_DIR (default output/checkpoints).
+
+import copy
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - CHECKPOINT - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+try:
+    script_dir = os.path.dirname(os.path.realpath(__file__))
+except NameError:
+    script_dir = os.getcwd()
+
+DEFAULT_CHECKPOINT_DIR = os.path.join(script_dir, "output", "checkpoints")
+CHECKPOINT_FORMAT = 1
+
+
+def order_checkpoint_id(client_name, *order_details):
+    """Stable id for an order: a filename-safe client name plus a hash of everything that shapes the report."""
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", client_name or "").strip("_")[:40] or "order"
+    payload = json.dumps([client_name, *order_details], sort_keys=True, default=str)
+    return f"{slug}_{hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]}"
+
+
+class SectionCheckpoint:
+    """JSON-file store of one order's finished sections (thread-safe; every save is an atomic rewrite)."""
+
+    def __init__(self, order_id, checkpoint_dir=None, clock=time.time):
+        self.order_id = order_id
+        self.checkpoint_dir = checkpoint_dir or os.getenv("REPORT_CHECKPOINT_DIR") or DEFAULT_CHECKPOINT_DIR
+        self.path = os.path.join(self.checkpoint_dir, f"{order_id}.json")
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._data = self._load()
+
+    def _empty(self):
+        return {"format": CHECKPOINT_FORMAT, "order_id": self.order_id, "meta": {}, "sections": {}}
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return self._empty()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") != CHECKPOINT_FORMAT or not isinstance(data.get("sections"), dict):
+                raise ValueError(f"unsupported checkpoint format {data.get('format')!r}")
+            return data
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable checkpoint {self.path}: {e}")
+            return self._empty()
+
+    def _write(self):
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, ensure_ascii=False, indent=1, default=str)
+        os.replace(tmp_path, self.path) # A crash mid-write leaves the previous checkpoint intact
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def reset(self, **meta):
+        """Starts the order over: drops stored sections and records meta (a fresh, non-resumed run)."""
+        with self._lock:
+            self._data = self._empty()
+            self._data["meta"].update(meta, created=self.clock())
+            self._write()
+
+    def update_meta(self, **meta):
+        with self._lock:
+            self._data["meta"].update(meta, updated=self.clock())
+            self._write()
+
+    @property
+    def meta(self):
+        return dict(self._data["meta"])
+
+    def save_section(self, section_id, section_data, prompt_hash=None):
+        """Persists one finished section (failed ones too, so resume knows to retry them)."""
+        entry = {"section": copy.deepcopy(section_data), "error_flag": bool(section_data.get("error_flag")),
+                 "prompt_hash": prompt_hash, "saved_at": self.clock()}
+        with self._lock:
+            self._data["sections"][section_id] = entry
+            self._write()
+
+    def section(self, section_id):
+        """Stored section dict, or None."""
+        entry = self._data["sections"].get(section_id)
+        return copy.deepcopy(entry["section"]) if entry else None
+
+    def reusable(self, section_id, prompt_hash=None):
+        """Stored section if it succeeded and (when given) its prompt fingerprint matches; otherwise None."""
+        entry = self._data["sections"].get(section_id)
+        if not entry or entry.get("error_flag"):
+            return None
+        if prompt_hash is not None and entry.get("prompt_hash") not in (None, prompt_hash):
+            logger.info(f"Checkpointed section '{section_id}' is stale (prompt changed); regenerating.")
+            return None
+        return copy.deepcopy(entry["section"])
+
+    def pending(self, section_ids):
+        """Section ids that are missing from the checkpoint or stored as failed."""
+        return [sid for sid in section_ids if sid not in self._data["sections"] or self._data["sections"][sid].get("error_flag")]
+
+    def sections(self, order=None):
+        """{section_id: section dict} in the given order (stored order if None); missing ids are skipped."""
+        ids = list(order) if order is not None else list(self._data["sections"])
+        return {sid: self.section(sid) for sid in ids if sid in self._data["sections"]}
+
+    def clear(self):
+        with self._lock:
+            self._data = self._empty()
+            if os.path.exists(self.path):
+                os.remove(self.path)
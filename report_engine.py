@@ -1,7 +1,17 @@
-import json, os, importlib
+import json, os, importlib, time
+from collections import Counter
+from datetime import datetime
 from reportlab.pdfgen import canvas
 import openai
 
+from ai_batch import BATCH_BACKENDS, DEFAULT_BATCH_DIR, DEFAULT_POLL_SECONDS, LocalBatchBackend, batch_line, make_custom_id, run_batch
+from ai_cache import get_ai_cache, prompt_fingerprint
+from ai_concurrency import run_sections_concurrently
+from ai_scheduler import DEFAULT_PRIORITY, estimate_tokens, get_ai_scheduler
+
+AI_MODEL = "gpt-3.5-turbo"
+_openai_client = None
+
 
 def load_config():
     with open("reports_config.json") as f:
@@ -22,31 +32,62 @@ def validate_data(report_type, data):
         raise KeyError(f"Missing keys for {report_type}: {missing}")
 
 
-def _call_openai(prompt):
+def _get_openai_client():
+    """Shared v1 OpenAI client, created from the environment on first use."""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = openai.OpenAI()
+    return _openai_client
+
+
+def _chat_completion(**kwargs):
+    return _get_openai_client().chat.completions.create(**kwargs)
+
+
+def _request_completion(prompt, priority):
+    resp = get_ai_scheduler().call(
+        _chat_completion,
+        model=AI_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        priority=priority,
+        estimated_tokens=estimate_tokens(prompt),
+    )
+    return resp.choices[0].message.content.strip()
+
+
+def _call_openai(prompt, priority=DEFAULT_PRIORITY, bypass_cache=False):
     try:
-        resp = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
+        return get_ai_cache().get_or_generate(
+            AI_MODEL, None, "", prompt, lambda: _request_completion(prompt, priority), bypass=bypass_cache
         )
-        return resp.choices[0].message.content.strip()
     except Exception:
         # Fallback for offline testing
         return f"AI RESPONSE: {prompt[:60]}"
 
 
-def main(report_type, input_path, occasion, output_path):
-    cfg = load_config()[report_type]
+def build_prompts(report_type, input_path, occasion):
+    """[(section, formatted prompt)] for one order, in SECTIONS order (raises if the input fails validation)."""
     data = load_data(input_path)
+    if report_type == "destiny_matrix":
+        from destiny_matrix import fill_destiny_matrix_fields # Builds its date table on import; only this report needs it
+        data = fill_destiny_matrix_fields(data)
+    elif report_type == "astrocartography":
+        from astrocartography_engine import fill_astrocartography_fields
+        from city_ranking import rank_cities # Loads the city list on import; only this report needs it
+        theme = data.get("theme", "general")
+        data = fill_astrocartography_fields(data, rank_locations=lambda acg: rank_cities(acg, theme=theme))
     validate_data(report_type, data)
 
     prompts_module = importlib.import_module(
         f"src.prompts.{report_type}.prompt_definitions_{report_type}"
     )
+    return [(section, prompts_module.get_prompt(section, data, occasion)) for section in prompts_module.SECTIONS]
+
 
+def render_pdf(sections, texts, output_path):
     c = canvas.Canvas(output_path)
-    for section in prompts_module.SECTIONS:
-        prompt = prompts_module.get_prompt(section, data, occasion)
-        text = _call_openai(prompt)
+    for section in sections:
+        text = texts[section]
         y = 750
         for line in text.splitlines():
             c.drawString(50, y, line)
@@ -58,3 +99,73 @@ def main(report_type, input_path, occasion, output_path):
     c.save()
 
 
+def main(report_type, input_path, occasion, output_path, max_concurrency=None, priority=DEFAULT_PRIORITY, regenerate=False):
+    prompts = build_prompts(report_type, input_path, occasion)
+    texts = run_sections_concurrently(prompts, lambda prompt: _call_openai(prompt, priority=priority, bypass_cache=regenerate), max_concurrency=max_concurrency)
+    render_pdf([section for section, _ in prompts], texts, output_path)
+
+
+def _batch_local_complete(body):
+    return _request_completion(body["messages"][-1]["content"], "bulk")
+
+
+def get_batch_backend(name=None, batch_dir=None):
+    """Batch backend by name (default: AI_BATCH_BACKEND env var or 'local')."""
+    name = name or os.getenv("AI_BATCH_BACKEND", "local")
+    if name not in BATCH_BACKENDS:
+        raise ValueError(f"Unknown batch backend '{name}'. Use one of: {', '.join(BATCH_BACKENDS)}")
+    if name == "local":
+        return LocalBatchBackend(_batch_local_complete, batch_dir=batch_dir)
+    return BATCH_BACKENDS[name]()
+
+
+def run_batch_orders(orders, backend=None, batch_dir=None, poll_seconds=DEFAULT_POLL_SECONDS, sleep=time.sleep, regenerate=False):
+    """Generates every section of every order in one batch job, then writes each order's PDF.
+
+    orders: [{'type', 'input', 'output', optional 'occasion' and 'order_id'}]. Cached responses are reused
+    (unless regenerate) and batch results are cached; sections the batch did not return are generated
+    interactively. Returns {order_id: {'output': path}} or {order_id: {'error': message}} per order; an
+    order_id used by more than one order is rejected for all of them.
+    """
+    batch_dir = batch_dir or DEFAULT_BATCH_DIR
+    cache = get_ai_cache()
+    order_ids = [str(order.get("order_id") or f"order{i + 1:04d}") for i, order in enumerate(orders)]
+    id_counts = Counter(order_ids)
+    planned, outcomes, texts, pending = [], {}, {}, {}
+    for order_id, order in zip(order_ids, orders):
+        if id_counts[order_id] > 1:
+            outcomes[order_id] = {"error": f"Duplicate order_id '{order_id}' used by {id_counts[order_id]} orders; none of them was generated."}
+            continue
+        try:
+            prompts = build_prompts(order["type"], order["input"], order.get("occasion", "self_discovery"))
+        except Exception as e:
+            outcomes[order_id] = {"error": f"{type(e).__name__}: {e}"}
+            continue
+        planned.append((order_id, order, [section for section, _ in prompts]))
+        for section, prompt in prompts:
+            custom_id = make_custom_id(order_id, section)
+            cached = cache.get(prompt_fingerprint(AI_MODEL, None, "", prompt)) if cache.enabled and not regenerate else None
+            if cached is not None:
+                texts[custom_id] = cached
+            else:
+                pending[custom_id] = prompt
+
+    batch_path = os.path.join(batch_dir, f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{len(planned)}orders.jsonl")
+    results = run_batch([batch_line(custom_id, AI_MODEL, prompt) for custom_id, prompt in pending.items()],
+                        backend or get_batch_backend(batch_dir=batch_dir), batch_path, poll_seconds=poll_seconds, sleep=sleep)
+    for custom_id, text in results.items():
+        if text is None: # Failed in the batch: fall back to an interactive bulk-priority call
+            text = _call_openai(pending[custom_id], priority="bulk", bypass_cache=regenerate)
+        elif cache.enabled:
+            cache.put(prompt_fingerprint(AI_MODEL, None, "", pending[custom_id]), text)
+        texts[custom_id] = text
+
+    for order_id, order, sections in planned:
+        try:
+            render_pdf(sections, {section: texts[make_custom_id(order_id, section)] for section in sections}, order["output"])
+            outcomes[order_id] = {"output": order["output"]}
+        except Exception as e:
+            outcomes[order_id] = {"error": f"{type(e).__name__}: {e}"}
+    return outcomes
+
+
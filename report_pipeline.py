@@ -0,0 +1,113 @@
+# report_pipeline.py
+# --- VERSION 1.1.0: stream_completion(should_stop=) closes the stream early (losing hedged requests) ---
+# --- VERSION 1.0.0: Streaming AI completions pipelined into PDF layout ---
+# Building a section's flowables (markdown conversion, Paragraph parsing, images) is CPU work that used to
+# start only after the slowest AI section had returned. SectionLayoutPipeline lays out each section on one
+# background thread as soon as its text lands (run_sections_concurrently's on_result hook), while the other
+# sections are still streaming; results() waits for the stragglers and returns the flowables in report order,
+# so only the final doc.build() and the layout of the last section remain after generation.
+# stream_completion() requests a streamed chat completion and joins the deltas, so the connection delivers
+# tokens as they are produced instead of holding one large response until the end.
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - PIPELINE - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+
+def _delta_text(chunk):
+    """Text of one streamed chunk (OpenAI v1 objects or v0 dicts); None for role/finish chunks."""
+    choices = chunk.get("choices") if isinstance(chunk, dict) else getattr(chunk, "choices", None)
+    if not choices:
+        return None
+    delta = choices[0].get("delta") if isinstance(choices[0], dict) else getattr(choices[0], "delta", None)
+    if isinstance(delta, dict):
+        return delta.get("content")
+    return getattr(delta, "content", None)
+
+
+def stream_completion(create, on_delta=None, should_stop=None, **kwargs):
+    """Calls create(stream=True, **kwargs) and returns the joined, stripped completion text.
+
+    on_delta(text) is called for every non-empty delta as it arrives. When should_stop() turns true the
+    stream is closed and the partial text returned (the caller has already discarded this request).
+    """
+    if should_stop is not None and should_stop():
+        return ""
+    parts = []
+    stream = create(stream=True, **kwargs)
+    for chunk in stream:
+        if should_stop is not None and should_stop():
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close() # Drops the connection so the provider stops generating
+            break
+        text = _delta_text(chunk)
+        if text:
+            parts.append(text)
+            if on_delta is not None:
+                on_delta(text)
+    return "".join(parts).strip()
+
+
+class SectionLayoutPipeline:
+    """Lays out sections on a background thread as they arrive; results() returns them in report order."""
+
+    def __init__(self, layout_section, order):
+        self.layout_section = layout_section # layout_section(key, section) -> list of flowables
+        self.order = list(order)
+        self.metrics = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-layout")
+        self._futures = {}
+        self._lock = threading.Lock()
+        self._layout_seconds = 0.0
+        self._started = time.perf_counter()
+
+    def _timed_layout(self, key, section):
+        start = time.perf_counter()
+        try:
+            return self.layout_section(key, section)
+        finally:
+            self._layout_seconds += time.perf_counter() - start # Single layout thread: no lock needed
+
+    def submit(self, key, section):
+        """Queues a finished section for layout (safe to call from any generation thread)."""
+        with self._lock:
+            if key in self._futures:
+                logger.warning(f"Section '{key}' submitted for layout twice; keeping the first.")
+                return
+            self._futures[key] = self._executor.submit(self._timed_layout, key, section)
+
+    def results(self):
+        """Waits for outstanding layout and returns the flowable lists in report order.
+
+        Sections that never arrived are skipped with a warning; a layout error is re-raised.
+        """
+        tail_start = time.perf_counter()
+        ordered = []
+        try:
+            for key in self.order:
+                future = self._futures.get(key)
+                if future is None:
+                    logger.warning(f"Section '{key}' never reached the layout stage; it is left out of the PDF.")
+                    continue
+                ordered.append(future.result())
+        finally:
+            self._executor.shutdown(wait=True)
+        tail = time.perf_counter() - tail_start
+        self.metrics = {
+            "sections": len(ordered), "layout_seconds": round(self._layout_seconds, 3),
+            "tail_seconds": round(tail, 3), "hidden_seconds": round(max(0.0, self._layout_seconds - tail), 3),
+            "total_seconds": round(time.perf_counter() - self._started, 3),
+        }
+        logger.info(f"Laid out {len(ordered)} sections in {self.metrics['layout_seconds']:.2f}s: "
+                    f"{self.metrics['hidden_seconds']:.2f}s overlapped generation, {tail:.2f}s after the last section landed.")
+        return ordered
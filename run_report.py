@@ -1,13 +1,28 @@
 import argparse
-from report_engine import main
+import json
+from ai_batch import BATCH_BACKENDS
+from ai_scheduler import DEFAULT_PRIORITY, PRIORITY_CLASSES
+from report_engine import get_batch_backend, main, run_batch_orders
 
 REPORT_TYPES = ["numerology", "destiny_matrix", "astrocartography", "astrology"]
 
 if __name__ == "__main__":
     p = argparse.ArgumentParser()
-    p.add_argument("--type", required=True, choices=REPORT_TYPES)
-    p.add_argument("--input", required=True)
+    p.add_argument("--type", choices=REPORT_TYPES)
+    p.add_argument("--input")
     p.add_argument("--occasion", default="self_discovery")
-    p.add_argument("--output", required=True)
+    p.add_argument("--output")
+    p.add_argument("--priority", default=DEFAULT_PRIORITY, choices=list(PRIORITY_CLASSES))
+    p.add_argument("--regenerate", action="store_true", help="Ignore cached AI responses")
+    p.add_argument("--batch", help="JSON list of orders ({type, input, output, occasion, order_id}) generated as one offline batch job")
+    p.add_argument("--batch_backend", default=None, choices=list(BATCH_BACKENDS), help="Batch backend (default: AI_BATCH_BACKEND env var or 'local')")
     args = p.parse_args()
-    main(args.type, args.input, args.occasion, args.output)
+    if args.batch:
+        with open(args.batch) as f:
+            orders = json.load(f)
+        outcomes = run_batch_orders(orders, backend=get_batch_backend(args.batch_backend), regenerate=args.regenerate)
+        print(json.dumps(outcomes, indent=2))
+    else:
+        if not (args.type and args.input and args.output):
+            p.error("--type, --input and --output are required unless --batch is given")
+        main(args.type, args.input, args.occasion, args.output, priority=args.priority, regenerate=args.regenerate)
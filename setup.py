@@ -3,9 +3,12 @@ from setuptools import setup
 setup(
     name="lumenaurareports",
     version="0.1.0",
-    py_modules=["report_engine", "run_report"],
+    py_modules=["report_engine", "run_report", "destiny_matrix", "ai_concurrency", "ai_scheduler", "ai_cache", "ai_batch",
+                "astrocartography_engine", "ephemeris_tier", "city_ranking"],
     install_requires=[
         "reportlab",
-        "openai"
+        "openai",
+        "numpy",
+        "pyswisseph"
     ],
 )
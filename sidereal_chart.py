@@ -0,0 +1,163 @@
+# sidereal_chart.py
+# --- VERSION 1.0.0: Sidereal (Lahiri, Fagan-Bradley, ...) views derived from a calculated tropical chart ---
+# The tropical chart from advanced_calculate_astrology.calculate_chart is the source of truth. A sidereal view
+# only subtracts the ayanamsa for the chart's Julian day from every longitude, so no ephemeris work is repeated.
+# Aspects, declinations and quadrant-house placements are frame-invariant and are carried over unchanged;
+# signs, dignities, balances, house rulers and sign-based patterns are recomputed.
+# --- VERSION 1.0.1: Ayanamsa read under a lock; the Swiss Ephemeris sidereal mode is reset afterwards ---
+
+import copy
+import logging
+import threading
+from functools import lru_cache
+
+import numpy as np
+import swisseph as swe
+
+from advanced_calculate_astrology import (
+    ESSENTIAL_DIGNITY_RULES,
+    TRADITIONAL_RULER_MAP,
+    calculate_balances,
+    calculate_house_rulers,
+    detect_grand_cross,
+    detect_grand_trine,
+    detect_stellium,
+    detect_t_square,
+    detect_yod,
+    get_chart_jd_ut,
+    get_essential_dignity,
+)
+from vectorized_astro import build_house_index, houses_for_degrees, sign_names, signs_for_degrees
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - SIDEREAL - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+AYANAMSA_MODES = {
+    "Lahiri": swe.SIDM_LAHIRI,
+    "Fagan-Bradley": swe.SIDM_FAGAN_BRADLEY,
+    "Raman": swe.SIDM_RAMAN,
+    "Krishnamurti": swe.SIDM_KRISHNAMURTI,
+}
+DEFAULT_AYANAMSA = "Lahiri"
+SWE_DEFAULT_SID_MODE = swe.SIDM_FAGAN_BRADLEY # Swiss Ephemeris' own default sidereal mode
+_sid_mode_lock = threading.Lock() # swe.set_sid_mode is process-wide state
+ANGLE_HOUSES = {"Ascendant": 1, "Midheaven": 10, "IC": 4, "DC": 7} # Angles keep their fixed cusp houses
+
+
+@lru_cache(maxsize=256)
+def get_ayanamsa(jd_ut, ayanamsa=DEFAULT_AYANAMSA):
+    """Return the true ayanamsa (degrees, incl. nutation) for a Julian day (UT).
+
+    The tropical chart uses true-equinox longitudes, so the nutation-inclusive value matches swe's own
+    FLG_SIDEREAL output. The sidereal mode is set and read under a lock and reset to SWE_DEFAULT_SID_MODE
+    afterwards, so other swe callers never see this module's mode. Raises ValueError for unknown ayanamsa names.
+    """
+    if ayanamsa not in AYANAMSA_MODES:
+        raise ValueError(f"Unknown ayanamsa '{ayanamsa}'. Expected one of: {', '.join(AYANAMSA_MODES)}")
+    with _sid_mode_lock:
+        swe.set_sid_mode(AYANAMSA_MODES[ayanamsa], 0, 0)
+        try:
+            _ret_flag, ayanamsa_value = swe.get_ayanamsa_ex_ut(jd_ut, swe.FLG_SWIEPH)
+        finally:
+            swe.set_sid_mode(SWE_DEFAULT_SID_MODE, 0, 0)
+    return ayanamsa_value
+
+
+def _collect_points(sidereal_chart):
+    """Gather every unique degree-bearing dict in the chart (shared dicts such as angles are visited once)."""
+    point_dicts = []
+    seen_ids = set()
+    for section_key in ('positions', 'angles', 'other_points', 'midpoints'):
+        for point_name, point_data in sidereal_chart.get(section_key, {}).items():
+            if isinstance(point_data, dict) and point_data.get('degree') is not None and id(point_data) not in seen_ids:
+                seen_ids.add(id(point_data))
+                point_dicts.append((point_name, point_data))
+    return point_dicts
+
+
+def derive_sidereal_chart(chart, ayanamsa=DEFAULT_AYANAMSA):
+    """Return a sidereal copy of a tropical chart from calculate_chart, or {"error": ...} on failure."""
+    if not isinstance(chart, dict) or 'error' in chart:
+        return {"error": "Sidereal conversion needs a successfully calculated tropical chart."}
+    jd_ut = get_chart_jd_ut(chart)
+    if jd_ut is None:
+        return {"error": "Sidereal conversion failed: chart Julian day unavailable."}
+    try:
+        ayanamsa_value = get_ayanamsa(jd_ut, ayanamsa)
+    except ValueError as e:
+        return {"error": str(e)}
+    logger.info(f"Deriving {ayanamsa} sidereal chart (ayanamsa {ayanamsa_value:.4f}°)")
+
+    sidereal = copy.deepcopy(chart) # deepcopy keeps positions/angles/other_points sharing the same dicts
+
+    # Shift every point and cusp in one pass
+    point_dicts = _collect_points(sidereal)
+    tropical_degrees = np.array([float(data['degree']) for _, data in point_dicts], dtype=float)
+    sidereal_degrees = np.mod(tropical_degrees - ayanamsa_value, 360.0)
+    sign_idx, exact_degrees = signs_for_degrees(sidereal_degrees)
+    signs = sign_names(sign_idx)
+
+    house_system = str(sidereal.get('birth_details', {}).get('house_system', 'P'))
+    cusps = sidereal.get('house_info', {}).get('cusps') or []
+    sidereal_cusps = []
+    if len(cusps) >= 12 and all(c is not None for c in cusps[:12]):
+        if house_system == 'W':
+            # Whole Sign cusps sit on sign boundaries, so they follow the sidereal Ascendant's sign
+            asc_sidereal = (float(sidereal['angles']['Ascendant']['degree']) - ayanamsa_value) % 360.0
+            first_cusp = np.floor(asc_sidereal / 30.0) * 30.0
+            sidereal_cusps = np.mod(first_cusp + 30.0 * np.arange(12), 360.0).tolist()
+        else:
+            sidereal_cusps = np.mod(np.asarray(cusps[:12], dtype=float) - ayanamsa_value, 360.0).tolist()
+    houses = houses_for_degrees(sidereal_degrees, build_house_index(sidereal_cusps) if sidereal_cusps else None)
+
+    for i, (point_name, point_data) in enumerate(point_dicts):
+        point_data['degree'] = float(sidereal_degrees[i])
+        point_data['sign'] = signs[i]
+        point_data['exact_degree'] = float(exact_degrees[i])
+        if 'house' in point_data and point_name not in ANGLE_HOUSES:
+            point_data['house'] = int(houses[i])
+        if 'dignity' in point_data and point_name in ESSENTIAL_DIGNITY_RULES:
+            point_data['dignity'] = get_essential_dignity(point_name, signs[i])
+
+    if sidereal_cusps:
+        sidereal['house_info']['cusps'] = sidereal_cusps
+        sidereal['house_rulers'] = calculate_house_rulers(sidereal_cusps)
+    asc_sign = sidereal.get('angles', {}).get('Ascendant', {}).get('sign', 'Error')
+    sidereal['birth_details']['chart_ruler'] = TRADITIONAL_RULER_MAP.get(asc_sign, "Error (Asc Sign Error)")
+
+    # Fixed star links: report the star's sign in the sidereal frame as well
+    for link in sidereal.get('fixed_star_links', []):
+        star_tropical = link.get('star_degree_tropical')
+        if star_tropical is not None:
+            star_sign_idx, star_exact = signs_for_degrees([float(star_tropical) - ayanamsa_value])
+            link['star_sign'] = sign_names(star_sign_idx)[0]
+            link['star_exact_degree'] = float(star_exact[0])
+
+    calculate_balances(sidereal)
+    try:
+        aspects = sidereal.get('aspects', {})
+        positions = sidereal.get('positions', {})
+        sidereal['aspect_patterns'] = (
+            detect_grand_trine(aspects, positions) + detect_t_square(aspects) + detect_yod(aspects)
+            + detect_grand_cross(aspects) + detect_stellium(positions)
+        )
+    except Exception as e:
+        logger.error(f"Error re-detecting aspect patterns for sidereal chart: {e}", exc_info=True)
+
+    sidereal['calculation_info'].update({
+        "zodiac": "Sidereal",
+        "ayanamsa": ayanamsa,
+        "ayanamsa_value": round(ayanamsa_value, 6),
+        "jd_ut": jd_ut,
+    })
+    return sidereal
+
+
+def derive_sidereal_charts(chart, ayanamsas=("Lahiri", "Fagan-Bradley")):
+    """Return {ayanamsa_name: sidereal_chart} for each requested ayanamsa."""
+    return {name: derive_sidereal_chart(chart, name) for name in ayanamsas}
@@ -6,7 +6,23 @@ PROMPT_TEMPLATES = {
     )
 }
 
+
+def _describe_place(loc):
+    """'Paris' or 'Paris (Venus MC 120 km, Saturn DC 480 km)' when ranked lines are attached."""
+    lines = [line for line in loc.get("lines", []) if isinstance(line, dict) and "planet" in line]
+    if not lines:
+        return loc["place_name"]
+    details = ", ".join(
+        f"{line['planet']} {line['angle']}" + (f" {line['distance_km']:.0f} km" if "distance_km" in line else "")
+        for line in lines
+    )
+    return f"{loc['place_name']} ({details})"
+
+
 def get_prompt(section, data, occasion):
-    places = ", ".join(loc["place_name"] for loc in data.get("locations", []))
+    places = ", ".join(_describe_place(loc) for loc in data.get("locations", []))
     template = PROMPT_TEMPLATES[section]
-    return template.format(name=data["name"], place_list=places) + f" Occasion: {occasion}"
+    prompt = template.format(name=data["name"], place_list=places)
+    if data.get("planetary_lines"):
+        prompt += f" Birth chart planetary lines (longitudes where each planet is angular):\n{data['planetary_lines']}\n"
+    return prompt + f" Occasion: {occasion}"
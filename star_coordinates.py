@@ -0,0 +1,133 @@
+# star_coordinates.py
+# --- VERSION 1.0.0: Built-in J2000 coordinates for the fixed_stars.json catalog (file-free star positions) ---
+# swe.fixstar_ut needs sefstars.txt and answers one star per call. Rising/setting/heliacal work only needs
+# each star's equatorial position to about an arcminute, so the catalog stars are kept here as J2000 RA/Dec
+# and brought to a date in one array pass: J2000 ecliptic + general precession in longitude, then rotated
+# to the equator with the true obliquity of date. Proper motion and nutation in longitude are ignored
+# (well under an arcminute for 1900-2100 except Toliman/Alpha Centauri, ~3.7"/yr).
+
+import json
+import logging
+import os
+
+import numpy as np
+import swisseph as swe
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - STARS - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+# Name (as in fixed_stars.json) -> (RA "h m s", Dec "d m s"), equinox and epoch J2000
+FIXED_STAR_J2000 = {
+    "Sirius": ("06 45 08.9", "-16 42 58"), "Canopus": ("06 23 57.1", "-52 41 45"),
+    "Toliman": ("14 39 36.5", "-60 50 02"), "Arcturus": ("14 15 39.7", "+19 10 57"),
+    "Vega": ("18 36 56.3", "+38 47 01"), "Capella": ("05 16 41.4", "+45 59 53"),
+    "Rigel": ("05 14 32.3", "-08 12 06"), "Procyon": ("07 39 18.1", "+05 13 30"),
+    "Achernar": ("01 37 42.8", "-57 14 12"), "Betelgeuse": ("05 55 10.3", "+07 24 25"),
+    "Agena": ("14 03 49.4", "-60 22 23"), "Altair": ("19 50 47.0", "+08 52 06"),
+    "Acrux": ("12 26 35.9", "-63 05 57"), "Aldebaran": ("04 35 55.2", "+16 30 33"),
+    "Spica": ("13 25 11.6", "-11 09 41"), "Antares": ("16 29 24.5", "-26 25 55"),
+    "Pollux": ("07 45 18.9", "+28 01 34"), "Fomalhaut": ("22 57 39.0", "-29 37 20"),
+    "Deneb Adige": ("20 41 25.9", "+45 16 49"), "Regulus": ("10 08 22.3", "+11 58 02"),
+    "Castor": ("07 34 36.0", "+31 53 18"), "Gacrux": ("12 31 10.0", "-57 06 48"),
+    "Bellatrix": ("05 25 07.9", "+06 20 59"), "El Nath": ("05 26 17.5", "+28 36 27"),
+    "Miaplacidus": ("09 13 12.0", "-69 43 02"), "Alnilam": ("05 36 12.8", "-01 12 07"),
+    "Al Nair": ("22 08 14.0", "-46 57 40"), "Alioth": ("12 54 01.7", "+55 57 35"),
+    "Alcyone": ("03 47 29.1", "+24 06 18"), "Menkar": ("03 02 16.8", "+04 05 23"),
+    "Mirfak": ("03 24 19.4", "+49 51 40"), "Dubhe": ("11 03 43.7", "+61 45 03"),
+    "Scheat": ("23 03 46.5", "+28 04 58"), "Markab": ("23 04 45.7", "+15 12 19"),
+    "Alpheratz": ("00 08 23.3", "+29 05 26"), "Algol": ("03 08 10.1", "+40 57 20"),
+    "Algorab": ("12 29 51.9", "-16 30 56"), "Zosma": ("11 14 06.5", "+20 31 25"),
+    "Vindemiatrix": ("13 02 10.6", "+10 57 33"), "Capulus": ("02 19 00.0", "+57 07 42"),
+    "Sadalmelik": ("22 05 47.0", "-00 19 11"), "Sadalsuud": ("21 31 33.5", "-05 34 16"),
+    "Deneb Algedi": ("21 47 02.4", "-16 07 38"), "Nashira": ("21 40 05.5", "-16 39 44"),
+    "Ankaa": ("00 26 17.0", "-42 18 22"),
+}
+
+try:
+    script_dir = os.path.dirname(os.path.realpath(__file__))
+except NameError:
+    script_dir = os.getcwd()
+
+FIXED_STARS_PATH = os.path.join(script_dir, "Data jsons", "fixed_stars.json")
+DEFAULT_STAR_MAGNITUDE = 2.0 # For stars without a magnitude in fixed_stars.json
+J2000_JD = 2451545.0
+J2000_OBLIQUITY = 23.4392911
+PRECESSION_ARCSEC_PER_CENTURY = 5029.0966 # General precession in longitude
+
+
+def _sexagesimal(text):
+    sign = -1.0 if text.strip().startswith("-") else 1.0
+    d, m, s = (abs(float(part)) for part in text.split())
+    return sign * (d + m / 60.0 + s / 3600.0)
+
+
+STAR_NAMES = tuple(FIXED_STAR_J2000)
+_RA_J2000 = np.array([_sexagesimal(ra) * 15.0 for ra, _ in FIXED_STAR_J2000.values()])
+_DEC_J2000 = np.array([_sexagesimal(dec) for _, dec in FIXED_STAR_J2000.values()])
+
+
+def load_star_magnitudes(path=FIXED_STARS_PATH):
+    """Visual magnitudes from fixed_stars.json aligned with STAR_NAMES (DEFAULT_STAR_MAGNITUDE when missing)."""
+    info = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            info = json.load(f).get("fixed_stars", {})
+    except FileNotFoundError:
+        logger.error(f"Fixed star data not found at: {path}")
+    except json.JSONDecodeError:
+        logger.error(f"Could not decode JSON from '{path}'. Check the file for syntax errors.")
+    magnitudes = []
+    for name in STAR_NAMES:
+        try:
+            magnitudes.append(float(info.get(name, {}).get("magnitude", DEFAULT_STAR_MAGNITUDE)))
+        except (TypeError, ValueError):
+            magnitudes.append(DEFAULT_STAR_MAGNITUDE)
+    return np.array(magnitudes)
+
+
+STAR_MAGNITUDES = load_star_magnitudes()
+
+
+def equatorial_to_ecliptic(ra, dec, obliquity):
+    """(lon, lat) in degrees for RA/Dec arrays in degrees."""
+    ra, dec, eps = np.radians(ra), np.radians(dec), np.radians(obliquity)
+    lon = np.arctan2(np.sin(ra) * np.cos(eps) + np.tan(dec) * np.sin(eps), np.cos(ra))
+    lat = np.arcsin(np.sin(dec) * np.cos(eps) - np.cos(dec) * np.sin(eps) * np.sin(ra))
+    return np.degrees(lon) % 360.0, np.degrees(lat)
+
+
+def ecliptic_to_equatorial(lon, lat, obliquity):
+    """(ra, dec) in degrees for ecliptic lon/lat arrays in degrees."""
+    lon, lat, eps = np.radians(lon), np.radians(lat), np.radians(obliquity)
+    ra = np.arctan2(np.sin(lon) * np.cos(eps) - np.tan(lat) * np.sin(eps), np.cos(lon))
+    dec = np.arcsin(np.sin(lat) * np.cos(eps) + np.cos(lat) * np.sin(eps) * np.sin(lon))
+    return np.degrees(ra) % 360.0, np.degrees(dec)
+
+
+def _catalog_indices(names):
+    names = STAR_NAMES if names is None else tuple(names)
+    unknown = [name for name in names if name not in FIXED_STAR_J2000]
+    if unknown:
+        raise KeyError(f"Stars not in the built-in catalog: {', '.join(unknown)}")
+    return names, np.array([STAR_NAMES.index(name) for name in names], dtype=int)
+
+
+def star_ecliptic_of_date(jd_ut, names=None):
+    """(names, lon, lat) tropical ecliptic positions of date for catalog stars (all by default)."""
+    names, idx = _catalog_indices(names)
+    lon, lat = equatorial_to_ecliptic(_RA_J2000[idx], _DEC_J2000[idx], J2000_OBLIQUITY)
+    centuries = (jd_ut - J2000_JD) / 36525.0
+    return names, (lon + PRECESSION_ARCSEC_PER_CENTURY * centuries / 3600.0) % 360.0, lat
+
+
+def star_equatorial_of_date(jd_ut, names=None):
+    """(names, ra, dec) of date in degrees for catalog stars (all by default). Raises KeyError for unknown stars."""
+    names, lon, lat = star_ecliptic_of_date(jd_ut, names)
+    obliquity = swe.calc_ut(jd_ut, swe.ECL_NUT)[0][0]
+    ra, dec = ecliptic_to_equatorial(lon, lat, obliquity)
+    return names, ra, dec
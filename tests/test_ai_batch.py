@@ -0,0 +1,80 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+import json
+
+import pytest
+
+import report_engine
+from ai_batch import (LocalBatchBackend, batch_line, make_custom_id, parse_batch_output, poll_batch, split_custom_id,
+                      write_batch_file)
+from ai_cache import AIResponseCache
+
+
+def test_batch_file_lines_and_output_parsing(tmp_path):
+    path = write_batch_file([batch_line(make_custom_id("A-1", "numerology"), "gpt-4-turbo", "Life path 7", "You are Elowen", 0.7)],
+                            str(tmp_path / "in.jsonl"))
+    line = json.loads(open(path).read())
+    assert line["url"] == "/v1/chat/completions" and line["body"]["temperature"] == 0.7
+    assert [m["role"] for m in line["body"]["messages"]] == ["system", "user"]
+    assert split_custom_id(line["custom_id"]) == ("A-1", "numerology")
+    with pytest.raises(ValueError):
+        write_batch_file([batch_line("x::a", "m", "p")] * 2, str(tmp_path / "dup.jsonl"))
+    output = "\n".join(json.dumps(o) for o in [
+        {"custom_id": "a", "response": {"status_code": 200, "body": {"choices": [{"message": {"content": " Seven \n"}}]}}},
+        {"custom_id": "b", "response": {"status_code": 429, "body": {"error": "rate limited"}}},
+        {"custom_id": "c", "response": None, "error": {"code": "server_error"}}])
+    assert parse_batch_output(output) == {"a": "Seven", "b": None, "c": None}
+
+
+def test_poll_until_terminal_status_or_timeout():
+    class SlowBackend:
+        def __init__(self, statuses):
+            self.statuses = list(statuses)
+        def status(self, batch_id):
+            return self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+    sleeps = []
+    assert poll_batch(SlowBackend(["validating", "in_progress", "completed"]), "b1", poll_seconds=30, sleep=sleeps.append) == "completed"
+    assert sleeps == [30, 30]
+    with pytest.raises(TimeoutError):
+        poll_batch(SlowBackend(["in_progress"]), "b2", poll_seconds=30, timeout_seconds=60, sleep=lambda s: None)
+
+
+def test_batch_orders_map_back_to_pdfs_with_fallback_and_cache(tmp_path, monkeypatch):
+    cache = AIResponseCache(path=str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(report_engine, "get_ai_cache", lambda: cache)
+    interactive = []
+    monkeypatch.setattr(report_engine, "_call_openai", lambda prompt, priority="standard", bypass_cache=False: interactive.append(priority) or "Live")
+    batched = []
+    def complete(body):
+        batched.append(body["messages"][-1]["content"])
+        if "Occasion: gift" in batched[-1]:
+            raise RuntimeError("server_error")
+        return f"Batch text {len(batched)}"
+    orders = [{"order_id": "A", "type": "numerology", "input": "tests/samples/numerology_valid.json", "output": str(tmp_path / "a.pdf")},
+              {"order_id": "B", "type": "astrology", "input": "tests/samples/astrology_valid.json", "output": str(tmp_path / "b.pdf"), "occasion": "gift"},
+              {"order_id": "C", "type": "astrology", "input": "tests/samples/astrology_missing.json", "output": str(tmp_path / "c.pdf")}]
+    backend = LocalBatchBackend(complete, batch_dir=str(tmp_path))
+    outcomes = report_engine.run_batch_orders(orders, backend=backend, batch_dir=str(tmp_path), sleep=lambda s: None)
+    assert outcomes["A"] == {"output": orders[0]["output"]} and os.path.getsize(orders[1]["output"]) > 0
+    assert "error" in outcomes["C"] and len(batched) == 2 and interactive == ["bulk"] # B's failed line fell back
+    assert len(list(tmp_path.glob("batch_*_2orders.jsonl"))) == 1
+
+    report_engine.run_batch_orders(orders[:1], backend=backend, batch_dir=str(tmp_path), sleep=lambda s: None)
+    assert len(batched) == 2 and cache.stats()["hits"] == 1 # Cached batch result reused, nothing resubmitted
+
+
+def test_local_backend_fallback_uses_v1_client_and_duplicate_ids_are_rejected(tmp_path, monkeypatch):
+    from types import SimpleNamespace
+    requests = []
+    def create(**kwargs):
+        requests.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=" From the API "))])
+    monkeypatch.setattr(report_engine, "_openai_client", SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))))
+    monkeypatch.setattr(report_engine, "get_ai_cache", lambda: AIResponseCache(path=str(tmp_path / "cache.sqlite3")))
+    backend = report_engine.get_batch_backend("local", batch_dir=str(tmp_path))
+    order = {"order_id": "A", "type": "numerology", "input": "tests/samples/numerology_valid.json", "output": str(tmp_path / "a.pdf")}
+    duplicates = [dict(order, order_id="D", output=str(tmp_path / f"d{i}.pdf")) for i in range(2)]
+    outcomes = report_engine.run_batch_orders([order] + duplicates, backend=backend, batch_dir=str(tmp_path), sleep=lambda s: None)
+    assert outcomes["A"] == {"output": order["output"]} and "Duplicate order_id 'D'" in outcomes["D"]["error"]
+    assert requests and all(r["model"] == report_engine.AI_MODEL for r in requests)
+    assert not any(os.path.exists(d["output"]) for d in duplicates)
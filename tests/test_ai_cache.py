@@ -0,0 +1,59 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+
+import pytest
+
+import report_engine
+from ai_cache import AIResponseCache, prompt_fingerprint
+
+
+def test_fingerprint_covers_model_temperature_system_and_prompt():
+    base = prompt_fingerprint("gpt-4-turbo", 0.3, "You are Elowen", "Sun in Leo")
+    assert base == prompt_fingerprint("gpt-4-turbo", 0.30000001, "You are Elowen", "Sun in Leo")
+    variants = [("gpt-4o", 0.3, "You are Elowen", "Sun in Leo"), ("gpt-4-turbo", 0.7, "You are Elowen", "Sun in Leo"),
+                ("gpt-4-turbo", 0.3, "You are Mika", "Sun in Leo"), ("gpt-4-turbo", 0.3, "You are Elowen", "Sun in Virgo")]
+    assert len({base} | {prompt_fingerprint(*v) for v in variants}) == 5
+
+
+def test_hits_survive_reopening_and_bypass_regenerates(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    calls = []
+    generate = lambda: calls.append(1) or f"Reading #{len(calls)}"
+    cache = AIResponseCache(path=path)
+    assert cache.get_or_generate("m", 0.3, "sys", "prompt", generate) == "Reading #1"
+    reopened = AIResponseCache(path=path)
+    assert reopened.get_or_generate("m", 0.3, "sys", "prompt", generate) == "Reading #1" and len(calls) == 1
+    assert reopened.get_or_generate("m", 0.3, "sys", "prompt", generate, bypass=True) == "Reading #2"
+    assert reopened.get_or_generate("m", 0.3, "sys", "prompt", generate) == "Reading #2"
+    stats = reopened.stats()
+    assert stats["hits"] == 2 and stats["misses"] == 0 and stats["bypassed"] == 1 and stats["hit_rate"] == 1.0
+    with pytest.raises(RuntimeError):
+        reopened.get_or_generate("m", 0.3, "sys", "other", lambda: (_ for _ in ()).throw(RuntimeError("429")))
+    assert reopened.stats()["entries"] == 1 # Failures are not stored
+
+
+def test_ttl_expiry_and_lru_eviction(tmp_path):
+    now = [1000.0]
+    cache = AIResponseCache(path=str(tmp_path / "c.sqlite3"), ttl_seconds=60, max_bytes=25, clock=lambda: now[0])
+    assert cache.get("missing") is None and not os.path.exists(tmp_path / "c.sqlite3") # Lookups never create the file
+    cache.put("a", "x" * 10)
+    now[0] += 1
+    cache.put("b", "y" * 10)
+    now[0] += 1
+    assert cache.get("a") == "x" * 10 # a is now more recently used than b
+    cache.put("c", "z" * 10)        # 30 bytes > 25: evict the least recently used (b)
+    assert cache.get("b") is None and cache.get("a") and cache.get("c")
+    now[0] += 120
+    assert cache.get("a") is None and cache.stats()["evictions"] == 1
+
+
+def test_report_engine_reuses_cached_sections(tmp_path, monkeypatch):
+    cache = AIResponseCache(path=str(tmp_path / "cache.sqlite3"))
+    monkeypatch.setattr(report_engine, "get_ai_cache", lambda: cache)
+    calls = []
+    monkeypatch.setattr(report_engine, "_request_completion", lambda prompt, priority: calls.append(prompt) or "Live text")
+    for _ in range(2):
+        report_engine.main("numerology", "tests/samples/numerology_valid.json", "self_discovery", str(tmp_path / "n.pdf"))
+    assert len(calls) == 1 and cache.stats()["hits"] == 1
+    report_engine.main("numerology", "tests/samples/numerology_valid.json", "self_discovery", str(tmp_path / "n.pdf"), regenerate=True)
+    assert len(calls) == 2
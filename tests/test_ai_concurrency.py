@@ -0,0 +1,56 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+import threading
+import time
+
+import pytest
+
+import report_engine
+from ai_concurrency import get_ai_concurrency, run_sections_concurrently
+
+
+def test_results_keep_input_order_and_wall_time_tracks_slowest():
+    delays = {f"{i:02d}_Section": 0.3 - 0.02 * i for i in range(10)} # Later sections finish first
+    start = time.perf_counter()
+    results = run_sections_concurrently(delays.items(), lambda d: time.sleep(d) or d, max_concurrency=10)
+    assert time.perf_counter() - start < 0.3 + 0.2 < sum(delays.values())
+    assert list(results) == list(delays) and list(results.values()) == list(delays.values())
+
+
+def test_concurrency_limit_and_per_section_errors():
+    in_flight, peak, lock = [0], [0], threading.Lock()
+    def worker(n):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+        if n == 3:
+            raise RuntimeError("API down")
+        return n * 10
+    results = run_sections_concurrently([(n, n) for n in range(8)], worker, max_concurrency=3,
+                                        on_error=lambda key, e: f"[ERROR: {e}]")
+    assert peak[0] <= 3
+    assert results[3] == "[ERROR: API down]" and results[7] == 70
+    with pytest.raises(RuntimeError):
+        run_sections_concurrently([(n, n) for n in range(4)], worker, max_concurrency=1)
+
+
+def test_limit_from_environment(monkeypatch):
+    monkeypatch.setenv("AI_MAX_CONCURRENCY", "3")
+    assert get_ai_concurrency() == 3 and get_ai_concurrency(0) == 1
+    monkeypatch.setenv("AI_MAX_CONCURRENCY", "lots")
+    assert get_ai_concurrency() >= 1
+
+
+def test_report_engine_generates_sections_concurrently(tmp_path, monkeypatch):
+    threads = set()
+    def slow_call(prompt, priority="standard", bypass_cache=False):
+        threads.add(threading.get_ident())
+        time.sleep(0.05)
+        return f"AI RESPONSE: {prompt[:20]}"
+    monkeypatch.setattr(report_engine, "_call_openai", slow_call)
+    out = tmp_path / "astrology.pdf"
+    report_engine.main("astrology", "tests/samples/astrology_valid.json", "self_discovery", str(out), max_concurrency=4)
+    assert out.exists() and out.stat().st_size > 0 and threads
@@ -0,0 +1,108 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+import threading
+import time
+
+import pytest
+
+from ai_hedging import HedgedCaller, LatencyRecorder, latency_percentile
+from report_pipeline import stream_completion
+
+
+def _recorder(tmp_path, samples=None):
+    recorder = LatencyRecorder(path=str(tmp_path / "latency.json"))
+    for label, values in (samples or {}).items():
+        for value in values:
+            recorder.record(label, value)
+    return recorder
+
+
+def test_percentiles_histograms_and_persistence(tmp_path):
+    recorder = _recorder(tmp_path, {"05_Core_Essence": [1.0, 2.0, 3.0, 4.0, 40.0], "10_Poetry": [0.5]})
+    assert latency_percentile([5.0, 1.0, 3.0, 2.0, 4.0], 50) == 3.0 and latency_percentile([], 95) is None
+    assert recorder.percentile(80, "05_Core_Essence") == 4.0 and recorder.percentile(100) == 40.0
+    histogram = dict(recorder.histogram("05_Core_Essence"))
+    assert histogram["<=1s"] == 1 and histogram["<=2s"] == 1 and histogram["<=4s"] == 2 and histogram["<=60s"] == 1
+    text = recorder.format_histograms(["05_Core_Essence", "99_Unseen"])
+    assert text.startswith("05_Core_Essence  n=5  p50 3.0s") and "99_Unseen" not in text
+    recorder.save()
+    assert _recorder(tmp_path).samples("05_Core_Essence") == [1.0, 2.0, 3.0, 4.0, 40.0]
+
+
+def test_no_hedge_without_percentile_or_enough_samples(tmp_path):
+    calls = []
+    hedger = HedgedCaller(_recorder(tmp_path), percentile=None, min_samples=3)
+    assert hedger.call("07_Numerology", lambda x, label: calls.append(label) or x * 2, 21, label="sched") == 42 and calls == ["sched"]
+    assert hedger.deadline("07_Numerology", 95) is None # One sample so far
+    assert len(hedger.recorder.samples("07_Numerology")) == 1 and hedger.metrics()["hedged"] == 0
+    def bad_prompt():
+        raise ValueError("bad prompt")
+    with pytest.raises(ValueError):
+        hedger.call("07_Numerology", bad_prompt)
+
+
+def test_slow_request_is_hedged_and_loser_stream_closed(tmp_path):
+    hedger = HedgedCaller(_recorder(tmp_path, {"05_Core_Essence": [0.05] * 20}), percentile=95, min_deadline=0.05)
+    assert hedger.deadline("05_Core_Essence") == 0.05 and hedger.deadline("unseen") == 0.05 # Pooled fallback
+    closed, started = [], []
+
+    class Stream:
+        def __init__(self, delay):
+            self.delay = delay
+        def __iter__(self):
+            for word in ("Your ", "Sun ", "shines."):
+                time.sleep(self.delay)
+                yield {"choices": [{"delta": {"content": word}}]}
+        def close(self):
+            closed.append(self.delay)
+
+    def create(stream, **kwargs):
+        started.append(threading.current_thread().name)
+        return Stream(0.2 if len(started) == 1 else 0.01) # The first request stalls
+
+    start = time.perf_counter()
+    text = hedger.call("05_Core_Essence", stream_completion, create, model="gpt-4-turbo", cancellable=True)
+    assert text == "Your Sun shines." and time.perf_counter() - start < 0.4 and len(started) == 2
+    assert hedger.metrics() == {"calls": 1, "hedged": 1, "hedge_wins": 1, "cancelled": 1, "percentile": 95}
+    time.sleep(0.3)
+    assert closed == [0.2] # The losing stream stopped at its next chunk
+    assert len(hedger.recorder.samples("05_Core_Essence")) == 21
+
+
+def test_failed_attempt_falls_back_to_the_other(tmp_path):
+    hedger = HedgedCaller(_recorder(tmp_path, {"s": [0.02] * 20}), percentile=50, min_deadline=0.02)
+    attempts = []
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            time.sleep(0.1)
+            raise RuntimeError("connection reset")
+        time.sleep(0.2)
+        return "ok"
+    gated = []
+    assert hedger.call("s", flaky, before_hedge=lambda: gated.append(1)) == "ok" and hedger.metrics()["hedge_wins"] == 1
+    assert gated == [1] # Only the duplicate waits for rate-limit capacity
+    def always_fails():
+        time.sleep(0.05)
+        raise RuntimeError("API down")
+    with pytest.raises(RuntimeError, match="API down"):
+        hedger.call("s", always_fails)
+
+
+def test_latency_excludes_rate_limit_wait_and_retry_backoff(tmp_path):
+    from ai_scheduler import AIScheduler
+    scheduler = AIScheduler(requests_per_minute=120, tokens_per_minute=10**9, sleep=lambda s: time.sleep(0.3))
+    scheduler.requests.level = 0.0 # First request waits 0.5 s for capacity
+    hedger = HedgedCaller(_recorder(tmp_path))
+    attempts = []
+    def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            error = RuntimeError("rate limited")
+            error.status_code = 429
+            raise error
+        return "ok"
+    start = time.perf_counter()
+    assert scheduler.call(flaky, label="s", wrap=lambda fn, *a, **k: hedger.call("s", fn, *a, **k)) == "ok"
+    assert time.perf_counter() - start > 0.7 # Queue wait plus backoff
+    assert len(hedger.recorder.samples("s")) == 1 and hedger.recorder.samples("s")[0] < 0.1 # The failed attempt is not a sample
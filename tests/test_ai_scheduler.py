@@ -0,0 +1,82 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import report_engine
+from ai_cache import AIResponseCache
+from ai_scheduler import AIScheduler, TokenBucket, estimate_tokens, is_retryable
+
+
+class FakeAPIError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+def test_token_bucket_refills_continuously():
+    now = [0.0]
+    bucket = TokenBucket(60, clock=lambda: now[0]) # One unit per second
+    bucket.consume(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0)
+    now[0] = 30.0
+    assert bucket.wait_time(30) == 0.0 and bucket.wait_time(45) == pytest.approx(15.0)
+    assert bucket.wait_time(1000) == pytest.approx(30.0) # Oversized requests wait for a full bucket only
+    assert estimate_tokens("x" * 400, output_tokens=100) == 200
+
+
+def test_express_calls_are_served_before_queued_bulk_calls():
+    scheduler = AIScheduler(requests_per_minute=1200, tokens_per_minute=10**7) # One request every 50 ms
+    scheduler.requests.level = 0.0
+    served = []
+    def submit(priority, name):
+        scheduler.acquire(10, priority)
+        served.append(name)
+    threads = [threading.Thread(target=submit, args=("bulk", f"bulk{i}")) for i in range(2)]
+    for t in threads:
+        t.start()
+    time.sleep(0.01)
+    express = [threading.Thread(target=submit, args=("express", f"express{i}")) for i in range(2)]
+    for t in express:
+        t.start()
+    time.sleep(0.01)
+    assert scheduler.metrics()["queue_depth_by_priority"] == {"express": 2, "standard": 0, "bulk": 2}
+    for t in threads + express:
+        t.join(timeout=2)
+    assert served == ["express0", "express1", "bulk0", "bulk1"]
+    metrics = scheduler.metrics()
+    assert metrics["max_queue_depth"] == 4 and metrics["queue_depth"] == 0 and metrics["requests"] == 4
+    with pytest.raises(ValueError):
+        scheduler.acquire(10, "vip")
+
+
+def test_retries_429_with_backoff_and_reraises_client_errors():
+    delays = []
+    scheduler = AIScheduler(requests_per_minute=10**6, tokens_per_minute=10**9, sleep=delays.append)
+    attempts = []
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise FakeAPIError(429)
+        return "ok"
+    assert scheduler.call(flaky, label="09_Planetary_Analysis") == "ok"
+    assert len(delays) == 2 and all(0.0 <= d <= 2.0 for d in delays)
+    with pytest.raises(FakeAPIError):
+        scheduler.call(lambda: (_ for _ in ()).throw(FakeAPIError(400)))
+    assert scheduler.metrics()["retries"] == 2 and scheduler.metrics()["failures"] == 1
+    assert is_retryable(FakeAPIError(503)) and not is_retryable(ValueError("bad prompt"))
+
+
+def test_report_engine_calls_go_through_the_scheduler(tmp_path, monkeypatch):
+    calls = []
+    class RecordingScheduler:
+        def call(self, fn, *args, priority, estimated_tokens, **kwargs):
+            calls.append((priority, estimated_tokens))
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=" Your chart... "))])
+    monkeypatch.setattr(report_engine, "get_ai_scheduler", lambda: RecordingScheduler())
+    monkeypatch.setattr(report_engine, "get_ai_cache", lambda: AIResponseCache(path=str(tmp_path / "cache.sqlite3")))
+    assert report_engine._call_openai("Describe the Sun in Leo", priority="express") == "Your chart..."
+    assert calls == [("express", estimate_tokens("Describe the Sun in Leo"))]
@@ -0,0 +1,51 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+
+import pytest
+from arabic_parts import calculate_arabic_parts, compile_parts_table
+
+CUSPS = [float(30 * i) for i in range(12)]
+ANGLES = {"Ascendant": {"degree": 0.0, "sign": "Aries"}, "DC": {"degree": 180.0, "sign": "Libra"}}
+
+def _positions(sun_house):
+    return {"Sun": {"degree": 100.0, "sign": "Cancer", "house": sun_house},
+            "Moon": {"degree": 40.0, "sign": "Taurus", "house": 2},
+            "Venus": {"degree": 70.0, "sign": "Gemini", "house": 3}}
+
+def test_day_night_reversal():
+    table = {"Fortune": {"formula": "Ascendant + Moon - Sun", "reverse_at_night": True}}
+    compiled = compile_parts_table(table)
+    day = calculate_arabic_parts(_positions(10), ANGLES, CUSPS, compiled=compiled)
+    night = calculate_arabic_parts(_positions(4), ANGLES, CUSPS, compiled=compiled)
+    assert day["Fortune"]["degree"] == pytest.approx(300.0)
+    assert night["Fortune"]["degree"] == pytest.approx(60.0)
+    assert night["Fortune"]["sign"] == "Gemini" and night["Fortune"]["house"] == 3
+
+def test_parts_referencing_parts_and_cusps():
+    table = {
+        "Eros": {"formula": "Ascendant + Venus - Spirit", "reverse_at_night": False},
+        "Spirit": {"formula": "Ascendant + Sun - Moon", "reverse_at_night": False},
+        "Death": {"formula": "Ascendant + Cusp 8 - Moon", "reverse_at_night": False},
+    }
+    parts = calculate_arabic_parts(_positions(10), ANGLES, CUSPS, compiled=compile_parts_table(table))
+    assert parts["Spirit"]["degree"] == pytest.approx(60.0)
+    assert parts["Eros"]["degree"] == pytest.approx(10.0)
+    assert parts["Death"]["degree"] == pytest.approx(170.0)
+
+def test_missing_operand_and_bad_tables():
+    table = {"Lot": {"formula": "Ascendant + Saturn - Sun", "reverse_at_night": True}}
+    parts = calculate_arabic_parts(_positions(10), ANGLES, CUSPS, compiled=compile_parts_table(table))
+    assert parts["Lot"] == {"degree": None, "sign": "Error", "exact_degree": 0.0, "house": 0}
+    with pytest.raises(ValueError):
+        compile_parts_table({"A": {"formula": "Ascendant + B - Sun"}, "B": {"formula": "Ascendant + A - Sun"}})
+    with pytest.raises(ValueError):
+        compile_parts_table({"A": {"formula": "Ascendant * Sun"}})
+
+def test_interpreted_parts_have_data():
+    import json
+    from arabic_parts import ARABIC_PARTS_FORMULAS, INTERPRETED_PARTS
+    with open(os.path.join(os.getcwd(), "Data jsons", "arabic_parts.json"), encoding="utf-8") as f:
+        data = json.load(f)
+    for part_name in INTERPRETED_PARTS:
+        assert part_name in ARABIC_PARTS_FORMULAS
+        assert part_name.lower().replace("part of ", "pof_").replace(" ", "_") in data
@@ -0,0 +1,32 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+
+import pytest
+import asteroid_catalog
+
+def test_batched_positions_and_missing_files(monkeypatch):
+    calls = []
+    def fake_calc_ut(jd_ut, body_id, flags):
+        calls.append(body_id)
+        if body_id == asteroid_catalog.swe.AST_OFFSET + 80: # Sappho: no ephemeris file installed
+            raise asteroid_catalog.swe.Error("SwissEph file 'se00080s.se1' not found")
+        return (45.0 if body_id == asteroid_catalog.swe.AST_OFFSET + 433 else 200.0, 0.0, 1.0, -0.1, 0.0, 0.0), flags
+    monkeypatch.setattr(asteroid_catalog.swe, "calc_ut", fake_calc_ut)
+    asteroid_catalog.reset_missing_asteroids()
+
+    cusps = [float(30 * i) for i in range(12)]
+    positions = asteroid_catalog.calculate_asteroid_positions(2451545.0, cusps, selection=["Eros", "Psyche", "Sappho"])
+    assert set(positions) == {"Eros", "Psyche"}
+    assert positions["Eros"]["sign"] == "Taurus" and positions["Eros"]["house"] == 2
+    assert positions["Psyche"]["is_retrograde"] is True
+
+    calls.clear() # Same chart again: served from cache; new chart: Sappho is not retried
+    asteroid_catalog.calculate_asteroid_positions(2451545.0, cusps, selection=["Eros", "Psyche", "Sappho"])
+    assert calls == []
+    asteroid_catalog.calculate_asteroid_positions(2451546.0, cusps, selection=["Eros", "Psyche", "Sappho"])
+    assert asteroid_catalog.swe.AST_OFFSET + 80 not in calls
+    asteroid_catalog.reset_missing_asteroids()
+
+def test_catalog_loaded_from_data():
+    assert {"Eros", "Psyche", "Sappho"} <= set(asteroid_catalog.ASTEROID_CATALOG)
+    assert asteroid_catalog.resolve_asteroid_names(["Eros", "Nope"]) == ("Eros",)
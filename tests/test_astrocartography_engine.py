@@ -0,0 +1,65 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+import time
+
+import numpy as np
+import pytest
+import swisseph as swe
+
+from astrocartography_engine import compute_astrocartography_lines, format_lines_for_prompt
+
+JD = swe.julday(1990, 6, 15, 18.5)
+
+
+def test_mc_line_is_where_armc_equals_ra():
+    acg = compute_astrocartography_lines(JD)
+    for name, planet in acg["planets"].items():
+        armc = swe.houses(JD, 0.0, planet["mc_longitude"], b'P')[1][2]
+        assert (armc - planet["ra"] + 180.0) % 360.0 - 180.0 == pytest.approx(0.0, abs=1e-6), name
+        assert (planet["ic_longitude"] - planet["mc_longitude"]) % 360.0 == pytest.approx(180.0)
+
+
+def test_ac_and_dc_lines_lie_on_horizon():
+    acg = compute_astrocartography_lines(JD)
+    for name in ("Sun", "Venus", "Saturn"):
+        planet = acg["planets"][name]
+        for angle in ("AC", "DC"):
+            polyline = max(planet["lines"][angle], key=len)
+            for lat, lon in polyline[::40]:
+                azimuth, true_alt, _ = swe.azalt(JD, swe.EQU2HOR, (lon, lat, 0), 0, 0, (planet["ra"], planet["dec"], 1))
+                assert true_alt == pytest.approx(0.0, abs=1e-3), (name, angle, lat)
+                # swe azimuth is measured from south: rising (east) is 180-360
+                assert (azimuth > 180.0) == (angle == "AC"), (name, angle, lat)
+
+
+def test_polylines_split_at_dateline():
+    acg = compute_astrocartography_lines(JD)
+    for planet in acg["planets"].values():
+        for polylines in planet["lines"].values():
+            for polyline in polylines:
+                lons = np.array(polyline)[:, 1]
+                assert np.all(np.abs(np.diff(lons)) <= 180.0)
+
+
+def test_all_planets_fast_and_prompt_text():
+    start = time.perf_counter()
+    acg = compute_astrocartography_lines(JD, lat_step=0.25)
+    assert time.perf_counter() - start < 1.0
+    assert len(acg["planets"]) == 10
+    text = format_lines_for_prompt(acg)
+    assert text.count("\n") == 9 and text.startswith("Sun: MC ")
+
+
+def test_order_birth_data_feeds_prompt(tmp_path):
+    import json
+    from astrocartography_engine import birth_jd_ut, fill_astrocartography_fields
+    from report_engine import build_prompts
+    assert birth_jd_ut("1990-06-15", "14:30", "America/New_York") == pytest.approx(JD)
+    order = {"name": "Jane", "date_of_birth": "1990-06-15", "birth_time": "14:30", "tz_str": "America/New_York",
+             "locations": [{"place_name": "Paris", "latitude": 48.86, "longitude": 2.35, "lines": []}]}
+    assert fill_astrocartography_fields({"name": "Jane", "date_of_birth": "1990-06-15"}) == {"name": "Jane", "date_of_birth": "1990-06-15"}
+    sample = tmp_path / "acg.json"
+    sample.write_text(json.dumps(order))
+    [(section, prompt)] = build_prompts("astrocartography", str(sample), "gift")
+    assert section == "locations" and "Paris" in prompt
+    assert format_lines_for_prompt(compute_astrocartography_lines(JD)) in prompt
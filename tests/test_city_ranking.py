@@ -0,0 +1,71 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+
+import numpy as np
+import swisseph as swe
+
+from astrocartography_engine import compute_astrocartography_lines
+from city_ranking import WORLD_CITIES, build_segment_index, nearest_line_distances, rank_cities
+from src.prompts.astrocartography.prompt_definitions_astrocartography import get_prompt
+
+JD = swe.julday(1990, 6, 15, 18.5)
+
+
+def test_grid_index_matches_brute_force():
+    acg = compute_astrocartography_lines(JD)
+    index = build_segment_index(acg)
+    lats = [c["latitude"] for c in WORLD_CITIES]
+    lons = [c["longitude"] for c in WORLD_CITIES]
+    # A single cell holding every segment is the O(cities x segments) scan
+    brute_index = {**index, "cell_offsets": np.array([0, len(index["segments"])]),
+                   "cell_segments": np.arange(len(index["segments"])),
+                   "cell_deg": 360.0, "n_lat_cells": 1, "n_lon_cells": 1}
+    indexed = nearest_line_distances(index, lats, lons)
+    brute = nearest_line_distances(brute_index, lats, lons)
+    assert np.isfinite(indexed).sum() > 50
+    assert np.array_equal(indexed, brute)
+
+
+def test_mc_line_distance_at_equator():
+    acg = compute_astrocartography_lines(JD)
+    mc_lon = acg["planets"]["Jupiter"]["mc_longitude"]
+    index = build_segment_index(acg)
+    jupiter_mc = index["line_keys"].index(("Jupiter", "MC"))
+    distances = nearest_line_distances(index, [0.0, 0.0], [mc_lon + 1.0, mc_lon + 10.0])
+    assert abs(distances[0, jupiter_mc] - 111.195) < 0.01
+    assert np.isinf(distances[1, jupiter_mc])
+
+
+def test_rank_cities_weights_and_locations_shape():
+    acg = compute_astrocartography_lines(JD)
+    mc_lon = acg["planets"]["Venus"]["mc_longitude"]
+    cities = [
+        {"place_name": "On Venus", "country": "X", "latitude": 10.0, "longitude": mc_lon},
+        {"place_name": "Nowhere", "country": "X", "latitude": -80.0, "longitude": mc_lon + 90.0},
+    ]
+    ranked = rank_cities(acg, cities=cities, top_n=1)
+    assert len(ranked) == 1 and ranked[0]["place_name"] == "On Venus"
+    assert ranked[0]["lines"][0]["planet"] == "Venus" and ranked[0]["lines"][0]["angle"] == "MC"
+    flipped = rank_cities(acg, cities=cities, planet_weights={"Venus": -5.0})
+    assert flipped[0]["place_name"] == "Nowhere"
+
+    ranked = rank_cities(acg, top_n=10, theme="love")
+    assert len(ranked) == 10
+    assert [r["score"] for r in ranked] == sorted((r["score"] for r in ranked), reverse=True)
+    prompt = get_prompt("locations", {"name": "Jane", "locations": ranked}, "gift")
+    assert ranked[0]["place_name"] in prompt and "km" in prompt
+
+
+def test_missing_locations_are_ranked_from_birth_data(tmp_path):
+    import json
+    import pytest
+    from report_engine import build_prompts
+    order = {"name": "Jane", "date_of_birth": "1990-06-15", "birth_time": "14:30", "tz_str": "America/New_York", "theme": "love"}
+    sample = tmp_path / "acg.json"
+    sample.write_text(json.dumps(order))
+    [(_, prompt)] = build_prompts("astrocartography", str(sample), "gift")
+    top = rank_cities(compute_astrocartography_lines(JD), theme="love")
+    assert all(city["place_name"] in prompt for city in top) and "km" in prompt
+    sample.write_text(json.dumps({"name": "Jane", "date_of_birth": "1990-06-15"}))
+    with pytest.raises(KeyError):
+        build_prompts("astrocartography", str(sample), "gift") # No birth time: nothing to rank from
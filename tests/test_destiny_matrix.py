@@ -0,0 +1,65 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+
+import json
+from datetime import date
+
+import numpy as np
+import pytest
+
+from destiny_matrix import (
+    DESTINY_POSITION_NAMES, DESTINY_TABLE, calculate_destiny_matrix, compute_destiny_matrix_rows,
+    fill_destiny_matrix_fields, reduce_to_arcana, validate_destiny_matrix_orders,
+)
+from report_engine import main
+
+
+def test_reduce_to_arcana():
+    assert reduce_to_arcana(22) == 22
+    assert reduce_to_arcana(23) == 5
+    assert reduce_to_arcana(1999) == 10 # 1+9+9+9 = 28 -> 10
+    assert reduce_to_arcana(np.array([31, 88, 7])).tolist() == [4, 16, 7]
+
+
+def test_known_date():
+    matrix = calculate_destiny_matrix("1990-04-15")
+    positions = {name: p["arcana"] for name, p in matrix["positions"].items()}
+    assert positions["personality"] == 15 and positions["talents_from_above"] == 4
+    assert positions["material_karma"] == 19 # 1+9+9+0
+    assert positions["karmic_tail"] == 11 # 15+4+19 = 38 -> 11
+    assert positions["comfort_zone"] == 13 # 15+4+19+11 = 49 -> 13
+    assert matrix["balance_number"] == 13 and matrix["innate_talent_number"] == 4
+    assert matrix["challenge_numbers"][0] == 11
+    assert matrix["positions"]["comfort_zone"]["name"] == "Death"
+    assert calculate_destiny_matrix(date(1990, 4, 15)) == matrix
+
+
+def test_table_matches_direct_computation_and_out_of_range():
+    assert DESTINY_TABLE.min() >= 1 and DESTINY_TABLE.max() <= 22
+    assert DESTINY_TABLE.shape[1] == len(DESTINY_POSITION_NAMES)
+    old = calculate_destiny_matrix("1850-02-03")
+    direct = compute_destiny_matrix_rows(np.array(["1850-02-03"], dtype="datetime64[D]"))[0]
+    assert [old["positions"][n]["arcana"] for n in DESTINY_POSITION_NAMES] == direct.tolist()
+    with pytest.raises(ValueError):
+        calculate_destiny_matrix("15/04/1990")
+
+
+def test_batch_validation():
+    good = fill_destiny_matrix_fields({"date_of_birth": "1985-11-30"})
+    orders = [good] * 500 + [{**good, "balance_number": 99}, {"date_of_birth": "not a date"}]
+    problems = validate_destiny_matrix_orders(orders)
+    assert [(p["index"], p["field"]) for p in problems] == [(500, "balance_number"), (501, "date_of_birth")]
+
+
+def test_report_fills_fields_from_date(tmp_path):
+    sample = tmp_path / "dm.json"
+    sample.write_text(json.dumps({"name": "Jane Doe", "date_of_birth": "1990-04-15"}))
+    out = tmp_path / "dm.pdf"
+    main("destiny_matrix", str(sample), "gift", str(out))
+    assert out.exists() and out.stat().st_size > 0
+
+
+def test_report_engine_imports_destiny_matrix_lazily():
+    import subprocess
+    check = "import sys, report_engine; sys.exit('destiny_matrix' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", check], cwd=os.getcwd()).returncode == 0
@@ -0,0 +1,58 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+
+import pytest
+import swisseph as swe
+import advanced_calculate_astrology as calc
+import ephemeris_tier
+from ephemeris_tier import benchmark_ephemeris_tiers, get_ephemeris_tier, use_ephemeris_tier
+
+BIRTH = dict(year=1990, month=6, day=15, hour=14, minute=30, lat=40.7128, lng=-74.0060, city="New York",
+             country="USA", tz_str="America/New_York", gender="Female", ephemeris_path_used=None)
+
+
+def test_tier_switch_is_scoped():
+    start = get_ephemeris_tier()
+    with use_ephemeris_tier("moshier"):
+        assert ephemeris_tier.get_ephemeris_flag() == swe.FLG_MOSEPH
+    assert get_ephemeris_tier() == start
+    with pytest.raises(ValueError):
+        ephemeris_tier.set_ephemeris_tier("jpl-horizons")
+
+
+def test_tier_is_isolated_between_concurrent_callers():
+    import threading
+    inside, release, seen = threading.Event(), threading.Event(), {}
+    def preview():
+        with use_ephemeris_tier("moshier"):
+            inside.set(); release.wait(5)
+            seen["preview"] = ephemeris_tier.get_ephemeris_flag()
+    worker = threading.Thread(target=preview)
+    worker.start(); inside.wait(5)
+    seen["other"] = ephemeris_tier.get_ephemeris_flag() # Another report while the preview runs
+    with use_ephemeris_tier("swiss"):
+        release.set(); worker.join(5)
+    assert seen == {"preview": swe.FLG_MOSEPH, "other": swe.FLG_SWIEPH}
+    assert get_ephemeris_tier() == "swiss"
+
+
+def test_moshier_chart_is_file_free(monkeypatch):
+    calc._geopy_available = False
+    calls = []
+    real_calc_ut = swe.calc_ut
+    monkeypatch.setattr(swe, "calc_ut", lambda jd, body, flags=swe.FLG_SWIEPH: calls.append(flags) or real_calc_ut(jd, body, flags))
+    monkeypatch.setattr(swe, "fixstar_ut", lambda *a: pytest.fail("fixed stars need sefstars.txt"))
+    chart = calc.calculate_pet_chart(**BIRTH, ephemeris_tier="moshier", include_asteroid_catalog=True)
+    assert calls and all(flags & swe.FLG_MOSEPH and not flags & swe.FLG_SWIEPH for flags in calls)
+    assert chart["calculation_info"]["ephemeris_tier"] == "moshier"
+    assert chart["positions"]["Chiron"]["sign"] == "Error (Moshier Tier)"
+    assert chart["positions"]["Sun"]["sign"] == "Gemini"
+    assert get_ephemeris_tier() == "swiss"
+
+
+def test_benchmark_report_shape():
+    report = benchmark_ephemeris_tiers(jds=[2451545.0, 2460000.5], bodies={"Sun": swe.SUN, "Moon": swe.MOON})
+    assert report["samples"] == 2 and set(report["timing"]) == {"swiss", "moshier"}
+    assert set(report["max_deviation_arcsec"]) == {"Sun", "Moon"}
+    # Moshier agrees with the Swiss files to a few arcseconds (exactly 0 without installed files)
+    assert max(report["max_deviation_arcsec"].values()) < 10.0
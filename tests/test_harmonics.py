@@ -0,0 +1,48 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+
+import numpy as np
+import pytest
+
+from harmonics import (
+    find_harmonic_conjunctions, format_harmonics_for_prompt, harmonic_chart, harmonic_matrix,
+    strongest_harmonic_signatures,
+)
+
+POSITIONS = {
+    "Sun": {"degree": 10.0, "sign": "Aries"}, "Moon": {"degree": 82.5, "sign": "Gemini"},     # Quintile, 0.5 off
+    "Venus": {"degree": 154.0, "sign": "Virgo"},                                              # BiQuintile to Sun
+    "Mars": {"degree": 190.0, "sign": "Libra"},                                               # Opposite the Sun
+    "Saturn": {"degree": 301.0, "sign": "Aquarius"}, "Chiron": {"degree": None, "sign": "Error"},
+}
+
+
+def test_matrix_matches_per_harmonic_loop():
+    degrees = np.array([10.0, 82.5, 154.0, 359.9])
+    matrix = harmonic_matrix(degrees, 9)
+    assert matrix.shape == (9, 4)
+    for h in range(1, 10):
+        assert np.allclose(matrix[h - 1], [(d * h) % 360.0 for d in degrees])
+    assert harmonic_chart(POSITIONS, 5)["Moon"]["degree"] == pytest.approx((82.5 * 5) % 360.0)
+
+
+def test_conjunctions_only_in_primary_harmonics():
+    found = find_harmonic_conjunctions(POSITIONS, 12)
+    pairs = lambda h: {(c["point1"], c["point2"]) for c in found[h]}
+    assert ("Sun", "Moon") in pairs(5) and ("Sun", "Venus") in pairs(5)
+    assert ("Sun", "Mars") in pairs(2) and ("Sun", "Mars") not in pairs(4) and ("Sun", "Mars") not in pairs(10)
+    assert ("Sun", "Moon") not in pairs(10) # Quintile is conjunct in H10 too, but belongs to H5
+    sun_moon = next(c for c in found[5] if c["point2"] == "Moon")
+    assert sun_moon["orb"] == pytest.approx(2.5) and sun_moon["natal_angle"] == 72.0
+    assert sun_moon["strength"] == pytest.approx(1 - 2.5 / 10.0) # Luminary conjunction orb from ORB_SETTINGS
+    assert all("Chiron" not in (c["point1"], c["point2"]) for cs in found.values() for c in cs)
+
+
+def test_signatures_are_ranked_and_formatted():
+    signatures = strongest_harmonic_signatures(POSITIONS, 12, top=3)
+    scores = [s["score"] for s in signatures]
+    assert scores == sorted(scores, reverse=True) and len(signatures) <= 3
+    assert signatures[0]["harmonic"] == 5 and {"Sun", "Moon", "Venus"} <= set(signatures[0]["points"])
+    text = format_harmonics_for_prompt(signatures)
+    assert text.startswith("H5 (creativity and style)")
+    assert format_harmonics_for_prompt([]) == "None"
@@ -0,0 +1,50 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+import time
+from datetime import date
+
+import pytest
+import swisseph as swe
+
+import heliacal
+from heliacal import add_heliacal_dates, compute_heliacal_table, heliacal_dates
+from star_coordinates import star_ecliptic_of_date
+
+
+def test_catalog_longitudes_match_published_j2000_positions():
+    names, lon, _ = star_ecliptic_of_date(2451545.0, ["Regulus", "Spica", "Aldebaran", "Algol"])
+    for name, degree, expected in zip(names, lon, (149.83, 203.84, 69.79, 56.17)):
+        assert degree == pytest.approx(expected, abs=0.05), name
+
+
+def test_sirius_rises_heliacally_in_early_august_in_egypt():
+    phases = heliacal_dates("Sirius", 2000, 30.0)
+    assert phases["source"] == "table" and phases["status"] == "ok"
+    assert date(2000, 7, 28) <= date.fromisoformat(phases["rising"]) <= date(2000, 8, 8)
+    assert date.fromisoformat(phases["setting"]) < date.fromisoformat(phases["rising"])
+
+
+def test_circumpolar_and_hidden_stars_have_no_phases():
+    assert heliacal_dates("Dubhe", 2000, 51.5)["status"] == "circumpolar"
+    hidden = heliacal_dates("Canopus", 2000, 51.5)
+    assert hidden["status"] == "never_rises" and hidden["rising"] is None
+
+
+def test_table_is_fast_and_live_fallback_is_cached(monkeypatch):
+    start = time.perf_counter()
+    table = compute_heliacal_table(1985)
+    assert time.perf_counter() - start < 0.5 and table["rising"].shape == (45, 25)
+
+    calls = []
+    def fake_heliacal_ut(jd, geopos, atmo, observer, star, event_type, flags):
+        calls.append((star, geopos[1], event_type))
+        return (swe.julday(1985, 3 + event_type, 10, 4.0),)
+    monkeypatch.setattr(swe, "heliacal_ut", fake_heliacal_ut)
+    heliacal._live_cache.clear()
+    for lat in (68.0, 69.0):
+        phases = heliacal_dates("Vega", 1985, lat)
+    assert phases["source"] == "live" and phases["rising"] == "1985-04-10"
+    assert len(calls) == 2 # One call per event type; 68 and 69 share the 70 degree band
+
+    links = add_heliacal_dates([{"star": "Spica", "linked_planet": "Sun"}], 1985, 40.7)
+    assert links[0]["heliacal_rising"] == heliacal_dates("Spica", 1985, 40.7)["rising"]
@@ -0,0 +1,33 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+
+import numpy as np
+import pytest
+import swisseph as swe
+from house_grid import compute_house_grid
+
+JD_UT = 2448058.2708 # 1990-06-15 18:30 UT
+
+def _angle_diff(a, b):
+    return np.abs((np.asarray(a) - np.asarray(b) + 180.0) % 360.0 - 180.0)
+
+@pytest.mark.parametrize("house_system,max_lat", [(b"P", 66.0), (b"O", 89.0), (b"E", 89.0), (b"W", 89.0)])
+def test_matches_swe_houses(house_system, max_lat):
+    lats, lngs = np.meshgrid(np.arange(-max_lat, max_lat + 0.1, 3.0), np.arange(-180.0, 180.0, 10.0))
+    lats, lngs = lats.ravel(), lngs.ravel()
+    grid = compute_house_grid(JD_UT, lats, lngs, house_system)
+    for i, (lat, lng) in enumerate(zip(lats, lngs)):
+        cusps, ascmc = swe.houses(JD_UT, lat, lng, house_system)
+        assert _angle_diff(grid["cusps"][i], cusps[:12]).max() < 1e-5, (lat, lng)
+        assert _angle_diff(grid["ascendant"][i], ascmc[0]) < 1e-8
+        assert _angle_diff(grid["mc"][i], ascmc[1]) < 1e-8
+        assert _angle_diff(grid["armc"][i], ascmc[2]) < 1e-8
+
+def test_polar_placidus_falls_back_to_porphyry():
+    grid_p = compute_house_grid(JD_UT, [70.0], [10.0], b"P")
+    grid_o = compute_house_grid(JD_UT, [70.0], [10.0], b"O")
+    assert np.allclose(grid_p["cusps"], grid_o["cusps"])
+
+def test_unsupported_system():
+    with pytest.raises(ValueError):
+        compute_house_grid(JD_UT, [0.0], [0.0], b"K")
@@ -0,0 +1,49 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+
+import json
+
+from interpretation_index import DEFAULT_INTERP, build_interpretation_index
+
+
+def _write(directory, group, data):
+    with open(os.path.join(directory, f"{group}.json"), "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def test_flat_and_nested_keys_resolve_in_any_spelling(tmp_path):
+    _write(tmp_path, "house", {"house_1": {"corethemes": "Self and identity"}, "houses": {"1": {"core_themes": "Deep"}}})
+    _write(tmp_path, "aspect_patterns", {"Grand Trine": {"themes": "Flow and ease"}})
+    _write(tmp_path, "dominant", {"fire": "Flat wins", "dominant": {"fire": "Nested"}, "dominant_fire": ""})
+    index = build_interpretation_index(str(tmp_path), expected_keys=[])
+    assert index.get("House", "house_1_corethemes") == "Self and identity"
+    assert index.get("house", "houses_1_core_themes") == "Deep"
+    assert index.get("aspect patterns", "Grand-Trine_themes") == "Flow and ease"
+    assert index.get("dominant", "dominant_fire") == "Nested" # Empty flat value falls through to the nested path
+    assert index.get("dominant", "fire") == "Flat wins"
+    assert index.get("house", "house_9_corethemes") == DEFAULT_INTERP and index.get("house", None, default=None) is None
+
+
+def test_aspect_groups_map_to_aspects_file(tmp_path):
+    _write(tmp_path, "aspects", {"moon_sun_trine": "Heart and will agree"})
+    index = build_interpretation_index(str(tmp_path), expected_keys=[])
+    assert index.get("major", "moon_sun_trine") == index.get("declination", "Moon_Sun_Trine") == "Heart and will agree"
+    assert ("minor", "moon_sun_trine") in index and ("minor", "moon_sun_square") not in index
+
+
+def test_build_reports_missing_and_placeholder_keys(tmp_path):
+    _write(tmp_path, "planets", {"sun": {"coretheme": "Vitality"}, "moon": {"coretheme": "[AUTO-PLACEHOLDER]"}})
+    _write(tmp_path, "world_cities", {"cities": [{"name": "Paris"}]})
+    (tmp_path / "broken.json").write_text("{not json", encoding="utf-8")
+    index = build_interpretation_index(str(tmp_path), expected_keys=[
+        ("planets", "sun_coretheme"), ("planets", "moon_coretheme"), ("planets", "mars_coretheme"), ("nodes", "northnode_sign_leo")])
+    assert index.files == ("planets.json",)
+    assert index.unresolved == {"missing": {"planets": ["mars_coretheme"], "nodes": ["northnode_sign_leo"]},
+                                "placeholder": {"planets": ["moon_coretheme"]}}
+
+
+def test_repo_data_resolves_core_lookups():
+    index = build_interpretation_index()
+    assert index.get("dignity", "sun_rulership") != DEFAULT_INTERP
+    assert index.get("element", "dominant_fire") != DEFAULT_INTERP
+    assert set(index.unresolved) == {"missing", "placeholder"}
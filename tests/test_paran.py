@@ -0,0 +1,53 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+
+import numpy as np
+import pytest
+import swisseph as swe
+
+from paran import (
+    PARAN_EVENTS, angular_event_lst, calculate_chart_parans, compute_paran_events, find_parans, format_parans_for_prompt,
+)
+
+JD = swe.julday(1990, 6, 15, 18.5)
+LAT = 40.7
+
+
+def test_rising_and_setting_lst_put_bodies_on_the_horizon():
+    events = compute_paran_events(JD, LAT)
+    star_ra, star_dec = 101.29, -16.72 # Sirius, roughly of date
+    lst = angular_event_lst([star_ra], [star_dec], LAT)[0]
+    gst0 = swe.sidtime(JD) * 15.0
+    for column in (0, 2):
+        jd = JD + ((lst[column] - gst0) % 360.0) / 360.98564736629 # Greenwich meridian: LST = GST
+        azimuth, altitude, _ = swe.azalt(jd, swe.EQU2HOR, (0.0, LAT, 0), 0, 0, (star_ra, star_dec, 1))
+        assert altitude == pytest.approx(0.0, abs=0.01)
+        assert (azimuth > 180.0) == (PARAN_EVENTS[column] == "rising")
+    assert events["planet_lst"].shape == (10, 4) and events["star_lst"].shape == (45, 4)
+
+
+def test_sorted_matching_equals_brute_force():
+    parans = find_parans(JD, LAT, orb_minutes=4.0)
+    events = compute_paran_events(JD, LAT)
+    expected = 0
+    for s in range(len(events["stars"])):
+        for a in range(4):
+            for p in range(len(events["planets"])):
+                for b in range(4):
+                    gap = abs((events["star_lst"][s, a] - events["planet_lst"][p, b] + 180.0) % 360.0 - 180.0)
+                    if gap <= 1.0 and not (a == 3 and b in (1, 3)):
+                        expected += 1
+    assert len(parans) == expected > 0
+    assert all(p["orb_minutes"] <= 4.0 for p in parans)
+    assert [p["orb_minutes"] for p in parans] == sorted(p["orb_minutes"] for p in parans)
+
+
+def test_chart_wrapper_and_prompt_text():
+    chart = {"calculation_info": {"jd_ut": JD}, "birth_details": {"latitude": LAT}}
+    parans = calculate_chart_parans(chart, orb_minutes=2.0)
+    assert parans and parans == find_parans(JD, LAT, orb_minutes=2.0)
+    assert calculate_chart_parans({"calculation_info": {"jd_ut": JD}, "birth_details": {}}) == []
+    text = format_parans_for_prompt(parans, max_parans=3)
+    assert text.count("\n") == 2 and " as " in text
+    assert format_parans_for_prompt([]) == "None"
+    assert np.isnan(angular_event_lst([10.0], [80.0], 60.0)[0, 0]) # Circumpolar: no rising
@@ -0,0 +1,58 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+
+import pytest
+import swisseph as swe
+
+import advanced_calculate_astrology as calc
+import progressions
+from progressions import PROGRESSED_BODIES, progressed_chart, progressed_longitudes, progressed_timeline
+
+calc._geopy_available = False
+CHART = calc.calculate_chart(1990, 6, 15, 14, 30, 40.7128, -74.0060, "New York", "USA", "America/New_York", "F", None,
+                             skip_fixed_stars=True)
+NATAL_JD = CHART["calculation_info"]["jd_ut"]
+
+
+def test_interpolated_positions_match_swiss_ephemeris():
+    ages = [0.0, 12.37, 45.81]
+    longitudes = progressed_longitudes(NATAL_JD, ages) % 360.0
+    for row, age in zip(longitudes, ages):
+        for column, body_id in enumerate(PROGRESSED_BODIES.values()):
+            expected = swe.calc_ut(NATAL_JD + age, body_id)[0][0]
+            assert (row[column] - expected + 180.0) % 360.0 - 180.0 == pytest.approx(0.0, abs=1e-3)
+    with pytest.raises(ValueError):
+        progressed_longitudes(NATAL_JD, [-1.0])
+
+
+def test_progressed_chart_moves_sun_about_a_degree_a_year():
+    progressed = progressed_chart(CHART, "2020-06-15")
+    assert progressed["age_years"] == pytest.approx(30.0, abs=0.01)
+    arc = (progressed["positions"]["Sun"]["degree"] - CHART["positions"]["Sun"]["degree"]) % 360.0
+    assert 28.0 < arc < 30.0
+    mc_arc = (progressed["positions"]["Midheaven"]["degree"] - CHART["angles"]["Midheaven"]["degree"]) % 360.0
+    assert mc_arc == pytest.approx(arc, abs=2.0) # Solar arc in ARMC, close to the arc in longitude
+    assert all(a["orb"] <= 1.0 for a in progressed["aspects_to_natal"])
+    assert progressed_chart({"calculation_info": {}, "birth_details": {}}, "2020-01-01").get("error")
+
+
+def test_timeline_events_agree_with_progressed_chart():
+    timeline = progressed_timeline(CHART, 2000, 2030)
+    assert [y["year"] for y in timeline["years"]] == list(range(2000, 2031))
+    ingresses = [e for e in timeline["events"] if e["type"] == "sign_change" and e["point"] == "Moon"]
+    assert len(ingresses) >= 2 # The progressed Moon changes sign every ~2.5 years
+    event = ingresses[0]
+    y, m, d = (int(part) for part in event["date"].split("-"))
+    before = swe.julday(y, m, d, 12.0) - 20
+    after = swe.julday(y, m, d, 12.0) + 20
+    assert progressed_chart(CHART, "%04d-%02d-%02d" % swe.revjul(before)[:3])["positions"]["Moon"]["sign"] == event["from"]
+    assert progressed_chart(CHART, "%04d-%02d-%02d" % swe.revjul(after)[:3])["positions"]["Moon"]["sign"] == event["to"]
+    assert {"sign_change", "house_change", "aspect"} <= {e["type"] for e in timeline["events"]}
+
+
+def test_daily_table_is_built_once_per_chart():
+    progressions._daily_ephemeris.cache_clear()
+    progressed_chart(CHART, "2010-01-01")
+    progressed_timeline(CHART, 2005, 2015)
+    info = progressions._daily_ephemeris.cache_info()
+    assert info.misses == 1 and info.hits >= 2
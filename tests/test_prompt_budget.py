@@ -0,0 +1,58 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+import json
+
+import pytest
+
+from prompt_budget import (DEDUPE_MARKER, MAX_LIST_ITEMS, MIN_PROMPT_TOKENS, compact_value, estimate_prompt_tokens,
+                           fit_prompt_to_budget, format_budget_report, section_token_budget)
+
+LONG = "Your Sun in Leo radiates warmth and creative confidence. It asks to be seen and celebrated. " * 3
+
+
+def _aspects(n):
+    return json.dumps([{"planet1": "Sun", "planet2": f"P{i}", "orb": 6.5 - 0.5 * i, "interpretation": f"{LONG}({i})"} for i in range(n)])
+
+
+def test_budget_follows_word_count_with_floor_and_override():
+    assert section_token_budget(600) == 2400 and section_token_budget(100) == MIN_PROMPT_TOKENS
+    assert section_token_budget(None) == section_token_budget("not a number") >= MIN_PROMPT_TOKENS
+    assert section_token_budget(600, override=900) == 900
+    assert estimate_prompt_tokens("x" * 400) == 100
+
+
+def test_prompt_within_budget_is_formatted_untouched():
+    template = "Write about {name}: {sun_sign_interp}"
+    prompt, report = fit_prompt_to_budget(template, {"name": "Jane", "sun_sign_interp": LONG}, budget_tokens=1000, section="05")
+    assert prompt == template.format(name="Jane", sun_sign_interp=LONG)
+    assert report["before"] == report["after"] and report["actions"] == [] and report["within_budget"]
+    with pytest.raises(KeyError):
+        fit_prompt_to_budget(template, {"name": "Jane"}, budget_tokens=1000)
+
+
+def test_compaction_dedupes_then_trims_low_priority_first():
+    context = {"name": "Jane", "sun_sign": "Leo", "sun_sign_interp": LONG, "sun_house_interp": LONG,
+               "all_aspect_interps_json": _aspects(12)}
+    template = "{name} has the Sun in {sun_sign}. {sun_sign_interp} House: {sun_house_interp} Aspects: {all_aspect_interps_json}"
+    prompt, report = fit_prompt_to_budget(template, context, budget_tokens=400, section="09_Planetary_Analysis")
+    assert report["after"] < report["before"] and report["within_budget"]
+    assert report["actions"][0] == "dedupe:sun_house_interp" and f"House: {DEDUPE_MARKER}" in prompt
+    assert prompt.startswith(f"Jane has the Sun in Leo. {LONG}") # Higher-priority text and chart facts kept verbatim
+    aspects = json.loads(prompt.split("Aspects: ")[1])
+    assert len(aspects) == MAX_LIST_ITEMS and [a["orb"] for a in aspects] == [1.0, 1.5, 2.0] # Tightest orbs kept
+
+    unchanged, off = fit_prompt_to_budget(template, context, budget_tokens=400, compact=False)
+    assert off["after"] == off["before"] == report["before"] and not off["within_budget"]
+    assert report["actions"][-1] == "drop:all_aspect_interps_json" and "truncate:all_aspect_interps_json" in report["actions"]
+    assert compact_value(_aspects(2), "dedupe") == _aspects(2) and compact_value("short text", "truncate") == "short text"
+
+
+def test_budget_report_table_has_before_after_and_totals():
+    table = format_budget_report([
+        {"section": "05_Core_Essence", "budget": 1000, "before": 3669, "after": 631, "within_budget": True},
+        {"section": "10_Celestial_Poetry", "budget": 2400, "before": 2380, "after": 2380, "within_budget": True},
+        None])
+    lines = table.splitlines()
+    assert lines[0].split() == ["Section", "Budget", "Before", "After", "Saved"]
+    assert lines[1].split() == ["05_Core_Essence", "1000", "3669", "631", "3038"]
+    assert lines[-1].split()[:4] == ["TOTAL", "6049", "3011", "3038"] and "(50% saved)" in lines[-1]
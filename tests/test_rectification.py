@@ -0,0 +1,60 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+
+import numpy as np
+import pytest
+import swisseph as swe
+import advanced_calculate_astrology as calc
+from rectification import INTERPOLATED_BODIES, interpolate_slow_bodies, scan_birth_time_window
+from vectorized_astro import build_house_index, houses_for_degree_rows, houses_for_degrees
+
+PLACE = dict(lat=40.7128, lng=-74.0060, tz_str="America/New_York")
+
+
+def _segment_at(scan, hhmm):
+    return next(s for s in scan["segments"] if s["start"] <= hhmm <= s["end"])
+
+
+def test_interpolated_bodies_match_direct_calculation():
+    jds = np.linspace(2448057.5, 2448058.5, 97)
+    names, longitudes = interpolate_slow_bodies(jds)
+    for b, name in enumerate(names):
+        for i in (0, 31, 60, 96):
+            direct = swe.calc_ut(jds[i], INTERPOLATED_BODIES[name], swe.FLG_SWIEPH)[0][0]
+            assert abs((longitudes[i, b] - direct + 180.0) % 360.0 - 180.0) < 1e-5, name
+
+
+def test_scan_matches_full_charts():
+    calc._geopy_available = False
+    scan = scan_birth_time_window(1990, 6, 15, **PLACE)
+    assert scan["samples"] == 1440 and scan["segments"][0]["start"] == "00:00" and scan["segments"][-1]["end"] == "23:59"
+    assert sum(s["minutes"] for s in scan["segments"]) == 1440
+    for hour, minute in ((3, 17), (9, 45), (18, 2)):
+        chart = calc.calculate_chart(1990, 6, 15, hour, minute, city="New York", country="USA", gender="U",
+                                     ephemeris_path_used=None, skip_fixed_stars=True, **PLACE)
+        segment = _segment_at(scan, f"{hour:02d}:{minute:02d}")
+        assert segment["ascendant_sign"] == chart["angles"]["Ascendant"]["sign"]
+        assert segment["midheaven_sign"] == chart["angles"]["Midheaven"]["sign"]
+        assert segment["moon_sign"] == chart["positions"]["Moon"]["sign"]
+        assert segment["moon_house"] == chart["positions"]["Moon"]["house"]
+        for name, house in segment["houses"].items():
+            assert house == chart["positions"][name]["house"], name
+
+
+def test_changes_and_validation():
+    scan = scan_birth_time_window(1990, 6, 15, start_time="06:00", end_time="10:00", step_minutes=5, **PLACE)
+    assert scan["samples"] == 49
+    asc_changes = [c for c in scan["changes"] if c["feature"] == "Ascendant sign"]
+    assert asc_changes and all(c["from"] != c["to"] for c in asc_changes)
+    with pytest.raises(ValueError):
+        scan_birth_time_window(1990, 6, 15, start_time="10:00", end_time="09:00", **PLACE)
+    with pytest.raises(ValueError):
+        scan_birth_time_window(1990, 6, 15, 40.0, -74.0, "Mars/Olympus_Mons")
+
+
+def test_house_rows_match_single_index():
+    cusps = np.array([[(15.0 + 31.0 * i) % 360 for i in range(12)], [(200.0 + 30.0 * i) % 360 for i in range(12)]])
+    degrees = np.array([[15.0, 14.9, 350.0], [200.0, 10.0, 199.0]])
+    rows = houses_for_degree_rows(degrees, cusps)
+    for r in range(2):
+        assert rows[r].tolist() == houses_for_degrees(degrees[r], build_house_index(cusps[r])).tolist()
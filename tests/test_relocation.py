@@ -0,0 +1,53 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+
+import pytest
+import advanced_calculate_astrology as calc
+from relocation import relocate_chart
+
+BIRTH = dict(year=1990, month=6, day=15, hour=14, minute=30, city="New York", country="USA",
+             tz_str="America/New_York", gender="Female", ephemeris_path_used=None, skip_fixed_stars=True)
+
+@pytest.fixture(scope="module")
+def natal_chart():
+    calc._geopy_available = False
+    return calc.calculate_chart(lat=40.7128, lng=-74.0060, **BIRTH)
+
+def test_relocated_matches_full_recalculation(natal_chart):
+    london = calc.calculate_chart(lat=51.5074, lng=-0.1278, **BIRTH)
+    relocated = relocate_chart(natal_chart, [{"lat": 51.5074, "lng": -0.1278, "city": "London", "country": "UK"}])[0]
+    assert relocated["house_info"]["cusps"] == pytest.approx(london["house_info"]["cusps"])
+    for name, data in london["positions"].items():
+        if data.get("degree") is not None:
+            assert relocated["positions"][name]["house"] == data["house"], name
+            assert relocated["positions"][name]["degree"] == pytest.approx(data["degree"]), name
+    for part_name, part in london["other_points"].items():
+        assert relocated["other_points"][part_name]["degree"] == pytest.approx(part["degree"]), part_name
+        assert relocated["other_points"][part_name]["house"] == part["house"], part_name
+    assert relocated["house_rulers"] == london["house_rulers"]
+    assert relocated["aspects"] == london["aspects"]
+    assert relocated["declination_aspects"] == london["declination_aspects"]
+    assert relocated["declination_aspects"]["Ascendant"] # Angle parallels are part of both charts
+    assert relocated["aspect_patterns"] == london["aspect_patterns"]
+    assert len(relocated["house_info"]["ascmc_raw"]) == len(london["house_info"]["ascmc_raw"])
+    assert relocated["house_info"]["ascmc_raw"][:3] == pytest.approx(london["house_info"]["ascmc_raw"][:3])
+    assert relocated["chart_signatures"] == london["chart_signatures"]
+    assert relocated["birth_details"]["city"] == "London"
+
+def test_relocating_to_birth_place_reproduces_natal_chart(natal_chart):
+    home = relocate_chart(natal_chart, [(40.7128, -74.0060)])[0]
+    for name in ("Ascendant", "Midheaven"):
+        assert home["angles"][name]["declination"] == pytest.approx(natal_chart["angles"][name]["declination"])
+    for key in ("aspects", "declination_aspects", "aspect_patterns", "house_rulers"):
+        assert home[key] == natal_chart[key], key
+
+def test_natal_chart_left_untouched(natal_chart):
+    before = natal_chart["positions"]["Sun"]["house"], natal_chart["angles"]["Ascendant"]["degree"]
+    results = relocate_chart(natal_chart, [(-33.87, 151.21), (35.68, 139.69)])
+    assert len(results) == 2 and all("error" not in r for r in results)
+    assert (natal_chart["positions"]["Sun"]["house"], natal_chart["angles"]["Ascendant"]["degree"]) == before
+
+def test_without_aspect_recompute_angle_dependent_data_stays_natal(natal_chart):
+    relocated = relocate_chart(natal_chart, [(51.5074, -0.1278)], recompute_aspects=False)[0]
+    for key in ("aspects", "declination_aspects", "aspect_patterns", "fixed_star_links"):
+        assert relocated[key] is natal_chart[key], key
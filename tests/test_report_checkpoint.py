@@ -0,0 +1,46 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+import json
+import threading
+
+from report_checkpoint import SectionCheckpoint, order_checkpoint_id
+
+
+def _section(sid, text, error=False):
+    return {"section_id": sid, "header": sid.title(), "ai_generated_content": text, "error_flag": error}
+
+
+def test_order_id_is_stable_and_filename_safe():
+    birth = {"year": 1990, "month": 6, "day": 15, "house_system": b"P"}
+    first = order_checkpoint_id("Jane Doe/Smith", birth, "birthday", False)
+    assert first == order_checkpoint_id("Jane Doe/Smith", dict(birth), "birthday", False)
+    assert first.startswith("Jane_Doe_Smith_") and os.sep not in first
+    assert first != order_checkpoint_id("Jane Doe/Smith", birth, "anniversary", False)
+
+
+def test_sections_survive_a_crash_and_only_missing_failed_or_stale_are_pending(tmp_path):
+    checkpoint = SectionCheckpoint("order1", checkpoint_dir=str(tmp_path))
+    checkpoint.reset(client_name="Jane", output_path="out.pdf")
+    threads = [threading.Thread(target=checkpoint.save_section, args=(f"{i:02d}_S", _section(f"{i:02d}_S", f"Text {i}"), f"h{i}"))
+               for i in range(8)]
+    [t.start() for t in threads]; [t.join() for t in threads]
+    checkpoint.save_section("08_S", _section("08_S", "[ERROR: OpenAI API Error]", error=True), "h8")
+
+    reloaded = SectionCheckpoint("order1", checkpoint_dir=str(tmp_path)) # A fresh process after the crash
+    assert reloaded.meta["output_path"] == "out.pdf" and len(reloaded.sections()) == 9
+    assert reloaded.pending([f"{i:02d}_S" for i in range(10)]) == ["08_S", "09_S"]
+    assert reloaded.reusable("03_S", "h3")["ai_generated_content"] == "Text 3"
+    assert reloaded.reusable("03_S", "changed") is None and reloaded.reusable("08_S", "h8") is None
+    assert list(reloaded.sections(order=["05_S", "01_S", "99_S"])) == ["05_S", "01_S"]
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_reset_and_unreadable_checkpoint_start_over(tmp_path):
+    checkpoint = SectionCheckpoint("order2", checkpoint_dir=str(tmp_path))
+    checkpoint.save_section("01_S", _section("01_S", "Text"))
+    checkpoint.reset(status="generating")
+    assert checkpoint.sections() == {} and json.loads((tmp_path / "order2.json").read_text())["meta"]["status"] == "generating"
+    (tmp_path / "order2.json").write_text("{truncated")
+    assert not SectionCheckpoint("order2", checkpoint_dir=str(tmp_path)).sections()
+    checkpoint.clear()
+    assert not checkpoint.exists()
@@ -0,0 +1,56 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+import time
+from types import SimpleNamespace
+
+import human_report
+from ai_concurrency import run_sections_concurrently
+from report_pipeline import SectionLayoutPipeline, stream_completion
+
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def test_stream_completion_joins_deltas_from_v1_and_v0_chunks():
+    seen = []
+    def create(stream, **kwargs):
+        assert stream and kwargs["model"] == "gpt-4-turbo"
+        return iter([_chunk(None), _chunk("  Your Sun "), {"choices": [{"delta": {"content": "in Leo."}}]}, {"choices": []}])
+    assert stream_completion(create, on_delta=seen.append, model="gpt-4-turbo") == "Your Sun in Leo."
+    assert seen == ["  Your Sun ", "in Leo."]
+
+
+def test_layout_overlaps_generation_and_keeps_report_order():
+    delays = {f"{i:02d}_Section": 0.05 * (6 - i) for i in range(6)} # Later sections land first
+    laid_out = []
+    def layout(key, text):
+        time.sleep(0.03)
+        laid_out.append(key)
+        return [f"{key}:{text}"]
+    pipeline = SectionLayoutPipeline(layout, list(delays) + ["99_Missing"])
+    failed = lambda key, e: "[ERROR]"
+    def worker(delay):
+        time.sleep(delay)
+        if delay == 0.1:
+            raise RuntimeError("API down")
+        return delay
+    run_sections_concurrently(delays.items(), worker, max_concurrency=6, on_error=failed, on_result=pipeline.submit)
+    results = pipeline.results()
+    assert [r[0].split(":")[0] for r in results] == list(delays) and results[4] == ["04_Section:[ERROR]"]
+    assert laid_out[0] == "05_Section" # Laid out in arrival order
+    assert pipeline.metrics["sections"] == 6 and pipeline.metrics["hidden_seconds"] > pipeline.metrics["tail_seconds"]
+
+
+def test_streamed_human_pdf_matches_sequential_build(tmp_path):
+    sections = [{'header': f'Chapter {i}', 'ai_content': f'**Insight** {i}.\n\n' + 'Text. ' * 300, 'quote': 'As above.'} for i in range(4)]
+    paths = dict(occasion_style_key="birthday", assets_base_dir="assets", fonts_base_dir="fonts", data_jsons_dir="Data jsons")
+    assert human_report.generate_human_pdf(str(tmp_path / "sequential.pdf"), "Jane", sections, **paths)
+
+    layout = human_report.prepare_human_pdf(str(tmp_path / "streamed.pdf"), "Jane", **paths)
+    pipeline = SectionLayoutPipeline(lambda i, s: human_report.build_section_flowables(layout, s, i, len(sections)), range(4))
+    for i in (2, 0, 3, 1):
+        pipeline.submit(i, sections[i])
+    assert human_report.assemble_human_pdf(layout, pipeline.results())
+    sequential_pages = (tmp_path / "sequential.pdf").read_bytes().count(b"/Type /Page\n")
+    assert layout['doc'].page > 4 and (tmp_path / "streamed.pdf").read_bytes().count(b"/Type /Page\n") == sequential_pages
@@ -0,0 +1,44 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+
+import pytest
+import swisseph as swe
+import advanced_calculate_astrology as calc
+from sidereal_chart import SWE_DEFAULT_SID_MODE, derive_sidereal_chart, get_ayanamsa
+
+@pytest.fixture(scope="module")
+def tropical_chart():
+    calc._geopy_available = False
+    return calc.calculate_chart(1990, 6, 15, 14, 30, 40.7128, -74.0060, "New York", "USA",
+                                "America/New_York", "Female", None, skip_fixed_stars=True)
+
+@pytest.mark.parametrize("ayanamsa,sid_mode", [
+    ("Lahiri", swe.SIDM_LAHIRI),
+    ("Fagan-Bradley", swe.SIDM_FAGAN_BRADLEY),
+])
+def test_matches_swisseph_sidereal(tropical_chart, ayanamsa, sid_mode):
+    sidereal = derive_sidereal_chart(tropical_chart, ayanamsa)
+    swe.set_sid_mode(sid_mode, 0, 0)
+    jd_ut = tropical_chart["calculation_info"]["jd_ut"]
+    for name, body in [("Sun", swe.SUN), ("Moon", swe.MOON), ("Saturn", swe.SATURN)]:
+        expected = swe.calc_ut(jd_ut, body, swe.FLG_SIDEREAL)[0][0]
+        assert sidereal["positions"][name]["degree"] == pytest.approx(expected, abs=1e-6)
+    assert sidereal["calculation_info"]["zodiac"] == "Sidereal"
+
+def test_houses_and_aspects_carry_over(tropical_chart):
+    sidereal = derive_sidereal_chart(tropical_chart)
+    for name, pos in sidereal["positions"].items():
+        if pos.get("degree") is not None:
+            assert pos["house"] == tropical_chart["positions"][name]["house"]
+    assert sidereal["aspects"] == tropical_chart["aspects"]
+    assert tropical_chart["calculation_info"]["zodiac"] == "Tropical"
+
+def test_unknown_ayanamsa(tropical_chart):
+    assert "error" in derive_sidereal_chart(tropical_chart, "Unknown")
+
+def test_ayanamsa_lookup_resets_sidereal_mode():
+    jd_ut = 2451545.25 # Not used elsewhere, so get_ayanamsa's cache is missed
+    swe.set_sid_mode(SWE_DEFAULT_SID_MODE, 0, 0)
+    default_value = swe.get_ayanamsa_ut(jd_ut)
+    assert get_ayanamsa(jd_ut, "Lahiri") != pytest.approx(default_value, abs=0.1)
+    assert swe.get_ayanamsa_ut(jd_ut) == default_value
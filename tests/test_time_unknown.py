@@ -0,0 +1,43 @@
+import os, sys
+sys.path.insert(0, os.getcwd())
+
+import pytest
+import swisseph as swe
+import advanced_calculate_astrology as calc
+from prompt_definitions import HUMAN_PROMPTS
+
+BIRTH = dict(year=1990, month=6, day=15, hour=None, minute=None, lat=40.7128, lng=-74.0060, city="New York",
+             country="USA", tz_str="America/New_York", gender="Female", ephemeris_path_used=None, skip_fixed_stars=True)
+
+
+def test_solar_chart_has_sun_on_first_cusp_and_no_angles(monkeypatch):
+    calc._geopy_available = False
+    monkeypatch.setattr(swe, "houses", lambda *a: pytest.fail("quadrant houses need a birth time"))
+    chart = calc.calculate_chart(**BIRTH, time_unknown=True)
+    sun = chart["positions"]["Sun"]
+    assert chart["house_info"]["cusps"][0] == pytest.approx(sun["degree"]) and sun["house"] == 1
+    assert chart["angles"] == {} and "Ascendant" not in chart["positions"]
+    assert chart["birth_details"]["hour"] == 12 and chart["birth_details"]["time_unknown"] is True
+    assert chart["birth_details"]["chart_ruler"] == "Unknown (Time Unknown)"
+    assert chart["other_points"]["Part of Fortune"]["degree"] is None
+    assert not any("Ascendant" in key or "Midheaven" in key for key in chart["midpoints"])
+    assert not any(a.get("planet2") in calc.ANGLE_POINTS for aspects in chart["aspects"].values() for a in aspects)
+    assert chart["birth_details"]["moon_sign_range"] == ["Pisces"]
+    assert "Chart Ruler" in chart["calculation_info"]["skipped_features"]
+
+
+def test_pet_chart_without_birth_time_uses_whole_sign_houses():
+    calc._geopy_available = False
+    chart = calc.calculate_pet_chart(birth_date="2015-03-02", lat=51.5, lng=-0.12, city="London", country="UK",
+                                     tz_str="Europe/London", ephemeris_path_used=None, time_unknown_houses="whole_sign")
+    assert chart["birth_details"]["house_system"] == "Solar Whole Sign"
+    assert chart["house_info"]["cusps"][:2] == [330.0, 0.0] # Sun in Pisces
+    assert chart["positions"]["Sun"]["house"] == 1
+
+
+def test_time_dependent_sections_and_bad_mode():
+    sections = calc.find_time_dependent_sections(HUMAN_PROMPTS)
+    assert {"01_Mythic_Prologue", "13_Career_Wealth", "14_Love_Soulmates"} <= set(sections)
+    assert "07_Numerology" not in sections and "09_Planetary_Analysis" not in sections
+    with pytest.raises(ValueError):
+        calc.calculate_solar_house_cusps(100.0, "placidus")
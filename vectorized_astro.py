@@ -0,0 +1,89 @@
+# vectorized_astro.py
+# --- VERSION 1.0.0: NumPy helpers for sign and house placement of many longitudes at once ---
+# --- VERSION 1.1.0: houses_for_degree_rows places points against a different cusp set per row ---
+# Used by derived-chart modules (sidereal views, relocation, parts engine) so they can place
+# every point in a single array pass instead of calling get_zodiac_sign/calculate_house per point.
+
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - VECTOR - %(message)s')
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(log_formatter)
+    logger.addHandler(log_handler)
+    logger.setLevel(logging.INFO)
+
+ZODIAC_SIGNS = (
+    "Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
+    "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"
+)
+HOUSE_EPSILON = 1e-9 # Same tolerance calculate_house uses for points sitting on a cusp
+
+
+def normalize_degrees(degrees):
+    """Return degrees as a float array wrapped into [0, 360). NaN stays NaN."""
+    return np.mod(np.asarray(degrees, dtype=float), 360.0)
+
+
+def signs_for_degrees(degrees):
+    """Return (sign_index, exact_degree) arrays for an array of longitudes. Invalid (NaN) entries get index -1."""
+    normalized = normalize_degrees(degrees)
+    valid = np.isfinite(normalized)
+    sign_index = np.full(normalized.shape, -1, dtype=int)
+    sign_index[valid] = (np.floor(normalized[valid] / 30.0).astype(int)) % 12
+    exact_degree = np.where(valid, np.round(np.mod(normalized, 30.0), 4), 0.0)
+    return sign_index, exact_degree
+
+
+def sign_names(sign_index):
+    """Map sign indices from signs_for_degrees back to names ("Error" for invalid)."""
+    return [ZODIAC_SIGNS[i] if 0 <= i < 12 else "Error" for i in np.asarray(sign_index).tolist()]
+
+
+def build_house_index(house_cusps):
+    """Precompute a sorted lookup for a set of 12 cusps.
+
+    Returns (start, offsets): cusp 1 longitude and each cusp's distance from it, which is monotonic,
+    so placement becomes one searchsorted call. Returns None if the cusps are unusable.
+    """
+    try:
+        cusps = np.asarray(list(house_cusps)[:12], dtype=float)
+    except (TypeError, ValueError):
+        logger.error(f"Invalid house cusps for house index: {house_cusps}")
+        return None
+    if cusps.shape != (12,) or not np.all(np.isfinite(cusps)):
+        logger.error(f"House index needs 12 finite cusps, got: {house_cusps}")
+        return None
+    start = cusps[0] % 360.0
+    offsets = np.mod(cusps - start, 360.0)
+    if np.any(np.diff(offsets) < 0):
+        logger.warning(f"House cusps are not in zodiacal order; house index may misplace points: {cusps.tolist()}")
+    return start, offsets
+
+
+def houses_for_degrees(degrees, house_index):
+    """Return house numbers (1-12, 0 = unknown) for an array of longitudes using a build_house_index result."""
+    degrees_arr = np.asarray(degrees, dtype=float)
+    if house_index is None:
+        return np.zeros(degrees_arr.shape, dtype=int)
+    start, offsets = house_index
+    relative = np.mod(degrees_arr - start + HOUSE_EPSILON, 360.0)
+    houses = np.searchsorted(offsets, relative, side='right')
+    return np.where(np.isfinite(degrees_arr), houses, 0).astype(int)
+
+
+def houses_for_degree_rows(degrees, cusps):
+    """House numbers for (N, P) longitudes where row i uses its own 12 cusps cusps[i] (shape (N, 12)).
+
+    Same placement rule as houses_for_degrees (a point on a cusp belongs to the house it starts); 0 for NaN.
+    """
+    degrees_arr = np.asarray(degrees, dtype=float)
+    cusps_arr = np.asarray(cusps, dtype=float)
+    start = cusps_arr[:, :1] % 360.0
+    offsets = np.mod(cusps_arr - start, 360.0) # (N, 12), monotonic per row
+    relative = np.mod(degrees_arr - start + HOUSE_EPSILON, 360.0) # (N, P)
+    houses = np.count_nonzero(offsets[:, None, :] <= relative[:, :, None], axis=2)
+    return np.where(np.isfinite(degrees_arr), houses, 0).astype(int)